@@ -137,7 +137,9 @@ console_scripts = [
     # copybara:uncomment_end
     'tensorflow_gnn.tools.generate_training_data',
     'tensorflow_gnn.tools.print_training_data',
+    'tensorflow_gnn.tools.profile_report',
     'tensorflow_gnn.tools.sampled_stats',
+    'tensorflow_gnn.tools.serving_benchmark',
     'tensorflow_gnn.tools.validate_graph_schema',
 ]
 
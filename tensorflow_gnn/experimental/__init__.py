@@ -30,11 +30,33 @@ need to be imported separately (`from tensorflow_gnn.experimental import foo`).
 That is for special cases only.
 """
 
+from tensorflow_gnn.graph import adjacency
+from tensorflow_gnn.graph import graph_tensor_encode
+from tensorflow_gnn.graph import graph_tensor_io
+from tensorflow_gnn.graph import graph_tensor_ops
+from tensorflow_gnn.graph import op_profiling
 from tensorflow_gnn.graph import readout
+from tensorflow_gnn.graph import schema_utils
 from tensorflow_gnn.graph import tensor_utils
 
+concat_graph_components = graph_tensor_ops.concat_graph_components
 context_readout_into_feature = readout.context_readout_into_feature
+convert_to_csr_adjacency = graph_tensor_ops.convert_to_csr_adjacency
+create_quantization_from_schema_pb = (
+    schema_utils.create_quantization_from_schema_pb)
+CsrAdjacency = adjacency.CsrAdjacency
+CsrAdjacencySpec = adjacency.CsrAdjacencySpec
+decode_quantized_feature = graph_tensor_io.decode_quantized_feature
+disable_op_profiling = op_profiling.disable_op_profiling
+enable_op_profiling = op_profiling.enable_op_profiling
+encode_quantized_feature = graph_tensor_encode.encode_quantized_feature
 segment_random_index_shuffle = tensor_utils.segment_random_index_shuffle
 
+del adjacency
+del graph_tensor_encode
+del graph_tensor_io
+del graph_tensor_ops
+del op_profiling
 del readout
+del schema_utils
 del tensor_utils
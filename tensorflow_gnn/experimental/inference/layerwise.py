@@ -0,0 +1,615 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Layer-wise inference of GraphUpdates on a full graph with Apache Beam.
+
+Running a trained GNN on sampled subgraphs around each seed node recomputes
+the lower-layer states of shared neighbors again and again, so the total work
+grows exponentially with the number of hops. This library applies the
+`GraphUpdate` layers of a trained model one at a time to all nodes of the
+graph instead: the states of layer `l` are computed for all nodes from the
+states of layer `l - 1` and the edges, and are written to disk before the next
+layer reads them. The total work is O(num_layers * num_edges).
+
+Each node set update is computed for batches of receiver nodes on a GraphTensor
+that contains just the receiver nodes, their incident edges and the states of
+the sender nodes on them. This is exact for convolutions that compute the
+result for a receiver node from its incident edges and their endpoints only,
+like `SimpleConv`, `GATv2Conv` or `MultiHeadAttentionConv`, but not for
+convolutions that need the degrees of sender nodes (like `GCNConv` with
+symmetric normalization).
+
+The supported `GraphUpdate` layers have node set updates only (no edge set or
+context updates) that read node states from and write them to the
+`tfgnn.HIDDEN_STATE` feature. Node states are float vectors.
+
+All messages to one receiver node (that is, the states of all its senders)
+are grouped on one Beam worker and held in its memory together, so the
+in-degree of nodes is limited by worker memory. Graphs with nodes of very high
+in-degree need to have their edges downsampled before.
+"""
+
+from __future__ import annotations
+
+import collections
+import functools
+import os
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import apache_beam as beam
+from apache_beam.options.pipeline_options import PipelineOptions
+import numpy as np
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+from tensorflow_gnn.data import unigraph
+
+PCollection = beam.pvalue.PCollection
+NodeId = bytes
+State = np.ndarray
+LayerFn = Callable[[], tf.keras.layers.Layer]
+# Maps feature names to their dtype (a `tf.DType` enum value) and shape, for
+# edge features.
+FeatureSpecs = Dict[str, Tuple[int, Tuple[int, ...]]]
+
+
+def get_graph_updates(
+    model: tf.keras.layers.Layer) -> List[tf.keras.layers.Layer]:
+  """Returns the GraphUpdate layers of `model` in the order of their calls.
+
+  Args:
+    model: A Keras Model, possibly with nested Models, as built by the runner.
+
+  Returns:
+    The list of `tfgnn.keras.layers.GraphUpdate` layers in `model`, in the
+    order of `model.layers`, which is the order of execution for functional
+    and sequential Keras models.
+  """
+  result = []
+  for layer in getattr(model, "layers", []):
+    if isinstance(layer, tfgnn.keras.layers.GraphUpdate):
+      result.append(layer)
+    elif isinstance(layer, tf.keras.Model):
+      result.extend(get_graph_updates(layer))
+  return result
+
+
+def load_graph_update(model_path: str, index: int) -> tf.keras.layers.Layer:
+  """Returns the `index`-th GraphUpdate layer of the saved Keras model."""
+  model = tf.keras.models.load_model(model_path, compile=False)
+  return get_graph_updates(model)[index]
+
+
+def layer_fns_from_saved_model(model_path: str) -> List[LayerFn]:
+  """Returns functions to load each GraphUpdate of the saved Keras model.
+
+  Args:
+    model_path: The path of a Keras model saved in SavedModel format, e.g., as
+      exported by `tfgnn.runner.KerasModelExporter`.
+
+  Returns:
+    A list of picklable functions that load the GraphUpdate layers of the
+    model, in their order of execution, for use with `ApplyGraphUpdate` or
+    `run_layerwise_inference()`.
+  """
+  model = tf.keras.models.load_model(model_path, compile=False)
+  num_layers = len(get_graph_updates(model))
+  if not num_layers:
+    raise ValueError(f"No GraphUpdate layers found in {model_path}.")
+  return [functools.partial(load_graph_update, model_path, index)
+          for index in range(num_layers)]
+
+
+class _EdgeSetInput(NamedTuple):
+  """An edge set that sends messages to the updated node set."""
+  edge_set_name: tfgnn.EdgeSetName
+  receiver_tag: tfgnn.IncidentNodeTag
+  sender_node_set_name: tfgnn.NodeSetName
+  # The edge features read by the convolution, or None if unknown.
+  edge_feature_names: Optional[Tuple[str, ...]]
+
+
+class _NodeSetUpdatePlan(NamedTuple):
+  """Describes the inputs of one node set update, as plain Python values."""
+  node_set_name: tfgnn.NodeSetName
+  edge_set_inputs: Tuple[_EdgeSetInput, ...]
+
+
+def _get_node_set_updates(
+    layer: tf.keras.layers.Layer,
+    graph_schema: tfgnn.GraphSchema) -> Mapping[tfgnn.NodeSetName, Any]:
+  """Returns the node set updates of a GraphUpdate layer."""
+  # pylint: disable=protected-access
+  if not isinstance(layer, tfgnn.keras.layers.GraphUpdate):
+    raise ValueError(f"Expected a GraphUpdate layer, got {layer}.")
+  if not layer._is_initialized:
+    # Deferred initialization only looks at the names and adjacency of
+    # graph pieces, which are the same as for the graph in the schema.
+    layer._init_from_updates(**layer._deferred_init_callback(
+        tfgnn.create_graph_spec_from_schema_pb(graph_schema)))
+  if layer._edge_set_updates or layer._context_update is not None:
+    raise ValueError("Layer-wise inference supports GraphUpdate layers with "
+                     "node set updates only.")
+  return layer._node_set_updates
+
+
+def _get_update_plans(
+    layer: tf.keras.layers.Layer,
+    graph_schema: tfgnn.GraphSchema,
+    default_receiver_tag: Optional[tfgnn.IncidentNodeTag]
+) -> List[_NodeSetUpdatePlan]:
+  """Returns the plans of the node set updates in `layer`."""
+  # pylint: disable=protected-access
+  result = []
+  node_set_updates = _get_node_set_updates(layer, graph_schema)
+  for node_set_name, node_set_update in sorted(node_set_updates.items()):
+    edge_set_inputs = []
+    for edge_set_name, input_fn in sorted(
+        getattr(node_set_update, "_edge_set_inputs", {}).items()):
+      receiver_tag = getattr(input_fn, "_receiver_tag", None)
+      if receiver_tag is None:
+        receiver_tag = default_receiver_tag
+      if receiver_tag not in (tfgnn.SOURCE, tfgnn.TARGET):
+        raise ValueError(
+            f"Cannot determine the receiver_tag of the input from edge set "
+            f"'{edge_set_name}' to node set '{node_set_name}'.")
+      edge_set = graph_schema.edge_sets[edge_set_name]
+      if receiver_tag == tfgnn.TARGET:
+        receiver, sender = edge_set.target, edge_set.source
+      else:
+        receiver, sender = edge_set.source, edge_set.target
+      if receiver != node_set_name:
+        raise ValueError(
+            f"Edge set '{edge_set_name}' does not have node set "
+            f"'{node_set_name}' as its receiver.")
+      if hasattr(input_fn, "_sender_edge_feature"):
+        edge_feature = input_fn._sender_edge_feature
+        edge_feature_names = (edge_feature,) if edge_feature else ()
+      else:
+        edge_feature_names = None
+      edge_set_inputs.append(_EdgeSetInput(
+          edge_set_name, receiver_tag, sender, edge_feature_names))
+    result.append(_NodeSetUpdatePlan(node_set_name, tuple(edge_set_inputs)))
+  return result
+
+
+def _get_feature_specs(
+    features: Mapping[str, tfgnn.proto.Feature],
+    names: Optional[Sequence[str]] = None) -> FeatureSpecs:
+  """Returns dtypes and shapes of dense features as plain Python values.
+
+  Args:
+    features: The features of a graph piece in the schema.
+    names: The names of the features to return. If unset, all features are
+      returned except the ones with names starting with "#".
+
+  Returns:
+    A dict from feature names to pairs `(dtype, shape)` of the `tf.DType` enum
+    value and the shape of the feature.
+  """
+  if names is None:
+    names = [name for name in features if not name.startswith("#")]
+  result = {}
+  for name in names:
+    if name not in features:
+      raise ValueError(f"Edge feature '{name}' is not in the schema.")
+    feature = features[name]
+    dims = tuple(dim.size for dim in feature.shape.dim)
+    if any(dim < 0 for dim in dims):
+      raise ValueError(f"Edge feature '{name}' must have a static shape.")
+    result[name] = (tf.dtypes.as_dtype(feature.dtype).as_datatype_enum, dims)
+  return result
+
+
+def _as_numpy_dtype(dtype: int) -> np.dtype:
+  """Returns the numpy dtype of a `tf.DType` enum value (object for strings)."""
+  return np.dtype(tf.dtypes.as_dtype(dtype).as_numpy_dtype)
+
+
+def _example_to_features(example: tf.train.Example,
+                         feature_specs: FeatureSpecs) -> Dict[str, np.ndarray]:
+  """Returns the features of `example` as numpy arrays of the given specs."""
+  result = {}
+  for name, (dtype, shape) in feature_specs.items():
+    feature = example.features.feature[name]
+    kind = feature.WhichOneof("kind")
+    values = getattr(feature, kind).value if kind else []
+    result[name] = np.asarray(
+        values, dtype=_as_numpy_dtype(dtype)).reshape(shape)
+  return result
+
+
+class _UpdateNodeStatesFn(beam.DoFn):
+  """Computes new states for batches of receiver nodes of one node set."""
+
+  def __init__(self, layer_fn: LayerFn, plan: _NodeSetUpdatePlan,
+               serialized_schema: bytes, edge_feature_specs: Mapping[
+                   tfgnn.EdgeSetName, FeatureSpecs]):
+    self._layer_fn = layer_fn
+    self._plan = plan
+    self._serialized_schema = serialized_schema
+    self._edge_feature_specs = edge_feature_specs
+    self._node_set_update = None
+    self._adjacency = None
+    self._update_fn = None
+
+  def setup(self):
+    graph_schema = tfgnn.GraphSchema()
+    graph_schema.ParseFromString(self._serialized_schema)
+    node_set_updates = _get_node_set_updates(self._layer_fn(), graph_schema)
+    self._node_set_update = node_set_updates[self._plan.node_set_name]
+    self._adjacency = {
+        name: (edge_set.source, edge_set.target)
+        for name, edge_set in graph_schema.edge_sets.items()}
+
+  def _get_update_fn(self, spec: tfgnn.GraphTensorSpec):
+    """Returns the node set update as a `tf.function` traced once for `spec`.
+
+    The input signature depends on the state sizes, which become known with
+    the side input of the first batch, so the function is created then and
+    reused for all later batches of this DoFn instance.
+
+    Args:
+      spec: The spec of the first input graph, to be relaxed to any number of
+        nodes and edges.
+    """
+    if self._update_fn is None:
+      node_set_update = self._node_set_update
+      node_set_name = self._plan.node_set_name
+
+      @tf.function(input_signature=[
+          spec.relax(num_nodes=True, num_edges=True)])
+      def update_fn(graph):
+        new_states = node_set_update(graph, node_set_name=node_set_name)
+        if isinstance(new_states, Mapping):
+          new_states = new_states[tfgnn.HIDDEN_STATE]
+        return new_states
+
+      self._update_fn = update_fn
+    return self._update_fn
+
+  def process(self, batch: List[Tuple[NodeId, Dict[str, List[Any]]]],
+              state_dims: Mapping[tfgnn.NodeSetName, int]):
+    receiver_set_name = self._plan.node_set_name
+    receiver_ids = []
+    node_states = collections.defaultdict(list)
+    for receiver_id, inputs in batch:
+      if not inputs["state"]:
+        continue  # Edges to an unknown node.
+      receiver_ids.append(receiver_id)
+      node_states[receiver_set_name].append(inputs["state"][0])
+
+    edge_indices = {}
+    edge_features = {}
+    for edge_set_input in self._plan.edge_set_inputs:
+      edge_set_name = edge_set_input.edge_set_name
+      sender_states = node_states[edge_set_input.sender_node_set_name]
+      receiver_indices, sender_indices = [], []
+      features = []
+      receiver_index = 0
+      for _, inputs in batch:
+        if not inputs["state"]:
+          continue
+        for sender_state, edge_feature_values in inputs[edge_set_name]:
+          receiver_indices.append(receiver_index)
+          sender_indices.append(len(sender_states))
+          sender_states.append(sender_state)
+          features.append(edge_feature_values)
+        receiver_index += 1
+      if edge_set_input.receiver_tag == tfgnn.TARGET:
+        edge_indices[edge_set_name] = (sender_indices, receiver_indices)
+      else:
+        edge_indices[edge_set_name] = (receiver_indices, sender_indices)
+      edge_features[edge_set_name] = features
+
+    if not receiver_ids:
+      return
+    graph = self._make_graph(node_states, state_dims, edge_indices,
+                             edge_features)
+    new_states = self._get_update_fn(graph.spec)(graph).numpy()
+    for i, receiver_id in enumerate(receiver_ids):
+      yield receiver_id, new_states[i]
+
+  def _make_graph(self, node_states, state_dims, edge_indices, edge_features):
+    """Returns a GraphTensor of receivers, their edges and sender states."""
+    node_sets = {}
+    for node_set_name, states in node_states.items():
+      if states:
+        values = np.stack(states).astype(np.float32)
+      else:
+        values = np.zeros([0, state_dims[node_set_name]], np.float32)
+      node_sets[node_set_name] = tfgnn.NodeSet.from_fields(
+          sizes=tf.constant([len(values)]),
+          features={tfgnn.HIDDEN_STATE: tf.constant(values)})
+    edge_sets = {}
+    for edge_set_name, (source_indices, target_indices) in edge_indices.items():
+      source_name, target_name = self._adjacency[edge_set_name]
+      features = {}
+      for name, (dtype, shape) in self._edge_feature_specs[
+          edge_set_name].items():
+        values = [item[name] for item in edge_features[edge_set_name]]
+        features[name] = tf.constant(
+            np.stack(values) if values else np.zeros(
+                [0, *shape], _as_numpy_dtype(dtype)),
+            dtype=tf.dtypes.as_dtype(dtype))
+      edge_sets[edge_set_name] = tfgnn.EdgeSet.from_fields(
+          sizes=tf.constant([len(source_indices)]),
+          adjacency=tfgnn.Adjacency.from_indices(
+              (source_name, tf.constant(source_indices, tf.int64)),
+              (target_name, tf.constant(target_indices, tf.int64))),
+          features=features)
+    return tfgnn.GraphTensor.from_pieces(node_sets=node_sets,
+                                         edge_sets=edge_sets)
+
+
+def _key_edge_by_sender(edge: Tuple[NodeId, NodeId, tf.train.Example],
+                        receiver_tag: tfgnn.IncidentNodeTag,
+                        feature_specs: FeatureSpecs):
+  source_id, target_id, example = edge
+  features = _example_to_features(example, feature_specs)
+  if receiver_tag == tfgnn.TARGET:
+    return source_id, (target_id, features)
+  else:
+    return target_id, (source_id, features)
+
+
+def _send_sender_state(item, edge_set_name: tfgnn.EdgeSetName):
+  """Yields the sender state with each edge, keyed by receiver id."""
+  _, inputs = item
+  if not inputs["state"]:
+    return  # Edges from an unknown node.
+  sender_state = inputs["state"][0]
+  for receiver_id, features in inputs["edges"]:
+    yield receiver_id, (edge_set_name, sender_state, features)
+
+
+def _group_messages(item, edge_set_names: Sequence[tfgnn.EdgeSetName]):
+  """Returns the receiver state and its edges grouped by edge set."""
+  receiver_id, inputs = item
+  result = {"state": list(inputs["state"])}
+  for edge_set_name in edge_set_names:
+    result[edge_set_name] = []
+  for edge_set_name, sender_state, features in inputs["messages"]:
+    result[edge_set_name].append((sender_state, features))
+  return receiver_id, result
+
+
+def _get_state_dim(item: Tuple[NodeId, State],
+                   node_set_name: tfgnn.NodeSetName) -> Tuple[str, int]:
+  return node_set_name, int(item[1].shape[-1])
+
+
+class ApplyGraphUpdate(beam.PTransform):
+  """Applies a GraphUpdate layer to the node states of a full graph.
+
+  The input is a dict of PCollections with the following keys:
+
+    * `"nodes/<node_set_name>"` for each node set, with items `(node_id,
+      state)`, where `state` is a 1-D numpy array of the node's input state;
+    * `"edges/<edge_set_name>"` for each edge set, with items `(source_id,
+      target_id, example)`, where `example` is the `tf.train.Example` with the
+      edge features, as read by `unigraph.read_graph()`.
+
+  The output is a dict of PCollections with key `<node_set_name>` for each node
+  set of the schema, with items `(node_id, new_state)`. Node sets not updated
+  by the layer keep their input state.
+
+  Only the edge features read by the convolutions are passed on with the
+  edges. For convolutions that do not expose it as their `_sender_edge_feature`
+  attribute, all edge features in the schema are passed on.
+
+  All messages to a receiver node are held in memory together, see the module
+  docstring.
+  """
+
+  def __init__(self,
+               layer_fn: LayerFn,
+               graph_schema: tfgnn.GraphSchema,
+               *,
+               receiver_tag: Optional[tfgnn.IncidentNodeTag] = None,
+               batch_size: int = 256):
+    """Constructs the transform.
+
+    Args:
+      layer_fn: A picklable function that returns the `GraphUpdate` layer,
+        like the items of `layer_fns_from_saved_model()`. It is called once
+        in the pipeline construction and once per Beam worker.
+      graph_schema: The schema of the graph.
+      receiver_tag: The receiver tag to use for convolutions that do not
+        expose it as their `_receiver_tag` attribute. Convolutions that
+        subclass `tfgnn.keras.layers.AnyToAnyConvolutionBase` do.
+      batch_size: The maximum number of receiver nodes for which the node set
+        update is computed together.
+    """
+    super().__init__()
+    self._layer_fn = layer_fn
+    self._graph_schema = graph_schema
+    self._plans = _get_update_plans(layer_fn(), graph_schema, receiver_tag)
+    self._batch_size = batch_size
+
+  def expand(self, inputs: Mapping[str, PCollection]
+             ) -> Dict[tfgnn.NodeSetName, PCollection]:
+    states = {name: inputs[f"nodes/{name}"]
+              for name in self._graph_schema.node_sets}
+    edges = {name: inputs[f"edges/{name}"]
+             for name in self._graph_schema.edge_sets}
+    state_dims = beam.pvalue.AsDict(
+        [states[name]
+         | f"GetStateDim/{name}" >> beam.Map(_get_state_dim, name)
+         | f"DistinctStateDim/{name}" >> beam.Distinct()
+         for name in sorted(states)]
+        | "FlattenStateDims" >> beam.Flatten())
+    serialized_schema = self._graph_schema.SerializeToString()
+
+    outputs = dict(states)
+    for plan in self._plans:
+      prefix = f"Update/{plan.node_set_name}"
+      messages = []
+      for edge_set_input in plan.edge_set_inputs:
+        edge_set_name = edge_set_input.edge_set_name
+        edge_set = self._graph_schema.edge_sets[edge_set_name]
+        feature_specs = _get_feature_specs(
+            edge_set.features, edge_set_input.edge_feature_names)
+        keyed_edges = (
+            edges[edge_set_name]
+            | f"{prefix}/KeyBySender/{edge_set_name}" >> beam.Map(
+                _key_edge_by_sender, edge_set_input.receiver_tag,
+                feature_specs))
+        messages.append(
+            {"state": states[edge_set_input.sender_node_set_name],
+             "edges": keyed_edges}
+            | f"{prefix}/JoinSenders/{edge_set_name}" >> beam.CoGroupByKey()
+            | f"{prefix}/SendStates/{edge_set_name}" >> beam.FlatMap(
+                _send_sender_state, edge_set_name))
+      messages = messages | f"{prefix}/FlattenMessages" >> beam.Flatten()
+
+      edge_set_names = [e.edge_set_name for e in plan.edge_set_inputs]
+      edge_feature_specs = {
+          e.edge_set_name: _get_feature_specs(
+              self._graph_schema.edge_sets[e.edge_set_name].features,
+              e.edge_feature_names)
+          for e in plan.edge_set_inputs}
+      outputs[plan.node_set_name] = (
+          {"state": states[plan.node_set_name], "messages": messages}
+          | f"{prefix}/JoinReceivers" >> beam.CoGroupByKey()
+          | f"{prefix}/GroupMessages" >> beam.Map(
+              _group_messages, edge_set_names)
+          | f"{prefix}/Batch" >> beam.BatchElements(
+              min_batch_size=1, max_batch_size=self._batch_size)
+          | f"{prefix}/Apply" >> beam.ParDo(
+              _UpdateNodeStatesFn(self._layer_fn, plan, serialized_schema,
+                                  edge_feature_specs),
+              state_dims))
+    return outputs
+
+
+def _state_to_example(item: Tuple[NodeId, State]) -> tf.train.Example:
+  node_id, state = item
+  example = tf.train.Example()
+  example.features.feature[unigraph.NODE_ID].bytes_list.value.append(node_id)
+  example.features.feature[tfgnn.HIDDEN_STATE].float_list.value.extend(
+      state.reshape([-1]).tolist())
+  return example
+
+
+def _example_to_state(example: tf.train.Example,
+                      feature_name: str = tfgnn.HIDDEN_STATE
+                     ) -> Tuple[NodeId, State]:
+  feature = example.features.feature
+  return (feature[unigraph.NODE_ID].bytes_list.value[0],
+          np.asarray(feature[feature_name].float_list.value, np.float32))
+
+
+def node_to_state(node: Tuple[NodeId, tf.train.Example],
+                  feature_name: str = tfgnn.HIDDEN_STATE
+                 ) -> Tuple[NodeId, State]:
+  """Returns `(node_id, state)` from a float feature of a unigraph node."""
+  return _example_to_state(node[1], feature_name)
+
+
+def get_states_pattern(output_dir: str, layer_index: int,
+                       node_set_name: tfgnn.NodeSetName,
+                       num_shards: Optional[int] = None) -> str:
+  """Returns the file pattern of the states of a node set after a layer."""
+  filename = f"{node_set_name}.tfrecords"
+  if num_shards:
+    filename += f"@{num_shards}"
+  return os.path.join(output_dir, f"layer_{layer_index}", filename)
+
+
+class WriteStates(beam.PTransform):
+  """Writes `(node_id, state)` items as TFRecords of `tf.train.Example`."""
+
+  def __init__(self, file_pattern: str):
+    super().__init__()
+    self._file_pattern = file_pattern
+
+  def expand(self, states: PCollection):
+    return (states
+            | "ToExample" >> beam.Map(_state_to_example)
+            | "Write" >> unigraph.WriteTable(self._file_pattern))
+
+
+class ReadStates(beam.PTransform):
+  """Reads `(node_id, state)` items written by `WriteStates`."""
+
+  def __init__(self, file_pattern: str):
+    super().__init__()
+    self._file_pattern = file_pattern
+
+  def expand(self, pcoll: PCollection) -> PCollection:
+    return (pcoll
+            | "Read" >> unigraph.ReadTable(self._file_pattern)
+            | "ToState" >> beam.Map(_example_to_state))
+
+
+def run_layerwise_inference(
+    layer_fns: Sequence[LayerFn],
+    *,
+    graph_schema: tfgnn.GraphSchema,
+    graph_dir: str,
+    output_dir: str,
+    initial_state_feature: str = tfgnn.HIDDEN_STATE,
+    receiver_tag: Optional[tfgnn.IncidentNodeTag] = None,
+    batch_size: int = 256,
+    num_shards: Optional[int] = None,
+    pipeline_options: Optional[PipelineOptions] = None) -> None:
+  """Computes the node states after each GraphUpdate for a full unigraph.
+
+  Runs one Beam pipeline per layer. The pipeline for layer `l` reads the node
+  states written for layer `l - 1` (or the `initial_state_feature` of the
+  unigraph nodes for `l = 0`) and the edges of the unigraph, applies the layer,
+  and writes the new states to the file patterns returned by
+  `get_states_pattern(output_dir, l, node_set_name, num_shards)`.
+
+  The input states must already be encoded as float vectors, so any feature
+  preprocessing and encoding of the model needs to have been applied to the
+  unigraph before.
+
+  Args:
+    layer_fns: Functions that return the GraphUpdate layers to apply, in order,
+      e.g., from `layer_fns_from_saved_model()`.
+    graph_schema: The schema of the unigraph.
+    graph_dir: The directory of the unigraph files.
+    output_dir: The directory to write node states to.
+    initial_state_feature: The node feature with the input states of layer 0.
+    receiver_tag: See `ApplyGraphUpdate`.
+    batch_size: See `ApplyGraphUpdate`.
+    num_shards: The number of output shards per node set and layer. If unset,
+      one file is written per node set and layer.
+    pipeline_options: Options for the Beam pipelines.
+  """
+  for layer_index, layer_fn in enumerate(layer_fns):
+    with beam.Pipeline(options=pipeline_options) as root:
+      graph = unigraph.read_graph(graph_schema, graph_dir, root)
+      inputs = {}
+      for node_set_name in graph_schema.node_sets:
+        if layer_index == 0:
+          states = (graph[tfgnn.NODES][node_set_name]
+                    | f"InitialStates/{node_set_name}" >> beam.Map(
+                        node_to_state, initial_state_feature))
+        else:
+          states = root | f"ReadStates/{node_set_name}" >> ReadStates(
+              get_states_pattern(output_dir, layer_index - 1, node_set_name,
+                                 num_shards))
+        inputs[f"nodes/{node_set_name}"] = states
+      for edge_set_name in graph_schema.edge_sets:
+        inputs[f"edges/{edge_set_name}"] = graph[tfgnn.EDGES][edge_set_name]
+
+      outputs = inputs | "ApplyGraphUpdate" >> ApplyGraphUpdate(
+          layer_fn, graph_schema, receiver_tag=receiver_tag,
+          batch_size=batch_size)
+      for node_set_name, states in outputs.items():
+        _ = states | f"WriteStates/{node_set_name}" >> WriteStates(
+            get_states_pattern(output_dir, layer_index, node_set_name,
+                               num_shards))
@@ -0,0 +1,332 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for layer-wise inference."""
+
+import os
+import tempfile
+
+from absl.testing import parameterized
+import apache_beam as beam
+from apache_beam.testing import test_pipeline
+from apache_beam.testing import util
+import numpy as np
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+from tensorflow_gnn.data import unigraph
+from tensorflow_gnn.experimental.inference import layerwise
+
+from google.protobuf import text_format
+
+_SCHEMA = text_format.Parse("""
+  node_sets {
+    key: "author"
+    value {
+      features { key: "hidden_state" value { dtype: DT_FLOAT shape { dim { size: 2 } } } }
+      metadata { filename: "author.tfrecords" }
+    }
+  }
+  node_sets {
+    key: "paper"
+    value {
+      features { key: "hidden_state" value { dtype: DT_FLOAT shape { dim { size: 2 } } } }
+      metadata { filename: "paper.tfrecords" }
+    }
+  }
+  edge_sets {
+    key: "cites"
+    value {
+      source: "paper"
+      target: "paper"
+      features { key: "weight" value { dtype: DT_FLOAT shape { dim { size: 1 } } } }
+      features { key: "venue" value { dtype: DT_STRING } }
+      metadata { filename: "cites.tfrecords" }
+    }
+  }
+  edge_sets {
+    key: "writes"
+    value {
+      source: "author"
+      target: "paper"
+      metadata { filename: "writes.tfrecords" }
+    }
+  }
+""", tfgnn.GraphSchema())
+
+_AUTHOR_STATES = np.array([[1., 2.], [-1., 0.5]], np.float32)
+_PAPER_STATES = np.array([[0., 1.], [2., -1.], [0.5, 0.5], [1., 3.]],
+                         np.float32)
+_CITES = ([0, 1, 1, 2, 3, 3], [1, 0, 2, 1, 1, 2], [1., 2., 3., 4., 5., 6.])
+_WRITES = ([0, 0, 1, 1], [0, 1, 1, 2])
+
+
+def _layer_fn(scale: float = 1.0) -> tf.keras.layers.Layer:
+  """Returns a GraphUpdate with deterministic weights."""
+  def dense(units, value):
+    return tf.keras.layers.Dense(
+        units, activation="relu",
+        kernel_initializer=tf.keras.initializers.RandomUniform(
+            -value, value, seed=42),
+        bias_initializer=tf.keras.initializers.Constant(0.1 * scale))
+  return tfgnn.keras.layers.GraphUpdate(node_sets={
+      "paper": tfgnn.keras.layers.NodeSetUpdate(
+          {"cites": tfgnn.keras.layers.SimpleConv(
+              dense(3, scale), "mean", receiver_tag=tfgnn.TARGET,
+              sender_edge_feature="weight"),
+           "writes": tfgnn.keras.layers.SimpleConv(
+               dense(3, scale), "sum", receiver_tag=tfgnn.TARGET)},
+          tfgnn.keras.layers.NextStateFromConcat(dense(2, scale)))})
+
+
+def _layer_fn_0():
+  return _layer_fn(1.0)
+
+
+def _layer_fn_1():
+  return _layer_fn(0.5)
+
+
+def _node_id(node_set_name, index):
+  return f"{node_set_name}{index}".encode()
+
+
+def _graph_tensor() -> tfgnn.GraphTensor:
+  def edge_set(source_name, target_name, edges, features=None):
+    return tfgnn.EdgeSet.from_fields(
+        sizes=[len(edges[0])],
+        adjacency=tfgnn.Adjacency.from_indices(
+            (source_name, tf.constant(edges[0])),
+            (target_name, tf.constant(edges[1]))),
+        features=features or {})
+  return tfgnn.GraphTensor.from_pieces(
+      node_sets={
+          "author": tfgnn.NodeSet.from_fields(
+              sizes=[2], features={tfgnn.HIDDEN_STATE: _AUTHOR_STATES}),
+          "paper": tfgnn.NodeSet.from_fields(
+              sizes=[4], features={tfgnn.HIDDEN_STATE: _PAPER_STATES})},
+      edge_sets={
+          "cites": edge_set("paper", "paper", _CITES, {
+              "weight": tf.constant(_CITES[2], shape=[6, 1])}),
+          "writes": edge_set("author", "paper", _WRITES)})
+
+
+def _expected_states(layer_fns):
+  graph = _graph_tensor()
+  for layer_fn in layer_fns:
+    graph = layer_fn()(graph)
+  return {name: graph.node_sets[name][tfgnn.HIDDEN_STATE].numpy()
+          for name in graph.node_sets}
+
+
+def _edge(source_name, source, target_name, target, **features):
+  example = tf.train.Example()
+  feature = example.features.feature
+  feature[unigraph.SOURCE_ID].bytes_list.value.append(
+      _node_id(source_name, source))
+  feature[unigraph.TARGET_ID].bytes_list.value.append(
+      _node_id(target_name, target))
+  for name, value in features.items():
+    if isinstance(value, bytes):
+      feature[name].bytes_list.value.append(value)
+    else:
+      feature[name].float_list.value.append(value)
+  return example
+
+
+def _cites_examples():
+  # The string feature "venue" is not read by the model.
+  return [_edge("paper", s, "paper", t, weight=w, venue=b"venue%d" % s)
+          for s, t, w in zip(*_CITES)]
+
+
+def _writes_examples():
+  return [_edge("author", s, "paper", t) for s, t in zip(*_WRITES)]
+
+
+def _node(node_set_name, index, state):
+  example = tf.train.Example()
+  feature = example.features.feature
+  feature[unigraph.NODE_ID].bytes_list.value.append(
+      _node_id(node_set_name, index))
+  feature[tfgnn.HIDDEN_STATE].float_list.value.extend(state)
+  return example
+
+
+def _write_examples(filename, examples):
+  with tf.io.TFRecordWriter(filename) as writer:
+    for example in examples:
+      writer.write(example.SerializeToString())
+
+
+def _read_states(file_pattern):
+  result = {}
+  for filename in tf.io.gfile.glob(unigraph.expand_sharded_pattern(
+      file_pattern)):
+    for record in tf.data.TFRecordDataset(filename):
+      node_id, state = layerwise._example_to_state(
+          tf.train.Example.FromString(record.numpy()))
+      result[node_id] = state
+  return result
+
+
+def _states_close_to(expected, node_set_name):
+  """Returns a Beam matcher for `(node_id, state)` items."""
+  def _matcher(actual):
+    actual = dict(actual)
+    if sorted(actual) != sorted(_node_id(node_set_name, i)
+                                for i in range(len(expected))):
+      raise util.BeamAssertException(f"Unexpected node ids: {sorted(actual)}")
+    for i, state in enumerate(expected):
+      np.testing.assert_allclose(state, actual[_node_id(node_set_name, i)],
+                                 rtol=1e-5, atol=1e-6)
+  return _matcher
+
+
+class LayerwiseInferenceTest(tf.test.TestCase, parameterized.TestCase):
+
+  def assertStatesEqual(self, expected, actual, node_set_name):
+    self.assertCountEqual([_node_id(node_set_name, i)
+                           for i in range(len(expected))], actual.keys())
+    for i, state in enumerate(expected):
+      self.assertAllClose(state, actual[_node_id(node_set_name, i)])
+
+  def testGetGraphUpdates(self):
+    graph = _graph_tensor()
+    inputs = tf.keras.layers.Input(type_spec=graph.spec)
+    layers = [_layer_fn_0(), _layer_fn_1()]
+    outputs = layers[1](layers[0](inputs))
+    outputs = tfgnn.keras.layers.Readout(
+        node_set_name="paper")(outputs)
+    model = tf.keras.Model(inputs, outputs)
+    self.assertEqual(layers, layerwise.get_graph_updates(model))
+
+  def testGetUpdatePlans(self):
+    plans = layerwise._get_update_plans(_layer_fn_0(), _SCHEMA, None)
+    self.assertEqual(
+        [layerwise._NodeSetUpdatePlan("paper", (
+            layerwise._EdgeSetInput("cites", tfgnn.TARGET, "paper",
+                                    ("weight",)),
+            layerwise._EdgeSetInput("writes", tfgnn.TARGET, "author", ())))],
+        plans)
+
+  def testGetFeatureSpecs(self):
+    features = _SCHEMA.edge_sets["cites"].features
+    self.assertEqual(
+        {"weight": (tf.float32.as_datatype_enum, (1,)),
+         "venue": (tf.string.as_datatype_enum, ())},
+        layerwise._get_feature_specs(features))
+    self.assertEqual({"weight": (tf.float32.as_datatype_enum, (1,))},
+                     layerwise._get_feature_specs(features, ["weight"]))
+    self.assertEqual({}, layerwise._get_feature_specs(features, []))
+    with self.assertRaisesRegex(ValueError, r"not in the schema"):
+      layerwise._get_feature_specs(features, ["unknown"])
+
+  def testExampleToFeaturesWithStrings(self):
+    example = _edge("paper", 0, "paper", 1, weight=2., venue=b"x")
+    features = layerwise._example_to_features(
+        example, layerwise._get_feature_specs(
+            _SCHEMA.edge_sets["cites"].features))
+    self.assertAllEqual([2.], features["weight"])
+    self.assertEqual(np.float32, features["weight"].dtype)
+    self.assertEqual(b"x", features["venue"])
+    self.assertEqual(object, features["venue"].dtype)
+
+  def testGetUpdatePlansWrongReceiver(self):
+    layer = tfgnn.keras.layers.GraphUpdate(node_sets={
+        "author": tfgnn.keras.layers.NodeSetUpdate(
+            {"writes": tfgnn.keras.layers.SimpleConv(
+                tf.keras.layers.Dense(2), "sum", receiver_tag=tfgnn.TARGET)},
+            tfgnn.keras.layers.NextStateFromConcat(
+                tf.keras.layers.Dense(2)))})
+    with self.assertRaisesRegex(ValueError, r"does not have node set"):
+      layerwise._get_update_plans(layer, _SCHEMA, None)
+
+  def testGetUpdatePlansEdgeSetUpdate(self):
+    layer = tfgnn.keras.layers.GraphUpdate(edge_sets={
+        "writes": tfgnn.keras.layers.EdgeSetUpdate(
+            tfgnn.keras.layers.NextStateFromConcat(
+                tf.keras.layers.Dense(2)))})
+    with self.assertRaisesRegex(ValueError, r"node set updates only"):
+      layerwise._get_update_plans(layer, _SCHEMA, None)
+
+  @parameterized.named_parameters(("Batch1", 1), ("Batch256", 256))
+  def testApplyGraphUpdate(self, batch_size):
+    expected = _expected_states([_layer_fn_0])
+    with test_pipeline.TestPipeline() as root:
+      inputs = {
+          "nodes/author": root | "Authors" >> beam.Create(
+              [(_node_id("author", i), s)
+               for i, s in enumerate(_AUTHOR_STATES)]),
+          "nodes/paper": root | "Papers" >> beam.Create(
+              [(_node_id("paper", i), s)
+               for i, s in enumerate(_PAPER_STATES)]),
+          "edges/cites": root | "Cites" >> beam.Create(
+              [unigraph.get_edge_ids(e) for e in _cites_examples()]),
+          "edges/writes": root | "Writes" >> beam.Create(
+              [unigraph.get_edge_ids(e) for e in _writes_examples()]),
+      }
+      outputs = inputs | layerwise.ApplyGraphUpdate(
+          _layer_fn_0, _SCHEMA, batch_size=batch_size)
+      self.assertCountEqual(["author", "paper"], outputs.keys())
+      for name, states in outputs.items():
+        util.assert_that(states, _states_close_to(expected[name], name),
+                         label=f"Check/{name}")
+
+  def testRunLayerwiseInference(self):
+    graph_dir = tempfile.mkdtemp(dir=self.get_temp_dir())
+    output_dir = tempfile.mkdtemp(dir=self.get_temp_dir())
+    _write_examples(os.path.join(graph_dir, "author.tfrecords"),
+                    [_node("author", i, s)
+                     for i, s in enumerate(_AUTHOR_STATES)])
+    _write_examples(os.path.join(graph_dir, "paper.tfrecords"),
+                    [_node("paper", i, s)
+                     for i, s in enumerate(_PAPER_STATES)])
+    _write_examples(os.path.join(graph_dir, "cites.tfrecords"),
+                    _cites_examples())
+    _write_examples(os.path.join(graph_dir, "writes.tfrecords"),
+                    _writes_examples())
+
+    layerwise.run_layerwise_inference(
+        [_layer_fn_0, _layer_fn_1], graph_schema=_SCHEMA, graph_dir=graph_dir,
+        output_dir=output_dir, num_shards=2)
+
+    for num_layers in [1, 2]:
+      expected = _expected_states([_layer_fn_0, _layer_fn_1][:num_layers])
+      for name in ["author", "paper"]:
+        self.assertStatesEqual(
+            expected[name],
+            _read_states(layerwise.get_states_pattern(
+                output_dir, num_layers - 1, name, num_shards=2)),
+            name)
+
+  def testLayerFnsFromSavedModel(self):
+    graph = _graph_tensor()
+    inputs = tf.keras.layers.Input(type_spec=graph.spec)
+    outputs = _layer_fn_1()(_layer_fn_0()(inputs))
+    model = tf.keras.Model(inputs, outputs)
+    model_path = os.path.join(self.get_temp_dir(), "model")
+    model.save(model_path, include_optimizer=False)
+
+    layer_fns = layerwise.layer_fns_from_saved_model(model_path)
+    self.assertLen(layer_fns, 2)
+    expected = _expected_states([_layer_fn_0, _layer_fn_1])
+    graph = _graph_tensor()
+    for layer_fn in layer_fns:
+      graph = layer_fn()(graph)
+    self.assertAllClose(expected["paper"],
+                        graph.node_sets["paper"][tfgnn.HIDDEN_STATE])
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -0,0 +1,386 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""In-process micro-batching of concurrent GraphTensor serving requests.
+
+Online serving often gets many concurrent requests with one small sampled
+subgraph each. Calling the model once per request leaves accelerators mostly
+idle. A `MicroBatcher` queues the serialized `GraphTensor`s of concurrent
+requests and scores them together in one call of a model for batches of
+serialized `GraphTensor`s, like the default serving signature exported by the
+runner. Such a model parses the batch and merges it into one graph with
+`merge_batch_to_components()`, so the graph components of the requests follow
+each other in the order of the batch. The batcher splits the outputs of the
+call back into the outputs of each request by the number of graph components
+of each request, so the outputs must be indexed by graph component (like the
+predictions of the root node and graph tasks of the runner).
+
+A batch is closed when the oldest request in it has waited for
+`max_latency_seconds`, when it has `max_batch_size` requests, or when the next
+request would exceed the `SizeConstraints` of a padded model.
+
+`run_benchmark()` measures the latency percentiles and throughput of a
+`MicroBatcher` under a given number of concurrent clients.
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import dataclasses
+import queue
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+
+# Calls a model on a batch of serialized `GraphTensor`s.
+PredictFn = Callable[[tf.Tensor], Mapping[str, tf.Tensor]]
+
+# Queued by `MicroBatcher.close()` after the last request.
+_CLOSE = object()
+
+
+class _Sizes(NamedTuple):
+  """The number of components, nodes and edges of a request."""
+  num_components: int
+  num_nodes: Mapping[str, int]
+  num_edges: Mapping[str, int]
+
+
+@dataclasses.dataclass
+class _Request:
+  example: bytes
+  sizes: _Sizes
+  future: concurrent.futures.Future
+  arrival_time: float
+
+
+class MicroBatcher:
+  """Merges concurrent GraphTensor requests into batched model calls.
+
+  Usage:
+
+  ```python
+  loaded = tf.saved_model.load(export_dir)
+  signature = loaded.signatures["serving_default"]
+  with MicroBatcher(lambda x: signature(examples=x), graph_spec,
+                    max_latency_seconds=0.002) as batcher:
+    # On each request thread:
+    outputs = batcher.predict(serialized_graph_tensor)
+  ```
+
+  `predict()` blocks the calling thread until the request has been scored;
+  `submit()` returns a `concurrent.futures.Future` instead. The outputs of a
+  request are a dict from output names to numpy arrays with one row per graph
+  component of the request.
+
+  All model calls happen on a single background thread, in order of arrival.
+  """
+
+  def __init__(self,
+               predict_fn: PredictFn,
+               graph_spec: tfgnn.GraphTensorSpec,
+               *,
+               max_latency_seconds: float = 0.005,
+               max_batch_size: int = 64,
+               size_constraints: Optional[tfgnn.SizeConstraints] = None):
+    """Starts the batching thread.
+
+    Args:
+      predict_fn: Calls the model on a rank-1 string Tensor of serialized
+        `GraphTensor`s and returns a dict of outputs, each with one row per
+        graph component of the merged batch.
+      graph_spec: The `GraphTensorSpec` of a single serialized `GraphTensor`,
+        to count the graph components (and sizes) of each request.
+      max_latency_seconds: The longest time a request waits for others to
+        join its batch.
+      max_batch_size: The maximum number of requests per batch.
+      size_constraints: Optionally, the total sizes a batch must fit when
+        merged, leaving room for padding with `tfgnn.pad_to_total_sizes()`,
+        like the size buckets of a padded export. A request that does not fit
+        on its own fails with a `ValueError`.
+    """
+    if graph_spec.rank != 0:
+      raise ValueError("Expected a `graph_spec` of rank 0 "
+                       f"(got rank {graph_spec.rank})")
+    if max_batch_size < 1:
+      raise ValueError(
+          f"Expected `max_batch_size` >= 1 (got {max_batch_size})")
+    if max_latency_seconds < 0:
+      raise ValueError("Expected `max_latency_seconds` >= 0 "
+                       f"(got {max_latency_seconds})")
+    self._predict_fn = predict_fn
+    self._max_latency_seconds = max_latency_seconds
+    self._max_batch_size = max_batch_size
+    self._size_constraints = size_constraints
+    self._parse_sizes = _make_parse_sizes_fn(graph_spec)
+    self._queue = queue.Queue()
+    # A request that did not fit the previous batch starts the next one.
+    self._pending: Deque[_Request] = collections.deque()
+    self._closed = False
+    self._lock = threading.Lock()
+    self._num_batches = 0
+    self._num_requests = 0
+    self._thread = threading.Thread(target=self._run, daemon=True)
+    self._thread.start()
+
+  @property
+  def num_batches(self) -> int:
+    """The number of model calls so far."""
+    with self._lock:
+      return self._num_batches
+
+  @property
+  def num_requests(self) -> int:
+    """The number of requests scored so far."""
+    with self._lock:
+      return self._num_requests
+
+  def submit(self, example: bytes) -> concurrent.futures.Future:
+    """Queues a serialized `GraphTensor` and returns the future outputs."""
+    future = concurrent.futures.Future()
+    sizes = self._parse_sizes(example)
+    if (self._size_constraints is not None and
+        not _fits(sizes, self._size_constraints)):
+      future.set_exception(ValueError(
+          f"Request with sizes {sizes} exceeds {self._size_constraints}"))
+      return future
+    with self._lock:
+      if self._closed:
+        raise ValueError("MicroBatcher is closed")
+      self._queue.put(_Request(example, sizes, future, time.monotonic()))
+    return future
+
+  def predict(self, example: bytes) -> Dict[str, np.ndarray]:
+    """Returns the outputs for a serialized `GraphTensor`."""
+    return self.submit(example).result()
+
+  def close(self):
+    """Scores all queued requests and stops the batching thread."""
+    with self._lock:
+      if self._closed:
+        return
+      self._closed = True
+      self._queue.put(_CLOSE)
+    self._thread.join()
+
+  def __enter__(self) -> MicroBatcher:
+    return self
+
+  def __exit__(self, *unused_exc_info):
+    self.close()
+
+  def _next_request(self, timeout: Optional[float]) -> Any:
+    """Returns the next request, `_CLOSE`, or None after `timeout`."""
+    if self._pending:
+      return self._pending.popleft()
+    try:
+      return self._queue.get(timeout=timeout)
+    except queue.Empty:
+      return None
+
+  def _run(self):
+    closing = False
+    while self._pending or not closing:
+      request = self._next_request(None)
+      if request is _CLOSE:
+        closing = True
+        continue
+      batch = [request]
+      totals = request.sizes
+      deadline = request.arrival_time + self._max_latency_seconds
+      while len(batch) < self._max_batch_size:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+          break
+        request = self._next_request(timeout)
+        if request is None:
+          break
+        if request is _CLOSE:
+          closing = True
+          break
+        merged = _add(totals, request.sizes)
+        if (self._size_constraints is not None and
+            not _fits(merged, self._size_constraints)):
+          self._pending.append(request)
+          break
+        batch.append(request)
+        totals = merged
+      self._call(batch)
+
+  def _call(self, batch: List[_Request]):
+    """Calls the model on `batch` and resolves the futures of its requests."""
+    with self._lock:
+      self._num_batches += 1
+      self._num_requests += len(batch)
+    try:
+      outputs = self._predict_fn(tf.constant([r.example for r in batch]))
+      outputs = {k: np.asarray(v) for k, v in outputs.items()}
+      splits = np.cumsum([r.sizes.num_components for r in batch])[:-1]
+      split_outputs = {k: np.split(v, splits) for k, v in outputs.items()}
+    except Exception as e:  # pylint: disable=broad-exception-caught
+      for r in batch:
+        r.future.set_exception(e)
+      return
+    for i, r in enumerate(batch):
+      r.future.set_result({k: v[i] for k, v in split_outputs.items()})
+
+
+def _make_parse_sizes_fn(
+    graph_spec: tfgnn.GraphTensorSpec) -> Callable[[bytes], _Sizes]:
+  """Returns a function to get the `_Sizes` of a serialized `GraphTensor`."""
+
+  @tf.function(input_signature=[tf.TensorSpec([], tf.string)])
+  def parse_sizes(example):
+    graph = tfgnn.parse_single_example(graph_spec, example)
+    return (graph.num_components,
+            {k: v.total_size for k, v in graph.node_sets.items()},
+            {k: v.total_size for k, v in graph.edge_sets.items()})
+
+  def fn(example: bytes) -> _Sizes:
+    num_components, num_nodes, num_edges = parse_sizes(example)
+    return _Sizes(int(num_components),
+                  {k: int(v) for k, v in num_nodes.items()},
+                  {k: int(v) for k, v in num_edges.items()})
+
+  return fn
+
+
+def _add(a: _Sizes, b: _Sizes) -> _Sizes:
+  return _Sizes(a.num_components + b.num_components,
+                {k: v + b.num_nodes[k] for k, v in a.num_nodes.items()},
+                {k: v + b.num_edges[k] for k, v in a.num_edges.items()})
+
+
+def _fits(sizes: _Sizes, size_constraints: tfgnn.SizeConstraints) -> bool:
+  """Returns whether `sizes` can be padded to `size_constraints`.
+
+  This is conservative: it leaves room for the padding component and for a
+  padding node in each node set, which `tfgnn.pad_to_total_sizes()` may need.
+
+  Args:
+    sizes: The sizes of a merged batch.
+    size_constraints: The total sizes after padding.
+  """
+  def value(total):
+    return int(total) if total is not None else None
+
+  total = value(size_constraints.total_num_components)
+  if total is not None and sizes.num_components >= total:
+    return False
+  for k, v in sizes.num_nodes.items():
+    total = value(size_constraints.total_num_nodes.get(k))
+    if total is not None and v >= total:
+      return False
+  for k, v in sizes.num_edges.items():
+    total = value(size_constraints.total_num_edges.get(k))
+    if total is not None and v > total:
+      return False
+  return True
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+  """The latency and throughput of a `MicroBatcher` under load.
+
+  Attributes:
+    num_clients: The number of concurrent clients.
+    num_requests: The number of requests completed.
+    requests_per_second: The throughput over all clients.
+    p50_latency_ms: The median request latency, in milliseconds.
+    p99_latency_ms: The 99th percentile of request latency, in milliseconds.
+    mean_batch_size: The mean number of requests per model call.
+  """
+  num_clients: int
+  num_requests: int
+  requests_per_second: float
+  p50_latency_ms: float
+  p99_latency_ms: float
+  mean_batch_size: float
+
+
+def run_benchmark(batcher_fn: Callable[[], MicroBatcher],
+                  examples: Sequence[bytes],
+                  *,
+                  num_clients: Sequence[int] = (1, 4, 16, 64),
+                  requests_per_client: int = 100) -> List[BenchmarkResult]:
+  """Measures latency vs. throughput of micro-batched serving.
+
+  For each entry of `num_clients`, a fresh `MicroBatcher` from `batcher_fn`
+  serves that many client threads, each of which sends `requests_per_client`
+  requests back to back, cycling through `examples`. One request per client
+  is sent before the timing starts, to exclude the one-time costs of tracing.
+
+  Args:
+    batcher_fn: Returns a new `MicroBatcher`.
+    examples: Serialized `GraphTensor`s to send as requests.
+    num_clients: The numbers of concurrent clients to measure.
+    requests_per_client: The number of timed requests per client.
+
+  Returns:
+    A `BenchmarkResult` for each entry of `num_clients`, in order.
+  """
+  if not examples:
+    raise ValueError("Expected at least one example")
+  results = []
+  for n in num_clients:
+    with batcher_fn() as batcher:
+      for example in examples[:n]:
+        batcher.predict(example)
+      num_batches = batcher.num_batches
+      barrier = threading.Barrier(n + 1)
+      latencies = [[] for _ in range(n)]
+
+      def client(index, batcher=batcher, barrier=barrier,
+                 latencies=latencies):
+        barrier.wait()
+        for i in range(requests_per_client):
+          example = examples[(index + i * n) % len(examples)]
+          start = time.perf_counter()
+          batcher.predict(example)
+          latencies[index].append(time.perf_counter() - start)
+
+      threads = [threading.Thread(target=client, args=(i,)) for i in range(n)]
+      for thread in threads:
+        thread.start()
+      barrier.wait()
+      start = time.perf_counter()
+      for thread in threads:
+        thread.join()
+      elapsed = time.perf_counter() - start
+      all_latencies = np.concatenate(latencies) * 1000.
+      results.append(BenchmarkResult(
+          num_clients=n,
+          num_requests=len(all_latencies),
+          requests_per_second=len(all_latencies) / max(elapsed, 1e-9),
+          p50_latency_ms=float(np.percentile(all_latencies, 50)),
+          p99_latency_ms=float(np.percentile(all_latencies, 99)),
+          mean_batch_size=len(all_latencies) / max(
+              batcher.num_batches - num_batches, 1)))
+  return results
+
+
+def format_benchmark(results: Sequence[BenchmarkResult]) -> str:
+  """Returns a printable table of `results`."""
+  lines = [f"{'clients':>7}  {'requests/s':>10}  {'p50 ms':>8}  "
+           f"{'p99 ms':>8}  {'batch':>6}"]
+  for r in results:
+    lines.append(f"{r.num_clients:>7d}  {r.requests_per_second:>10.1f}  "
+                 f"{r.p50_latency_ms:>8.2f}  {r.p99_latency_ms:>8.2f}  "
+                 f"{r.mean_batch_size:>6.1f}")
+  return "\n".join(lines)
@@ -0,0 +1,172 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for micro_batcher."""
+import concurrent.futures
+
+from absl.testing import parameterized
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+from tensorflow_gnn.experimental.inference import micro_batcher
+
+_SCHEMA = """
+  context {
+    features {
+      key: "label"
+      value {
+        dtype: DT_FLOAT
+      }
+    }
+  }
+  node_sets {
+    key: "nodes"
+    value {
+      features {
+        key: "features"
+        value {
+          dtype: DT_FLOAT
+          shape { dim { size: 4 } }
+        }
+      }
+    }
+  }
+  edge_sets {
+    key: "edges"
+    value {
+      source: "nodes"
+      target: "nodes"
+    }
+  }
+"""
+
+
+def gt_spec() -> tfgnn.GraphTensorSpec:
+  return tfgnn.create_graph_spec_from_schema_pb(tfgnn.parse_schema(_SCHEMA))
+
+
+def serialized_examples(num_examples: int):
+  return [
+      tfgnn.write_example(
+          tfgnn.random_graph_tensor(gt_spec(), row_lengths_range=(2, 4)))
+      .SerializeToString()
+      for _ in range(num_examples)]
+
+
+class _Model:
+  """Sums node features per component; records the batch sizes it gets."""
+
+  def __init__(self):
+    self.batch_sizes = []
+
+    @tf.function(input_signature=[tf.TensorSpec([None], tf.string)])
+    def predict(examples):
+      graph = tfgnn.parse_example(gt_spec(), examples)
+      graph = graph.merge_batch_to_components()
+      sums = tfgnn.pool_nodes_to_context(graph, "nodes", "sum",
+                                         feature_name="features")
+      return {"sums": sums, "label": graph.context["label"]}
+
+    self._predict = predict
+
+  def __call__(self, examples):
+    self.batch_sizes.append(int(tf.size(examples)))
+    return self._predict(examples)
+
+
+class MicroBatcherTest(tf.test.TestCase, parameterized.TestCase):
+
+  @parameterized.named_parameters(
+      ("Unconstrained", None, 8),
+      ("SizeConstraints", tfgnn.SizeConstraints(
+          total_num_components=4,
+          total_num_nodes={"nodes": 20},
+          total_num_edges={"edges": 20}), 3),
+  )
+  def test_concurrent_requests(self, size_constraints, max_requests):
+    model = _Model()
+    examples = serialized_examples(24)
+    with micro_batcher.MicroBatcher(
+        model, gt_spec(), max_latency_seconds=0.5, max_batch_size=8,
+        size_constraints=size_constraints) as batcher:
+      with concurrent.futures.ThreadPoolExecutor(len(examples)) as executor:
+        results = list(executor.map(batcher.predict, examples))
+
+    self.assertLess(len(model.batch_sizes), len(examples))
+    self.assertLessEqual(max(model.batch_sizes), max_requests)
+    self.assertEqual(sum(model.batch_sizes), len(examples))
+    for example, result in zip(examples, results):
+      expected = model._predict(tf.constant([example]))
+      self.assertCountEqual(result.keys(), ["sums", "label"])
+      self.assertAllClose(result["sums"], expected["sums"])
+      self.assertAllClose(result["label"], expected["label"])
+
+  def test_latency_deadline(self):
+    model = _Model()
+    [example] = serialized_examples(1)
+    with micro_batcher.MicroBatcher(
+        model, gt_spec(), max_latency_seconds=0.) as batcher:
+      batcher.predict(example)
+      batcher.predict(example)
+    self.assertEqual(model.batch_sizes, [1, 1])
+
+  def test_close_scores_pending_requests(self):
+    model = _Model()
+    examples = serialized_examples(5)
+    batcher = micro_batcher.MicroBatcher(
+        model, gt_spec(), max_latency_seconds=60.)
+    futures = [batcher.submit(example) for example in examples]
+    batcher.close()
+    self.assertTrue(all(f.done() for f in futures))
+    self.assertEqual(model.batch_sizes, [5])
+    with self.assertRaisesRegex(ValueError, "closed"):
+      batcher.submit(examples[0])
+
+  def test_request_too_large(self):
+    model = _Model()
+    [example] = serialized_examples(1)
+    with micro_batcher.MicroBatcher(
+        model, gt_spec(),
+        size_constraints=tfgnn.SizeConstraints(
+            total_num_components=2,
+            total_num_nodes={"nodes": 2},
+            total_num_edges={"edges": 100})) as batcher:
+      with self.assertRaisesRegex(ValueError, "exceeds"):
+        batcher.predict(example)
+    self.assertEqual(model.batch_sizes, [])
+
+  def test_model_error(self):
+    def predict_fn(examples):
+      raise tf.errors.InvalidArgumentError(None, None, "bad input")
+    [example] = serialized_examples(1)
+    with micro_batcher.MicroBatcher(predict_fn, gt_spec()) as batcher:
+      with self.assertRaisesRegex(tf.errors.InvalidArgumentError, "bad input"):
+        batcher.predict(example)
+
+  def test_run_benchmark(self):
+    examples = serialized_examples(4)
+    results = micro_batcher.run_benchmark(
+        lambda: micro_batcher.MicroBatcher(
+            _Model(), gt_spec(), max_latency_seconds=0.001),
+        examples, num_clients=[1, 4], requests_per_client=5)
+    self.assertEqual([r.num_clients for r in results], [1, 4])
+    self.assertEqual([r.num_requests for r in results], [5, 20])
+    for r in results:
+      self.assertGreater(r.requests_per_second, 0.)
+      self.assertLessEqual(r.p50_latency_ms, r.p99_latency_ms)
+      self.assertGreaterEqual(r.mean_batch_size, 1.)
+    self.assertIn("p99 ms", micro_batcher.format_benchmark(results))
+
+
+if __name__ == "__main__":
+  tf.test.main()
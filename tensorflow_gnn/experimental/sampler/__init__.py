@@ -30,6 +30,7 @@ from tensorflow_gnn.utils import api_utils
 set_ext_ops_implementation = ext_ops.set_ops_implementation
 ragged_lookup = ext_ops.ragged_lookup
 ragged_unique = ext_ops.ragged_unique
+ragged_unique_with_inverse = ext_ops.ragged_unique_with_inverse
 ragged_choice = ext_ops.ragged_choice
 
 build_graph_tensor = core.build_graph_tensor
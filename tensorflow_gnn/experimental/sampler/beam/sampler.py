@@ -20,7 +20,7 @@ from __future__ import annotations
 
 import functools
 import os
-from typing import Optional
+from typing import Mapping, Optional
 
 from absl import app
 from absl import flags
@@ -89,6 +89,15 @@ def get_sampling_model(
     except Exception as e:
       raise ValueError(f'Invalid graph schema for {debug_context}') from e
 
+  def get_quantization(
+      features: Mapping[str, graph_schema_pb2.Feature]
+  ) -> dict[str, graph_schema_pb2.Quantization]:
+    return {
+        name: feature.quantization
+        for name, feature in features.items()
+        if feature.HasField('quantization')
+    }
+
   def edge_sampler_factory(
       op: sampler_lib.SamplingOp,
       *,
@@ -111,6 +120,7 @@ def get_sampling_model(
                 for name, feature in edge_features.items()
             },
         },
+        quantization=get_quantization(edge_features),
     )
     edge_set_count = counter.setdefault(op.edge_set_name, 0)
     counter[op.edge_set_name] += 1
@@ -150,6 +160,7 @@ def get_sampling_model(
             keys_to_values={'b': b'b'}, name=f'nodes/{node_set_name}'
         ),
         features_spec=features_spec,
+        quantization=get_quantization(node_features),
     )
     return accessor
 
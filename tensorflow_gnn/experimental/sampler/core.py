@@ -19,12 +19,14 @@ import collections
 import functools
 from typing import Any, cast, Collection, List, Mapping, Optional, Tuple, Union
 
+import numpy as np
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 
 from tensorflow_gnn.experimental.sampler import ext_ops
 from tensorflow_gnn.experimental.sampler import interfaces
 # pylint: disable=g-direct-tensorflow-import
+from google.protobuf import text_format
 from tensorflow.python.framework import composite_tensor
 # pylint: enable=g-direct-tensorflow-import
 
@@ -390,6 +392,7 @@ class KeyToTfExampleAccessor(CompositeLayer, interfaces.KeyToFeaturesAccessor):
       *,
       features_spec: FeaturesSpec,
       default_values: Optional[Mapping[str, Any]] = None,
+      quantization: Optional[Mapping[str, tfgnn.proto.Quantization]] = None,
       **kwargs,
   ):
     """Constructor.
@@ -403,15 +406,20 @@ class KeyToTfExampleAccessor(CompositeLayer, interfaces.KeyToFeaturesAccessor):
         strings for `tf.string` type. For features for which missing values are
         not supported and must result in the runtime errir, the default values
         must be explicitly set to `None`.
+      quantization: An optional mapping from a feature name to the
+        `tfgnn.proto.Quantization` of its stored values. See `TfExamplesParser`.
       **kwargs: Other arguments for the base class.
     """
     super().__init__(**kwargs)
     self._key_to_serialized = cast(tf.keras.layers.Layer, key_to_serialized)
     self._features_spec = features_spec.copy()
     self._default_values = default_values.copy() if default_values else {}
+    self._quantization = dict(quantization or {})
 
     self._parser = TfExamplesParser(
-        features_spec, default_values=self._default_values
+        features_spec,
+        default_values=self._default_values,
+        quantization=self._quantization,
     )
 
   @property
@@ -423,9 +431,17 @@ class KeyToTfExampleAccessor(CompositeLayer, interfaces.KeyToFeaturesAccessor):
         key_to_serialized=self._key_to_serialized,
         features_spec=self._features_spec,
         default_values=self._default_values,
+        quantization=_quantization_to_config(self._quantization),
         **super().get_config(),
     )
 
+  @classmethod
+  def from_config(cls, config):
+    config['quantization'] = _quantization_from_config(
+        config.get('quantization')
+    )
+    return cls(**config)
+
   def symbolic_call(self, keys):
     values = self._key_to_serialized(keys)
     return self._parser(values)
@@ -828,13 +844,22 @@ class InMemUniformEdgesSampler(
 
 @tf.keras.utils.register_keras_serializable(package='GNN')
 class TfExamplesParser(tf.keras.layers.Layer):
-  """Parses serialized Example protos according to features type spec."""
+  """Parses serialized Example protos according to features type spec.
+
+  Floating-point features can be stored with reduced precision, as described by
+  `tfgnn.proto.Quantization`: as a `bytes_list` with one entry per item, where
+  an item is the value with the trailing fully defined dimensions of its type
+  spec (so a `tf.TensorSpec([None, 8], tf.float32)` feature of an edge set is
+  stored as one string of 8 quantized values per edge). Such features are
+  dequantized on the fly if their quantization is passed to the constructor.
+  """
 
   def __init__(
       self,
       features_spec: FeaturesSpec,
       *,
       default_values: Optional[Mapping[str, Any]] = None,
+      quantization: Optional[Mapping[str, tfgnn.proto.Quantization]] = None,
       **kwargs,
   ):
     """Constructor.
@@ -845,19 +870,39 @@ class TfExamplesParser(tf.keras.layers.Layer):
         `tf.float32` feature has a type spec `tf.TensorSpec([], tf.string))`.
       default_values: An optional mapping from feature name to default value as
         a Python constants.
+      quantization: An optional mapping from feature name to the
+        `tfgnn.proto.Quantization` of its stored values.
       **kwargs: Other arguments for the tf.keras.layers.Layer base class.
     """
     super().__init__(**kwargs)
     self._features_spec = features_spec.copy()
     self._default_values = default_values.copy() if default_values else {}
+    self._quantization = {
+        k: v
+        for k, v in (quantization or {}).items()
+        if v.type != tfgnn.proto.Quantization.NONE
+    }
+    unknown = set(self._quantization) - set(self._features_spec)
+    if unknown:
+      raise ValueError(
+          f'Quantization is given for unknown features: {sorted(unknown)}'
+      )
 
   def get_config(self):
     return dict(
         features_spec=self._features_spec,
         default_values=self._default_values,
+        quantization=_quantization_to_config(self._quantization),
         **super().get_config(),
     )
 
+  @classmethod
+  def from_config(cls, config):
+    config['quantization'] = _quantization_from_config(
+        config.get('quantization')
+    )
+    return cls(**config)
+
   def call(
       self, serialized: Union[tf.RaggedTensor, tf.Tensor]
   ) -> Mapping[str, Union[tf.RaggedTensor, tf.Tensor]]:
@@ -874,7 +919,15 @@ class TfExamplesParser(tf.keras.layers.Layer):
     flat_features_spec = {
         k: _get_io_spec(k, v, self._default_values.get(k, _type_default(v)))
         for k, v in self._features_spec.items()
+        if k not in self._quantization
     }
+    for k, q in self._quantization.items():
+      flat_features_spec[k] = _get_quantized_io_spec(
+          k,
+          self._features_spec[k],
+          q,
+          self._default_values.get(k, 0.0),
+      )
 
     flat_values = (
         serialized.flat_values
@@ -885,6 +938,14 @@ class TfExamplesParser(tf.keras.layers.Layer):
     assert flat_values.dtype == tf.string
 
     flat_features = tf.io.parse_example(flat_values, flat_features_spec)
+    for k, q in self._quantization.items():
+      spec = self._features_spec[k]
+      flat_features[k] = tfgnn.experimental.decode_quantized_feature(
+          flat_features[k],
+          q,
+          item_shape=_get_quantized_item_shape(spec),
+          dtype=spec.dtype,
+      )
     if isinstance(serialized, tf.RaggedTensor):
       return tf.nest.map_structure(serialized.with_flat_values, flat_features)
 
@@ -1112,94 +1173,109 @@ class GraphTensorBuilder(tf.keras.layers.Layer):
     else:
       context_ = None
 
-    node_sets_ = {}
-    edge_sets_ = {}
+    node_sets = {k: join(f) for k, f in node_sets.items()}
+    edge_sets = {k: join(f) for k, f in edge_sets.items()}
 
-    latent_node_sets = collections.defaultdict(list)
+    # Node ids of edge endpoints grouped by node set, as a list of tuples
+    # (edge set key, endpoint feature name, node ids) in order of appearance.
+    endpoints = collections.defaultdict(list)
     for key, features in edge_sets.items():
-      source_node_set, _, target_node_set = _parse_edge_set_definition(key)
+      source_node_set, edge_set_name, target_node_set = (
+          _parse_edge_set_definition(key)
+      )
+      missing = [
+          fname
+          for fname in (tfgnn.SOURCE_NAME, tfgnn.TARGET_NAME)
+          if fname not in features
+      ]
+      if missing:
+        raise ValueError(f'Missing `{missing} in {edge_set_name}.')
+      endpoints[source_node_set].append(
+          (key, tfgnn.SOURCE_NAME, features[tfgnn.SOURCE_NAME])
+      )
+      endpoints[target_node_set].append(
+          (key, tfgnn.TARGET_NAME, features[tfgnn.TARGET_NAME])
+      )
+
+    latent_node_sets = [k for k in endpoints if k not in node_sets]
+    node_sets_ = {}
+    edge_indices = collections.defaultdict(dict)
+    for node_set_name in [*node_sets, *latent_node_sets]:
+      features_ = dict(node_sets.get(node_set_name, {}))
+      node_ids = features_.get(NODE_ID_NAME, None)
+      if node_set_name in node_sets and node_ids is None:
+        raise ValueError(f'Missing `{NODE_ID_NAME}` in {node_set_name}.')
 
-      features = features if isinstance(features, list) else [features]
-      if source_node_set not in node_sets:
-        latent_node_sets[source_node_set].extend(
-            [f[tfgnn.SOURCE_NAME] for f in features]
+      check_ops = []
+      if self._validate and node_ids is not None:
+        check_ops.append(
+            tf.debugging.assert_equal(
+                ext_ops.ragged_unique(node_ids).row_splits,
+                node_ids.row_splits,
+                f'Node set {node_set_name} ids are not unique.',
+            )
         )
-      if target_node_set not in node_sets:
-        latent_node_sets[target_node_set].extend(
-            [f[tfgnn.TARGET_NAME] for f in features]
+      node_set_endpoints = endpoints.get(node_set_name, [])
+      if node_set_endpoints:
+        # Indexes the node ids of all edge endpoints in one pass. Given node
+        # ids go first, so that they keep their positions in the vocabulary.
+        pieces = [ids for _, _, ids in node_set_endpoints]
+        if node_ids is not None:
+          pieces = [node_ids, *pieces]
+        unique, inverse = ext_ops.ragged_unique_with_inverse(
+            tf.concat(pieces, axis=-1)
         )
-
-    node_sets_with_id = {
-        **{k: v for k, v in node_sets.items()},
-        **{
-            k: [{NODE_ID_NAME: ext_ops.ragged_unique(tf.concat(v, -1))}]
-            for k, v in latent_node_sets.items()
-        },
-    }
-
-    nodes_ids = dict()
-    for node_set_name, features in node_sets_with_id.items():
-      features_ = {}
-      sizes_ = None
-      for fname, fvalue in join(features).items():
-        if fname == NODE_ID_NAME:
-          check_ops = []
-          if self._validate and node_set_name not in latent_node_sets:
+        if node_ids is None:
+          node_ids = unique
+          features_[NODE_ID_NAME] = node_ids
+          offsets = tf.zeros_like(node_ids.row_lengths())
+        else:
+          if self._validate:
             check_ops.append(
                 tf.debugging.assert_equal(
-                    ext_ops.ragged_unique(fvalue).row_splits,
-                    fvalue.row_splits,
-                    f'Node set {node_set_name} ids are not unique.',
+                    unique.row_lengths(),
+                    node_ids.row_lengths(),
+                    'Out of vocabulary values',
                 )
             )
-          with tf.control_dependencies(check_ops):
-            sizes_ = tf.cast(
-                tf.expand_dims(fvalue.row_lengths(), -1), self._indices_dtype
-            )
-          nodes_ids[node_set_name] = fvalue
-        features_[fname] = fvalue
-      if sizes_ is None:
-        raise ValueError(f'Missing `{NODE_ID_NAME}` in {node_set_name}.')
+          offsets = node_ids.row_lengths()
+        for key, fname, ids in node_set_endpoints:
+          limits = offsets + ids.row_lengths()
+          edge_indices[key][fname] = tf.gather(
+              inverse,
+              tf.ragged.range(
+                  offsets, limits, row_splits_dtype=ids.row_splits.dtype
+              ),
+              batch_dims=1,
+          )
+          offsets = limits
 
+      with tf.control_dependencies(check_ops):
+        sizes_ = tf.cast(
+            tf.expand_dims(node_ids.row_lengths(), -1), self._indices_dtype
+        )
       node_sets_[node_set_name] = tfgnn.NodeSet.from_fields(
           features=features_, sizes=sizes_
       )
 
+    edge_sets_ = {}
     for key, features in edge_sets.items():
       source_node_set, edge_set_name, target_node_set = (
           _parse_edge_set_definition(key)
       )
-      key_to_index_fn = {
-          tfgnn.SOURCE_NAME: functools.partial(
-              ext_ops.ragged_lookup,
-              vocabulary=nodes_ids[source_node_set],
-              validate=self._validate,
-          ),
-          tfgnn.TARGET_NAME: functools.partial(
-              ext_ops.ragged_lookup,
-              vocabulary=nodes_ids[target_node_set],
-              validate=self._validate,
-          ),
+      source, target = [
+          tf.cast(edge_indices[key][fname], self._indices_dtype)
+          for fname in (tfgnn.SOURCE_NAME, tfgnn.TARGET_NAME)
+      ]
+      sizes_ = tf.cast(
+          tf.expand_dims(features[tfgnn.SOURCE_NAME].row_lengths(), -1),
+          self._indices_dtype,
+      )
+      features_ = {
+          fname: fvalue
+          for fname, fvalue in features.items()
+          if fname not in (tfgnn.SOURCE_NAME, tfgnn.TARGET_NAME)
       }
-      features_ = {}
-      indices_ = {}
-      sizes_ = None
-      for fname, fvalue in join(features).items():
-        if fname in (tfgnn.SOURCE_NAME, tfgnn.TARGET_NAME):
-          sizes_ = tf.cast(
-              tf.expand_dims(fvalue.row_lengths(), -1), self._indices_dtype
-          )
-          indices_[fname] = tf.cast(
-              key_to_index_fn.pop(fname)(fvalue), self._indices_dtype
-          )
-        else:
-          features_[fname] = fvalue
-
-      if key_to_index_fn:
-        raise ValueError(
-            f'Missing `{list(key_to_index_fn)} in {edge_set_name}.'
-        )
-      source, target = indices_[tfgnn.SOURCE_NAME], indices_[tfgnn.TARGET_NAME]
       edge_sets_[edge_set_name] = tfgnn.EdgeSet.from_fields(
           features=features_,
           sizes=sizes_,
@@ -1269,6 +1345,61 @@ def _get_io_spec(
   )
 
 
+def _get_quantized_item_shape(
+    spec: Union[tf.TensorSpec, tf.RaggedTensorSpec]
+) -> tf.TensorShape:
+  """Returns the longest fully defined suffix of the `spec` shape."""
+  dims = spec.shape.as_list()
+  num_outer_dims = 0
+  for i, dim in enumerate(dims):
+    if dim is None:
+      num_outer_dims = i + 1
+  return tf.TensorShape(dims[num_outer_dims:])
+
+
+def _get_quantized_io_spec(
+    name: str,
+    spec: Union[tf.TensorSpec, tf.RaggedTensorSpec],
+    quantization: tfgnn.proto.Quantization,
+    default_value=None,
+):
+  """Returns TF IO parsing spec for quantized values, one string per item."""
+  if not spec.dtype.is_floating:
+    raise ValueError(
+        f'Only floating-point features can be quantized, got {name}: {spec}'
+    )
+  item_shape = _get_quantized_item_shape(spec)
+  outer_shape = spec.shape[: spec.shape.rank - item_shape.rank]
+  if not outer_shape.is_fully_defined():
+    default_value = None
+  if default_value is not None:
+    default_value = np.broadcast_to(
+        np.asarray(default_value, np.float32), item_shape.as_list()
+    )
+    default_value = tfgnn.experimental.encode_quantized_feature(
+        default_value[np.newaxis], quantization
+    )[0]
+  return _get_io_spec(name, tf.TensorSpec(outer_shape, tf.string),
+                      default_value)
+
+
+def _quantization_to_config(
+    quantization: Mapping[str, tfgnn.proto.Quantization]
+) -> Mapping[str, str]:
+  return {k: text_format.MessageToString(v) for k, v in quantization.items()}
+
+
+def _quantization_from_config(
+    config: Optional[Mapping[str, str]]
+) -> Mapping[str, tfgnn.proto.Quantization]:
+  if not config:
+    return {}
+  return {
+      k: text_format.Parse(v, tfgnn.proto.Quantization())
+      for k, v in config.items()
+  }
+
+
 def _get_io_type(dtype: tf.DType) -> tf.DType:
   if dtype.is_floating:
     return tf.float32
@@ -17,6 +17,7 @@ from typing import Optional
 
 from absl.testing import parameterized
 import google.protobuf.text_format as pbtext
+import numpy as np
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 from tensorflow_gnn.experimental.sampler import core
@@ -500,6 +501,64 @@ class TfExamplesParserTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual(result['f'].dtype, float_type)
     self.assertAllEqual(result['f'], [values['f']])
 
+  def testQuantized(self):
+    int8 = tfgnn.proto.Quantization(
+        type=tfgnn.proto.Quantization.INT8, scale=0.5, zero_point=-2
+    )
+    float16 = tfgnn.proto.Quantization(type=tfgnn.proto.Quantization.FLOAT16)
+    encode = tfgnn.experimental.encode_quantized_feature
+
+    def example(v, w):
+      result = tf.train.Example()
+      if v is not None:
+        result.features.feature['v'].bytes_list.value.extend(encode([v], int8))
+      result.features.feature['w'].bytes_list.value.extend(encode(w, float16))
+      return result.SerializeToString()
+
+    serialized = [
+        example([1.0, -1.5], [[1.5, 2.0], [3.0, -4.0]]),
+        example(None, np.zeros([0, 2])),
+        example([0.0, 63.0], [[0.25, 0.5]]),
+    ]
+    layer = core.TfExamplesParser(
+        {
+            'v': tf.TensorSpec([2], tf.float32),
+            'w': tf.TensorSpec([None, 2], tf.float64),
+        },
+        default_values={'v': [-1.0, -1.0]},
+        quantization={'v': int8, 'w': float16},
+    )
+    result = layer(tf.RaggedTensor.from_row_lengths(serialized, [2, 1]))
+    self.assertAllEqual(
+        result['v'],
+        rt([[[1.0, -1.5], [-1.0, -1.0]], [[0.0, 63.0]]], ragged_rank=1),
+    )
+    self.assertEqual(result['w'].dtype, tf.float64)
+    self.assertAllEqual(
+        result['w'].flat_values,
+        [[1.5, 2.0], [3.0, -4.0], [0.25, 0.5]],
+    )
+    self.assertAllEqual(result['w'].row_lengths(), [2, 1])
+    self.assertAllEqual(result['w'].values.row_lengths(), [2, 0, 1])
+
+    result = layer(tf.constant(serialized))
+    self.assertAllEqual(result['v'], [[1.0, -1.5], [-1.0, -1.0], [0.0, 63.0]])
+
+    config = layer.get_config()
+    restored = core.TfExamplesParser.from_config(config)
+    self.assertAllEqual(restored(tf.constant(serialized))['v'], result['v'])
+
+  def testRaisesOnQuantizedUnknownFeature(self):
+    with self.assertRaisesRegex(ValueError, 'unknown features'):
+      core.TfExamplesParser(
+          {'v': tf.TensorSpec([2], tf.float32)},
+          quantization={
+              'x': tfgnn.proto.Quantization(
+                  type=tfgnn.proto.Quantization.FLOAT16
+              )
+          },
+      )
+
 
 class LookupLayersTest(tf.test.TestCase):
 
@@ -620,6 +679,36 @@ class KeyToTfExampleTest(tf.test.TestCase):
         restored_accessor, core.InMemIntegerKeyToBytesAccessor
     )
 
+  def testSymbolicQuantized(self):
+    quantization = tfgnn.proto.Quantization(
+        type=tfgnn.proto.Quantization.UINT8, scale=0.25, zero_point=8
+    )
+    example = tf.train.Example()
+    example.features.feature['f'].bytes_list.value.extend(
+        tfgnn.experimental.encode_quantized_feature([[1.0, -2.0]], quantization)
+    )
+    table = core.InMemIntegerKeyToBytesAccessor(
+        keys_to_values={1: example.SerializeToString()}
+    )
+    layer = core.KeyToTfExampleAccessor(
+        table,
+        features_spec={
+            'f': tf.TensorSpec([2]),
+        },
+        quantization={'f': quantization},
+    )
+
+    def check_results(model):
+      result = model(rt([[1, 0], [0]]))
+      expected = rt([[[1.0, -2.0], [0.0, 0.0]], [[0.0, 0.0]]], ragged_rank=1)
+      self.assertAllEqual(result['f'], expected)
+
+    i = tf.keras.Input(type_spec=tf.RaggedTensorSpec([None, None], tf.int64))
+    o = layer(i)
+    model = tf.keras.Model(inputs=i, outputs=o)
+    check_results(model)
+    check_results(save_and_load(model))
+
   def testAccessorSharing(self):
     table = core.InMemIntegerKeyToBytesAccessor(
         keys_to_values={
@@ -1456,6 +1545,31 @@ class GraphTensorBuilderTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual(target.dtype, indices_dtype)
     self.assertAllEqual(target.row_splits.dtype, row_splits_dtype)
 
+  def testRaisesOnOutOfVocabularyEndpoints(self):
+    with self.assertRaisesRegex(
+        tf.errors.InvalidArgumentError, 'Out of vocabulary values'
+    ):
+      core.build_graph_tensor(
+          node_sets={'A': {'#id': rt([['a', 'b'], ['c']])}},
+          edge_sets={
+              'A,A->A,A': {
+                  '#source': rt([['a'], ['c']]),
+                  '#target': rt([['b'], ['x']]),
+              },
+          },
+      )
+
+  def testRaisesOnNonUniqueNodeIds(self):
+    with self.assertRaisesRegex(
+        tf.errors.InvalidArgumentError, 'Node set A ids are not unique'
+    ):
+      core.build_graph_tensor(
+          node_sets={'A': {'#id': rt([['a', 'a']])}},
+          edge_sets={
+              'A,A->A,A': {'#source': rt([['a']]), '#target': rt([['a']])},
+          },
+      )
+
   def testRaisesOnIncompatibleEdgeSetsRowSplits(self):
     with self.assertRaisesRegex(
         ValueError,
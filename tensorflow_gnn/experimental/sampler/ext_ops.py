@@ -13,7 +13,7 @@
 # limitations under the License.
 # ==============================================================================
 """Extended set of Tensorflow operations."""
-from typing import Optional
+from typing import Optional, Tuple
 
 import tensorflow as tf
 # copybara:uncomment_begin (internal implementation of ext_ops)
@@ -161,6 +161,57 @@ def ragged_unique(ragged: tf.RaggedTensor) -> tf.RaggedTensor:
   return _OPS_LIB.ragged_unique(ragged)
 
 
+def ragged_unique_with_inverse(
+    ragged: tf.RaggedTensor,
+    *,
+    global_indices: bool = False,
+) -> Tuple[tf.RaggedTensor, tf.RaggedTensor]:
+  """Returns unique values for each ragged row and indices of inputs in them.
+
+  This is a batched version of `tf.unique()`, equivalent to
+  `ragged_unique(ragged)` followed by `ragged_lookup(ragged, unique)` but done
+  in one pass over the input values.
+
+  Example:
+
+  ```python
+    ragged_unique_with_inverse([
+      ['a', 'a', 'b'],
+      ['b', 'c', 'b']
+    ])
+    # ([['a', 'b'], ['b', 'c']], [[0, 0, 1], [0, 1, 0]])
+    ragged_unique_with_inverse([
+      ['a', 'a', 'b'],
+      ['b', 'c', 'b']
+    ], global_indices=True)
+    # ([['a', 'b'], ['b', 'c']], [[0, 0, 1], [2, 3, 2]])
+  ```
+
+  Args:
+    ragged: The ragged tensor of rank 2 (ragged matrix).
+    global_indices: If True, the returned indices are defined for flat unique
+      values ignoring the ragged row splits. If False, the returned indices are
+      defined independently for each ragged row.
+
+  Returns:
+    A tuple `(unique, inverse)` of ragged tensors of rank 2. The `unique`
+    contains unique values for each row of the input in the order of their
+    first occurrence. The `inverse` has the same row partitions as the input
+    and contains indices of input values in `unique` (row-based or global,
+    depending on the `global_indices` argument), as values of the input's row
+    splits dtype.
+  """
+  ragged = _convert_to_ragged_tensor(ragged)
+  if ragged.shape.rank != 2:
+    raise ValueError(
+        f'Expected rank 2 ragged tensor, got {tf.type_spec_from_value(ragged)}'
+    )
+  lib = _OPS_LIB
+  if not hasattr(lib, 'ragged_unique_with_inverse'):
+    lib = _IMPLEMENTATIONS['vectorized']
+  return lib.ragged_unique_with_inverse(ragged, global_indices=global_indices)
+
+
 def ragged_lookup(
     values: tf.RaggedTensor,
     vocabulary: tf.RaggedTensor,
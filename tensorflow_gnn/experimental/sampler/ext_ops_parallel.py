@@ -106,6 +106,41 @@ def ragged_unique(ragged: tf.RaggedTensor) -> tf.RaggedTensor:
   )
 
 
+def ragged_unique_with_inverse(
+    ragged: tf.RaggedTensor,
+    *,
+    global_indices: bool,
+) -> Tuple[tf.RaggedTensor, tf.RaggedTensor]:
+  """Implements `ext_ops.py:ragged_unique_with_inverse()`."""
+  dtype = ragged.row_splits.dtype
+
+  def fn(values: tf.Tensor) -> Tuple[tf.Tensor, tf.Tensor]:
+    unique_values, idx = tf.unique(values, out_idx=dtype)
+    return unique_values, idx
+
+  unique, inverse = tf.map_fn(
+      fn,
+      ragged,
+      fn_output_signature=(
+          tf.RaggedTensorSpec(
+              [None],
+              dtype=ragged.dtype,
+              ragged_rank=0,
+              row_splits_dtype=dtype,
+          ),
+          tf.RaggedTensorSpec(
+              [None],
+              dtype=dtype,
+              ragged_rank=0,
+              row_splits_dtype=dtype,
+          ),
+      ),
+  )
+  if global_indices:
+    inverse += tf.expand_dims(unique.row_starts(), axis=-1)
+  return unique, inverse
+
+
 def ragged_lookup(
     values: tf.RaggedTensor,
     vocabulary: tf.RaggedTensor,
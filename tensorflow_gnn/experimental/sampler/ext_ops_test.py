@@ -246,6 +246,68 @@ class ParallelRaggedUniqueTest(RaggedUniqueTest):
 # copybara:uncomment_end
 
 
+class RaggedUniqueWithInverseTest(ExtOpsTestBase, parameterized.TestCase):
+
+  @parameterized.parameters(
+      # pylint: disable=g-complex-comprehension
+      (v, s)
+      for v in [tf.int32, tf.int64, tf.float32, tf.double, tf.string]
+      for s in [tf.int32, tf.int64]
+      # pylint: enable=g-complex-comprehension
+  )
+  def testSupportedTypes(self, values_dtype, splits_dtype):
+    input_value = tf.RaggedTensor.from_row_lengths(
+        tf.zeros([5], dtype=values_dtype),
+        tf.convert_to_tensor([3, 2], dtype=splits_dtype),
+    )
+    unique, inverse = ops.ragged_unique_with_inverse(input_value)
+    self.assertAllEqual(unique.values, tf.zeros([2], dtype=values_dtype))
+    self.assertAllEqual(unique.row_splits, [0, 1, 2])
+    self.assertEqual(unique.row_splits.dtype, splits_dtype)
+    self.assertEqual(inverse.dtype, splits_dtype)
+    self.assertAllEqual(inverse, rt([[0, 0, 0], [0, 0]]))
+
+  @parameterized.named_parameters([
+      ('empty', rt([], tf.int32, 1)),
+      ('empty_rows', rt([[], [], []])),
+      ('single_string', rt([['a']])),
+      ('single_value', rt([['a'] * 10, [], ['c'] * 5])),
+      (
+          'unique_int',
+          rt([[], [2, 1] * 10, [5, 3, 1, 1, 2] * 10, [], [7] * 10, []]),
+      ),
+      (
+          'unique_string',
+          rt([['a', 'a', 'b'], ['a', 'b', 'a', 'b', 'c'], ['b', 'c', 'b']]),
+      ),
+  ])
+  def testMatchesUniqueAndLookup(self, input_value):
+    expected_unique = ops.ragged_unique(input_value)
+    for global_indices in [False, True]:
+      unique, inverse = ops.ragged_unique_with_inverse(
+          input_value, global_indices=global_indices
+      )
+      self.assertAllEqual(unique.values, expected_unique.values)
+      self.assertAllEqual(unique.row_splits, expected_unique.row_splits)
+      self.assertAllEqual(
+          inverse,
+          ops.ragged_lookup(
+              input_value, expected_unique, global_indices=global_indices
+          ),
+      )
+
+  def testGlobalIndices(self):
+    unique, inverse = ops.ragged_unique_with_inverse(
+        rt([['a', 'a', 'b'], [], ['b', 'c', 'b']]), global_indices=True
+    )
+    self.assertAllEqual(unique, rt([['a', 'b'], [], ['b', 'c']]))
+    self.assertAllEqual(inverse, rt([[0, 0, 1], [], [2, 3, 2]]))
+
+
+class ParallelRaggedUniqueWithInverseTest(RaggedUniqueWithInverseTest):
+  IMPLEMENTATION = 'parallel'
+
+
 class RaggedLookupTest(ExtOpsTestBase, parameterized.TestCase):
 
   @parameterized.parameters(
@@ -60,6 +60,30 @@ def ragged_unique(ragged: tf.RaggedTensor) -> tf.RaggedTensor:
   )
 
 
+def ragged_unique_with_inverse(
+    ragged: tf.RaggedTensor,
+    *,
+    global_indices: bool,
+) -> Tuple[tf.RaggedTensor, tf.RaggedTensor]:
+  """Implements `ext_ops.py:ragged_unique_with_inverse()`."""
+  global_vocabulary, row_ids, row_ids_base = _index_rows(ragged)
+  # Because `row_ids` do not overlap between rows and `tf.unique` enumerates
+  # values in the order of their first occurrence, unique values of each row
+  # are placed after unique values of all previous rows.
+  unique_row_ids, idx = tf.unique(row_ids, out_idx=ragged.row_splits.dtype)
+  unique_idx = unique_row_ids % row_ids_base
+  result_values = tf.gather(global_vocabulary, unique_idx)
+  result_rowids = tf.cast(
+      unique_row_ids // row_ids_base, ragged.row_splits.dtype
+  )
+  unique = tf.RaggedTensor.from_value_rowids(
+      result_values, result_rowids, ragged.nrows(), validate=False
+  )
+  if not global_indices:
+    idx -= tf.gather(unique.row_starts(), ragged.value_rowids())
+  return unique, ragged.with_values(idx)
+
+
 def ragged_lookup(
     values: tf.RaggedTensor,
     vocabulary: tf.RaggedTensor,
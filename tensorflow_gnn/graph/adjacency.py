@@ -30,6 +30,10 @@ NodeSetName = const.NodeSetName
 Index = Tuple[NodeSetName, Field]
 Indices = Mapping[IncidentNodeTag, Index]
 
+# Data and metadata keys of CsrAdjacency (in addition to the index tensors).
+_ROW_SPLITS_KEY = '#row_splits'
+_ROW_TAG_KEY = '#row_tag'
+
 
 class HyperAdjacency(gp.GraphPieceBase):
   """Stores how (hyper-)edges connect tuples of nodes from incident node sets.
@@ -179,6 +183,7 @@ class HyperAdjacency(gp.GraphPieceBase):
         _index_key_to_node_tag(key):
         (self.node_set_name(_index_key_to_node_tag(key)), index)
         for key, index in self._data.items()
+        if _is_index_key(key)
     }
 
   @classmethod
@@ -204,8 +209,8 @@ class HyperAdjacency(gp.GraphPieceBase):
                                    num_nodes_per_example[node_set_name])
 
     new_data = {
-        node_tag_key: flatten_indices(node_tag_key, index)
-        for node_tag_key, index in flat_adj._data.items()  # pylint: disable=protected-access
+        key: flatten_indices(key, value) if _is_index_key(key) else value
+        for key, value in flat_adj._data.items()  # pylint: disable=protected-access
     }
     return self.__class__(new_data, flat_adj.spec)
 
@@ -320,6 +325,7 @@ class HyperAdjacencySpec(gp.GraphPieceSpecBase):
         _index_key_to_node_tag(key):
         (self.node_set_name(_index_key_to_node_tag(key)), index)
         for key, index in self._data_spec.items()
+        if _is_index_key(key)
     }
 
   def node_set_name(self, node_set_tag: IncidentNodeTag) -> NodeSetName:
@@ -549,6 +555,270 @@ class AdjacencySpec(HyperAdjacencySpec):
         index_spec=utils.with_undefined_outer_dimension(self.source))
 
 
+class CsrAdjacency(Adjacency):
+  """Stores edges sorted by one incident node, with CSR row splits.
+
+  This is an `Adjacency` whose edges are sorted by the node indices of one
+  incident node set, called the row node set and identified by `row_tag`
+  (`tfgnn.SOURCE` or `tfgnn.TARGET`). In addition to the `source` and `target`
+  indices, it stores the `row_splits` tensor of the compressed sparse row (CSR)
+  representation of the adjacency matrix that has one row per node of the row
+  node set: the edges of node `i` are `row_splits[i]:row_splits[i+1]`. For
+  `row_tag=tfgnn.SOURCE`, this is the CSR format of the adjacency matrix; for
+  `row_tag=tfgnn.TARGET`, it is the CSR format of its transpose (equivalently,
+  the CSC format of the adjacency matrix).
+
+  The `row_splits` tensor has shape `[*graph_shape, num_row_nodes + 1]`. It is
+  batched, merged into components and padded along with the index tensors, so
+  CSR adjacencies can be converted once in the input pipeline (see
+  `tfgnn.experimental.convert_to_csr_adjacency()`). Operations like
+  `tfgnn.pool()` and `tfgnn.pool_neighbors_to_node()` use the row splits for
+  faster pooling to the row node set. Operations that change the edges of a
+  graph may return a plain `Adjacency`.
+
+  The CsrAdjacency is a composite tensor and a special case of
+  `tfgnn.Adjacency`.
+  """
+
+  # TODO(b/210004712): Replace `*_` by more Pythonic `*`.
+  @classmethod
+  @tf.__internal__.dispatch.add_dispatch_support
+  def from_indices(cls,
+                   source: Index,
+                   target: Index,
+                   *_,
+                   row_splits: Field,
+                   row_tag: IncidentNodeTag = const.TARGET,
+                   validate: Optional[bool] = None) -> 'CsrAdjacency':
+    """Constructs a new instance from sorted node indices and row splits.
+
+    Example:
+
+    ```python
+    # Single graph (rank is 0) with 3 nodes in node set b. Edges are sorted by
+    # the target node: b[0] has 2 incoming edges, b[1] none and b[2] one.
+    tfgnn.experimental.CsrAdjacency.from_indices(
+        ('a', [1, 2, 0]),
+        ('b', [0, 0, 2]),
+        row_splits=[0, 2, 2, 3],
+        row_tag=tfgnn.TARGET)
+    ```
+
+    Args:
+      source: The tuple of node set name and nodes index integer tensor, as for
+        `tfgnn.Adjacency.from_indices()`.
+      target: Like `source` field, but for target edge endpoint.
+      row_splits: The integer row splits tensor of shape
+        `[*graph_shape, num_row_nodes + 1]`, where `num_row_nodes` is the number
+        of nodes in the row node set.
+      row_tag: The incident node tag of the row node set, either `tfgnn.SOURCE`
+        or `tfgnn.TARGET`. The index tensor for this tag must be sorted.
+      validate: If `True`, checks that source and target indices have the same
+        type spec and, for scalar adjacencies, that the index tensor of the row
+        node set is sorted and agrees with the `row_splits`.
+
+    Returns:
+      A `CsrAdjacency` tensor with a shape and an indices_dtype being inferred
+      from the `indices` values.
+    """
+    if _:
+      raise TypeError('Positional arguments are not supported:', _)
+    if row_tag not in (const.SOURCE, const.TARGET):
+      raise ValueError(
+          f'row_tag must be tfgnn.SOURCE or tfgnn.TARGET, got {row_tag}')
+
+    adjacency = Adjacency._from_indices(  # pylint: disable=protected-access
+        {const.SOURCE: source, const.TARGET: target}, validate=validate)
+    row_splits = gp.convert_to_tensor_or_ragged(row_splits)
+    if row_splits.dtype not in (tf.int32, tf.int64):
+      raise ValueError(
+          f'row_splits must have tf.int32 or tf.int64 dtype, got'
+          f' {row_splits.dtype}')
+    if row_splits.shape.rank != adjacency.rank + 1:
+      raise ValueError(
+          f'row_splits must have rank {adjacency.rank + 1}, got'
+          f' {row_splits.shape.rank}')
+    row_splits = tf.cast(row_splits, adjacency.indices_dtype)
+
+    if validate is None:
+      validate = const.validate_graph_tensor_at_runtime
+    if validate and adjacency.rank == 0:
+      index = tf.cast(adjacency[row_tag], row_splits.dtype)
+      expected_row_splits = tf.searchsorted(
+          index, tf.range(tf.size(row_splits, out_type=row_splits.dtype)),
+          side='left', out_type=row_splits.dtype)
+      assert_ops = [
+          tf.debugging.assert_non_negative(
+              index[1:] - index[:-1],
+              message='CsrAdjacency indices must be sorted by row_tag'),
+          tf.debugging.assert_equal(
+              row_splits, expected_row_splits,
+              message='CsrAdjacency row_splits do not match the indices'),
+      ]
+      with tf.control_dependencies(assert_ops):
+        row_splits = tf.identity(row_splits)
+
+    # pylint: disable=protected-access
+    data = dict(adjacency._data)
+    data[_ROW_SPLITS_KEY] = row_splits
+    metadata = dict(adjacency.spec._metadata)
+    metadata[_ROW_TAG_KEY] = row_tag
+    return cls._from_data(
+        data,
+        shape=adjacency.shape,
+        indices_dtype=adjacency.indices_dtype,
+        row_splits_dtype=gp.get_max_row_splits_dtype(data),
+        metadata=metadata,
+    )
+
+  @property
+  def row_tag(self) -> IncidentNodeTag:
+    """The incident node tag of the row node set."""
+    return self.spec.row_tag
+
+  @property
+  def row_splits(self) -> Field:
+    """The row splits tensor of shape `[*graph_shape, num_row_nodes + 1]`."""
+    return self._data[_ROW_SPLITS_KEY]
+
+  def row_lengths(self) -> Field:
+    """The number of edges of each node of the row node set (its degree)."""
+    row_splits = self.row_splits
+    return row_splits[..., 1:] - row_splits[..., :-1]
+
+  def _merge_batch_to_components(
+      self, num_edges_per_example: Field,
+      num_nodes_per_example: Mapping[NodeSetName, Field]) -> 'CsrAdjacency':
+    if self.rank == 0:
+      return self
+
+    flat_adj = super()._merge_batch_to_components(
+        num_edges_per_example=num_edges_per_example,
+        num_nodes_per_example=num_nodes_per_example)
+    assert self.rank == 1, 'Not implemented for rank > 1'
+    # The batched row splits of each graph start at 0. Shift them by the number
+    # of edges in the preceding graphs and drop the duplicate boundaries.
+    row_splits = self.row_splits
+    if not isinstance(row_splits, tf.RaggedTensor):
+      row_splits = tf.RaggedTensor.from_tensor(
+          row_splits, row_splits_dtype=self.row_splits_dtype)
+    edge_offsets = tf.math.cumsum(num_edges_per_example, exclusive=True)
+    edge_offsets = tf.cast(edge_offsets, row_splits.dtype)
+    heads = row_splits[:, :-1] + tf.expand_dims(edge_offsets, -1)
+    total = tf.reduce_sum(tf.cast(num_edges_per_example, row_splits.dtype),
+                          keepdims=True)
+    new_data = dict(flat_adj._data)  # pylint: disable=protected-access
+    new_data[_ROW_SPLITS_KEY] = tf.concat([heads.values, total], axis=0)
+    return self.__class__._from_data(
+        new_data,
+        shape=flat_adj.shape,
+        indices_dtype=flat_adj.indices_dtype,
+        row_splits_dtype=flat_adj.row_splits_dtype,
+        metadata=flat_adj.spec._metadata)  # pylint: disable=protected-access
+
+  @staticmethod
+  def _type_spec_cls():
+    return CsrAdjacencySpec
+
+  def __repr__(self):
+    return (f'CsrAdjacency(source=(\'{self.source_name}\', '
+            f'{utils.short_repr(self.source)}), '
+            f'target=(\'{self.target_name}\', '
+            f'{utils.short_repr(self.target)}), '
+            f'row_tag={self.row_tag}, '
+            f'row_splits={utils.short_repr(self.row_splits)})')
+
+
+@tf_internal.type_spec_register('tensorflow_gnn.CsrAdjacencySpec')
+class CsrAdjacencySpec(AdjacencySpec):
+  """A type spec for `tfgnn.experimental.CsrAdjacency`."""
+
+  @classmethod
+  def from_incident_node_sets(
+      cls,
+      source_node_set: NodeSetName,
+      target_node_set: NodeSetName,
+      index_spec: FieldSpec = tf.TensorSpec((None,),
+                                            const.default_indices_dtype),
+      *,
+      row_tag: IncidentNodeTag = const.TARGET,
+      row_splits_spec: Optional[FieldSpec] = None,
+  ) -> 'CsrAdjacencySpec':
+    """Constructs a new instance from the `incident_node_sets`.
+
+    Args:
+      source_node_set: The name of the source node set.
+      target_node_set: The name of the target node set.
+      index_spec: type spec for source and target index tensors, as for
+        `tfgnn.AdjacencySpec.from_incident_node_sets()`.
+      row_tag: The incident node tag of the row node set.
+      row_splits_spec: type spec of the row splits tensor. Defaults to a vector
+        of unknown size.
+
+    Returns:
+      A `CsrAdjacencySpec` TypeSpec.
+    """
+    # pylint: disable=protected-access
+    adjacency_spec = AdjacencySpec.from_incident_node_sets(
+        source_node_set, target_node_set, index_spec)
+    if row_splits_spec is None:
+      row_splits_spec = tf.TensorSpec(
+          adjacency_spec.shape.concatenate([None]),
+          adjacency_spec.indices_dtype)
+    data_spec = dict(adjacency_spec._data_spec)
+    data_spec[_ROW_SPLITS_KEY] = gp.set_field_spec_dtype(
+        row_splits_spec, adjacency_spec.indices_dtype)
+    metadata = dict(adjacency_spec._metadata)
+    metadata[_ROW_TAG_KEY] = row_tag
+    return cls._from_data_spec(
+        data_spec,
+        shape=adjacency_spec.shape,
+        indices_dtype=adjacency_spec.indices_dtype,
+        row_splits_dtype=gp.get_max_row_splits_dtype(data_spec),
+        metadata=metadata,
+    )
+
+  @staticmethod
+  def _value_type():
+    return CsrAdjacency
+
+  @property
+  def row_tag(self) -> IncidentNodeTag:
+    """The incident node tag of the row node set."""
+    return self._metadata[_ROW_TAG_KEY]
+
+  @property
+  def row_splits(self) -> FieldSpec:
+    """The type spec of the row splits tensor."""
+    return self._data_spec[_ROW_SPLITS_KEY]
+
+  def relax(self, *, num_edges: bool = False) -> 'CsrAdjacencySpec':
+    """Allows variable number of graph edges.
+
+    Unlike for other adjacencies, the outer dimension of the row splits is
+    always relaxed, because it depends on the number of nodes in the row node
+    set, which may be relaxed independently of the edges.
+
+    Args:
+      num_edges: if True, allows a variable number of edges in each edge set.
+
+    Returns:
+      Relaxed compatible spec.
+
+    Raises:
+      ValueError: if adjacency is not scalar (rank > 0).
+    """
+    gp.check_scalar_graph_piece(self, 'CsrAdjacency.relax()')
+    index_spec = self.source
+    if num_edges:
+      index_spec = utils.with_undefined_outer_dimension(index_spec)
+    return self.from_incident_node_sets(
+        self.source_name, self.target_name,
+        index_spec=index_spec,
+        row_tag=self.row_tag,
+        row_splits_spec=utils.with_undefined_outer_dimension(self.row_splits))
+
+
 def _validate_indices(indices: Indices, allow_tf_assertions: bool) -> Indices:
   """Checks that indices have compatible shapes."""
   if not indices:
@@ -663,9 +933,15 @@ def _index_key_to_node_tag(index_key: str) -> IncidentNodeTag:
   return int(index_key[len(const.INDEX_KEY_PREFIX):])
 
 
+def _is_index_key(key: str) -> bool:
+  """Returns True if `key` is the data key of an index tensor."""
+  return key.startswith(const.INDEX_KEY_PREFIX)
+
+
 def _get_indicative_index(
     indices: Mapping[str, Union[Field, FieldSpec]]) -> Union[Field, FieldSpec]:
   """Deterministically selects one of the index tensors from the `indices`."""
+  indices = {k: v for k, v in indices.items() if _is_index_key(k)}
   assert indices
   _, result = min(indices.items(), key=lambda item: item[0])
 
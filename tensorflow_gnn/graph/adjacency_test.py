@@ -499,5 +499,104 @@ class AdjacencyTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual(adj._get_max_index('a'), expected_source)
     self.assertAllEqual(adj._get_max_index('b'), expected_target)
 
+
+class CsrAdjacencyTest(tf.test.TestCase, parameterized.TestCase):
+
+  def testFromIndices(self):
+    adj = adjacency.CsrAdjacency.from_indices(
+        source=('node.a', as_tensor([1, 2, 0])),
+        target=('node.b', as_tensor([0, 0, 2])),
+        row_splits=as_tensor([0, 2, 2, 3]),
+        row_tag=const.TARGET)
+    self.assertIsInstance(adj, adjacency.Adjacency)
+    self.assertIsInstance(adj.spec, adjacency.CsrAdjacencySpec)
+    self.assertEqual(adj.row_tag, const.TARGET)
+    self.assertAllEqual(adj.source, [1, 2, 0])
+    self.assertAllEqual(adj.target, [0, 0, 2])
+    self.assertAllEqual(adj.row_splits, [0, 2, 2, 3])
+    self.assertAllEqual(adj.row_lengths(), [2, 0, 1])
+    self.assertEqual(adj.row_splits.dtype, adj.indices_dtype)
+    self.assertEqual(
+        set(adj.get_indices_dict().keys()), {const.SOURCE, const.TARGET})
+
+  @parameterized.named_parameters(
+      ('Unsorted', [0, 2, 0], [0, 2, 2, 3]),
+      ('WrongRowSplits', [0, 0, 2], [0, 1, 2, 3]),
+      ('TooFewRowSplits', [0, 0, 2], [0, 2, 3]),
+  )
+  def testValidation(self, target, row_splits):
+    with self.assertRaises(tf.errors.InvalidArgumentError):
+      adjacency.CsrAdjacency.from_indices(
+          source=('node.a', as_tensor([1, 2, 0])),
+          target=('node.b', as_tensor(target)),
+          row_splits=as_tensor(row_splits),
+          validate=True)
+
+  def testRaisesOnBadRowTag(self):
+    with self.assertRaisesRegex(ValueError, 'row_tag'):
+      adjacency.CsrAdjacency.from_indices(
+          source=('node.a', as_tensor([0])),
+          target=('node.b', as_tensor([0])),
+          row_splits=as_tensor([0, 1]),
+          row_tag=2)
+
+  def testMergeRank1BatchToComponents(self):
+    adj = adjacency.CsrAdjacency.from_indices(
+        source=('node.a', tf.ragged.constant([[0, 1, 2], [0]])),
+        target=('node.b', tf.ragged.constant([[0, 0, 2], [1]])),
+        row_splits=tf.ragged.constant([[0, 2, 2, 3], [0, 0, 1]]))
+    result = adj._merge_batch_to_components(
+        as_tensor([3, 1]), {
+            'node.a': as_tensor([3, 1]),
+            'node.b': as_tensor([3, 2]),
+        })
+    self.assertIsInstance(result, adjacency.CsrAdjacency)
+    self.assertEqual(result.row_tag, const.TARGET)
+    self.assertAllEqual(result.source, [0, 1, 2, 0 + 3])
+    self.assertAllEqual(result.target, [0, 0, 2, 1 + 3])
+    self.assertAllEqual(result.row_splits, [0, 2, 2, 3, 3, 4])
+
+  def testDatasetBatching(self):
+    adj = adjacency.CsrAdjacency.from_indices(
+        source=('node.a', as_tensor([0, 1])),
+        target=('node.b', as_tensor([1, 1])),
+        row_splits=as_tensor([0, 0, 2]),
+        row_tag=const.TARGET)
+    ds = tf.data.Dataset.from_tensors(adj).repeat(3).batch(3)
+    batch = next(iter(ds))
+    self.assertIsInstance(batch, adjacency.CsrAdjacency)
+    self.assertAllEqual(batch.row_splits, [[0, 0, 2]] * 3)
+    ds = ds.unbatch()
+    self.assertAllEqual(next(iter(ds)).row_splits, [0, 0, 2])
+
+  def testCsrAdjacencyRepr(self):
+    adj = adjacency.CsrAdjacency.from_indices(
+        source=('node.a', as_tensor([0, 1, 2])),
+        target=('node.b', as_tensor([0, 1, 2])),
+        row_splits=as_tensor([0, 1, 2, 3]))
+    self.assertEqual(
+        "CsrAdjacency("
+        "source=('node.a', <tf.Tensor: shape=(3,), dtype=tf.int32>), "
+        "target=('node.b', <tf.Tensor: shape=(3,), dtype=tf.int32>), "
+        "row_tag=1, "
+        "row_splits=<tf.Tensor: shape=(4,), dtype=tf.int32>)",
+        repr(adj))
+
+  def testRelaxation(self):
+    original = adjacency.CsrAdjacencySpec.from_incident_node_sets(
+        'a', 'b', index_spec=tf.TensorSpec([3], tf.int64),
+        row_tag=const.SOURCE, row_splits_spec=tf.TensorSpec([5], tf.int64))
+    expected_nodes = adjacency.CsrAdjacencySpec.from_incident_node_sets(
+        'a', 'b', index_spec=tf.TensorSpec([3], tf.int64),
+        row_tag=const.SOURCE, row_splits_spec=tf.TensorSpec([None], tf.int64))
+    expected_edges = adjacency.CsrAdjacencySpec.from_incident_node_sets(
+        'a', 'b', index_spec=tf.TensorSpec([None], tf.int64),
+        row_tag=const.SOURCE, row_splits_spec=tf.TensorSpec([None], tf.int64))
+    self.assertEqual(original.relax(), expected_nodes)
+    self.assertEqual(original.relax(num_edges=True), expected_edges)
+    self.assertEqual(
+        original.relax(num_edges=True).relax(num_edges=True), expected_edges)
+
+
 if __name__ == '__main__':
   tf.test.main()
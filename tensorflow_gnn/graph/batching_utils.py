@@ -43,7 +43,9 @@ def dynamic_batch(dataset: tf.data.Dataset,
   graph tensors of rank 1 with the first dimension that indexes individual
   examples in the batch. The result graphs could be converted to scalar graph
   tensors using `.merge_batch_to_components()` and then padded to the target
-  sizes with `pad_to_total_sizes()`.
+  sizes with `pad_to_total_sizes()`. If padding is needed, it is cheaper to pass
+  the rank-1 results directly to `pad_to_total_sizes()`, which merges and pads
+  them in one pass.
 
   TODO(b/212274918): add support for non-scalar input graph tensors.
 
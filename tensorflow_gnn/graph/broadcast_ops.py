@@ -20,6 +20,7 @@ import tensorflow as tf
 
 from tensorflow_gnn.graph import graph_constants as const
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import op_profiling
 from tensorflow_gnn.graph import tag_utils
 from tensorflow_gnn.graph import tensor_utils as utils
 from tensorflow_gnn.keras import keras_tensors as kt
@@ -244,17 +245,26 @@ def broadcast_v2(
         "broadcast() requires exactly one of feature_name of feature_value.")
   feature_kwargs = dict(feature_value=feature_value, feature_name=feature_name)
 
-  if from_tag == const.CONTEXT:
-    if edge_set_names is not None:
-      result = [broadcast_context_to_edges(graph_tensor, name, **feature_kwargs)
-                for name in edge_set_names]
+  with op_profiling.op_scope("broadcast"):
+    if from_tag == const.CONTEXT:
+      if edge_set_names is not None:
+        result = []
+        for name in edge_set_names:
+          with op_profiling.item_scope(edge_set_name=name):
+            result.append(broadcast_context_to_edges(
+                graph_tensor, name, **feature_kwargs))
+      else:
+        result = []
+        for name in node_set_names:
+          with op_profiling.item_scope(node_set_name=name):
+            result.append(broadcast_context_to_nodes(
+                graph_tensor, name, **feature_kwargs))
     else:
-      result = [broadcast_context_to_nodes(graph_tensor, name, **feature_kwargs)
-                for name in node_set_names]
-  else:
-    result = [
-        broadcast_node_to_edges(graph_tensor, name, from_tag, **feature_kwargs)
-        for name in edge_set_names]
+      result = []
+      for name in edge_set_names:
+        with op_profiling.item_scope(edge_set_name=name):
+          result.append(broadcast_node_to_edges(
+              graph_tensor, name, from_tag, **feature_kwargs))
 
   if got_sequence_args:
     return result
@@ -19,8 +19,9 @@ messages that will parse with `tfgnn.parse_example()`.
 """
 
 import functools
-from typing import Optional
+from typing import Any, List, Optional
 
+import numpy as np
 import tensorflow as tf
 
 from tensorflow_gnn.graph import adjacency as adj
@@ -29,11 +30,16 @@ from tensorflow_gnn.graph import graph_piece as gp
 from tensorflow_gnn.graph import graph_tensor as gt
 from tensorflow_gnn.graph import graph_tensor_io as io
 from tensorflow_gnn.keras import keras_tensors as kt
+from tensorflow_gnn.proto import graph_schema_pb2 as schema_pb2
 
 
 @kt.disallow_keras_tensors
-def write_example(graph: gt.GraphTensor,
-                  prefix: Optional[str] = None) -> tf.train.Example:
+def write_example(
+    graph: gt.GraphTensor,
+    prefix: Optional[str] = None,
+    *,
+    quantization: Optional[io.FeatureQuantization] = None,
+) -> tf.train.Example:
   """Encode an eager `GraphTensor` to a tf.train.Example proto.
 
   This routine can be used to create a stream of training data for GNNs from a
@@ -57,10 +63,18 @@ def write_example(graph: gt.GraphTensor,
       bit pattern. Deserializing from `tf.train.Example` recovers the original
       value.
 
+  Floating-point features can be stored with reduced precision by passing
+  their `tfgnn.proto.Quantization` in `quantization` (see
+  `tfgnn.experimental.create_quantization_from_schema_pb()`). The same mapping
+  must be passed to `tfgnn.parse_example()` to dequantize them.
+
   Args:
     graph: An eager instance of `GraphTensor` to write out.
     prefix: An optional prefix string over all the features. You may use
       this if you are encoding other data in the same protocol buffer.
+    quantization: An optional mapping from feature names in `tf.train.Example`
+      (without `prefix`, like "nodes/paper.feat") to the quantization of their
+      stored values.
 
   Returns:
     A `tf.train.Example` with the serialized `graph`.
@@ -68,63 +82,141 @@ def write_example(graph: gt.GraphTensor,
   result = tf.train.Example()
   if prefix is None:
     prefix = ''
-  _encode(graph, prefix, result)
+  quantization = {
+      f'{prefix}{fname}': value
+      for fname, value in (quantization or {}).items()
+      if value.type != schema_pb2.Quantization.NONE
+  }
+  _encode(graph, prefix, result, quantization)
+  unknown = set(quantization) - set(result.features.feature)
+  if unknown:
+    raise ValueError(
+        f'Quantization is given for unknown features: {sorted(unknown)}')
   return result
 
 
+def encode_quantized_feature(values: Any,
+                             quantization: schema_pb2.Quantization
+                             ) -> List[bytes]:
+  """Quantizes feature values and encodes them as raw bytes, one per item.
+
+  This is the inverse of `tfgnn.experimental.decode_quantized_feature()`.
+  INT8 and UINT8 values are stored as `round(x / scale) + zero_point`, clipped
+  to the range of the integer type.
+
+  Args:
+    values: An eager tensor or array-like of shape `[num_items, *item_shape]`
+      with floating-point values of graph components, nodes or edges.
+    quantization: The `tfgnn.proto.Quantization` to apply.
+
+  Returns:
+    A list of `num_items` bytes objects with the quantized values of each item.
+  """
+  if isinstance(values, tf.RaggedTensor):
+    raise ValueError('Quantized features must have a static shape, '
+                     f'got a ragged tensor of shape {values.shape}')
+  if isinstance(values, tf.Tensor):
+    values = values.numpy()
+  array = np.asarray(values, dtype=np.float32)
+  if array.ndim == 0:
+    raise ValueError('Expected values with a leading items dimension')
+  array = array.reshape([array.shape[0], int(np.prod(array.shape[1:]))])
+
+  if quantization.type == schema_pb2.Quantization.FLOAT16:
+    stored = array.astype('<f2')
+  elif quantization.type in (schema_pb2.Quantization.INT8,
+                             schema_pb2.Quantization.UINT8):
+    if quantization.scale <= 0:
+      raise ValueError(
+          f'Quantization scale must be positive, got {quantization.scale}')
+    info = np.iinfo(np.int8 if quantization.type == schema_pb2.Quantization.INT8
+                    else np.uint8)
+    stored = np.clip(np.round(array / quantization.scale) +
+                     quantization.zero_point, info.min, info.max)
+    stored = stored.astype(info.dtype)
+  else:
+    raise ValueError(f'Unsupported quantization type {quantization.type}')
+  return [row.tobytes() for row in stored]
+
+
 @functools.singledispatch
 def _encode(piece: gp.GraphPieceBase, prefix: str,
-            result: tf.train.Example):
+            result: tf.train.Example, quantization: io.FeatureQuantization):
   """Recursively flattens GraphPieceSpec into map of its field specs.
 
   Args:
     piece: Subclass of the GraphPieceBase.
     prefix: string prefix to append to all result field specs name.
     result: A tf.train.Example proto message which gets mutated directly.
+    quantization: The quantization of features, keyed by prefixed names.
   """
   raise NotImplementedError(
       f'Encoding is not defined for {type(piece).__name__}')
 
 
 @_encode.register(gt.GraphTensor)
-def _(graph: gt.GraphTensor, prefix: str, result: tf.train.Example):
-  _encode(graph.context, f'{prefix}{gc.CONTEXT}/', result)
+def _(graph: gt.GraphTensor, prefix: str, result: tf.train.Example,
+      quantization: io.FeatureQuantization):
+  _encode(graph.context, f'{prefix}{gc.CONTEXT}/', result, quantization)
   for set_name, node_set in sorted(graph.node_sets.items()):
-    _encode(node_set, f'{prefix}{gc.NODES}/{set_name}.', result)
+    _encode(node_set, f'{prefix}{gc.NODES}/{set_name}.', result, quantization)
   for set_name, edge_set in sorted(graph.edge_sets.items()):
-    _encode(edge_set, f'{prefix}{gc.EDGES}/{set_name}.', result)
+    _encode(edge_set, f'{prefix}{gc.EDGES}/{set_name}.', result, quantization)
 
 
 @_encode.register(gt.Context)
-def _(context: gt.Context, prefix: str, result: tf.train.Example):
-  _encode_features(context.features, prefix, result)
+def _(context: gt.Context, prefix: str, result: tf.train.Example,
+      quantization: io.FeatureQuantization):
+  _encode_features(context.features, prefix, result, quantization)
 
 
 @_encode.register(gt.NodeSet)
-def _(node_set: gt.NodeSet, prefix: str, result: tf.train.Example):
+def _(node_set: gt.NodeSet, prefix: str, result: tf.train.Example,
+      quantization: io.FeatureQuantization):
   _copy_feature_values(node_set.sizes, f'{prefix}{gc.SIZE_NAME}', result)
-  _encode_features(node_set.features, prefix, result)
+  _encode_features(node_set.features, prefix, result, quantization)
 
 
 @_encode.register(gt.EdgeSet)
-def _(edge_set: gt.EdgeSet, prefix: str, result: tf.train.Example):
+def _(edge_set: gt.EdgeSet, prefix: str, result: tf.train.Example,
+      quantization: io.FeatureQuantization):
   _copy_feature_values(edge_set.sizes, f'{prefix}{gc.SIZE_NAME}', result)
-  _encode_features(edge_set.features, prefix, result)
-  _encode(edge_set.adjacency, prefix, result)
+  _encode_features(edge_set.features, prefix, result, quantization)
+  _encode(edge_set.adjacency, prefix, result, quantization)
 
 
 @_encode.register(adj.Adjacency)
-def _(adjacency: adj.Adjacency, prefix: str, result: tf.train.Example):
+def _(adjacency: adj.Adjacency, prefix: str, result: tf.train.Example,
+      quantization: io.FeatureQuantization):
+  del quantization  # Indices are never quantized.
   for name, values in [(f'{prefix}{gc.SOURCE_NAME}', adjacency.source),
                        (f'{prefix}{gc.TARGET_NAME}', adjacency.target)]:
     _copy_feature_values(values, name, result)
 
 
 def _encode_features(features: gc.Fields, template: str,
-                     result: tf.train.Example):
+                     result: tf.train.Example,
+                     quantization: io.FeatureQuantization):
   """Encode features `features` by mutating `result`."""
   for fname, values in sorted(features.items()):
-    _copy_feature_values(values, f'{template}{fname}', result)
+    fname = f'{template}{fname}'
+    if fname in quantization:
+      _copy_quantized_feature_values(values, fname, result,
+                                     quantization[fname])
+    else:
+      _copy_feature_values(values, fname, result)
+
+
+def _copy_quantized_feature_values(values: gc.Field, fname: str,
+                                   result: tf.train.Example,
+                                   quantization: schema_pb2.Quantization):
+  """Copy the quantized values of an eager tensor to a `Feature` object."""
+  if not values.dtype.is_floating:
+    raise ValueError(
+        f'Only floating-point features can be quantized, fname={fname}')
+  feature = result.features.feature[fname]
+  feature.bytes_list.value.extend(
+      encode_quantized_feature(values, quantization))
 
 
 def _copy_feature_values(values: gc.Field, fname: str,
@@ -199,6 +199,75 @@ class TestWriteExample(tf.test.TestCase, parameterized.TestCase):
 
     self.assertAllEqual(pgraph.context.features['f'], feat)
 
+  @parameterized.named_parameters(
+      ('Int8', schema_pb2.Quantization.INT8, 0.25, -3, 0.125),
+      ('UInt8', schema_pb2.Quantization.UINT8, 0.25, 128, 0.125),
+      ('Float16', schema_pb2.Quantization.FLOAT16, 1.0, 0, 0.01),
+  )
+  def testQuantizedRoundtrip(self, qtype, scale, zero_point, atol):
+    quantization = schema_pb2.Quantization(
+        type=qtype, scale=scale, zero_point=zero_point)
+    graph = gt.GraphTensor.from_pieces(
+        context=gt.Context.from_fields(features={'c': [[0.5, -1.0]]}),
+        node_sets={
+            'a': gt.NodeSet.from_fields(
+                sizes=[3],
+                features={
+                    'f': tf.constant([[0.1, 0.2], [-10., 10.], [2., 3.]]),
+                    'g': tf.constant([1., 2., 3.], tf.float64),
+                    'id': tf.constant([1, 2, 3]),
+                }),
+            'b': gt.NodeSet.from_fields(
+                sizes=[0], features={'f': tf.zeros([0, 4])}),
+        })
+    quantized = {fname: quantization
+                 for fname in ['context/c', 'nodes/a.f', 'nodes/a.g',
+                               'nodes/b.f']}
+
+    example = ge.write_example(graph, 'x:', quantization=quantized)
+    self.assertLen(
+        example.features.feature['x:nodes/a.f'].bytes_list.value, 3)
+    self.assertEmpty(
+        example.features.feature['x:nodes/b.f'].bytes_list.value)
+    serialized = example.SerializeToString()
+
+    def check(parsed):
+      for piece, expected in [(parsed.context, graph.context),
+                              (parsed.node_sets['a'], graph.node_sets['a']),
+                              (parsed.node_sets['b'], graph.node_sets['b'])]:
+        for fname, value in expected.features.items():
+          self.assertEqual(piece[fname].dtype, value.dtype)
+          self.assertAllClose(piece[fname], value, atol=atol)
+
+    check(io.parse_single_example(graph.spec, tf.constant(serialized), 'x:',
+                                  quantization=quantized))
+    spec = graph.spec.relax(num_components=True, num_nodes=True)
+    ds = tf.data.Dataset.from_tensors(tf.constant([serialized] * 2))
+    ds = ds.map(lambda s: io.parse_example(spec, s, 'x:',
+                                           quantization=quantized))
+    for parsed in ds.unbatch():
+      check(parsed)
+
+  def testQuantizationRaisesOnUnknownFeature(self):
+    graph = gt.GraphTensor.from_pieces(
+        context=gt.Context.from_fields(features={'c': [0.5]}))
+    quantization = {'context/x': schema_pb2.Quantization(
+        type=schema_pb2.Quantization.FLOAT16)}
+    with self.assertRaisesRegex(ValueError, 'unknown features'):
+      ge.write_example(graph, quantization=quantization)
+    with self.assertRaisesRegex(ValueError, 'unknown features'):
+      io.get_io_spec(graph.spec, quantization=quantization)
+
+  def testQuantizationRaisesOnIntegerFeature(self):
+    graph = gt.GraphTensor.from_pieces(
+        context=gt.Context.from_fields(features={'c': [1]}))
+    quantization = {'context/c': schema_pb2.Quantization(
+        type=schema_pb2.Quantization.INT8)}
+    with self.assertRaisesRegex(ValueError, 'Only floating-point'):
+      ge.write_example(graph, quantization=quantization)
+    with self.assertRaisesRegex(ValueError, 'Only floating-point'):
+      io.get_io_spec(graph.spec, quantization=quantization)
+
 
 if __name__ == '__main__':
   tf.test.main()
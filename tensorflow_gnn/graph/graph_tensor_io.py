@@ -34,7 +34,7 @@ ds = ds.batch(batch_size, True)
 ```
 """
 import functools
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
 import tensorflow as tf
 
@@ -42,6 +42,7 @@ from tensorflow_gnn.graph import adjacency as adj
 from tensorflow_gnn.graph import graph_constants as gc
 from tensorflow_gnn.graph import graph_piece as gp
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.proto import graph_schema_pb2 as schema_pb2
 
 # pytype: disable=attribute-error
 IOFeature = Union[tf.io.FixedLenFeature, tf.io.RaggedFeature]
@@ -50,11 +51,18 @@ RaggedPartition = Union[tf.io.RaggedFeature.RowLengths,
 AssertOp = Any
 # pytype: enable=attribute-error
 
+# A mapping from tf.Example feature names (without prefix, like
+# "nodes/paper.feat") to the quantization of their stored values.
+FeatureQuantization = Mapping[str, schema_pb2.Quantization]
+
 
 def parse_example(spec: gt.GraphTensorSpec,
                   serialized: tf.Tensor,
                   prefix: Optional[str] = None,
-                  validate: bool = True) -> gt.GraphTensor:
+                  validate: bool = True,
+                  *,
+                  quantization: Optional[FeatureQuantization] = None
+                  ) -> gt.GraphTensor:
   """Parses a batch of serialized Example protos into a single `GraphTensor`.
 
   We expect `serialized` to be a string tensor batched with `batch_size` many
@@ -71,6 +79,12 @@ def parse_example(spec: gt.GraphTensorSpec,
   using `tf.cast()`. Note that `tf.float64` features are converted from a
   `tf.float32` representation in `tf.train.Example`.
 
+  Floating-point features can be stored with reduced precision, as described
+  by the `Quantization` message of the graph schema. They are dequantized on
+  the fly to the dtype declared in the `spec` if their names are passed in
+  `quantization` (see
+  `tfgnn.experimental.create_quantization_from_schema_pb()`).
+
   Args:
     spec: A graph tensor type specification of a single serialized graph tensor
       value.
@@ -81,6 +95,9 @@ def parse_example(spec: gt.GraphTensorSpec,
       this if you are encoding other data in the same protocol buffer.
     validate: A boolean indicating whether or not to validate that the input
       values form a valid GraphTensor. Defaults to `True`.
+    quantization: An optional mapping from feature names in `tf.train.Example`
+      (without `prefix`, like "nodes/paper.feat") to the
+      `tfgnn.proto.Quantization` of their stored values.
 
   Returns:
     A graph tensor object with `spec.batch(serialized.shape[0])` type spec.
@@ -90,20 +107,24 @@ def parse_example(spec: gt.GraphTensorSpec,
         f'`serialized` must have rank=1, got {serialized.shape.rank}')
   batch_size = serialized.shape[0]
 
-  fields_io_spec = get_io_spec(spec, prefix, validate)
+  fields_io_spec = get_io_spec(spec, prefix, validate,
+                               quantization=quantization)
   flat_fields = tf.io.parse_example(serialized, fields_io_spec)
 
   spec = spec._batch(batch_size)  # pylint: disable=protected-access
   with tf.control_dependencies(
       _check_size_fields(spec, flat_fields) if validate else []):
-    flat_fields = _restore_types(spec, prefix, flat_fields)
+    flat_fields = _restore_types(spec, prefix, flat_fields, quantization)
     return tf.identity(_unflatten_graph_fields(spec, flat_fields, prefix or ''))
 
 
 def parse_single_example(spec: gt.GraphTensorSpec,
                          serialized: tf.Tensor,
                          prefix: Optional[str] = None,
-                         validate: bool = True) -> gt.GraphTensor:
+                         validate: bool = True,
+                         *,
+                         quantization: Optional[FeatureQuantization] = None
+                         ) -> gt.GraphTensor:
   """Parses a single serialized Example proto into a single `GraphTensor`.
 
   Like `parse_example()`, but for a single graph tensor.
@@ -117,21 +138,28 @@ def parse_single_example(spec: gt.GraphTensorSpec,
       this if you are encoding other data in the same protocol buffer.
     validate: A boolean indicating whether or not to validate that the input
       fields form a valid `GraphTensor`. Defaults to `True`.
+    quantization: An optional mapping from feature names in `tf.train.Example`
+      (without `prefix`) to the `tfgnn.proto.Quantization` of their stored
+      values.
 
   Returns:
     A graph tensor object with a matching type spec.
   """
-  fields_io_spec = get_io_spec(spec, prefix, validate)
+  fields_io_spec = get_io_spec(spec, prefix, validate,
+                               quantization=quantization)
   flat_fields = tf.io.parse_single_example(serialized, fields_io_spec)
   with tf.control_dependencies(
       _check_size_fields(spec, flat_fields) if validate else None):
-    flat_fields = _restore_types(spec, prefix, flat_fields)
+    flat_fields = _restore_types(spec, prefix, flat_fields, quantization)
     return tf.identity(_unflatten_graph_fields(spec, flat_fields, prefix or ''))
 
 
 def get_io_spec(spec: gt.GraphTensorSpec,
                 prefix: Optional[str] = None,
-                validate: bool = True) -> Dict[str, IOFeature]:
+                validate: bool = True,
+                *,
+                quantization: Optional[FeatureQuantization] = None
+                ) -> Dict[str, IOFeature]:
   """Returns tf.io parsing features for `GraphTensorSpec` type spec.
 
   This function returns a mapping of `tf.train.Feature` names to configuration
@@ -151,6 +179,9 @@ def get_io_spec(spec: gt.GraphTensorSpec,
       this if you are encoding other data in the same protocol buffer.
     validate: A boolean indicating whether or not to validate that the input
       fields form a valid `GraphTensor`. Defaults to `True`.
+    quantization: An optional mapping from feature names in `tf.train.Example`
+      (without `prefix`) to the `tfgnn.proto.Quantization` of their stored
+      values. Quantized features are parsed as raw bytes, one string per item.
 
   Returns:
     A dict of `tf.train.Feature` name to feature configuration object, to be
@@ -215,14 +246,43 @@ def get_io_spec(spec: gt.GraphTensorSpec,
     raise ValueError(
         f'Unsupported type spec {type(value_spec).__name__}, fname={fname}')
 
-  out = {}
+  def get_quantized_io_feature(fname: str,
+                               value_spec: gt.FieldSpec) -> IOFeature:
+    # Each item (graph component, node or edge) is stored as a single string.
+    if not value_spec.dtype.is_floating:
+      raise ValueError(
+          f'Only floating-point features can be quantized, fname={fname}')
+    if not value_spec.shape[1:].is_fully_defined():
+      raise ValueError(
+          'Quantized features must have static non-leading dimensions'
+          f', got shape={value_spec.shape}, fname={fname}')
+    if (isinstance(value_spec, tf.TensorSpec) and
+        value_spec.shape[:1].is_fully_defined()):
+      return tf.io.FixedLenFeature(dtype=tf.string, shape=value_spec.shape[:1])
+    return tf.io.RaggedFeature(
+        value_key=fname,
+        dtype=tf.string,
+        row_splits_dtype=spec.indices_dtype,
+        validate=validate)
+
+  quantization = quantization or {}
+  flat_specs = _flatten_graph_field_specs(spec, '')
+  unknown = set(quantization) - set(flat_specs)
+  if unknown:
+    raise ValueError(
+        f'Quantization is given for unknown features: {sorted(unknown)}')
 
-  for fname, value_spec in _flatten_graph_field_specs(spec, '').items():
+  out = {}
+  for fname, value_spec in flat_specs.items():
+    is_quantized = _is_quantized(quantization.get(fname))
     if prefix:
       fname = f'{prefix}{fname}'
     # pylint: disable=protected-access
-    out[fname] = get_io_feature(
-        fname, gp._box_spec(spec.rank, value_spec, spec.indices_dtype))
+    value_spec = gp._box_spec(spec.rank, value_spec, spec.indices_dtype)
+    if is_quantized:
+      out[fname] = get_quantized_io_feature(fname, value_spec)
+    else:
+      out[fname] = get_io_feature(fname, value_spec)
 
   return out
 
@@ -406,15 +466,85 @@ def get_io_dtype(dtype: tf.dtypes.DType) -> tf.dtypes.DType:
     )
 
 
+def get_quantized_dtype(
+    quantization: schema_pb2.Quantization) -> tf.dtypes.DType:
+  """Returns the dtype of the values stored for a quantized feature."""
+  if quantization.type == schema_pb2.Quantization.INT8:
+    return tf.int8
+  elif quantization.type == schema_pb2.Quantization.UINT8:
+    return tf.uint8
+  elif quantization.type == schema_pb2.Quantization.FLOAT16:
+    return tf.float16
+  else:
+    raise ValueError(f'Unsupported quantization type {quantization.type}')
+
+
+def decode_quantized_feature(
+    serialized: Union[tf.Tensor, tf.RaggedTensor],
+    quantization: schema_pb2.Quantization,
+    *,
+    item_shape: Union[tf.TensorShape, List[int]],
+    dtype: tf.dtypes.DType = tf.float32,
+) -> Union[tf.Tensor, tf.RaggedTensor]:
+  """Decodes the values of a quantized feature from their raw bytes.
+
+  Each string in `serialized` holds the values of one item (graph component,
+  node or edge) as little-endian numbers of the type selected by
+  `quantization.type`, as written by `tfgnn.write_example()`. INT8 and UINT8
+  values `q` are dequantized to `(q - zero_point) * scale`.
+
+  Args:
+    serialized: A potentially ragged tensor of strings, one per item.
+    quantization: The `tfgnn.proto.Quantization` of the stored values.
+    item_shape: The fully defined shape of the feature value for one item.
+    dtype: The floating-point dtype of the result.
+
+  Returns:
+    A tensor with the same ragged partitions as `serialized` and the shape
+    `serialized.shape + item_shape`.
+  """
+  item_shape = tf.TensorShape(item_shape)
+  if not item_shape.is_fully_defined():
+    raise ValueError(
+        f'Quantized features must have a static shape, got {item_shape}')
+  stored_dtype = get_quantized_dtype(quantization)
+
+  def decode(flat_serialized: tf.Tensor) -> tf.Tensor:
+    values = tf.io.decode_raw(flat_serialized, stored_dtype, little_endian=True)
+    values = tf.reshape(
+        values,
+        tf.concat([tf.shape(flat_serialized, out_type=tf.int64),
+                   tf.constant(item_shape.as_list(), tf.int64)], axis=0))
+    if stored_dtype == tf.float16:
+      return tf.cast(values, dtype)
+    values = tf.cast(values, tf.float32)
+    if quantization.zero_point:
+      values -= float(quantization.zero_point)
+    if quantization.scale != 1.0:
+      values *= quantization.scale
+    return tf.cast(values, dtype)
+
+  if isinstance(serialized, tf.RaggedTensor):
+    return tf.ragged.map_flat_values(decode, serialized)
+  return decode(serialized)
+
+
+def _is_quantized(quantization: Optional[schema_pb2.Quantization]) -> bool:
+  return (quantization is not None and
+          quantization.type != schema_pb2.Quantization.NONE)
+
+
 def get_printable_supported_io_types() -> str:
   return (
       'Supported types are boolean, (non-quantized) integer types, '
       '(non-quantized, non-complex) floating-point types and `string`.')
 
 
-def _restore_types(spec: gt.GraphTensorSpec,
-                   prefix: Optional[str],
-                   flat_values: gt.Fields) -> gt.Fields:
+def _restore_types(
+    spec: gt.GraphTensorSpec,
+    prefix: Optional[str],
+    flat_values: gt.Fields,
+    quantization: Optional[FeatureQuantization] = None) -> gt.Fields:
   """Casts `flat_values` to types expected in the graph tensor spec, if needed.
 
   Parsing of tensorflow examples using tf.io is limited to one of the following
@@ -426,17 +556,27 @@ def _restore_types(spec: gt.GraphTensorSpec,
     prefix: An optional prefix string over all the features. You may use
       this if you are encoding other data in the same protocol buffer.
     flat_values: flattened graph tensor values matching the `spec` except maybe
-      values types (must be safely castable to the `spec` types).
+      values types (must be safely castable to the `spec` types) and quantized
+      features, which are parsed as raw bytes.
+    quantization: The quantization of features, keyed by names without prefix.
 
   Returns:
     flattened graph tensor values with types matching the graph tensor spec.
   """
   # pylint: disable=protected-access
-  flat_spec = _flatten_graph_field_specs(spec, prefix or '')
+  prefix = prefix or ''
+  quantization = quantization or {}
+  flat_spec = _flatten_graph_field_specs(spec, prefix)
   result = dict()
   for fname, value in flat_values.items():
     field_dtype = flat_spec[fname].dtype
-    if value.dtype != field_dtype:
+    field_quantization = quantization.get(fname[len(prefix):])
+    if _is_quantized(field_quantization):
+      value = decode_quantized_feature(
+          value, field_quantization,
+          item_shape=flat_spec[fname].shape[(spec.rank + 1):],
+          dtype=field_dtype)
+    elif value.dtype != field_dtype:
       value = tf.cast(value, field_dtype)
     result[fname] = value
   return result
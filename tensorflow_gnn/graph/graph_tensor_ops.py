@@ -612,6 +612,74 @@ def shuffle_nodes(graph_tensor: GraphTensor,
   )
 
 
+def concat_graph_components(graphs: Sequence[GraphTensor]) -> GraphTensor:
+  """Returns a GraphTensor with the components of a sequence of GraphTensors.
+
+  The components of `graphs[0]` come first, followed by those of `graphs[1]`
+  and so on. Features and sizes are concatenated, and the adjacency indices of
+  each graph are offset by the total sizes of the node sets in the graphs
+  before it. All elements of `graphs` must be scalar and share a
+  `GraphTensorSpec`.
+
+  Args:
+    graphs: A non-empty sequence of scalar GraphTensors with the same spec.
+
+  Returns:
+    A scalar GraphTensor with the components of all `graphs`.
+  """
+  if not graphs:
+    raise ValueError('concat_graph_components() of empty sequence')
+  first, *_ = graphs
+  if not all(first.spec == g.spec for g in graphs):
+    raise ValueError('concat_graph_components() with graphs of different spec')
+  for g in graphs:
+    gt.check_scalar_graph_tensor(g, 'tfgnn.concat_graph_components()')
+  if len(graphs) == 1:
+    return first
+
+  def concat_features(pieces):
+    return {k: tf.concat([p.features[k] for p in pieces], axis=0)
+            for k in pieces[0].features.keys()}
+
+  def concat_sizes(pieces):
+    return tf.concat([p.sizes for p in pieces], axis=0)
+
+  context = gt.Context.from_fields(
+      features=concat_features([g.context for g in graphs]),
+      sizes=concat_sizes([g.context for g in graphs]))
+
+  node_sets = {}
+  for node_set_name in first.node_sets.keys():
+    pieces = [g.node_sets[node_set_name] for g in graphs]
+    node_sets[node_set_name] = gt.NodeSet.from_fields(
+        features=concat_features(pieces), sizes=concat_sizes(pieces))
+
+  edge_sets = {}
+  for edge_set_name, edge_set in first.edge_sets.items():
+    pieces = [g.edge_sets[edge_set_name] for g in graphs]
+    indices = {}
+    for tag, (node_set_name, index) in (
+        edge_set.adjacency.get_indices_dict().items()):
+      offset = tf.zeros([], index.dtype)
+      values = []
+      for g, piece in zip(graphs, pieces):
+        values.append(piece.adjacency[tag] + offset)
+        offset += tf.cast(g.node_sets[node_set_name].total_size, offset.dtype)
+      indices[tag] = (node_set_name, tf.concat(values, axis=0))
+    if isinstance(edge_set.adjacency, adj.Adjacency):
+      adjacency = adj.Adjacency.from_indices(
+          source=indices[const.SOURCE], target=indices[const.TARGET])
+    else:
+      adjacency = adj.HyperAdjacency.from_indices(indices)
+    edge_sets[edge_set_name] = gt.EdgeSet.from_fields(
+        features=concat_features(pieces),
+        sizes=concat_sizes(pieces),
+        adjacency=adjacency)
+
+  return GraphTensor.from_pieces(
+      context=context, node_sets=node_sets, edge_sets=edge_sets)
+
+
 @kt.delegate_keras_tensors
 def node_degree(graph_tensor: GraphTensor,
                 edge_set_name: EdgeSetName,
@@ -634,6 +702,8 @@ def node_degree(graph_tensor: GraphTensor,
   """
   gt.check_scalar_graph_tensor(graph_tensor, 'tfgnn.node_degree()')
   adjacency = graph_tensor.edge_sets[edge_set_name].adjacency
+  if isinstance(adjacency, adj.CsrAdjacency) and adjacency.row_tag == node_tag:
+    return adjacency.row_lengths()
   aggregate_node_count = pool_ops.pool_edges_to_node(
       graph_tensor,
       edge_set_name,
@@ -643,6 +713,95 @@ def node_degree(graph_tensor: GraphTensor,
   return aggregate_node_count
 
 
+@kt.delegate_keras_tensors
+def convert_to_csr_adjacency(
+    graph_tensor: GraphTensor,
+    edge_set_names: Optional[Collection[EdgeSetName]] = None,
+    *,
+    row_tag: IncidentNodeTag = const.TARGET) -> GraphTensor:
+  """Sorts edges by one incident node and stores them as `CsrAdjacency`.
+
+  For each selected edge set, this function reorders the edges (along with
+  their features) by the index of their incident node at `row_tag`, using a
+  stable sort, and replaces the `tfgnn.Adjacency` by a
+  `tfgnn.experimental.CsrAdjacency` with the corresponding row splits. The
+  graph and its components are not changed otherwise (edges do not move between
+  components, because nodes are numbered consecutively across components).
+
+  This is meant to be done once in the input pipeline, before batching and
+  padding, so that the model can use the faster pooling to the `row_tag` nodes
+  of the CSR layout, e.g., for the GNN layers that pool messages to the
+  `tfgnn.TARGET` nodes of each edge set.
+
+  Args:
+    graph_tensor: A scalar GraphTensor.
+    edge_set_names: The names of the edge sets to convert. Defaults to all edge
+      sets with an `Adjacency`.
+    row_tag: The incident node tag (`tfgnn.SOURCE` or `tfgnn.TARGET`) by which
+      edges are sorted.
+
+  Returns:
+    A scalar GraphTensor with the same nodes and context as the input, in which
+    the selected edge sets have a `CsrAdjacency`.
+
+  Raises:
+    ValueError: If `graph_tensor` is not scalar, if `edge_set_names` contains
+      non existing edge sets, or if a selected edge set does not have an
+      `Adjacency`.
+  """
+  gt.check_scalar_graph_tensor(graph_tensor,
+                               'tfgnn.experimental.convert_to_csr_adjacency()')
+  if edge_set_names is None:
+    edge_set_names = [
+        edge_set_name
+        for edge_set_name, edge_set in graph_tensor.edge_sets.items()
+        if isinstance(edge_set.adjacency, adj.Adjacency)
+    ]
+  diff = set(edge_set_names) - set(graph_tensor.edge_sets.keys())
+  if diff:
+    raise ValueError(
+        f'`edge_set_names` contains non existing edge sets: {diff}.')
+
+  edge_sets = dict(graph_tensor.edge_sets)
+  for edge_set_name in edge_set_names:
+    edge_set = edge_sets[edge_set_name]
+    adjacency = edge_set.adjacency
+    if not isinstance(adjacency, adj.Adjacency):
+      raise ValueError(
+          'Expected adjacency type `tfgnn.Adjacency`,'
+          f' got {type(adjacency).__name__}, edge set {edge_set_name}.')
+    if (isinstance(adjacency, adj.CsrAdjacency)
+        and adjacency.row_tag == row_tag):
+      continue
+
+    row_index = adjacency[row_tag]
+    perm = tf.argsort(row_index, stable=True)
+    row_index = tf.gather(row_index, perm)
+    num_row_nodes = graph_tensor.node_sets[
+        adjacency.node_set_name(row_tag)].total_size
+    row_splits = tf.searchsorted(
+        row_index,
+        tf.range(num_row_nodes + 1, dtype=row_index.dtype),
+        side='left',
+        out_type=row_index.dtype)
+    csr_adjacency = adj.CsrAdjacency.from_indices(
+        source=(adjacency.source_name, tf.gather(adjacency.source, perm)),
+        target=(adjacency.target_name, tf.gather(adjacency.target, perm)),
+        row_splits=row_splits,
+        row_tag=row_tag,
+        validate=False)
+    features = tf.nest.map_structure(
+        functools.partial(tf.gather, indices=perm),
+        edge_set.get_features_dict())
+    edge_sets[edge_set_name] = gt.EdgeSet.from_fields(
+        features=features, sizes=edge_set.sizes, adjacency=csr_adjacency)
+
+  return gt.GraphTensor.from_pieces(
+      context=graph_tensor.context,
+      node_sets=graph_tensor.node_sets,
+      edge_sets=edge_sets)
+
+
 def _shuffle_features(features: gt.Fields,
                       *,
                       seed: Optional[int] = None) -> gt.Fields:
@@ -1182,6 +1341,18 @@ def pool_neighbors_to_node(
           f' {tag_name}={tag} node set, got {node_sets}'
       )
 
+  csr_result = _pool_neighbors_to_node_with_csr(
+      graph_tensor,
+      edge_set_name,
+      to_tag,
+      reduce_type=reduce_type,
+      from_tag=from_tag,
+      feature_value=feature_value,
+      feature_name=feature_name,
+  )
+  if csr_result is not None:
+    return csr_result
+
   edge_value = broadcast_ops.broadcast_v2(
       graph_tensor,
       from_tag=from_tag,
@@ -1198,6 +1369,74 @@ def pool_neighbors_to_node(
   )
 
 
+def _pool_neighbors_to_node_with_csr(
+    graph_tensor: GraphTensor,
+    edge_set_name: Union[Sequence[EdgeSetName], EdgeSetName],
+    to_tag: IncidentNodeTag,
+    *,
+    reduce_type: str,
+    from_tag: IncidentNodeTag,
+    feature_value: Optional[Field],
+    feature_name: Optional[FieldName],
+) -> Optional[Field]:
+  """Returns pool_neighbors_to_node() as a sparse-dense matmul, if possible.
+
+  For "sum" and "mean" pooling of dense float features along a single edge set
+  that stores a `CsrAdjacency` sorted by `to_tag`, broadcasting to edges and
+  pooling to nodes is a multiplication with the (sparse) adjacency matrix,
+  which avoids materializing the per-edge values.
+
+  `tf.sparse.sparse_dense_matmul()` does not lower well to TPUs, so this fast
+  path does not apply under a `TPUStrategy`, and pooling falls back to the
+  segment ops of broadcasting and pooling along edges.
+
+  Returns:
+    The pooled values, or None if the fast path does not apply.
+  """
+  if reduce_type not in ('sum', 'mean'):
+    return None
+  if _in_tpu_strategy():
+    return None
+  if not isinstance(edge_set_name, str):
+    if len(edge_set_name) != 1:
+      return None
+    edge_set_name = edge_set_name[0]
+  adjacency = graph_tensor.edge_sets[edge_set_name].adjacency
+  if not (isinstance(adjacency, adj.CsrAdjacency) and
+          adjacency.row_tag == to_tag and
+          set(adjacency.get_indices_dict()) == {to_tag, from_tag}):
+    return None
+  if feature_value is None:
+    if feature_name is None:
+      return None
+    feature_value = graph_tensor.node_sets[
+        adjacency.node_set_name(from_tag)][feature_name]
+  if not (utils.is_dense_tensor(feature_value) and
+          feature_value.shape.rank == 2 and feature_value.dtype.is_floating):
+    return None
+
+  row_splits = tf.cast(adjacency.row_splits, tf.int64)
+  row_ids = tf.ragged.row_splits_to_segment_ids(row_splits)
+  col_ids = tf.cast(adjacency[from_tag], tf.int64)
+  num_rows = tf.size(row_splits, out_type=tf.int64) - 1
+  num_cols = tf.shape(feature_value, out_type=tf.int64)[0]
+  matrix = tf.sparse.SparseTensor(
+      indices=tf.stack([row_ids, col_ids], axis=1),
+      values=tf.ones(tf.shape(col_ids), feature_value.dtype),
+      dense_shape=tf.stack([num_rows, num_cols]))
+  result = tf.sparse.sparse_dense_matmul(matrix, feature_value)
+  if reduce_type == 'mean':
+    counts = tf.cast(adjacency.row_lengths(), feature_value.dtype)
+    result = tf.math.divide_no_nan(result, tf.expand_dims(counts, -1))
+  return result
+
+
+def _in_tpu_strategy() -> bool:
+  return isinstance(tf.distribute.get_strategy(),
+                    (tf.distribute.TPUStrategy,
+                     tf.distribute.experimental.TPUStrategy))
+
+
 @kt.delegate_keras_tensors
 def pool_neighbors_to_node_feature(
     graph_tensor: GraphTensor,
@@ -899,6 +899,154 @@ class NodeDegreeTest(tf.test.TestCase, parameterized.TestCase):
       get = ops.node_degree(graph, edge_set_name, const.TARGET)
       self.assertAllEqual(get, expected)
 
+    for row_tag, expected_degree in [(const.SOURCE, expected_source_degree),
+                                     (const.TARGET, expected_target_degree)]:
+      csr_graph = ops.convert_to_csr_adjacency(graph, row_tag=row_tag)
+      for edge_set_name, expected in expected_degree.items():
+        get = ops.node_degree(csr_graph, edge_set_name, row_tag)
+        self.assertAllEqual(get, expected)
+
+
+class ConcatGraphComponentsTest(tf.test.TestCase, parameterized.TestCase):
+  """Tests for concatenating the components of GraphTensors."""
+
+  def _graph(self, h):
+    return gt.GraphTensor.from_pieces(
+        context=gt.Context.from_fields(
+            sizes=as_tensor([1]), features={'c': as_tensor([[h[0]]])}),
+        node_sets={
+            'a': gt.NodeSet.from_fields(
+                sizes=as_tensor([3]), features={'h': as_tensor(h)}),
+            'b': gt.NodeSet.from_fields(sizes=as_tensor([1]), features={}),
+        },
+        edge_sets={
+            'a->a': gt.EdgeSet.from_fields(
+                sizes=as_tensor([2]),
+                features={'w': as_tensor([.5, .25])},
+                adjacency=adj.Adjacency.from_indices(
+                    ('a', as_tensor([0, 1])), ('a', as_tensor([1, 2])))),
+            'hyper': gt.EdgeSet.from_fields(
+                sizes=as_tensor([1]),
+                adjacency=adj.HyperAdjacency.from_indices({
+                    0: ('a', as_tensor([2])),
+                    1: ('b', as_tensor([0])),
+                    2: ('a', as_tensor([0])),
+                })),
+        })
+
+  def testConcat(self):
+    graph = ops.concat_graph_components(
+        [self._graph([1., 2., 3.]), self._graph([4., 5., 6.])])
+    self.assertAllEqual(graph.context.sizes, [1, 1])
+    self.assertAllEqual(graph.context['c'], [[1.], [4.]])
+    self.assertAllEqual(graph.node_sets['a'].sizes, [3, 3])
+    self.assertAllEqual(graph.node_sets['a']['h'],
+                        [1., 2., 3., 4., 5., 6.])
+    self.assertAllEqual(graph.node_sets['b'].sizes, [1, 1])
+    edge_set = graph.edge_sets['a->a']
+    self.assertAllEqual(edge_set.sizes, [2, 2])
+    self.assertAllEqual(edge_set['w'], [.5, .25, .5, .25])
+    self.assertAllEqual(edge_set.adjacency.source, [0, 1, 3, 4])
+    self.assertAllEqual(edge_set.adjacency.target, [1, 2, 4, 5])
+    hyper = graph.edge_sets['hyper'].adjacency
+    self.assertIsInstance(hyper, adj.HyperAdjacency)
+    self.assertAllEqual(hyper[0], [2, 5])
+    self.assertAllEqual(hyper[1], [0, 1])
+    self.assertAllEqual(hyper[2], [0, 3])
+
+  def testSingleGraph(self):
+    graph = self._graph([1., 2., 3.])
+    self.assertIs(ops.concat_graph_components([graph]), graph)
+
+  def testEmpty(self):
+    with self.assertRaisesRegex(ValueError, r'empty sequence'):
+      ops.concat_graph_components([])
+
+  def testDifferentSpec(self):
+    graph = self._graph([1., 2., 3.])
+    with self.assertRaisesRegex(ValueError, r'different spec'):
+      ops.concat_graph_components(
+          [graph, graph.replace_features(context={})])
+
+
+class ConvertToCsrAdjacencyTest(tf.test.TestCase, parameterized.TestCase):
+  """Tests for conversion of edge sets to CsrAdjacency."""
+
+  def setUp(self):
+    super().setUp()
+    const.enable_graph_tensor_validation_at_runtime()
+
+  def _make_graph(self):
+    return gt.GraphTensor.from_pieces(
+        node_sets={
+            'a': gt.NodeSet.from_fields(sizes=as_tensor([2, 2])),
+            'b': gt.NodeSet.from_fields(sizes=as_tensor([2, 1])),
+        },
+        edge_sets={
+            'a->b': gt.EdgeSet.from_fields(
+                sizes=as_tensor([3, 2]),
+                features={
+                    'id': as_tensor([0, 1, 2, 3, 4]),
+                    'r': as_ragged([[0], [], [2, 2], [3], []]),
+                },
+                adjacency=adj.Adjacency.from_indices(
+                    ('a', as_tensor([0, 1, 1, 3, 2])),
+                    ('b', as_tensor([1, 1, 0, 2, 2])),
+                )),
+            'b->b': gt.EdgeSet.from_fields(
+                sizes=as_tensor([1, 0]),
+                adjacency=adj.Adjacency.from_indices(
+                    ('b', as_tensor([1])),
+                    ('b', as_tensor([0])),
+                )),
+        })
+
+  @parameterized.named_parameters(
+      ('Target', const.TARGET, [2, 0, 1, 3, 4], [1, 0, 1, 3, 2],
+       [0, 1, 1, 2, 2], [0, 1, 3, 5]),
+      ('Source', const.SOURCE, [0, 1, 2, 4, 3], [0, 1, 1, 2, 3],
+       [1, 1, 0, 2, 2], [0, 1, 3, 4, 5]),
+  )
+  def testConvert(self, row_tag, expected_ids, expected_source,
+                  expected_target, expected_row_splits):
+    graph = self._make_graph()
+    result = ops.convert_to_csr_adjacency(graph, ['a->b'], row_tag=row_tag)
+    self.assertIsInstance(result.edge_sets['b->b'].adjacency, adj.Adjacency)
+    self.assertNotIsInstance(result.edge_sets['b->b'].adjacency,
+                             adj.CsrAdjacency)
+    edge_set = result.edge_sets['a->b']
+    self.assertIsInstance(edge_set.adjacency, adj.CsrAdjacency)
+    self.assertEqual(edge_set.adjacency.row_tag, row_tag)
+    self.assertAllEqual(edge_set.sizes, [3, 2])
+    self.assertAllEqual(edge_set['id'], expected_ids)
+    self.assertAllEqual(
+        edge_set['r'],
+        tf.gather(graph.edge_sets['a->b']['r'], expected_ids))
+    self.assertAllEqual(edge_set.adjacency.source, expected_source)
+    self.assertAllEqual(edge_set.adjacency.target, expected_target)
+    self.assertAllEqual(edge_set.adjacency.row_splits, expected_row_splits)
+
+  def testConvertAll(self):
+    result = ops.convert_to_csr_adjacency(self._make_graph())
+    for edge_set in result.edge_sets.values():
+      self.assertIsInstance(edge_set.adjacency, adj.CsrAdjacency)
+    self.assertAllEqual(result.edge_sets['b->b'].adjacency.row_splits,
+                        [0, 1, 1, 1])
+
+  def testRaisesOnUnknownEdgeSet(self):
+    with self.assertRaisesRegex(ValueError, 'non existing edge sets'):
+      ops.convert_to_csr_adjacency(self._make_graph(), ['c->c'])
+
+  def testKerasModel(self):
+    graph = self._make_graph()
+    inputs = tf.keras.layers.Input(type_spec=graph.spec)
+    outputs = ops.convert_to_csr_adjacency(inputs)
+    model = tf.keras.Model(inputs, outputs)
+    result = model(graph)
+    self.assertIsInstance(result.edge_sets['a->b'].adjacency, adj.CsrAdjacency)
+    self.assertAllEqual(result.edge_sets['a->b'].adjacency.row_splits,
+                        [0, 1, 3, 5])
+
 
 class _MaskEdges(tf.keras.layers.Layer):
 
@@ -1739,6 +1887,12 @@ class PoolNeighborsToNodeTest(tf.test.TestCase, parameterized.TestCase):
           as_tensor([[5.0], [1.0]]),
           as_tensor([[(5.0 + 1.0) / 2.0], [5.0]]),
       ),
+      (
+          'matrix',
+          'sum',
+          as_tensor([[5.0, 3.0], [1.0, 5.0]]),
+          as_tensor([[5.0 + 1.0, 3.0 + 5.0], [5.0, 3.0]]),
+      ),
       (
           'ragged',
           'sum',
@@ -1786,6 +1940,16 @@ class PoolNeighborsToNodeTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual(updated_gt.node_sets['nodes']['f_in'], source)
     self.assertAllEqual(updated_gt.node_sets['nodes']['f_out'], expected)
 
+    csr_graph = ops.convert_to_csr_adjacency(graph)
+    result = ops.pool_neighbors_to_node(
+        csr_graph,
+        'edges',
+        const.TARGET,
+        reduce_type=reduce_type,
+        feature_name='f_in',
+    )
+    self.assertAllClose(result, expected)
+
   @parameterized.named_parameters([
       ('scalar', as_tensor([1.0, 3.0]), as_tensor([1.0 + 3.0])),
       (
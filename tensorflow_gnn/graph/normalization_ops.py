@@ -21,6 +21,7 @@ import tensorflow as tf
 from tensorflow_gnn.graph import broadcast_ops
 from tensorflow_gnn.graph import graph_constants as const
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import op_profiling
 from tensorflow_gnn.graph import pool_ops
 from tensorflow_gnn.keras import keras_tensors as kt
 
@@ -95,12 +96,13 @@ def softmax(
 
   # Compute softmax. Subtract the maxes for numerical stability.
   # Some segment_maxes may be -inf, but that's broadcast nowhere.
-  segment_maxes = pool(reduce_type="max", feature_value=values)
-  maxes = broadcast(feature_value=segment_maxes)
-  exp_values = [tf.exp(v - m) for v, m in _zip_strict(values, maxes)]
-  sum_exp_values = broadcast(feature_value=pool(reduce_type="sum",
-                                                feature_value=exp_values))
-  result = [ev / sev for ev, sev in _zip_strict(exp_values, sum_exp_values)]
+  with op_profiling.op_scope("softmax"):
+    segment_maxes = pool(reduce_type="max", feature_value=values)
+    maxes = broadcast(feature_value=segment_maxes)
+    exp_values = [tf.exp(v - m) for v, m in _zip_strict(values, maxes)]
+    sum_exp_values = broadcast(feature_value=pool(reduce_type="sum",
+                                                  feature_value=exp_values))
+    result = [ev / sev for ev, sev in _zip_strict(exp_values, sum_exp_values)]
 
   # Return result with the same nesting as the inputs.
   if got_sequence_args:
@@ -0,0 +1,121 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Optional profiler annotations for the ops on a GraphTensor.
+
+The TF profiler reports the ops of a model by their names, which are prefixed
+by the name scopes in which the ops were created. The broadcast, pool and
+softmax ops on a GraphTensor create many anonymous `GatherV2` and
+`UnsortedSegmentSum` ops. While op profiling is enabled, these ops (and the
+convolutions of TF-GNN's Keras layers) get created in name scopes like
+
+```
+tfgnn.pool/edge_set.cites/UnsortedSegmentSum
+```
+
+that identify the TF-GNN operation and the edge set or node set they work on.
+When called eagerly, they also emit `tf.profiler.experimental.Trace` events
+with that information. `tensorflow_gnn/tools/profile_report.py` aggregates the
+time and memory of the ops in a captured trace by these name scopes.
+
+Op profiling takes effect when a model is traced (e.g., by `tf.function` or
+`Model.compile()`), so it needs to be enabled before the model is built or
+called for the first time.
+"""
+
+import contextlib
+import re
+from typing import Iterator, Optional
+
+import tensorflow as tf
+
+# Name scope prefixes, for use by report tools.
+OP_SCOPE_PREFIX = "tfgnn."
+EDGE_SET_SCOPE_PREFIX = "edge_set."
+NODE_SET_SCOPE_PREFIX = "node_set."
+
+_op_profiling_enabled = False
+
+
+def enable_op_profiling():
+  """Enables profiler annotations for the ops on a GraphTensor."""
+  global _op_profiling_enabled
+  _op_profiling_enabled = True
+
+
+def disable_op_profiling():
+  """Disables profiler annotations for the ops on a GraphTensor (default)."""
+  global _op_profiling_enabled
+  _op_profiling_enabled = False
+
+
+def is_op_profiling_enabled() -> bool:
+  """Returns whether profiler annotations are enabled."""
+  return _op_profiling_enabled
+
+
+def scope_name(name: str) -> str:
+  """Returns `name` with characters invalid in name scopes replaced by `_`."""
+  return re.sub(r"[^A-Za-z0-9_.\->]", "_", name)
+
+
+@contextlib.contextmanager
+def op_scope(op_name: str, *,
+             edge_set_name: Optional[str] = None,
+             node_set_name: Optional[str] = None,
+             layer_name: Optional[str] = None) -> Iterator[None]:
+  """Annotates the ops created in this context, if op profiling is enabled.
+
+  Args:
+    op_name: The name of the TF-GNN operation, like `"pool"`.
+    edge_set_name: The edge set on which the operation works, if any.
+    node_set_name: The node set on which the operation works, if any.
+    layer_name: The name of the Keras layer, for eager trace events only.
+      (Keras already opens a name scope for the layer when tracing.)
+
+  Yields:
+    Nothing.
+  """
+  if not _op_profiling_enabled:
+    yield
+    return
+  with contextlib.ExitStack() as stack:
+    stack.enter_context(tf.name_scope(OP_SCOPE_PREFIX + scope_name(op_name)))
+    stack.enter_context(item_scope(edge_set_name=edge_set_name,
+                                   node_set_name=node_set_name))
+    if tf.executing_eagerly():
+      trace_kwargs = dict(edge_set=edge_set_name, node_set=node_set_name,
+                          layer=layer_name)
+      stack.enter_context(tf.profiler.experimental.Trace(
+          OP_SCOPE_PREFIX + op_name,
+          **{k: v for k, v in trace_kwargs.items() if v is not None}))
+    yield
+
+
+@contextlib.contextmanager
+def item_scope(*,
+               edge_set_name: Optional[str] = None,
+               node_set_name: Optional[str] = None) -> Iterator[None]:
+  """Like `op_scope()`, but only annotates the edge set or node set."""
+  if not _op_profiling_enabled:
+    yield
+    return
+  with contextlib.ExitStack() as stack:
+    if edge_set_name is not None:
+      stack.enter_context(tf.name_scope(
+          EDGE_SET_SCOPE_PREFIX + scope_name(edge_set_name)))
+    if node_set_name is not None:
+      stack.enter_context(tf.name_scope(
+          NODE_SET_SCOPE_PREFIX + scope_name(node_set_name)))
+    yield
@@ -0,0 +1,101 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for op_profiling."""
+
+import tensorflow as tf
+from tensorflow_gnn.graph import adjacency as adj
+from tensorflow_gnn.graph import broadcast_ops
+from tensorflow_gnn.graph import graph_constants as const
+from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import normalization_ops
+from tensorflow_gnn.graph import op_profiling
+from tensorflow_gnn.graph import pool_ops
+
+
+def _make_graph():
+  return gt.GraphTensor.from_pieces(
+      node_sets={
+          "a": gt.NodeSet.from_fields(
+              sizes=[2], features={"x": tf.constant([1., 2.])}),
+          "b": gt.NodeSet.from_fields(sizes=[1]),
+      },
+      edge_sets={
+          "a->b": gt.EdgeSet.from_fields(
+              sizes=[2],
+              adjacency=adj.Adjacency.from_indices(("a", [0, 1]),
+                                                   ("b", [0, 0]))),
+          "a/b": gt.EdgeSet.from_fields(
+              sizes=[1],
+              adjacency=adj.Adjacency.from_indices(("a", [1]), ("b", [0]))),
+      })
+
+
+def _op_names(fn, graph):
+  concrete_fn = tf.function(fn).get_concrete_function(graph)
+  return [op.name for op in concrete_fn.graph.get_operations()]
+
+
+class OpProfilingTest(tf.test.TestCase):
+
+  def tearDown(self):
+    op_profiling.disable_op_profiling()
+    super().tearDown()
+
+  def testDisabledByDefault(self):
+    self.assertFalse(op_profiling.is_op_profiling_enabled())
+
+    def fn(graph):
+      return pool_ops.pool_v2(graph, const.TARGET, edge_set_name="a->b",
+                              reduce_type="sum", feature_value=tf.ones([2]))
+
+    self.assertFalse(any("tfgnn." in name
+                         for name in _op_names(fn, _make_graph())))
+
+  def testScopes(self):
+    op_profiling.enable_op_profiling()
+    self.assertTrue(op_profiling.is_op_profiling_enabled())
+
+    def fn(graph):
+      values = broadcast_ops.broadcast_v2(
+          graph, const.SOURCE, edge_set_name=["a->b", "a/b"],
+          feature_name="x")
+      values = normalization_ops.softmax(
+          graph, const.TARGET, edge_set_name=["a->b", "a/b"],
+          feature_value=values)
+      return pool_ops.pool_v2(graph, const.CONTEXT, node_set_name="a",
+                              reduce_type="sum", feature_name="x")
+
+    op_names = _op_names(fn, _make_graph())
+    scopes = {name.rsplit("/", 1)[0] for name in op_names}
+    self.assertContainsSubset(
+        ["tfgnn.broadcast/edge_set.a->b", "tfgnn.broadcast/edge_set.a_b",
+         "tfgnn.softmax/tfgnn.pool/edge_set.a->b",
+         "tfgnn.softmax/tfgnn.broadcast/edge_set.a_b",
+         "tfgnn.pool/node_set.a"],
+        scopes)
+
+  def testEager(self):
+    op_profiling.enable_op_profiling()
+    graph = _make_graph()
+    result = pool_ops.pool_v2(graph, const.TARGET, edge_set_name="a->b",
+                              reduce_type="sum", feature_value=tf.ones([2]))
+    self.assertAllEqual([2.], result)
+
+  def testScopeName(self):
+    self.assertEqual("a->b_c.d-e_f", op_profiling.scope_name("a->b/c.d-e f"))
+
+
+if __name__ == "__main__":
+  tf.test.main()
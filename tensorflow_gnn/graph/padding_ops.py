@@ -15,7 +15,7 @@
 """Defines padding operations over a GraphTensor."""
 
 import functools
-from typing import Any, Callable, List, Optional, Tuple, Union, cast
+from typing import Any, Callable, List, Mapping, Optional, Tuple, Union, cast
 
 import numpy as np
 import tensorflow as tf
@@ -54,11 +54,21 @@ def pad_to_total_sizes(
   number of incident edges (this behavior is not guaranteed and may change in
   the future).
 
+  If `graph_tensor` has rank 1 (e.g., a batch of graphs from
+  `tf.data.Dataset.batch()` or `tfgnn.dynamic_batch()`), its graphs are merged
+  into components of a scalar graph tensor while padding, with the same result
+  as `pad_to_total_sizes(graph_tensor.merge_batch_to_components(), ...)`. This
+  fused path does not build the intermediate merged graph tensor: each feature
+  is copied once, directly into a tensor with the target total size, and node
+  indices are shifted for the merged components in the same pass that appends
+  the fake edges.
+
   NOTE(b/275338236): This operation is not available in TFLite (last checked
   for TF 2.12).
 
   Args:
-    graph_tensor: scalar graph tensor (rank=0) to pad.
+    graph_tensor: scalar graph tensor (rank=0) to pad, or a batch of graph
+      tensors (rank=1) to merge into components and pad.
     size_constraints: target total sizes for each graph piece. Must define the
       target number of graph components (`.total_num_components`), target total
       number of items for each node set (`.total_num_nodes[node_set_name]`) and
@@ -75,10 +85,10 @@ def pad_to_total_sizes(
       each input value.
 
   Returns:
-    Tuple of padded graph tensor and padding mask. The mask is a rank-1 dense
-    boolean tensor wth size equal to the number of graph compoents is the result
-    containing `True` for real graph components and `False` - for fake one used
-    for padding.
+    Tuple of padded scalar graph tensor and padding mask. The mask is a rank-1
+    dense boolean tensor with size equal to the number of graph components in
+    the result, containing `True` for real graph components and `False` for the
+    fake ones used for padding.
 
   Raises:
     ValueError: if input parameters are invalid.
@@ -86,7 +96,10 @@ def pad_to_total_sizes(
       the `size_constraints` or has less nodes in a component than allowed by
       the `min_nodes_per_component`
   """
-  gt.check_scalar_graph_tensor(graph_tensor, 'tfgnn.pad_to_total_sizes()')
+  if graph_tensor.rank not in (0, 1):
+    raise ValueError(
+        'tfgnn.pad_to_total_sizes() requires a scalar GraphTensor or'
+        f' a GraphTensor of rank 1, got rank={graph_tensor.rank}.')
 
   def _ifnone(value, default):
     return value if value is not None else default
@@ -154,6 +167,14 @@ def pad_to_total_sizes(
               _ifnone(padding_values.node_sets, {}).get(name, {}),
               debug_context=f'{name} nodes'))
 
+    if graph_tensor.rank == 1:
+      num_nodes_per_example = {
+          name: item._get_num_items()  # pylint: disable=protected-access
+          for name, item in graph_tensor.node_sets.items()
+      }
+    else:
+      num_nodes_per_example = None
+
     padded_edge_sets = {}
     for name, item in graph_tensor.edge_sets.items():
       padded_edge_sets[name] = _pad_to_total_sizes(
@@ -161,6 +182,7 @@ def pad_to_total_sizes(
           target_total_num_components=target_total_num_components,
           target_total_size=size_constraints.total_num_edges[name],
           min_max_node_index_fn=get_min_max_fake_nodes_indices,
+          num_nodes_per_example=num_nodes_per_example,
           min_edges_per_component=0,
           padding_value_fn=functools.partial(
               get_default_value,
@@ -271,13 +293,14 @@ def _(context: gt.Context, *,
   diff = tf.ones(
       shape=[target_total_num_components - context.total_num_components],
       dtype=context.spec.sizes_spec.dtype)
-  sizes = tf.concat([context.sizes, diff], axis=0)
+  sizes = tf.concat([_remove_batch_dimensions(context.sizes, context.rank),
+                     diff], axis=0)
   sizes = tensor_utils.ensure_static_nrows(
       sizes, nrows=target_total_num_components)
   assert sizes.shape == tf.TensorShape([target_total_num_components])
   return context.from_fields(
       features=_pad_features(
-          context.features,
+          _remove_batch_dimensions(context.features, context.rank),
           padding_value_fn=padding_value_fn,
           target_size=target_total_num_components),
       sizes=sizes)
@@ -293,11 +316,11 @@ def _(node_set: gt.NodeSet, *,
 
   return node_set.from_fields(
       features=_pad_features(
-          node_set.features,
+          _remove_batch_dimensions(node_set.features, node_set.rank),
           padding_value_fn=padding_value_fn,
           target_size=target_total_size),
       sizes=_pad_sizes(
-          node_set.sizes,
+          _remove_batch_dimensions(node_set.sizes, node_set.rank),
           min_entities_per_component=min_nodes_per_component,
           target_num_components=target_total_num_components,
           target_size=target_total_size))
@@ -308,6 +331,7 @@ def _(edge_set: gt.EdgeSet, *,
       padding_value_fn: Callable[[gt.FieldName], gt.Field],
       min_max_node_index_fn: Callable[[gt.NodeSetName],
                                       Tuple[tf.Tensor, tf.Tensor]],
+      num_nodes_per_example: Optional[Mapping[gt.NodeSetName, tf.Tensor]],
       target_total_num_components: int,
       target_total_size: int,
       min_edges_per_component: int) -> gt.EdgeSet:
@@ -315,56 +339,141 @@ def _(edge_set: gt.EdgeSet, *,
 
   return edge_set.from_fields(
       features=_pad_features(
-          edge_set.features,
+          _remove_batch_dimensions(edge_set.features, edge_set.rank),
           padding_value_fn=padding_value_fn,
           target_size=target_total_size),
       sizes=_pad_sizes(
-          edge_set.sizes,
+          _remove_batch_dimensions(edge_set.sizes, edge_set.rank),
           min_entities_per_component=min_edges_per_component,
           target_num_components=target_total_num_components,
           target_size=target_total_size),
       adjacency=_pad_to_total_sizes(
           edge_set.adjacency,
           target_total_size=target_total_size,
-          min_max_node_index_fn=min_max_node_index_fn))
+          min_max_node_index_fn=min_max_node_index_fn,
+          merge_index_fn=_get_merge_index_fn(
+              edge_set.adjacency, num_nodes_per_example)))
 
 
 @_pad_to_total_sizes.register
 def _(adjacency: adj.Adjacency, *,
       target_total_size: int,
       min_max_node_index_fn: Callable[[gt.NodeSetName],
-                                      Tuple[tf.Tensor, tf.Tensor]]
+                                      Tuple[tf.Tensor, tf.Tensor]],
+      merge_index_fn: Callable[[gt.NodeSetName, gt.Field], tf.Tensor]
      ) -> adj.Adjacency:
   """Pads adjacency the target number of edges."""
   return adjacency.from_indices(
       source=(adjacency.source_name,
               _pad_adjacency_index_with_linspace(
-                  adjacency.source, target_total_size,
+                  merge_index_fn(adjacency.source_name, adjacency.source),
+                  target_total_size,
                   *min_max_node_index_fn(adjacency.source_name))),
       target=(adjacency.target_name,
               _pad_adjacency_index_with_linspace(
-                  adjacency.target, target_total_size,
+                  merge_index_fn(adjacency.target_name, adjacency.target),
+                  target_total_size,
                   *min_max_node_index_fn(adjacency.target_name))),
       validate=False)
 
 
+@_pad_to_total_sizes.register
+def _(adjacency: adj.CsrAdjacency, *,
+      target_total_size: int,
+      min_max_node_index_fn: Callable[[gt.NodeSetName],
+                                      Tuple[tf.Tensor, tf.Tensor]],
+      merge_index_fn: Callable[[gt.NodeSetName, gt.Field], tf.Tensor]
+     ) -> adj.CsrAdjacency:
+  """Pads CSR adjacency the target number of edges and row nodes."""
+  # Fake edges connect fake nodes in non-decreasing order, so padded indices
+  # remain sorted by the row node and the row splits can be recomputed by
+  # binary search for all (real and fake) row nodes.
+  padded_indices = {}
+  for tag, (name, index) in adjacency.get_indices_dict().items():
+    padded_indices[tag] = (name,
+                           _pad_adjacency_index_with_linspace(
+                               merge_index_fn(name, index),
+                               target_total_size,
+                               *min_max_node_index_fn(name)))
+  _, row_index = padded_indices[adjacency.row_tag]
+  _, max_row_index = min_max_node_index_fn(
+      adjacency.node_set_name(adjacency.row_tag))
+  num_row_splits = tf.get_static_value(max_row_index) + 2
+  row_splits = tf.searchsorted(
+      row_index,
+      tf.range(num_row_splits, dtype=row_index.dtype),
+      side='left',
+      out_type=row_index.dtype)
+  return adjacency.from_indices(
+      source=padded_indices[const.SOURCE],
+      target=padded_indices[const.TARGET],
+      row_splits=tensor_utils.ensure_static_nrows(
+          row_splits, nrows=num_row_splits),
+      row_tag=adjacency.row_tag,
+      validate=False)
+
+
 @_pad_to_total_sizes.register
 def _(adjacency: adj.HyperAdjacency, *,
       target_total_size: int,
       min_max_node_index_fn: Callable[[gt.NodeSetName],
-                                      Tuple[tf.Tensor, tf.Tensor]]
+                                      Tuple[tf.Tensor, tf.Tensor]],
+      merge_index_fn: Callable[[gt.NodeSetName, gt.Field], tf.Tensor]
      ) -> adj.HyperAdjacency:
   """Pads hyper adjacency the target number of edges."""
   padded_indices = {}
   for tag, (name, index) in adjacency.get_indices_dict().items():
     padded_indices[tag] = (name,
                            _pad_adjacency_index_with_linspace(
-                               index, target_total_size,
+                               merge_index_fn(name, index),
+                               target_total_size,
                                *min_max_node_index_fn(name)))
 
   return adjacency.from_indices(padded_indices, validate=False)
 
 
+def _remove_batch_dimensions(value, rank: int):
+  """Merges the `rank` batch dimensions of all fields in `value` (no copy)."""
+  if rank == 0:
+    return value
+  return tf.nest.map_structure(
+      functools.partial(gp.field_remove_batch_dimensions, rank), value)
+
+
+def _get_merge_index_fn(
+    adjacency: adj.HyperAdjacency,
+    num_nodes_per_example: Optional[Mapping[gt.NodeSetName, tf.Tensor]]
+) -> Callable[[gt.NodeSetName, gt.Field], tf.Tensor]:
+  """Returns a function that converts node indices into merged components.
+
+  For a scalar `adjacency`, the returned function is the identity. For an
+  `adjacency` of rank 1, the returned function shifts the node indices of each
+  batch element by the total number of nodes in the preceding batch elements,
+  like `GraphTensor.merge_batch_to_components()` does.
+
+  Args:
+    adjacency: the adjacency with the indices to merge.
+    num_nodes_per_example: for rank-1 adjacencies, a mapping from node set
+      names to the number of nodes in each batch element; `None` otherwise.
+  """
+  if adjacency.rank == 0:
+    return lambda node_set_name, index: index
+
+  assert adjacency.rank == 1, adjacency.rank
+  assert num_nodes_per_example is not None
+  # pylint: disable-next=protected-access
+  num_edges_per_example = adjacency._get_num_items()
+
+  def merge_index_fn(node_set_name: gt.NodeSetName,
+                     index: gt.Field) -> tf.Tensor:
+    return tensor_utils.flatten_indices(
+        gp.field_remove_batch_dimensions(1, index),
+        num_edges_per_example,
+        num_nodes_per_example[node_set_name])
+
+  return merge_index_fn
+
+
 def _pad_features(features: gt.Fields, *,
                   padding_value_fn: Callable[[gt.FieldName], gt.Field],
                   target_size: int) -> gt.Fields:
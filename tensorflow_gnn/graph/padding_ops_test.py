@@ -18,6 +18,7 @@ import tensorflow as tf
 from tensorflow_gnn.graph import adjacency as adj
 from tensorflow_gnn.graph import graph_constants as gc
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import graph_tensor_ops
 from tensorflow_gnn.graph import graph_tensor_test_utils as tu
 from tensorflow_gnn.graph import padding_ops as ops
 from tensorflow_gnn.graph import preprocessing_common as preprocessing
@@ -270,6 +271,39 @@ class PaddingToTotalSizesTest(tu.GraphTensorTestBase):
     self.assertAllEqual(
         tf.unique(padded_adjacency.target[3:]).y, tf.range(4, 200))
 
+  @parameterized.parameters([gc.SOURCE, gc.TARGET])
+  def testCsrAdjacencyPadding(self, row_tag):
+    graph = graph_tensor_ops.convert_to_csr_adjacency(
+        self.test_2_a2b4_ab3_graph, row_tag=row_tag)
+    size_constraints = preprocessing.SizeConstraints(
+        total_num_components=8,
+        total_num_nodes={'a': 10, 'b': 15},
+        total_num_edges={'a->b': 12})
+
+    padded, _ = ops.pad_to_total_sizes(graph, size_constraints)
+    padded_adjacency = padded.edge_sets['a->b'].adjacency
+    self.assertIsInstance(padded_adjacency, adj.CsrAdjacency)
+    self.assertEqual(padded_adjacency.row_tag, row_tag)
+    num_row_nodes = {gc.SOURCE: 10, gc.TARGET: 15}[row_tag]
+    self.assertEqual(padded_adjacency.row_splits.shape, [num_row_nodes + 1])
+    row_index = padded_adjacency[row_tag]
+    self.assertAllEqual(
+        padded_adjacency.row_splits,
+        tf.searchsorted(row_index, tf.range(num_row_nodes + 1)))
+
+    batch = tf.data.Dataset.from_tensors(graph).repeat(3).batch(3)
+    batch = batch.get_single_element()
+    expected, _ = ops.pad_to_total_sizes(
+        batch.merge_batch_to_components(), size_constraints)
+    actual, _ = ops.pad_to_total_sizes(batch, size_constraints)
+    expected_adjacency = expected.edge_sets['a->b'].adjacency
+    actual_adjacency = actual.edge_sets['a->b'].adjacency
+    self.assertIsInstance(actual_adjacency, adj.CsrAdjacency)
+    self.assertAllEqual(actual_adjacency.source, expected_adjacency.source)
+    self.assertAllEqual(actual_adjacency.target, expected_adjacency.target)
+    self.assertAllEqual(actual_adjacency.row_splits,
+                        expected_adjacency.row_splits)
+
   def testHyperAdjacencyPaddingWithLinspace(self):
     source = gt.GraphTensor.from_pieces(
         node_sets={
@@ -497,6 +531,126 @@ class PaddingToTotalSizesTest(tu.GraphTensorTestBase):
             tf.nest.flatten(padded2, expand_composites=True))):
       self.assertAllEqual(a, b, msg=f'index={index}')
 
+  @parameterized.parameters([
+      dict(batch_size=1, scale=1, drop_remainder=False),
+      dict(batch_size=3, scale=3, drop_remainder=False),
+      dict(batch_size=2, scale=2, drop_remainder=True),
+  ])
+  def testMergeBatchAndPadding(self, batch_size, scale, drop_remainder):
+    size_constraints = preprocessing.SizeConstraints(
+        total_num_components=4 * scale,
+        total_num_nodes={
+            'a': 5 * scale,
+            'b': 6 * scale
+        },
+        total_num_edges={'a->b': 6 * scale})
+    padding_values = preprocessing.FeatureDefaultValues(
+        context={'f': '?'}, node_sets={'a': {'f': -1.}})
+    ds = tf.data.Dataset.from_tensors(self.test_2_a2b4_ab3_graph).repeat(3)
+    ds = ds.batch(batch_size, drop_remainder=drop_remainder)
+    for batch in ds:
+      self.assertEqual(batch.rank, 1)
+      expected, expected_mask = ops.pad_to_total_sizes(
+          batch.merge_batch_to_components(),
+          size_constraints,
+          padding_values=padding_values)
+      actual, actual_mask = ops.pad_to_total_sizes(
+          batch, size_constraints, padding_values=padding_values)
+      self.assertEqual(actual.rank, 0)
+      self.asserHasStaticNRows(actual)
+      self.assertAllEqual(actual_mask, expected_mask)
+      tf.nest.assert_same_structure(
+          expected.spec, actual.spec, expand_composites=True)
+      for index, (a, b) in enumerate(
+          zip(
+              tf.nest.flatten(expected, expand_composites=True),
+              tf.nest.flatten(actual, expand_composites=True))):
+        self.assertAllEqual(a, b, msg=f'index={index}')
+
+  @parameterized.parameters([1, 2, 3])
+  def testMergeBatchAndPaddingOfDifferentGraphs(self, batch_size):
+
+    def create_graph(context_f, a_f, a_sizes, b_sizes, edge_sizes, source,
+                     target):
+      return gt.GraphTensor.from_pieces(
+          context=gt.Context.from_fields(
+              features={'f': as_tensor(context_f)}),
+          node_sets={
+              'a':
+                  gt.NodeSet.from_fields(
+                      features={'f': as_tensor(a_f, tf.float32)},
+                      sizes=as_tensor(a_sizes)),
+              'b':
+                  gt.NodeSet.from_fields(
+                      features={}, sizes=as_tensor(b_sizes)),
+          },
+          edge_sets={
+              'a->b':
+                  gt.EdgeSet.from_fields(
+                      features={
+                          'weight': as_tensor(
+                              [float(i) for i in range(len(source))])
+                      },
+                      sizes=as_tensor(edge_sizes),
+                      adjacency=adj.Adjacency.from_indices(
+                          ('a', as_tensor(source)),
+                          ('b', as_tensor(target)),
+                      )),
+          },
+      )
+
+    graphs = [
+        self.test_2_a2b4_ab3_graph,
+        create_graph(['Z'], [3., 4.], [2], [1], [3], [0, 1, 1], [0, 0, 0]),
+        create_graph(['U', 'V', 'W'], [5., 6., 7.], [0, 1, 2], [1, 1, 3],
+                     [0, 1, 2], [0, 1, 2], [1, 2, 4]),
+    ]
+    spec = graphs[0].spec.relax(
+        num_components=True, num_nodes=True, num_edges=True)
+    ds = tf.data.Dataset.from_generator(
+        lambda: iter(graphs), output_signature=spec)
+    ds = ds.batch(batch_size)
+
+    size_constraints = preprocessing.SizeConstraints(
+        total_num_components=8,
+        total_num_nodes={
+            'a': 9,
+            'b': 12
+        },
+        total_num_edges={'a->b': 10})
+    padding_values = preprocessing.FeatureDefaultValues(
+        context={'f': '?'}, node_sets={'a': {'f': -1.}})
+    for batch in ds:
+      self.assertEqual(batch.rank, 1)
+      expected, expected_mask = ops.pad_to_total_sizes(
+          batch.merge_batch_to_components(),
+          size_constraints,
+          padding_values=padding_values)
+      actual, actual_mask = ops.pad_to_total_sizes(
+          batch, size_constraints, padding_values=padding_values)
+      self.assertEqual(actual.rank, 0)
+      self.asserHasStaticNRows(actual)
+      self.assertAllEqual(actual_mask, expected_mask)
+      tf.nest.assert_same_structure(
+          expected.spec, actual.spec, expand_composites=True)
+      for index, (a, b) in enumerate(
+          zip(
+              tf.nest.flatten(expected, expand_composites=True),
+              tf.nest.flatten(actual, expand_composites=True))):
+        self.assertAllEqual(a, b, msg=f'index={index}')
+
+  def testMergeBatchAndPaddingRaisesOnOverflow(self):
+    ds = tf.data.Dataset.from_tensors(self.test_2_a2b4_ab3_graph)
+    batch = ds.repeat(2).batch(2).get_single_element()
+    with self.assertRaisesRegex(tf.errors.InvalidArgumentError,
+                                'Could not pad'):
+      ops.pad_to_total_sizes(
+          batch,
+          preprocessing.SizeConstraints(
+              total_num_components=5,
+              total_num_nodes={'a': 3, 'b': 10},
+              total_num_edges={'a->b': 10}))
+
   def testRaisesOnIncompleteTotalSizes(self):
 
     no_node = preprocessing.SizeConstraints(
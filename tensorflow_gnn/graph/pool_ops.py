@@ -17,13 +17,14 @@
 from __future__ import annotations
 import abc
 import functools
-from typing import Optional, Sequence, Union
+from typing import Callable, List, Optional, Sequence, Union
 
 import tensorflow as tf
 
 from tensorflow_gnn.graph import adjacency as adj
 from tensorflow_gnn.graph import graph_constants as const
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import op_profiling
 from tensorflow_gnn.graph import tag_utils
 from tensorflow_gnn.graph import tensor_utils as utils
 from tensorflow_gnn.keras import keras_tensors as kt
@@ -325,10 +326,11 @@ def pool_v2(
           for name, shape in zip(node_set_names, feature_shapes)])
     raise ValueError("\n".join(msg_lines))
 
-  return _pool_internal(
-      graph_tensor, to_tag,
-      edge_set_names=edge_set_names, node_set_names=node_set_names,
-      reduce_type=reduce_type, feature_values=feature_values)
+  with op_profiling.op_scope("pool"):
+    return _pool_internal(
+        graph_tensor, to_tag,
+        edge_set_names=edge_set_names, node_set_names=node_set_names,
+        reduce_type=reduce_type, feature_values=feature_values)
 
 
 def _pool_internal(
@@ -340,10 +342,107 @@ def _pool_internal(
     reduce_type: str,
     feature_values: Sequence[Field]) -> Field:
   """Returns pool() result from canonicalized args."""
+  def reduce_piece(piece_reducer: GraphPieceReducer, i: int) -> Field:
+    edge_set_name = edge_set_names[i] if edge_set_names else None
+    node_set_name = node_set_names[i] if node_set_names else None
+    with op_profiling.item_scope(edge_set_name=edge_set_name,
+                                 node_set_name=node_set_name):
+      return piece_reducer.reduce(
+          graph, to_tag,
+          feature_value=feature_values[i],
+          edge_set_name=edge_set_name,
+          node_set_name=node_set_name)
+
+  return _compute_reductions(reduce_type, len(feature_values), reduce_piece)
+
+
+def pool_edges_to_node_per_edge_set(
+    graph: GraphTensor,
+    to_tag: IncidentNodeTag,
+    *,
+    edge_set_names: Sequence[EdgeSetName],
+    reduce_type: str,
+    feature_values: Sequence[Field]) -> List[Field]:
+  """Pools values from several edge sets to the same nodes, separately.
+
+  The result is the same as
+  `[pool_v2(graph, to_tag, edge_set_name=name, reduce_type=reduce_type,
+  feature_value=value) for name, value in zip(edge_set_names, feature_values)]`
+  but it is computed with one segment operation per reduce type for all edge
+  sets together: the values are concatenated, and the segment ids are formed
+  from pairs (edge set, receiver node), which replaces many small ops by a few
+  large ones.
+
+  Args:
+    graph: A scalar GraphTensor.
+    to_tag: The incident node tag of the receiver nodes, e.g., `tfgnn.TARGET`.
+    edge_set_names: A non-empty sequence of edge set names, which must all
+      have the same incident node set at `to_tag`, with `HyperAdjacency`.
+    reduce_type: As for `pool_v2()`.
+    feature_values: A list of dense tensors, parallel to `edge_set_names`, with
+      shape `[num_edges, *feature_shape]` and the same dtype and fully defined
+      `*feature_shape` for all edge sets.
+
+  Returns:
+    A list of the pooled results for each edge set, each of shape
+    `[num_nodes, *feature_shape]`.
+  """
+  gt.check_scalar_graph_tensor(graph, "pool_edges_to_node_per_edge_set()")
+  if not edge_set_names or len(edge_set_names) != len(feature_values):
+    raise ValueError("Expected parallel non-empty edge_set_names and "
+                     f"feature_values, got {len(edge_set_names)} and "
+                     f"{len(feature_values)}.")
+  if len(edge_set_names) == 1:
+    return [pool_v2(graph, to_tag, edge_set_name=edge_set_names[0],
+                    reduce_type=reduce_type, feature_value=feature_values[0])]
+
+  node_set_names = {graph.edge_sets[name].adjacency.node_set_name(to_tag)
+                    for name in edge_set_names}
+  if len(node_set_names) != 1:
+    raise ValueError("Expected the same node set at the receiver, got "
+                     f"{sorted(node_set_names)}.")
+  node_set = graph.node_sets[node_set_names.pop()]
+  num_nodes = node_set.spec.total_size
+  if num_nodes is None:
+    num_nodes = node_set.total_size
+
+  segment_ids = []
+  for i, edge_set_name in enumerate(edge_set_names):
+    adjacency = graph.edge_sets[edge_set_name].adjacency
+    if (not isinstance(adjacency, (kt.HyperAdjacencyKerasTensor,
+                                   adj.HyperAdjacency))
+        or utils.is_ragged_tensor(feature_values[i])):
+      raise ValueError("Expected HyperAdjacency and dense feature values for "
+                       f"edge set '{edge_set_name}'.")
+    index = adjacency[to_tag]
+    segment_ids.append(index + tf.cast(i * num_nodes, index.dtype))
+  segment_ids = tf.concat(segment_ids, axis=0)
+  values = tf.concat(feature_values, axis=0)
+  num_segments = len(edge_set_names) * num_nodes
+
+  def reduce_piece(piece_reducer: GraphPieceReducer, i: int) -> Field:
+    assert i == 0, "Internal error"
+    return piece_reducer.unsorted_segment_op(values, segment_ids, num_segments)
+
+  result = _compute_reductions(reduce_type, 1, reduce_piece)
+  return tf.split(result, len(edge_set_names), axis=0)
+
+
+def _compute_reductions(
+    reduce_type: str,
+    num_pieces: int,
+    reduce_piece: Callable[[GraphPieceReducer, int], Field]) -> Field:
+  """Returns pool() result from the results of `reduce_piece()` for pieces.
 
+  Args:
+    reduce_type: As for `pool_v2()`.
+    num_pieces: The number of graph pieces to pool from.
+    reduce_piece: Called as `reduce_piece(piece_reducer, i)` to return the
+      result of the GraphPieceReducer for the i-th graph piece.
+  """
   # Decide how to compute each requested reduce_type.
   reduce_types = reduce_type.split("|")
-  if len(feature_values) != 1:
+  if num_pieces != 1:
     # In the general case, all outputs are computed by MultiReducers.
     reduce_types_multi = set(reduce_types)
     reduce_types_single = set()
@@ -382,12 +481,8 @@ def _pool_internal(
   for piece_reducer_name in piece_reducer_names:
     piece_reducer = _GRAPH_PIECE_REDUCER_CLASSES[piece_reducer_name]()
     piece_reducer_results = []
-    for i in range(len(feature_values)):
-      piece_reducer_results.append(piece_reducer.reduce(
-          graph, to_tag,
-          feature_value=feature_values[i],
-          edge_set_name=edge_set_names[i] if edge_set_names else None,
-          node_set_name=node_set_names[i] if node_set_names else None))
+    for i in range(num_pieces):
+      piece_reducer_results.append(reduce_piece(piece_reducer, i))
     reduced_pieces[piece_reducer_name] = piece_reducer_results
 
   # For each requested reduce_type, in the user-requested order,
@@ -509,7 +604,9 @@ class GraphPieceReducer(abc.ABC):
   adjacency structure at hand, say, `unsorted_segment_{sum,max,...}`.
 
   Subclasses implement methods like `unsorted_segment_op()` to supply the
-  actual TF ops for their respective operation (sum, max, ...).
+  actual TF ops for their respective operation (sum, max, ...). They may
+  override `sorted_segment_op()` to exploit the row splits of edges sorted by
+  the receiver node (see `tfgnn.experimental.CsrAdjacency`).
   Subclasses are usually looked up in_GRAPH_PIECE_REDUCER_CLASSES.
 
   Note that calling pool() on multiple graph pieces and/or with multiple
@@ -547,6 +644,8 @@ class GraphPieceReducer(abc.ABC):
 
     # Pooling from edges to node.
     adjacency = graph.edge_sets[edge_set_name].adjacency
+    if isinstance(adjacency, adj.CsrAdjacency) and adjacency.row_tag == to_tag:
+      return self.sorted_segment_op(feature_value, adjacency.row_splits)
     if isinstance(adjacency, (kt.HyperAdjacencyKerasTensor,  # TODO(b/283404258)
                               adj.HyperAdjacency)):
       node_set = graph.node_sets[adjacency.node_set_name(to_tag)]
@@ -571,10 +670,39 @@ class GraphPieceReducer(abc.ABC):
       num_segments: tf.Tensor)-> Field:
     raise NotImplementedError("To be implemented by op-specific subclass.")
 
+  def sorted_segment_op(
+      self,
+      values: Field,
+      row_splits: tf.Tensor) -> Field:
+    """Reduces `values` whose segments are given by `row_splits`.
+
+    The default implementation calls `unsorted_segment_op()`. Subclasses may
+    override it to exploit that the segments are contiguous.
+
+    Args:
+      values: A Tensor or RaggedTensor of shape `[num_items, ...]`.
+      row_splits: A sorted integer vector of shape `[num_segments + 1]`, such
+        that `values[row_splits[i]:row_splits[i+1]]` belong to segment `i`.
+
+    Returns:
+      The reduced values of shape `[num_segments, ...]`.
+    """
+    return self.unsorted_segment_op(
+        values,
+        tf.ragged.row_splits_to_segment_ids(row_splits,
+                                            out_type=row_splits.dtype),
+        tf.size(row_splits, out_type=row_splits.dtype) - 1)
+
 
 class CountGraphPieceReducer(GraphPieceReducer):
   """Implements count-pooling from one graph piece."""
 
+  def sorted_segment_op(self,
+                        values: Field,
+                        row_splits: tf.Tensor) -> Field:
+    """Implements subclass API."""
+    return tf.cast(row_splits[1:] - row_splits[:-1], values.dtype)
+
   def unsorted_segment_op(self,
                           values: Field,
                           segment_ids: tf.Tensor,
@@ -605,6 +733,19 @@ class MeanGraphPieceReducer(GraphPieceReducer):
     """Implements subclass API."""
     return tf.math.unsorted_segment_mean(values, segment_ids, num_segments)
 
+  def sorted_segment_op(self,
+                        values: Field,
+                        row_splits: tf.Tensor) -> Field:
+    """Implements subclass API."""
+    if not utils.is_dense_tensor(values):
+      return super().sorted_segment_op(values, row_splits)
+    # The segment sizes are known from row_splits, so only the sums need to
+    # be computed. Empty segments are 0, like for unsorted_segment_mean().
+    sums = SumGraphPieceReducer().sorted_segment_op(values, row_splits)
+    counts = tf.cast(row_splits[1:] - row_splits[:-1], values.dtype)
+    counts = tf.reshape(counts, [-1] + [1] * (values.shape.rank - 1))
+    return tf.math.divide_no_nan(sums, counts)
+
 
 class MinGraphPieceReducer(GraphPieceReducer):
   """Implements min-pooling from one graph piece."""
@@ -216,6 +216,34 @@ class PoolTest(tf.test.TestCase, parameterized.TestCase):
                                         tf.constant([[13.], [15.]])]))
 
 
+class PoolEdgesToNodePerEdgeSetTest(tf.test.TestCase, parameterized.TestCase):
+
+  @parameterized.parameters(["sum", "mean", "max", "max_no_inf", "min",
+                             "mean|sum", "sum|max_no_inf"])
+  def testMatchesPool(self, reduce_type):
+    input_graph = _get_test_graph_abc_efx()
+    feature_values = [tf.constant([[10., 1.], [20., -2.], [40., 4.]]),
+                      tf.constant([[30., 3.], [50., -5.]])]
+    actual = pool_ops.pool_edges_to_node_per_edge_set(
+        input_graph, const.TARGET, edge_set_names=["e", "f"],
+        reduce_type=reduce_type, feature_values=feature_values)
+    self.assertLen(actual, 2)
+    for edge_set_name, feature_value, result in zip(
+        ["e", "f"], feature_values, actual):
+      expected = pool_ops.pool_v2(
+          input_graph, const.TARGET, edge_set_name=edge_set_name,
+          reduce_type=reduce_type, feature_value=feature_value)
+      self.assertAllEqual(expected, result)
+
+  def testRaisesOnDifferentReceivers(self):
+    input_graph = _get_test_graph_abc_efx()
+    with self.assertRaisesRegex(ValueError, r"same node set"):
+      pool_ops.pool_edges_to_node_per_edge_set(
+          input_graph, const.TARGET, edge_set_names=["e", "x"],
+          reduce_type="sum",
+          feature_values=[tf.zeros([3, 1]), tf.zeros([1, 1])])
+
+
 def _get_test_graph_abc_efx():
   return gt.GraphTensor.from_pieces(
       node_sets={
@@ -508,6 +536,50 @@ class PoolReduceTypesTest(tf.test.TestCase, parameterized.TestCase):
             inner_shape=(2,)))
     self.assertAllClose(expected, actual)
 
+  @parameterized.named_parameters(
+      ("Sum", "sum", tf.constant(
+          [[0., 0.], [10., 11.], [20.+30., 21.+31.]])),
+      ("Prod", "prod", tf.constant(
+          [[1., 1.], [10., 11.], [20.*30., 21.*31.]])),
+      ("Mean", "mean", tf.constant(
+          [[0., 0.], [10./1., 11./1.], [(20.+30.)/2., (21.+31.)/2.]])),
+      ("MeanAndSum", "mean|sum", tf.constant(
+          [[0., 0., 0., 0], [10./1., 11./1., 10., 11.],
+           [(20.+30.)/2., (21.+31.)/2., 20.+30., 21.+31.]])),
+      ("Max", "max", tf.constant(
+          [[tf.float32.min]*2, [10., 11.], [30., 31.]])),
+      ("MaxNoInf", "max_no_inf", tf.constant(
+          [[0., 0.], [10., 11.], [30., 31.]])),
+      ("Min", "min", tf.constant(
+          [[tf.float32.max]*2, [10., 11.], [20., 21.]])),
+      ("MinNoInf", "min_no_inf", tf.constant(
+          [[0., 0.], [10., 11.], [20., 21.]])),
+  )
+  def testSingleRank2Csr(self, reduce_type, expected):
+    input_graph = _get_test_graph_csr()
+    actual = pool_ops.pool_v2(
+        input_graph, const.TARGET,
+        edge_set_name="e",
+        reduce_type=reduce_type,
+        feature_value=tf.constant([[10., 11.],
+                                   [20., 21.],
+                                   [30., 31.]]))
+    self.assertAllClose(expected, actual)
+
+  @parameterized.named_parameters(
+      ("Sum", "sum", tf.constant([10.+20.+30., 0., 0.])),
+      ("Mean", "mean", tf.constant([(10.+20.+30.)/3., 0., 0.])),
+      ("Max", "max", tf.constant([30., tf.float32.min, tf.float32.min])),
+  )
+  def testSingleRank1CsrToOtherTag(self, reduce_type, expected):
+    input_graph = _get_test_graph_csr()
+    actual = pool_ops.pool_v2(
+        input_graph, const.SOURCE,
+        edge_set_name="e",
+        reduce_type=reduce_type,
+        feature_value=tf.constant([10., 20., 30.]))
+    self.assertAllClose(expected, actual)
+
 
 def _get_test_graph_0123():
   return gt.GraphTensor.from_pieces(
@@ -538,5 +610,21 @@ def _get_test_graph_0123():
       })
 
 
+def _get_test_graph_csr():
+  return gt.GraphTensor.from_pieces(
+      node_sets={
+          "v": gt.NodeSet.from_fields(sizes=tf.constant([3])),
+      },
+      edge_sets={
+          "e": gt.EdgeSet.from_fields(
+              sizes=tf.constant([3]),
+              adjacency=adj.CsrAdjacency.from_indices(
+                  ("v", tf.constant([0, 0, 0])),
+                  ("v", tf.constant([1, 2, 2])),
+                  row_splits=tf.constant([0, 0, 1, 3]),
+                  row_tag=const.TARGET)),
+      })
+
+
 if __name__ == "__main__":
   tf.test.main()
@@ -14,7 +14,7 @@
 # ==============================================================================
 """Misc graph tensor utilities."""
 
-from typing import Any, Iterator, Mapping, Optional, Text, Tuple, Union
+from typing import Any, Dict, Iterator, Mapping, Optional, Text, Tuple, Union
 
 import tensorflow as tf
 from tensorflow_gnn.graph import adjacency
@@ -213,6 +213,33 @@ def create_schema_pb_from_graph_spec(
   return result
 
 
+def create_quantization_from_schema_pb(
+    schema: schema_pb2.GraphSchema) -> Dict[str, schema_pb2.Quantization]:
+  """Returns the feature quantization declared in a graph schema.
+
+  The result can be passed as `quantization=...` to `tfgnn.write_example()`
+  and `tfgnn.parse_example()` to store the features with reduced precision
+  and to dequantize them on the fly when parsing.
+
+  Args:
+    schema: An instance of the graph schema proto message.
+
+  Returns:
+    A dict from feature names in `tf.train.Example` (like "nodes/paper.feat")
+    to the `tfgnn.proto.Quantization` of each quantized feature.
+  """
+  result = {}
+  for set_type, set_name, feature_name, feature in iter_features(schema):
+    if feature.quantization.type == schema_pb2.Quantization.NONE:
+      continue
+    if set_type == gc.CONTEXT:
+      fname = f'{gc.CONTEXT}/{feature_name}'
+    else:
+      fname = f'{set_type}/{set_name}.{feature_name}'
+    result[fname] = feature.quantization
+  return result
+
+
 @kt.disallow_keras_tensors
 def check_compatible_with_schema_pb(graph: Union[gt.GraphTensor,
                                                  gt.GraphTensorSpec],
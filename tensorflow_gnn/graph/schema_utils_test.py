@@ -161,6 +161,48 @@ class SchemaUtilsTest(tf.test.TestCase):
         set((stype, sname) for stype, sname, _ in su.iter_sets(schema)))
 
 
+  def test_create_quantization_from_schema_pb(self):
+    schema = pbtext.Parse("""
+      context {
+        features {
+          key: "c"
+          value { dtype: DT_FLOAT quantization { type: FLOAT16 } }
+        }
+      }
+      node_sets {
+        key: "a"
+        value {
+          features {
+            key: "f"
+            value {
+              dtype: DT_FLOAT
+              shape { dim { size: 4 } }
+              quantization { type: INT8 scale: 0.5 }
+            }
+          }
+          features { key: "g" value { dtype: DT_FLOAT } }
+        }
+      }
+      edge_sets {
+        key: "e"
+        value {
+          source: "a"
+          target: "a"
+          features {
+            key: "w"
+            value { dtype: DT_FLOAT quantization { type: NONE } }
+          }
+        }
+      }
+    """, schema_pb2.GraphSchema())
+    quantization = su.create_quantization_from_schema_pb(schema)
+    self.assertEqual(
+        {k: v.type for k, v in quantization.items()},
+        {'context/c': schema_pb2.Quantization.FLOAT16,
+         'nodes/a.f': schema_pb2.Quantization.INT8})
+    self.assertEqual(quantization['nodes/a.f'].scale, 0.5)
+
+
 class SchemaToGraphTensorSpecTest(tf.test.TestCase, parameterized.TestCase):
   """Tests for Graph Tensor specification."""
 
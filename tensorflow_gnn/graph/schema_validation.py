@@ -62,6 +62,7 @@ def validate_schema(
   """
   _validate_schema_feature_dtypes(schema)
   _validate_schema_shapes(schema)
+  _validate_schema_quantization(schema)
   _validate_schema_descriptions(schema)
   _validate_schema_reserved_feature_names(schema)
   _validate_schema_context_references(schema)
@@ -174,6 +175,31 @@ def _validate_schema_shapes(schema: schema_pb2.GraphSchema):
               set_type, set_name, feature_name))
 
 
+def _validate_schema_quantization(schema: schema_pb2.GraphSchema):
+  """Verify that quantized features are dense floats with valid parameters."""
+  q = schema_pb2.Quantization
+  for set_type, set_name, feature_name, feature in su.iter_features(schema):
+    if feature.quantization.type == q.NONE:
+      continue
+    where = "{} set '{}' feature '{}'".format(set_type, set_name, feature_name)
+    if not tf.dtypes.as_dtype(feature.dtype).is_floating:
+      raise ValidationError(
+          "Quantization requires a floating-point dtype on {}".format(where))
+    if any(dim.size < 0 for dim in feature.shape.dim):
+      raise ValidationError(
+          "Quantization requires a fully defined shape on {}".format(where))
+    if feature.quantization.type in (q.INT8, q.UINT8):
+      if feature.quantization.scale <= 0:
+        raise ValidationError(
+            "Quantization scale must be positive on {}".format(where))
+      low, high = (-128, 127) if feature.quantization.type == q.INT8 else (
+          0, 255)
+      if not low <= feature.quantization.zero_point <= high:
+        raise ValidationError(
+            "Quantization zero_point must be in [{}, {}] on {}".format(
+                low, high, where))
+
+
 def _warn_schema_scalar_shapes(schema: schema_pb2.GraphSchema):
   """Return warnings on unnecessary shapes of size 1. This is a common error.
 
@@ -110,6 +110,44 @@ class GraphValidationTest(tf.test.TestCase):
     with self.assertRaises(sv.ValidationError):
       sv._validate_schema_shapes(schema)
 
+  def test_validate_schema_quantization(self):
+    schema = text_format.Parse("""
+      node_sets {
+        key: "queries"
+        value {
+          features {
+            key: "embedding"
+            value {
+              dtype: DT_FLOAT
+              shape { dim { size: 8 } }
+              quantization { type: INT8 scale: 0.1 zero_point: -3 }
+            }
+          }
+        }
+      }
+    """, schema_pb2.GraphSchema())
+    sv._validate_schema_quantization(schema)
+
+    embedding = schema.node_sets['queries'].features['embedding']
+    for mutate in [
+        lambda f: setattr(f, 'dtype', tf.int32.as_datatype_enum),
+        lambda f: f.shape.dim.add(size=-1),
+        lambda f: setattr(f.quantization, 'scale', 0.0),
+        lambda f: setattr(f.quantization, 'zero_point', 128),
+    ]:
+      invalid = copy.deepcopy(embedding)
+      mutate(invalid)
+      schema.node_sets['queries'].features['invalid'].CopyFrom(invalid)
+      with self.assertRaises(sv.ValidationError):
+        sv._validate_schema_quantization(schema)
+    del schema.node_sets['queries'].features['invalid']
+
+    embedding.quantization.type = schema_pb2.Quantization.UINT8
+    with self.assertRaises(sv.ValidationError):
+      sv._validate_schema_quantization(schema)
+    embedding.quantization.zero_point = 128
+    sv._validate_schema_quantization(schema)
+
   def test_warn_schema_scalar_shapes(self):
     schema = text_format.Parse("""
       node_sets {
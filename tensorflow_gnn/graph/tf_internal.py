@@ -38,6 +38,7 @@ try:
   try:
     # Get Keras v2 from the separate tf_keras package.
     # In OSS, it exists for TF2.14+. It may become required for TF2.16+.
+    from tf_keras.src.engine import base_layer_utils  # pytype: disable=import-error
     from tf_keras.src.engine import keras_tensor  # pytype: disable=import-error
     from tf_keras.src.layers import core as core_layers  # pytype: disable=import-error
     import tf_keras.src.backend as keras_backend  # pytype: disable=import-error
@@ -52,15 +53,18 @@ try:
       ) from None  # A Keras version mismatch is different to lacking tf_keras.
     import keras  # pytype: disable=import-error
     if hasattr(keras, 'src'):  # As of TF/Keras 2.13.
+      from keras.src.engine import base_layer_utils  # pytype: disable=import-error
       from keras.src.engine import keras_tensor  # pytype: disable=import-error
       from keras.src.layers import core as core_layers  # pytype: disable=import-error
       import keras.src.backend as keras_backend  # pytype: disable=import-error
     else:
+      from keras.engine import base_layer_utils  # pytype: disable=import-error
       from keras.engine import keras_tensor  # pytype: disable=import-error
       from keras.layers import core as core_layers  # pytype: disable=import-error
       import keras.backend as keras_backend  # pytype: disable=import-error
 except ImportError:
   # Internal
+  base_layer_utils = tf._keras_internal.engine.base_layer_utils  # pylint: disable=protected-access
   keras_tensor = tf._keras_internal.engine.keras_tensor  # pylint: disable=protected-access
   core_layers = tf._keras_internal.layers.core  # pylint: disable=protected-access
   keras_backend = tf._keras_internal.backend  # pylint: disable=protected-access
@@ -96,11 +100,14 @@ delegate_method = core_layers._delegate_method  # pylint: disable=protected-acce
 OpDispatcher = tf.__internal__.dispatch.OpDispatcher
 
 unique_keras_object_name = keras_backend.unique_object_name
+# True while Keras calls a layer on symbolic inputs to build a model.
+is_in_keras_graph = base_layer_utils.is_in_keras_graph
 
 # Delete imports, in their order above.
 del composite_tensor
 del type_spec
 del tf
 del type_spec_registry
+del base_layer_utils
 del keras_tensor
 del core_layers
@@ -15,6 +15,7 @@
 """Utility functions to simplify construction of GNN layers."""
 
 import collections
+import functools
 from typing import Any, Callable, Collection, Mapping, Optional
 
 import tensorflow as tf
@@ -95,6 +96,11 @@ class ConvGNNBuilder:
     graph_update_factory: If set, called as
       `graph_update_factory(deferred_init_callback, name)` to return the graph
       update. The arguments are as expected by `tfgnn.keras.layers.GraphUpdate`.
+    recompute_grad: If true, the default `graph_update_factory` returns
+      GraphUpdate layers that recompute their intermediate results during
+      backpropagation instead of keeping them in memory; see
+      `tfgnn.keras.layers.GraphUpdate`. Cannot be combined with a custom
+      `graph_update_factory`.
   """
 
   def __init__(
@@ -109,6 +115,7 @@ class ConvGNNBuilder:
           ..., graph_update_lib.NodeSetUpdateLayer]] = None,
       graph_update_factory: Optional[Callable[
           ..., tf.keras.layers.Layer]] = None,
+      recompute_grad: bool = False,
     ):
     self._convolutions_factory = convolutions_factory
     self._nodes_next_state_factory = nodes_next_state_factory
@@ -119,7 +126,11 @@ class ConvGNNBuilder:
     else:
       self._node_set_update_factory = node_set_update_factory
     if graph_update_factory is None:
-      self._graph_update_factory = _default_graph_update_factory
+      self._graph_update_factory = functools.partial(
+          _default_graph_update_factory, recompute_grad=recompute_grad)
+    elif recompute_grad:
+      raise ValueError("ConvGNNBuilder(recompute_grad=True) cannot be combined "
+                       "with a custom graph_update_factory")
     else:
       self._graph_update_factory = graph_update_factory
 
@@ -231,6 +242,9 @@ def _default_node_set_update_factory(
 def _default_graph_update_factory(
     deferred_init_callback: Callable[[gt.GraphTensorSpec], Mapping[str, Any]],
     name: str,
+    *,
+    recompute_grad: bool = False,
 )-> tf.keras.layers.Layer:
   return graph_update_lib.GraphUpdate(
-      deferred_init_callback=deferred_init_callback, name=name)
+      deferred_init_callback=deferred_init_callback, name=name,
+      recompute_grad=recompute_grad)
@@ -278,6 +278,28 @@ class ConvGNNBuilderTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual([[100.]], edge_state("c->a"))
     self.assertAllEqual([[100.]], edge_state("b->a"))
 
+  def testRecomputeGrad(self):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("node", [1.])], [("node", "node", [100.])])
+    gnn_builder = builders.ConvGNNBuilder(
+        lambda _, receiver_tag: convolutions.SimpleConv(
+            IdentityLayer(), receiver_tag=receiver_tag),
+        lambda _: next_state_lib.NextStateFromConcat(IdentityLayer()),
+        receiver_tag=const.TARGET,
+        recompute_grad=True)
+    graph_update = gnn_builder.Convolve()
+    _ = graph_update(input_graph)  # Trigger deferred init.
+    self.assertTrue(graph_update.get_config()["recompute_grad"])
+
+    with self.assertRaisesRegex(ValueError, r"recompute_grad"):
+      builders.ConvGNNBuilder(
+          lambda _, receiver_tag: convolutions.SimpleConv(
+              IdentityLayer(), receiver_tag=receiver_tag),
+          lambda _: next_state_lib.NextStateFromConcat(IdentityLayer()),
+          receiver_tag=const.TARGET,
+          graph_update_factory=graph_update_lib.GraphUpdate,
+          recompute_grad=True)
+
   def testAuxNodeSetRequested(self):
     def convolutions_factory(edge_set_name, receiver_tag):
       del edge_set_name  # Unused.
@@ -281,6 +281,7 @@ for _cls, _methods in [
 for _cls, _class_methods in [
     (adj.HyperAdjacency, ('from_indices',)),
     (adj.Adjacency, ('from_indices',)),
+    (adj.CsrAdjacency, ('from_indices',)),
     (gt.Context, ('from_fields',)),
     (gt.NodeSet, ('from_fields',)),
     (gt.EdgeSet, ('from_fields',)),
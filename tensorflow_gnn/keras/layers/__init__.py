@@ -4,11 +4,14 @@ from tensorflow_gnn.keras.layers import convolution_base
 from tensorflow_gnn.keras.layers import convolutions
 from tensorflow_gnn.keras.layers import graph_ops
 from tensorflow_gnn.keras.layers import graph_update
+from tensorflow_gnn.keras.layers import historical_embeddings
+from tensorflow_gnn.keras.layers import id_embedding
 from tensorflow_gnn.keras.layers import item_dropout
 from tensorflow_gnn.keras.layers import map_features
 from tensorflow_gnn.keras.layers import next_state
 from tensorflow_gnn.keras.layers import padding_ops
 from tensorflow_gnn.keras.layers import parse_example
+from tensorflow_gnn.keras.layers import recomputable_dropout
 from tensorflow_gnn.utils import api_utils
 
 # NOTE: This package is covered by tensorflow_gnn/api_def/api_symbols_test.py.
@@ -38,7 +41,10 @@ ReadoutNamedIntoFeature = graph_ops.StructuredReadoutIntoFeature
 AnyToAnyConvolutionBase = convolution_base.AnyToAnyConvolutionBase
 SimpleConv = convolutions.SimpleConv
 
+HistoricalEmbeddings = historical_embeddings.HistoricalEmbeddings
+IdEmbedding = id_embedding.IdEmbedding
 ItemDropout = item_dropout.ItemDropout
+RecomputableDropout = recomputable_dropout.RecomputableDropout
 
 NextStateFromConcat = next_state.NextStateFromConcat
 ResidualNextState = next_state.ResidualNextState
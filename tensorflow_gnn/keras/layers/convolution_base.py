@@ -15,13 +15,14 @@
 """The AnyToAnyConvolutionBase class and associated tooling."""
 
 import abc
-from typing import Any, Callable, Mapping, Optional
+from typing import Any, Callable, Dict, Mapping, Optional
 
 import tensorflow as tf
 
 from tensorflow_gnn.graph import broadcast_ops
 from tensorflow_gnn.graph import graph_constants as const
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import op_profiling
 from tensorflow_gnn.graph import pool_ops
 from tensorflow_gnn.graph import tag_utils
 
@@ -232,6 +233,11 @@ class AnyToAnyConvolutionBase(tf.keras.layers.Layer, abc.ABC):
         sender_edge_feature=self._sender_edge_feature,
         **super().get_config())
 
+  @property
+  def receiver_tag(self) -> Optional[const.IncidentNodeOrContextTag]:
+    """Returns the receiver_tag argument to init, or None if unset."""
+    return self._receiver_tag
+
   @property
   def takes_receiver_input(self) -> bool:
     """If `False`, all calls to convolve() will get `receiver_input=None`."""
@@ -252,6 +258,20 @@ class AnyToAnyConvolutionBase(tf.keras.layers.Layer, abc.ABC):
            node_set_name: Optional[gt.NodeSetName] = None,
            receiver_tag: Optional[const.IncidentNodeOrContextTag] = None,
            training: Optional[bool] = False) -> tf.Tensor:
+    with op_profiling.op_scope("convolution", edge_set_name=edge_set_name,
+                               node_set_name=node_set_name,
+                               layer_name=self.name):
+      return self.convolve(**self._get_convolve_kwargs(
+          graph, edge_set_name=edge_set_name, node_set_name=node_set_name,
+          receiver_tag=receiver_tag, training=training))
+
+  def _get_convolve_kwargs(
+      self, graph: gt.GraphTensor, *,
+      edge_set_name: Optional[gt.EdgeSetName] = None,
+      node_set_name: Optional[gt.NodeSetName] = None,
+      receiver_tag: Optional[const.IncidentNodeOrContextTag] = None,
+      training: Optional[bool] = False) -> Dict[str, Any]:
+    """Returns the kwargs for `convolve()` as set up by `call()`."""
     # pylint: disable=g-long-lambda
 
     # Normalize inputs.
@@ -323,7 +343,7 @@ class AnyToAnyConvolutionBase(tf.keras.layers.Layer, abc.ABC):
     if None not in [edge_set, self._sender_edge_feature]:
       sender_edge_input = edge_set[self._sender_edge_feature]
 
-    return self.convolve(
+    return dict(
         sender_node_input=sender_node_input,
         sender_edge_input=sender_edge_input,
         receiver_input=receiver_input,
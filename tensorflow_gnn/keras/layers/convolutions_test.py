@@ -113,6 +113,79 @@ class SimpleConvTest(tf.test.TestCase, parameterized.TestCase):
         [0.]])  # No edges.
     self.assertAllEqual(expected, actual)
 
+  @parameterized.named_parameters(
+      ("Dense", False, tftu.ModelReloading.SKIP),
+      ("SequentialRestoredKeras", True, tftu.ModelReloading.KERAS),
+      ("SequentialRestored", True, tftu.ModelReloading.SAVED_MODEL))
+  def testDecomposeMessage(self, sequential, model_reloading):
+    values = dict(edges=tf.constant([[1., -1.], [2., 0.5]]),
+                  nodes=tf.constant([[4., 1.], [8., -2.], [16., 3.]]))
+    input_graph = _make_test_graph_01into2(values)
+
+    def make_conv(decompose_message):
+      message_fn = tf.keras.layers.Dense(
+          3, activation="relu",
+          kernel_initializer=tf.keras.initializers.RandomNormal(seed=1),
+          bias_initializer=tf.keras.initializers.Constant(0.5))
+      if sequential:
+        message_fn = tf.keras.Sequential([message_fn,
+                                          tf.keras.layers.Dense(2)])
+      return convolutions.SimpleConv(
+          message_fn, "sum|max", receiver_tag=const.TARGET,
+          sender_edge_feature=const.HIDDEN_STATE,
+          decompose_message=decompose_message)
+
+    conv = make_conv(decompose_message=True)
+    inputs = tf.keras.layers.Input(type_spec=input_graph.spec)
+    outputs = conv(inputs, edge_set_name="edges")
+    model = tf.keras.Model(inputs, outputs)
+    _ = model(input_graph)  # Trigger building.
+    self.assertEqual(tf.TensorShape([6, 3]),
+                     convolutions._split_first_dense(
+                         conv._message_fn)[0].kernel.shape)
+
+    reference_conv = make_conv(decompose_message=False)
+    _ = reference_conv(input_graph, edge_set_name="edges")
+    reference_conv.set_weights(conv.get_weights())
+    expected = reference_conv(input_graph, edge_set_name="edges")
+
+    model = tftu.maybe_reload_model(self, model, model_reloading,
+                                    "simple-convolution-decomposed")
+    self.assertAllClose(expected, model(input_graph))
+
+  def testDecomposeMessageErrors(self):
+    with self.assertRaisesRegex(ValueError, r"combine_type='concat'"):
+      convolutions.SimpleConv(tf.keras.layers.Dense(2), combine_type="sum",
+                              decompose_message=True)
+    with self.assertRaisesRegex(ValueError, r"requires a message_fn"):
+      convolutions.SimpleConv(
+          tf.keras.Sequential([tf.keras.layers.Dropout(0.5),
+                               tf.keras.layers.Dense(2)]),
+          decompose_message=True)
+
+  @parameterized.named_parameters(
+      ("", tftu.ModelReloading.SKIP),
+      ("Restored", tftu.ModelReloading.SAVED_MODEL),
+      ("RestoredKeras", tftu.ModelReloading.KERAS))
+  def testReturnMessages(self, model_reloading):
+    values = dict(nodes=tf.constant([[1.], [2.], [4.]]))
+    input_graph = _make_test_graph_01into2(values)
+    conv = convolutions.SimpleConv(
+        tf.keras.layers.Dense(
+            1, use_bias=False,
+            kernel_initializer=tf.keras.initializers.Constant([[1.], [10.]])),
+        "sum")
+    self.assertAllClose([[0.], [0.], [83.]],
+                        conv(input_graph, edge_set_name="edges"))
+
+    inputs = tf.keras.layers.Input(type_spec=input_graph.spec)
+    outputs = conv(inputs, edge_set_name="edges", return_messages=True)
+    model = tf.keras.Model(inputs, outputs)
+    model = tftu.maybe_reload_model(self, model, model_reloading,
+                                    "simple-convolution-messages")
+    # Messages from sender and receiver states, one per edge.
+    self.assertAllClose([[41.], [42.]], model(input_graph))
+
   def testTFLite(self):
     self.skipTest(
         "SimpleConv TFLite functionality is tested in models/mt_albis")
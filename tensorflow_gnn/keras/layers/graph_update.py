@@ -14,16 +14,22 @@
 # ==============================================================================
 """The GraphUpdate layer and its pieces."""
 
+import collections
 import sys
-from typing import Any, Callable, Mapping, Optional, Sequence
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
 
 import tensorflow as tf
 
+from tensorflow_gnn.graph import adjacency as adj
 from tensorflow_gnn.graph import broadcast_ops
 from tensorflow_gnn.graph import dict_utils as du
 from tensorflow_gnn.graph import graph_constants as const
 from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.graph import pool_ops
+from tensorflow_gnn.graph import tf_internal
+from tensorflow_gnn.keras.layers import convolutions
 from tensorflow_gnn.keras.layers import next_state as next_state_lib
+from tensorflow_gnn.keras.layers import recomputable_dropout
 
 # pylint:disable=g-import-not-at-top
 if sys.version_info >= (3, 8):
@@ -160,6 +166,17 @@ class GraphUpdate(tf.keras.layers.Layer):
       The object is initialized upon its first call from the results of
       the callback on the spec of the input. Before that, the object cannot
       be saved.
+    recompute_grad: If true, the intermediate results of this layer (such as
+      per-edge messages, attention logits and broadcast node states) are not
+      kept for backpropagation but recomputed from the input graph when
+      gradients are computed, using `tf.recompute_grad()`. This trades extra
+      compute for memory in deep stacks of GraphUpdates. This only applies to
+      calls in training mode on actual inputs (eagerly or in a `tf.function`),
+      not to calls on symbolic inputs while building a Keras model. Dropout
+      in the updates must use `tfgnn.keras.layers.RecomputableDropout`, which
+      repeats the random choices of the forward pass when recomputed; such
+      calls raise a ValueError if the updates contain other stochastic layers
+      like `tf.keras.layers.Dropout` with a non-zero rate. Defaults to false.
 
   Call result:
     A graph tensor with feature maps that have all configured updates merged in:
@@ -177,8 +194,10 @@ class GraphUpdate(tf.keras.layers.Layer):
                context: Optional[ContextUpdateLayer] = None,
                deferred_init_callback: Optional[
                    Callable[[gt.GraphTensorSpec], Mapping[str, Any]]] = None,
+               recompute_grad: bool = False,
                **kwargs):
     super().__init__(**kwargs)
+    self._recompute_grad = recompute_grad
     if not deferred_init_callback:
       self._deferred_init_callback = None
       self._init_from_updates(edge_sets, node_sets, context)
@@ -218,6 +237,7 @@ class GraphUpdate(tf.keras.layers.Layer):
         **du.with_key_prefix(self._edge_set_updates, "edge_sets/"),
         **du.with_key_prefix(self._node_set_updates, "node_sets/"),
         context=self._context_update,
+        recompute_grad=self._recompute_grad,
         **super().get_config())
 
   @classmethod
@@ -226,7 +246,7 @@ class GraphUpdate(tf.keras.layers.Layer):
     config["node_sets"] = du.pop_by_prefix(config, "node_sets/")
     return cls(**config)
 
-  def call(self, graph: gt.GraphTensor) -> gt.GraphTensor:
+  def call(self, graph: gt.GraphTensor, training=None) -> gt.GraphTensor:
     if not self._is_initialized:
       with tf.init_scope():
         self._init_from_updates(**self._deferred_init_callback(graph.spec))
@@ -235,12 +255,25 @@ class GraphUpdate(tf.keras.layers.Layer):
 
     gt.check_scalar_graph_tensor(graph, "GraphUpdate")
 
+    # Gradients are only needed in training, and calls on symbolic inputs
+    # only build the model (and its variables).
+    if (self._recompute_grad and training is True and
+        not tf_internal.is_in_keras_graph()):
+      _check_no_stochastic_layers(self)
+      return _call_with_recompute_grad(
+          lambda graph: self._update(graph, training=training), graph)
+    return self._update(graph, training=training)
+
+  def _update(self, graph: gt.GraphTensor, *, training) -> gt.GraphTensor:
+    """Returns the result of applying all updates to `graph`."""
+    # The training mode is passed explicitly, because the recomputation
+    # for backpropagation happens outside the Keras call context of this layer.
     if self._edge_set_updates:
       edge_set_features = {}
       for edge_set_name, update_fn in sorted(self._edge_set_updates.items()):
         features = graph.edge_sets[edge_set_name].get_features_dict()
         features.update(_ensure_dict(
-            update_fn(graph, edge_set_name=edge_set_name)))
+            update_fn(graph, edge_set_name=edge_set_name, training=training)))
         edge_set_features[edge_set_name] = features
       graph = graph.replace_features(edge_sets=edge_set_features)
 
@@ -249,13 +282,14 @@ class GraphUpdate(tf.keras.layers.Layer):
       for node_set_name, update_fn in sorted(self._node_set_updates.items()):
         features = graph.node_sets[node_set_name].get_features_dict()
         features.update(_ensure_dict(
-            update_fn(graph, node_set_name=node_set_name)))
+            update_fn(graph, node_set_name=node_set_name, training=training)))
         node_set_features[node_set_name] = features
       graph = graph.replace_features(node_sets=node_set_features)
 
     if self._context_update:
       context_features = graph.context.get_features_dict()
-      context_features.update(_ensure_dict(self._context_update(graph)))
+      context_features.update(_ensure_dict(
+          self._context_update(graph, training=training)))
       graph = graph.replace_features(context=context_features)
 
     return graph
@@ -387,6 +421,14 @@ class NodeSetUpdate(tf.keras.layers.Layer):
       Otherwise, a dict of tensors keyed by feature names is passed.
       To pass the default state tensor of the context, set this to
       `tfgnn.HIDDEN_STATE`.
+    fuse_edge_set_inputs: If true, the edge set inputs that are `SimpleConv`
+      layers with the same `receiver_tag` and `reduce_type` and produce
+      messages of the same shape and dtype are pooled together: their messages
+      get concatenated and pooled with one segment operation per reduce type,
+      keyed by edge set and receiver node, and the results get split by edge
+      set again. The results are the same as without fusion, but many small
+      ops are replaced by a few large ones, which helps for node sets that
+      receive from many edge sets. Defaults to `False`.
 
   Call result:
     The tensor or dict of tensors with the new node state, as returned by
@@ -401,6 +443,7 @@ class NodeSetUpdate(tf.keras.layers.Layer):
                node_input_feature: Optional[const.FieldNameOrNames]
                = const.HIDDEN_STATE,
                context_input_feature: Optional[const.FieldNameOrNames] = None,
+               fuse_edge_set_inputs: bool = False,
                **kwargs):
     super().__init__(**kwargs)
     self._edge_set_inputs = {
@@ -411,6 +454,7 @@ class NodeSetUpdate(tf.keras.layers.Layer):
                                        "NodeSetUpdate(next_state=...")
     self._node_input_feature = _copy_if_sequence(node_input_feature)
     self._context_input_feature = _copy_if_sequence(context_input_feature)
+    self._fuse_edge_set_inputs = fuse_edge_set_inputs
 
   def get_config(self):
     return dict(
@@ -419,6 +463,7 @@ class NodeSetUpdate(tf.keras.layers.Layer):
         next_state=self._next_state,
         node_input_feature=self._node_input_feature,
         context_input_feature=self._context_input_feature,
+        fuse_edge_set_inputs=self._fuse_edge_set_inputs,
         **super().get_config())
 
   @classmethod
@@ -436,10 +481,14 @@ class NodeSetUpdate(tf.keras.layers.Layer):
         _get_feature_or_features(graph.node_sets[node_set_name],
                                  self._node_input_feature))
     # Input from edge sets.
-    input_from_edge_sets = {}
-    for edge_set_name, input_fn in sorted(self._edge_set_inputs.items()):
-      input_from_edge_sets[edge_set_name] = input_fn(
-          graph, edge_set_name=edge_set_name)
+    if self._fuse_edge_set_inputs:
+      input_from_edge_sets = _fused_edge_set_inputs(
+          graph, self._edge_set_inputs)
+    else:
+      input_from_edge_sets = {}
+      for edge_set_name, input_fn in sorted(self._edge_set_inputs.items()):
+        input_from_edge_sets[edge_set_name] = input_fn(
+            graph, edge_set_name=edge_set_name)
     next_state_inputs.append(input_from_edge_sets)
     # Input from context.
     next_state_inputs.append(tf.nest.map_structure(
@@ -452,6 +501,45 @@ class NodeSetUpdate(tf.keras.layers.Layer):
     return self._next_state(next_state_inputs)
 
 
+def _fused_edge_set_inputs(
+    graph: gt.GraphTensor,
+    edge_set_inputs: Mapping[const.EdgeSetName, tf.keras.layers.Layer]
+) -> Dict[const.EdgeSetName, const.FieldOrFields]:
+  """Returns the results of edge_set_inputs, with SimpleConv poolings fused."""
+  result = {}
+  # Messages of fusable convolutions, keyed by what needs to agree for fusion.
+  messages_by_key = collections.defaultdict(dict)
+  for edge_set_name, input_fn in sorted(edge_set_inputs.items()):
+    adjacency = graph.edge_sets[edge_set_name].adjacency
+    if (not isinstance(input_fn, convolutions.SimpleConv)
+        or input_fn.receiver_tag not in (const.SOURCE, const.TARGET)
+        or (isinstance(adjacency, adj.CsrAdjacency)
+            and adjacency.row_tag == input_fn.receiver_tag)):
+      result[edge_set_name] = input_fn(graph, edge_set_name=edge_set_name)
+      continue
+    receiver_tag = input_fn.receiver_tag
+    messages = input_fn(graph, edge_set_name=edge_set_name,
+                        return_messages=True)
+    if (not isinstance(messages, tf.Tensor)
+        or not messages.shape[1:].is_fully_defined()):
+      result[edge_set_name] = pool_ops.pool_v2(
+          graph, receiver_tag, edge_set_name=edge_set_name,
+          reduce_type=input_fn.reduce_type, feature_value=messages)
+      continue
+    key = (receiver_tag, input_fn.reduce_type, messages.dtype,
+           tuple(messages.shape[1:].as_list()))
+    messages_by_key[key][edge_set_name] = messages
+
+  for (receiver_tag, reduce_type, *_), messages in messages_by_key.items():
+    edge_set_names = sorted(messages)
+    pooled = pool_ops.pool_edges_to_node_per_edge_set(
+        graph, receiver_tag,
+        edge_set_names=edge_set_names, reduce_type=reduce_type,
+        feature_values=[messages[name] for name in edge_set_names])
+    result.update(zip(edge_set_names, pooled))
+  return {key: result[key] for key in sorted(result)}
+
+
 @tf.keras.utils.register_keras_serializable(package="GNN")
 class ContextUpdate(tf.keras.layers.Layer):
   """A context update with input from node sets and/or edge sets.
@@ -555,6 +643,60 @@ class ContextUpdate(tf.keras.layers.Layer):
     return self._next_state(next_state_inputs)
 
 
+def _call_with_recompute_grad(
+    fn: Callable[[gt.GraphTensor], gt.GraphTensor],
+    graph: gt.GraphTensor) -> gt.GraphTensor:
+  """Returns `fn(graph)`, recomputing intermediate results for gradients."""
+  # tf.recompute_grad() takes and returns lists of Tensors, so the GraphTensors
+  # are flattened into their component Tensors. Only the floating-point inputs
+  # are passed as arguments; the others (sizes, indices) are captured.
+  flat_inputs = tf.nest.flatten(graph, expand_composites=True)
+  float_positions = [i for i, t in enumerate(flat_inputs)
+                     if t.dtype.is_floating]
+  result_specs = []
+  # The seed is drawn once and captured, so that RecomputableDropout layers
+  # make the same random choices in the forward pass and its recomputation.
+  seed = recomputable_dropout.new_seed()
+
+  @tf.recompute_grad
+  def flat_fn(*float_inputs):
+    inputs = list(flat_inputs)
+    for i, t in zip(float_positions, float_inputs):
+      inputs[i] = t
+    with recomputable_dropout.seed_scope(seed):
+      result = fn(tf.nest.pack_sequence_as(graph.spec, inputs,
+                                           expand_composites=True))
+    result_specs.append(result.spec)
+    return tf.nest.flatten(result, expand_composites=True)
+
+  flat_result = flat_fn(*[flat_inputs[i] for i in float_positions])
+  return tf.nest.pack_sequence_as(result_specs[0], flat_result,
+                                  expand_composites=True)
+
+
+# Keras layers that draw random numbers in training mode.
+_STOCHASTIC_LAYER_TYPES = (tf.keras.layers.Dropout,
+                           tf.keras.layers.AlphaDropout,
+                           tf.keras.layers.GaussianDropout,
+                           tf.keras.layers.GaussianNoise)
+
+
+def _check_no_stochastic_layers(layer: tf.keras.layers.Layer):
+  """Raises ValueError if `layer` has unrepeatable stochastic sublayers."""
+  for sublayer in layer.submodules:
+    if (not isinstance(sublayer, _STOCHASTIC_LAYER_TYPES) or
+        isinstance(sublayer, recomputable_dropout.RecomputableDropout)):
+      continue
+    if getattr(sublayer, "rate", 0.) or getattr(sublayer, "stddev", 0.):
+      raise ValueError(
+          f"GraphUpdate(recompute_grad=True) cannot be trained with stochastic "
+          f"layers, because the recomputation for backpropagation would use "
+          f"different random numbers than the forward pass. "
+          f"Found {sublayer.__class__.__name__} layer '{sublayer.name}' in "
+          f"'{layer.name}'. For dropout, use "
+          f"tfgnn.keras.layers.RecomputableDropout instead.")
+
+
 def _ensure_dict(features):
   if not isinstance(features, Mapping):
     features = {const.HIDDEN_STATE: features}
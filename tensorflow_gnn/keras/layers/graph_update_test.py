@@ -14,6 +14,8 @@
 # ==============================================================================
 """Tests for graph_update Keras layers."""
 
+from unittest import mock
+
 from absl.testing import parameterized
 import tensorflow as tf
 from tensorflow_gnn.graph import adjacency as adj
@@ -23,6 +25,7 @@ from tensorflow_gnn.keras.layers import convolutions
 from tensorflow_gnn.keras.layers import graph_ops
 from tensorflow_gnn.keras.layers import graph_update
 from tensorflow_gnn.keras.layers import next_state as next_state_lib
+from tensorflow_gnn.keras.layers import recomputable_dropout
 from tensorflow_gnn.utils import tf_test_utils as tftu
 
 
@@ -198,6 +201,243 @@ class GraphUpdateTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual([[16. + 2.+ 19.]],
                         graph.context[const.HIDDEN_STATE])
 
+  @parameterized.named_parameters(
+      ("Sum", "sum", tftu.ModelReloading.SKIP),
+      ("MeanMax", "mean|max", tftu.ModelReloading.SKIP),
+      ("SumRestoredKeras", "sum", tftu.ModelReloading.KERAS),
+      ("MeanRestored", "mean", tftu.ModelReloading.SAVED_MODEL))
+  def testFuseEdgeSetInputs(self, reduce_type, model_reloading):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("a", [1., 2.]), ("b", [2., -1.]), ("c", [4., 0.5])],
+        [("a", "c", [1.]), ("b", "c", [2.]),
+         ("c", "a", [3.]), ("b", "a", [4.])])
+
+    def make_graph_update(fuse_edge_set_inputs):
+      def conv(units):
+        return convolutions.SimpleConv(
+            tf.keras.layers.Dense(units, "relu"),
+            reduce_type=reduce_type, sender_edge_feature=const.HIDDEN_STATE)
+      return graph_update.GraphUpdate(node_sets={
+          "c": graph_update.NodeSetUpdate(
+              {"a->c": conv(3), "b->c": conv(3)},
+              next_state_lib.NextStateFromConcat(tf.keras.layers.Dense(2)),
+              fuse_edge_set_inputs=fuse_edge_set_inputs),
+          "a": graph_update.NodeSetUpdate(
+              # Messages of different sizes cannot be pooled together.
+              {"c->a": conv(2), "b->a": conv(3)},
+              next_state_lib.NextStateFromConcat(tf.keras.layers.Dense(2)),
+              fuse_edge_set_inputs=fuse_edge_set_inputs)})
+
+    fused_update = make_graph_update(fuse_edge_set_inputs=True)
+    inputs = tf.keras.layers.Input(type_spec=input_graph.spec)
+    outputs = fused_update(inputs)
+    model = tf.keras.Model(inputs, outputs)
+    _ = model(input_graph)  # Trigger building.
+
+    update = make_graph_update(fuse_edge_set_inputs=False)
+    _ = update(input_graph)
+    update.set_weights(fused_update.get_weights())
+    expected = update(input_graph)
+
+    model = tftu.maybe_reload_model(self, model, model_reloading,
+                                    "fused-node-set-update")
+    actual = model(input_graph)
+    for node_set_name in ["a", "b", "c"]:
+      self.assertAllClose(
+          expected.node_sets[node_set_name][const.HIDDEN_STATE],
+          actual.node_sets[node_set_name][const.HIDDEN_STATE])
+
+  @parameterized.named_parameters(
+      ("", tftu.ModelReloading.SKIP),
+      ("Restored", tftu.ModelReloading.SAVED_MODEL),
+      ("RestoredKeras", tftu.ModelReloading.KERAS))
+  def testRecomputeGrad(self, model_reloading):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("a", [1., 2.]), ("b", [2., -1.]), ("c", [4., 0.5])],
+        [("a", "c", [1.]), ("b", "c", [2.]), ("c", "a", [3.])])
+
+    def make_model(recompute_grad):
+      inputs = tf.keras.layers.Input(type_spec=input_graph.spec)
+      graph = inputs
+      for _ in range(3):
+        graph = graph_update.GraphUpdate(
+            edge_sets={"b->c": graph_update.EdgeSetUpdate(
+                next_state_lib.NextStateFromConcat(
+                    tf.keras.layers.Dense(1, "relu")))},
+            node_sets={
+                name: graph_update.NodeSetUpdate(
+                    {edge_set_name: convolutions.SimpleConv(
+                        tf.keras.layers.Dense(3, "relu"),
+                        sender_edge_feature=const.HIDDEN_STATE)},
+                    next_state_lib.NextStateFromConcat(
+                        tf.keras.layers.Dense(2, "tanh")))
+                for name, edge_set_name in [("a", "c->a"), ("c", "b->c")]},
+            recompute_grad=recompute_grad)(graph)
+      outputs = graph.node_sets["c"][const.HIDDEN_STATE]
+      return tf.keras.Model(inputs, outputs)
+
+    model = make_model(recompute_grad=False)
+    recompute_model = make_model(recompute_grad=True)
+    recompute_model.set_weights(model.get_weights())
+    recompute_model = tftu.maybe_reload_model(
+        self, recompute_model, model_reloading, "recompute-grad")
+    if tftu.is_keras_model_reloading(model_reloading):
+      self.assertTrue(recompute_model.get_layer(index=1).get_config()[
+          "recompute_grad"])
+
+    def loss_and_grads(model):
+      with tf.GradientTape() as tape:
+        loss = tf.reduce_sum(model(input_graph, training=True)**2)
+      return loss, tape.gradient(
+          loss, model.trainable_variables,
+          unconnected_gradients=tf.UnconnectedGradients.ZERO)
+
+    expected_loss, expected_grads = loss_and_grads(model)
+    loss, grads = tf.function(lambda: loss_and_grads(recompute_model))()
+    self.assertAllClose(expected_loss, loss)
+    self.assertLen(grads, len(expected_grads))
+    for expected_grad, grad in zip(expected_grads, grads):
+      self.assertAllClose(expected_grad, grad)
+
+  def testRecomputeGradOnFirstCallInTfFunction(self):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("a", [1., 2.]), ("b", [2., -1.]), ("c", [4., 0.5])],
+        [("a", "c", [1.]), ("b", "c", [2.]), ("c", "a", [3.])])
+
+    def make_layer(recompute_grad):
+      return graph_update.GraphUpdate(
+          node_sets={
+              "c": graph_update.NodeSetUpdate(
+                  {"b->c": convolutions.SimpleConv(
+                      tf.keras.layers.Dense(3, "relu"))},
+                  next_state_lib.NextStateFromConcat(
+                      tf.keras.layers.Dense(2, "tanh")))},
+          recompute_grad=recompute_grad)
+
+    def loss_and_grads(layer):
+      with tf.GradientTape() as tape:
+        graph = layer(input_graph, training=True)
+        loss = tf.reduce_sum(graph.node_sets["c"][const.HIDDEN_STATE]**2)
+      return loss, tape.gradient(loss, layer.trainable_variables)
+
+    # The very first call of the layer is a traced training step.
+    recompute_layer = make_layer(recompute_grad=True)
+    with mock.patch.object(
+        graph_update, "_call_with_recompute_grad",
+        wraps=graph_update._call_with_recompute_grad) as recompute_mock:
+      loss, grads = tf.function(lambda: loss_and_grads(recompute_layer))()
+    recompute_mock.assert_called()
+
+    layer = make_layer(recompute_grad=False)
+    _ = layer(input_graph)
+    layer.set_weights(recompute_layer.get_weights())
+    expected_loss, expected_grads = loss_and_grads(layer)
+    self.assertAllClose(expected_loss, loss)
+    self.assertLen(grads, len(expected_grads))
+    for expected_grad, grad in zip(expected_grads, grads):
+      self.assertAllClose(expected_grad, grad)
+
+  @parameterized.named_parameters(
+      ("Dropout", tf.keras.layers.Dropout, 0.5),
+      ("GaussianNoise", tf.keras.layers.GaussianNoise, 0.1))
+  def testRecomputeGradRaisesForStochasticLayers(self, layer_type, rate):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("a", [1., 2.]), ("b", [2., -1.]), ("c", [4., 0.5])],
+        [("a", "c", [1.]), ("b", "c", [2.]), ("c", "a", [3.])])
+
+    def make_layer(recompute_grad, rate):
+      return graph_update.GraphUpdate(
+          node_sets={
+              "c": graph_update.NodeSetUpdate(
+                  {"b->c": convolutions.SimpleConv(
+                      tf.keras.layers.Dense(3, "relu"))},
+                  next_state_lib.NextStateFromConcat(
+                      tf.keras.Sequential([tf.keras.layers.Dense(2),
+                                           layer_type(rate)])))},
+          recompute_grad=recompute_grad)
+
+    layer = make_layer(recompute_grad=True, rate=rate)
+    with self.assertRaisesRegex(ValueError, r"stochastic layers"):
+      layer(input_graph, training=True)
+    # Inference does not recompute gradients and can use the layer.
+    _ = layer(input_graph, training=False)
+
+    # A rate of zero is deterministic, so gradients can be recomputed.
+    recompute_layer = make_layer(recompute_grad=True, rate=0.)
+    _ = recompute_layer(input_graph)
+    layer = make_layer(recompute_grad=False, rate=0.)
+    _ = layer(input_graph)
+    layer.set_weights(recompute_layer.get_weights())
+
+    def grads(layer):
+      with tf.GradientTape() as tape:
+        graph = layer(input_graph, training=True)
+        loss = tf.reduce_sum(graph.node_sets["c"][const.HIDDEN_STATE]**2)
+      return tape.gradient(loss, layer.trainable_variables)
+
+    for expected_grad, grad in zip(grads(layer), grads(recompute_layer)):
+      self.assertAllClose(expected_grad, grad)
+
+  def testRecomputeGradWithRecomputableDropout(self):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("a", [1., 2.]), ("b", [2., -1.]), ("c", [4., 0.5])],
+        [("a", "c", [1.]), ("b", "c", [2.]), ("c", "a", [3.])])
+
+    def make_layer(recompute_grad):
+      dropout = recomputable_dropout.RecomputableDropout
+      return graph_update.GraphUpdate(
+          node_sets={
+              "c": graph_update.NodeSetUpdate(
+                  {"b->c": convolutions.SimpleConv(
+                      tf.keras.Sequential([tf.keras.layers.Dense(8, "relu"),
+                                           dropout(0.5)]))},
+                  next_state_lib.NextStateFromConcat(
+                      tf.keras.Sequential([tf.keras.layers.Dense(2),
+                                           dropout(0.5)])))},
+          recompute_grad=recompute_grad)
+
+    recompute_layer = make_layer(recompute_grad=True)
+    _ = recompute_layer(input_graph)
+    layer = make_layer(recompute_grad=False)
+    _ = layer(input_graph)
+    layer.set_weights(recompute_layer.get_weights())
+
+    # Without recomputation, the same seed scope makes the same random choices
+    # as the seed drawn by the layer with recomputation.
+    seed = tf.constant([1, 2], tf.int64)
+    def grads(layer, recompute_grad):
+      with tf.GradientTape() as tape:
+        if recompute_grad:
+          with mock.patch.object(recomputable_dropout, "new_seed",
+                                 return_value=seed):
+            graph = layer(input_graph, training=True)
+        else:
+          with recomputable_dropout.seed_scope(seed):
+            graph = layer(input_graph, training=True)
+        loss = tf.reduce_sum(graph.node_sets["c"][const.HIDDEN_STATE]**2)
+      return tape.gradient(loss, layer.trainable_variables)
+
+    for expected_grad, grad in zip(grads(layer, False),
+                                   grads(recompute_layer, True)):
+      self.assertAllClose(expected_grad, grad)
+
+  def testNoRecomputeGradForInference(self):
+    input_graph = _make_test_graph_with_singleton_node_sets(
+        [("a", [1., 2.]), ("b", [2., -1.]), ("c", [4., 0.5])],
+        [("a", "c", [1.]), ("b", "c", [2.]), ("c", "a", [3.])])
+    layer = graph_update.GraphUpdate(
+        node_sets={"c": graph_update.NodeSetUpdate(
+            {"b->c": convolutions.SimpleConv(tf.keras.layers.Dense(3))},
+            next_state_lib.NextStateFromConcat(tf.keras.layers.Dense(2)))},
+        recompute_grad=True)
+    with mock.patch.object(graph_update,
+                           "_call_with_recompute_grad") as recompute_mock:
+      inputs = tf.keras.layers.Input(type_spec=input_graph.spec)
+      _ = layer(inputs, training=True)
+      _ = layer(input_graph, training=False)
+      _ = layer(input_graph)
+    recompute_mock.assert_not_called()
+
 
 def _make_test_graph_with_singleton_node_sets(nodes, edges, context=None):
   """Returns graph with singleton node sets and edge sets of given values."""
@@ -0,0 +1,278 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""The HistoricalEmbeddings layer."""
+
+from typing import Optional
+
+import tensorflow as tf
+
+from tensorflow_gnn.graph import graph_constants as const
+from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.utils import distribute_utils
+
+_UPDATE_POLICIES = ("replace", "moving_average")
+# String ids are hashed to keys in [0, _NUM_KEY_BUCKETS).
+_NUM_KEY_BUCKETS = 2**62
+
+
+@tf.keras.utils.register_keras_serializable(package="GNN")
+class HistoricalEmbeddings(tf.keras.layers.Layer):
+  """Replaces node states of out-of-batch nodes by cached historical values.
+
+  Training on subgraphs sampled around seed nodes computes the states of
+  lower GNN layers for many neighbor nodes far from the seeds, only to drop
+  most of them a hop later. Following GNNAutoScale (Fey et al., 2021), this
+  layer lets a model use smaller samples: it keeps a non-trainable table of
+  the most recent state of each node in a node set of the full graph, keyed by
+  a node id feature (like the `"#id"` feature written by the samplers).
+  Placed after a GraphUpdate, it
+
+    * writes the freshly computed states of in-batch nodes to the table
+      (during training only), and
+    * replaces the computed states of out-of-batch nodes by their cached
+      values, if the table has a value for them that is not too stale.
+
+  Gradients do not flow into the cached values, nor from them back to the
+  layers that produced them.
+
+  Note that this layer only swaps node states after the fact: the GraphUpdate
+  before it still computes the states of all nodes, including the out-of-batch
+  ones that get replaced. Unlike the full GNNAutoScale scheme, which does not
+  compute out-of-batch nodes at all, it saves neither compute nor memory for
+  a given sample size. Its benefit is in accuracy: it allows to train with
+  smaller samples (fewer neighbors per hop, or fewer hops) while the states of
+  out-of-batch nodes still reflect their full neighborhoods from earlier steps.
+
+  By default, the in-batch nodes are the first node of each graph component,
+  which is the seed node by the convention of `tfgnn.keras.layers.
+  ReadoutFirstNode`. Other nodes of the node set, and all nodes of other node
+  sets, are out-of-batch. Alternatively, `in_batch_feature_name` can name a
+  boolean node feature that marks the in-batch nodes.
+
+  Integer node ids index the table directly. Nodes with an integer id outside
+  `[0, num_nodes)` are ignored: they are neither written to nor read from the
+  table. This can be used to exclude padding nodes.
+
+  String node ids (as written by the samplers) are hashed into `[0, num_nodes)`
+  with `tf.strings.to_hash_bucket_fast()`. Each table entry also stores a
+  64-bit hash of the id that wrote it, so a node never reads the cached state
+  of another node that hashes to the same entry; instead, the two nodes evict
+  each other's cached states. To keep such collisions rare, `num_nodes` should
+  be a few times the number of nodes in the node set. Nodes with the empty
+  string as id are ignored, like padding nodes.
+
+  Staleness is measured in training steps, that is, in calls of this layer with
+  `training=True`. A cached value written `k` steps ago has staleness `k`.
+
+  Under a distribution strategy with several replicas (like MirroredStrategy
+  or TPUStrategy), the table is mirrored: each training step gathers the
+  in-batch states of all replicas and writes them to every copy of the table,
+  and the step count advances once per step, not once per replica. The node
+  states must have the same shape on all replicas except for the number of
+  nodes (as required by `tf.distribute.ReplicaContext.all_gather()`).
+
+  This layer can be restored from config by `tf.keras.models.load_model()`
+  when saved as part of a Keras model using `save_format="tf"`. The table
+  is part of the model's variables, so it is saved and restored with them.
+
+  Init args:
+    node_set_name: The node set whose states are cached.
+    num_nodes: The size of the table. For integer ids, the total number of
+      nodes in the node set of the full graph, whose ids must be in the range
+      `[0, num_nodes)`. For string ids, see above.
+    units: The size of the node states, which must be float vectors.
+    feature_name: The node feature with the states. Defaults to
+      `tfgnn.HIDDEN_STATE`.
+    id_feature_name: The integer or string node feature with the node ids.
+      Defaults to `"#id"`.
+    in_batch_feature_name: If set, the boolean node feature that marks the
+      in-batch nodes. If unset, the first node of each component is in-batch.
+    max_staleness: If set, cached values older than this many training steps
+      are not used; the freshly computed states are kept instead.
+    update_policy: How the states of in-batch nodes are written to the table.
+      With `"replace"` (the default), they overwrite the cached value. With
+      `"moving_average"`, they are mixed into an existing cached value as
+      `momentum * cached + (1 - momentum) * new`.
+    momentum: The momentum for `update_policy="moving_average"`.
+
+  Call args:
+    graph: A scalar GraphTensor.
+    training: If true, the states of in-batch nodes are written to the table.
+
+  Call returns:
+    The input GraphTensor with the feature `feature_name` of node set
+    `node_set_name` updated as described above.
+  """
+
+  def __init__(self,
+               node_set_name: const.NodeSetName,
+               *,
+               num_nodes: int,
+               units: int,
+               feature_name: const.FieldName = const.HIDDEN_STATE,
+               id_feature_name: const.FieldName = "#id",
+               in_batch_feature_name: Optional[const.FieldName] = None,
+               max_staleness: Optional[int] = None,
+               update_policy: str = "replace",
+               momentum: float = 0.9,
+               **kwargs):
+    super().__init__(**kwargs)
+    if num_nodes <= 0:
+      raise ValueError(f"HistoricalEmbeddings requires num_nodes > 0, "
+                       f"got {num_nodes}")
+    if max_staleness is not None and max_staleness < 0:
+      raise ValueError(f"HistoricalEmbeddings requires max_staleness >= 0, "
+                       f"got {max_staleness}")
+    if update_policy not in _UPDATE_POLICIES:
+      raise ValueError(f"HistoricalEmbeddings got unknown update_policy "
+                       f"'{update_policy}', expected one of {_UPDATE_POLICIES}")
+    if not 0.0 <= momentum < 1.0:
+      raise ValueError(f"HistoricalEmbeddings requires 0 <= momentum < 1, "
+                       f"got {momentum}")
+    self._node_set_name = node_set_name
+    self._num_nodes = num_nodes
+    self._units = units
+    self._feature_name = feature_name
+    self._id_feature_name = id_feature_name
+    self._in_batch_feature_name = in_batch_feature_name
+    self._max_staleness = max_staleness
+    self._update_policy = update_policy
+    self._momentum = momentum
+
+    self._embeddings = self.add_weight(
+        name="embeddings", shape=[num_nodes, units], initializer="zeros",
+        trainable=False, **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+    # The training step at which each entry was last written, or -1 if never.
+    self._last_update = self.add_weight(
+        name="last_update", shape=[num_nodes], dtype=tf.int64,
+        initializer=tf.keras.initializers.Constant(-1), trainable=False,
+        **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+    # The key (integer id or string id hash) of the node that last wrote each
+    # entry, or -1 if none.
+    self._keys = self.add_weight(
+        name="keys", shape=[num_nodes], dtype=tf.int64,
+        initializer=tf.keras.initializers.Constant(-1), trainable=False,
+        **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+    self._step = self.add_weight(
+        name="step", shape=[], dtype=tf.int64, initializer="zeros",
+        trainable=False, **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+
+  def get_config(self):
+    return dict(
+        node_set_name=self._node_set_name,
+        num_nodes=self._num_nodes,
+        units=self._units,
+        feature_name=self._feature_name,
+        id_feature_name=self._id_feature_name,
+        in_batch_feature_name=self._in_batch_feature_name,
+        max_staleness=self._max_staleness,
+        update_policy=self._update_policy,
+        momentum=self._momentum,
+        **super().get_config())
+
+  def call(self, graph: gt.GraphTensor, training=None) -> gt.GraphTensor:
+    gt.check_scalar_graph_tensor(graph, "HistoricalEmbeddings")
+    node_set = graph.node_sets[self._node_set_name]
+    states = node_set[self._feature_name]
+    if states.shape.rank != 2 or states.shape[-1] != self._units:
+      raise ValueError(
+          f"HistoricalEmbeddings for node set '{self._node_set_name}' expects "
+          f"states of shape [num_nodes, {self._units}], got {states.shape}")
+    ids = node_set[self._id_feature_name]
+    if ids.dtype == tf.string:
+      keys = tf.strings.to_hash_bucket_fast(ids, _NUM_KEY_BUCKETS)
+      slots = keys % self._num_nodes
+      is_valid = tf.not_equal(ids, "")
+    elif ids.dtype.is_integer:
+      keys = slots = tf.cast(ids, tf.int64)
+      is_valid = tf.logical_and(slots >= 0, slots < self._num_nodes)
+    else:
+      raise ValueError(
+          f"HistoricalEmbeddings requires an integer or string id feature, "
+          f"got '{self._id_feature_name}' of dtype {ids.dtype.name}")
+    safe_slots = tf.where(is_valid, slots, tf.zeros_like(slots))
+    is_in_batch = self._get_in_batch_mask(node_set)
+
+    step = self._step.read_value()
+    last_update = tf.gather(self._last_update, safe_slots)
+    is_cached = tf.logical_and(
+        last_update >= 0, tf.equal(tf.gather(self._keys, safe_slots), keys))
+    use_cache = tf.logical_and(
+        tf.logical_and(is_valid, tf.logical_not(is_in_batch)), is_cached)
+    if self._max_staleness is not None:
+      use_cache = tf.logical_and(
+          use_cache, step - last_update <= self._max_staleness)
+    cached = tf.gather(self._embeddings, safe_slots)
+    cached = tf.cast(cached, states.dtype)
+    new_states = tf.where(tf.expand_dims(use_cache, -1), cached, states)
+
+    if training:
+      is_written = tf.logical_and(is_valid, is_in_batch)
+      written_slots = tf.boolean_mask(slots, is_written)
+      written_keys = tf.boolean_mask(keys, is_written)
+      written_states = tf.cast(
+          tf.stop_gradient(tf.boolean_mask(states, is_written)),
+          self._embeddings.dtype)
+      written_slots, written_keys, written_states = (
+          distribute_utils.all_gather_from_replicas(
+              written_slots, written_keys, written_states))
+      # Entries written more than once get the key and state of the same node.
+      written_slots, written_keys, written_states = _last_write_per_slot(
+          written_slots, written_keys, written_states)
+      if self._update_policy == "moving_average":
+        old_states = tf.gather(self._embeddings, written_slots)
+        has_old_state = tf.logical_and(
+            tf.gather(self._last_update, written_slots) >= 0,
+            tf.equal(tf.gather(self._keys, written_slots), written_keys))
+        written_states = tf.where(
+            tf.expand_dims(has_old_state, -1),
+            (self._momentum * old_states +
+             (1. - self._momentum) * written_states),
+            written_states)
+      updates = [
+          self._embeddings.scatter_update(
+              tf.IndexedSlices(written_states, written_slots)),
+          self._keys.scatter_update(
+              tf.IndexedSlices(written_keys, written_slots)),
+          self._last_update.scatter_update(
+              tf.IndexedSlices(tf.fill(tf.shape(written_slots), step),
+                               written_slots)),
+      ]
+      with tf.control_dependencies(updates):
+        update_step = self._step.assign_add(1)
+      with tf.control_dependencies([update_step]):
+        new_states = tf.identity(new_states)
+
+    return graph.replace_features(node_sets={self._node_set_name: {
+        **node_set.features, self._feature_name: new_states}})
+
+  def _get_in_batch_mask(self, node_set: gt.NodeSet) -> tf.Tensor:
+    """Returns a boolean mask of the in-batch nodes."""
+    if self._in_batch_feature_name is not None:
+      return tf.cast(node_set[self._in_batch_feature_name], tf.bool)
+    sizes = tf.cast(node_set.sizes, tf.int64)
+    starts = tf.boolean_mask(tf.math.cumsum(sizes, exclusive=True), sizes > 0)
+    return tf.scatter_nd(
+        tf.expand_dims(starts, -1),
+        tf.ones_like(starts, dtype=tf.int32),
+        tf.expand_dims(tf.reduce_sum(sizes), 0)) > 0
+
+
+def _last_write_per_slot(slots: tf.Tensor, *values: tf.Tensor):
+  """Returns the unique `slots` with the `values` of their last occurrence."""
+  unique_slots, index = tf.unique(slots)
+  last = tf.math.unsorted_segment_max(
+      tf.range(tf.size(slots)), index, tf.size(unique_slots))
+  return (unique_slots, *(tf.gather(value, last) for value in values))
@@ -0,0 +1,253 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for historical_embeddings.py."""
+
+from absl.testing import parameterized
+import tensorflow as tf
+from tensorflow_gnn.graph import graph_constants as const
+from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.keras.layers import historical_embeddings
+from tensorflow_gnn.utils import tf_test_utils as tftu
+
+
+def setUpModule():
+  # Splits the CPU into two logical devices for testMirroredStrategy.
+  cpus = tf.config.list_physical_devices("CPU")
+  tf.config.set_logical_device_configuration(
+      cpus[0], [tf.config.LogicalDeviceConfiguration()] * 2)
+
+
+def _make_graph(ids, states, sizes, in_batch=None, id_dtype=tf.int64):
+  features = {"#id": tf.constant(ids, id_dtype),
+              const.HIDDEN_STATE: tf.constant(states, tf.float32)}
+  if in_batch is not None:
+    features["in_batch"] = tf.constant(in_batch)
+  return gt.GraphTensor.from_pieces(node_sets={
+      "nodes": gt.NodeSet.from_fields(sizes=tf.constant(sizes),
+                                      features=features)})
+
+
+class HistoricalEmbeddingsTest(tf.test.TestCase, parameterized.TestCase):
+
+  def _states(self, layer, graph, training):
+    return layer(graph, training=training).node_sets["nodes"][
+        const.HIDDEN_STATE]
+
+  def testSeedNodesAreInBatch(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=5, units=2)
+    # Seeds 0 and 3 (first node of each component) have their states cached.
+    graph = _make_graph([0, 1, 3, 4], [[1., 1.], [2., 2.], [3., 3.], [4., 4.]],
+                        [2, 2])
+    self.assertAllEqual([[1., 1.], [2., 2.], [3., 3.], [4., 4.]],
+                        self._states(layer, graph, training=True))
+
+    # Cached values replace the states of out-of-batch nodes 0 and 3, while
+    # in-batch node 1 and uncached node 2 keep their computed states.
+    graph = _make_graph([1, 0, 3, 2], [[5., 5.], [6., 6.], [7., 7.], [8., 8.]],
+                        [4])
+    self.assertAllEqual([[5., 5.], [1., 1.], [3., 3.], [8., 8.]],
+                        self._states(layer, graph, training=False))
+
+  def testInBatchFeature(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=3, units=1, in_batch_feature_name="in_batch")
+    graph = _make_graph([0, 1, 2], [[1.], [2.], [3.]], [3],
+                        in_batch=[False, True, True])
+    self._states(layer, graph, training=True)
+    graph = _make_graph([0, 1, 2], [[4.], [5.], [6.]], [3],
+                        in_batch=[False, False, True])
+    self.assertAllEqual([[4.], [2.], [6.]],
+                        self._states(layer, graph, training=False))
+
+  def testNoUpdatesInInference(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=3, units=1, in_batch_feature_name="in_batch")
+    graph = _make_graph([0, 1], [[1.], [2.]], [2], in_batch=[True, True])
+    self._states(layer, graph, training=False)
+    graph = _make_graph([0, 1], [[3.], [4.]], [2], in_batch=[False, False])
+    self.assertAllEqual([[3.], [4.]],
+                        self._states(layer, graph, training=False))
+
+  def testMaxStaleness(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=3, units=1, in_batch_feature_name="in_batch",
+        max_staleness=1)
+    # Step 0 writes node 0.
+    graph = _make_graph([0, 1], [[1.], [2.]], [2], in_batch=[True, False])
+    self._states(layer, graph, training=True)
+    # Step 1 writes node 1 and reads node 0 with staleness 1.
+    graph = _make_graph([0, 1], [[3.], [4.]], [2], in_batch=[False, True])
+    self.assertAllEqual([[1.], [4.]],
+                        self._states(layer, graph, training=True))
+    # At step 2, node 0 is too stale but node 1 is not.
+    graph = _make_graph([0, 1], [[5.], [6.]], [2], in_batch=[False, False])
+    self.assertAllEqual([[5.], [4.]],
+                        self._states(layer, graph, training=False))
+
+  def testMovingAverage(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=2, units=1, in_batch_feature_name="in_batch",
+        update_policy="moving_average", momentum=0.75)
+    for value in [4., 8.]:
+      graph = _make_graph([0, 1], [[value], [0.]], [2], in_batch=[True, False])
+      self._states(layer, graph, training=True)
+    graph = _make_graph([0, 1], [[0.], [0.]], [2], in_batch=[False, False])
+    self.assertAllClose([[0.75 * 4. + 0.25 * 8.], [0.]],
+                        self._states(layer, graph, training=False))
+
+  def testIgnoresInvalidIds(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=2, units=1, in_batch_feature_name="in_batch")
+    graph = _make_graph([-1, 1, 2], [[1.], [2.], [3.]], [3],
+                        in_batch=[True, True, True])
+    self._states(layer, graph, training=True)
+    graph = _make_graph([-1, 0, 1, 2], [[4.], [5.], [6.], [7.]], [4],
+                        in_batch=[False, False, False, False])
+    self.assertAllEqual([[4.], [5.], [2.], [7.]],
+                        self._states(layer, graph, training=False))
+
+  def testStringIds(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=16, units=1, in_batch_feature_name="in_batch")
+    graph = _make_graph([b"a", b"b", b""], [[1.], [2.], [3.]], [3],
+                        in_batch=[True, False, True], id_dtype=tf.string)
+    self._states(layer, graph, training=True)
+    # Node "a" reads its cached state; node "b" was never written, and
+    # nodes with an empty id are ignored.
+    graph = _make_graph([b"b", b"a", b""], [[4.], [5.], [6.]], [3],
+                        in_batch=[False, False, False], id_dtype=tf.string)
+    self.assertAllEqual([[4.], [1.], [6.]],
+                        self._states(layer, graph, training=False))
+
+  def testStringIdCollisions(self):
+    # With a single entry, all nodes share it.
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=1, units=1, in_batch_feature_name="in_batch")
+    graph = _make_graph([b"a", b"b"], [[1.], [2.]], [2],
+                        in_batch=[True, False], id_dtype=tf.string)
+    self._states(layer, graph, training=True)
+    # Node "b" does not read the state cached by node "a".
+    graph = _make_graph([b"a", b"b"], [[3.], [4.]], [2],
+                        in_batch=[False, False], id_dtype=tf.string)
+    self.assertAllEqual([[1.], [4.]],
+                        self._states(layer, graph, training=False))
+    # Writing "b" evicts "a".
+    graph = _make_graph([b"b"], [[5.]], [1], in_batch=[True],
+                        id_dtype=tf.string)
+    self._states(layer, graph, training=True)
+    graph = _make_graph([b"a", b"b"], [[6.], [7.]], [2],
+                        in_batch=[False, False], id_dtype=tf.string)
+    self.assertAllEqual([[6.], [5.]],
+                        self._states(layer, graph, training=False))
+
+  def testConsistentWritesToSharedEntry(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=1, units=1, in_batch_feature_name="in_batch")
+    # Both nodes write the only entry in the same step.
+    graph = _make_graph([b"a", b"b"], [[1.], [2.]], [2],
+                        in_batch=[True, True], id_dtype=tf.string)
+    self._states(layer, graph, training=True)
+    # Exactly one of them reads back its own state.
+    graph = _make_graph([b"a", b"b"], [[3.], [4.]], [2],
+                        in_batch=[False, False], id_dtype=tf.string)
+    self.assertIn(self._states(layer, graph, training=False).numpy().tolist(),
+                  [[[1.], [4.]], [[3.], [2.]]])
+
+  def testNoGradientThroughCache(self):
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=2, units=1, in_batch_feature_name="in_batch")
+    graph = _make_graph([0, 1], [[1.], [2.]], [2], in_batch=[True, False])
+    self._states(layer, graph, training=True)
+    states = tf.constant([[3.], [4.]])
+    with tf.GradientTape() as tape:
+      tape.watch(states)
+      graph = _make_graph([0, 1], states, [2], in_batch=[False, True])
+      outputs = self._states(layer, graph, training=True)
+    self.assertAllEqual([[1.], [4.]], outputs)
+    self.assertAllEqual([[0.], [1.]], tape.gradient(outputs, states))
+
+  @parameterized.named_parameters(
+      ("", tftu.ModelReloading.SKIP),
+      ("Restored", tftu.ModelReloading.SAVED_MODEL),
+      ("RestoredKeras", tftu.ModelReloading.KERAS))
+  def testModel(self, model_reloading):
+    graph = _make_graph([0, 1], [[1., 2.], [3., 4.]], [2],
+                        in_batch=[True, False])
+    inputs = tf.keras.layers.Input(type_spec=graph.spec)
+    outputs = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=4, units=2, in_batch_feature_name="in_batch",
+        max_staleness=5, update_policy="moving_average", momentum=0.5)(inputs)
+    outputs = outputs.node_sets["nodes"][const.HIDDEN_STATE]
+    model = tf.keras.Model(inputs, outputs)
+    model(graph, training=True)
+    model = tftu.maybe_reload_model(self, model, model_reloading,
+                                    "historical-embeddings-model")
+
+    graph = _make_graph([0, 1], [[5., 6.], [7., 8.]], [2],
+                        in_batch=[False, False])
+    self.assertAllEqual([[1., 2.], [7., 8.]], model(graph))
+    if tftu.is_keras_model_reloading(model_reloading):
+      layer = model.get_layer(index=1)
+      self.assertEqual(4, layer.get_config()["num_nodes"])
+      self.assertEqual("moving_average", layer.get_config()["update_policy"])
+
+  def testMirroredStrategy(self):
+    strategy = tf.distribute.MirroredStrategy(["/cpu:0", "/cpu:1"])
+    with strategy.scope():
+      layer = historical_embeddings.HistoricalEmbeddings(
+          "nodes", num_nodes=4, units=1, in_batch_feature_name="in_batch")
+    # Each replica writes a different node.
+    graphs = [_make_graph([0, 1], [[1.], [2.]], [2], in_batch=[True, False]),
+              _make_graph([2, 3], [[3.], [4.]], [2], in_batch=[True, False])]
+    distributed_graphs = strategy.experimental_distribute_values_from_function(
+        lambda ctx: graphs[ctx.replica_id_in_sync_group])
+
+    @tf.function
+    def train_step(graph):
+      return strategy.run(
+          lambda graph: self._states(layer, graph, training=True),
+          args=(graph,))
+
+    train_step(distributed_graphs)
+    # pylint: disable=protected-access
+    for embeddings in strategy.experimental_local_results(layer._embeddings):
+      self.assertAllEqual([[1.], [0.], [3.], [0.]], embeddings)
+    for step in strategy.experimental_local_results(layer._step):
+      self.assertEqual(1, step)
+    graph = _make_graph([0, 1, 2, 3], [[5.], [6.], [7.], [8.]], [4],
+                        in_batch=[False, False, False, False])
+    self.assertAllEqual([[1.], [6.], [3.], [8.]],
+                        self._states(layer, graph, training=False))
+
+  def testErrors(self):
+    with self.assertRaisesRegex(ValueError, r"update_policy"):
+      historical_embeddings.HistoricalEmbeddings(
+          "nodes", num_nodes=2, units=1, update_policy="latest")
+    with self.assertRaisesRegex(ValueError, r"max_staleness"):
+      historical_embeddings.HistoricalEmbeddings(
+          "nodes", num_nodes=2, units=1, max_staleness=-1)
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=2, units=3)
+    with self.assertRaisesRegex(ValueError, r"expects states of shape"):
+      layer(_make_graph([0], [[1.]], [1]))
+    layer = historical_embeddings.HistoricalEmbeddings(
+        "nodes", num_nodes=2, units=1)
+    with self.assertRaisesRegex(ValueError, r"integer or string id feature"):
+      layer(_make_graph([0.], [[1.]], [1], id_dtype=tf.float32))
+
+
+if __name__ == "__main__":
+  tf.test.main()
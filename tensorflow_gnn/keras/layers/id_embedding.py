@@ -0,0 +1,137 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""The IdEmbedding layer."""
+
+from typing import Any, Union
+
+import tensorflow as tf
+
+
+@tf.keras.utils.register_keras_serializable(package="GNN")
+class IdEmbedding(tf.keras.layers.Layer):
+  """Looks up learnable embeddings for node ids, one row per distinct id.
+
+  This layer is meant for large id vocabularies, like a learnable embedding
+  of each node of a node set with tens of millions of nodes, typically applied
+  to the `"#id"` feature from a `node_sets_fn` of `MapFeatures`:
+
+  ```python
+  embedding = tfgnn.keras.layers.IdEmbedding(num_papers, 128)
+  def node_sets_fn(node_set, node_set_name):
+    if node_set_name == "paper":
+      return embedding(node_set["#id"])
+    ...
+  graph = tfgnn.keras.layers.MapFeatures(node_sets_fn=node_sets_fn)(graph)
+  ```
+
+  Unlike `tf.keras.layers.Embedding`, each batch looks up each distinct id
+  only once: the ids are deduplicated with `tf.unique()` before the lookup,
+  and the result is gathered back to the shape of the input. The gradient of
+  the table is a `tf.IndexedSlices` with one row per distinct id, so optimizers
+  update only those rows. For sampled subgraphs, in which the same neighbor
+  node often occurs many times, this shrinks the traffic to and from the table
+  substantially.
+
+  The table is a single variable created by `add_weight()`, so it is sharded
+  by the variable partitioner of a `tf.distribute.ParameterServerStrategy`
+  (like the one of `runner.ParameterServerStrategy`): each parameter server
+  holds a contiguous range of rows, lookups fetch only the requested rows
+  from each shard, and sparse updates go only to the shards of those rows.
+  (Other strategies replicate the table on each device.)
+
+  This layer can be restored from config by `tf.keras.models.load_model()`
+  when saved as part of a Keras model using `save_format="tf"`.
+
+  Init args:
+    vocab_size: The number of rows of the table. Integer ids must be in the
+      range `[0, vocab_size)`.
+    output_dim: The size of each embedding vector.
+    embeddings_initializer: The initializer of the table.
+    embeddings_regularizer: An optional regularizer of the table. Note that
+      regularizers like L2 produce dense gradients for the full table.
+    hash_strings: If true, string ids are hashed into `vocab_size` buckets
+      with `tf.strings.to_hash_bucket_fast()`. If false, ids must be integers.
+
+  Call args:
+    ids: A Tensor or RaggedTensor of ids.
+
+  Call returns:
+    The embeddings of `ids`, with an extra dimension of size `output_dim`.
+  """
+
+  def __init__(self,
+               vocab_size: int,
+               output_dim: int,
+               *,
+               embeddings_initializer: Any = "uniform",
+               embeddings_regularizer: Any = None,
+               hash_strings: bool = False,
+               **kwargs):
+    super().__init__(**kwargs)
+    if vocab_size <= 0:
+      raise ValueError(f"IdEmbedding requires vocab_size > 0, "
+                       f"got {vocab_size}")
+    if output_dim <= 0:
+      raise ValueError(f"IdEmbedding requires output_dim > 0, "
+                       f"got {output_dim}")
+    self._vocab_size = vocab_size
+    self._output_dim = output_dim
+    self._embeddings_initializer = tf.keras.initializers.get(
+        embeddings_initializer)
+    self._embeddings_regularizer = tf.keras.regularizers.get(
+        embeddings_regularizer)
+    self._hash_strings = hash_strings
+
+  def get_config(self):
+    return dict(
+        vocab_size=self._vocab_size,
+        output_dim=self._output_dim,
+        embeddings_initializer=tf.keras.initializers.serialize(
+            self._embeddings_initializer),
+        embeddings_regularizer=tf.keras.regularizers.serialize(
+            self._embeddings_regularizer),
+        hash_strings=self._hash_strings,
+        **super().get_config())
+
+  def build(self, input_shape):
+    self.embeddings = self.add_weight(
+        name="embeddings",
+        shape=[self._vocab_size, self._output_dim],
+        initializer=self._embeddings_initializer,
+        regularizer=self._embeddings_regularizer)
+    super().build(input_shape)
+
+  def call(self, ids: Union[tf.Tensor, tf.RaggedTensor]):
+    if isinstance(ids, tf.RaggedTensor):
+      return tf.ragged.map_flat_values(self._lookup, ids)
+    return self._lookup(ids)
+
+  def _lookup(self, ids: tf.Tensor) -> tf.Tensor:
+    if ids.dtype == tf.string:
+      if not self._hash_strings:
+        raise ValueError("IdEmbedding requires integer ids, "
+                         "or string ids with hash_strings=True")
+      ids = tf.strings.to_hash_bucket_fast(ids, self._vocab_size)
+    elif not ids.dtype.is_integer:
+      raise ValueError(f"IdEmbedding requires integer ids, got {ids.dtype}")
+    flat_ids = tf.reshape(tf.cast(ids, tf.int64), [-1])
+    unique_ids, index = tf.unique(flat_ids)
+    unique_embeddings = tf.nn.embedding_lookup(self.embeddings, unique_ids)
+    if unique_embeddings.dtype != self.compute_dtype:
+      unique_embeddings = tf.cast(unique_embeddings, self.compute_dtype)
+    embeddings = tf.gather(unique_embeddings, index)
+    return tf.reshape(
+        embeddings,
+        tf.concat([tf.shape(ids), [self._output_dim]], axis=0))
@@ -0,0 +1,151 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for id_embedding.py."""
+
+import multiprocessing
+import socket
+
+from absl.testing import parameterized
+import tensorflow as tf
+from tensorflow_gnn.graph import graph_tensor as gt
+from tensorflow_gnn.keras.layers import id_embedding
+from tensorflow_gnn.keras.layers import map_features
+
+
+def _table(vocab_size, output_dim):
+  return tf.keras.initializers.Constant(
+      tf.reshape(tf.range(vocab_size * output_dim, dtype=tf.float32),
+                 [vocab_size, output_dim]))
+
+
+def _free_port():
+  with socket.socket() as s:
+    s.bind(("localhost", 0))
+    return s.getsockname()[1]
+
+
+class IdEmbeddingTest(tf.test.TestCase, parameterized.TestCase):
+
+  @parameterized.named_parameters(("Int32", tf.int32), ("Int64", tf.int64))
+  def testDense(self, dtype):
+    layer = id_embedding.IdEmbedding(
+        5, 2, embeddings_initializer=_table(5, 2))
+    ids = tf.constant([[4, 1], [1, 0]], dtype)
+    self.assertAllEqual(layer(ids),
+                        [[[8., 9.], [2., 3.]], [[2., 3.], [0., 1.]]])
+
+  def testRagged(self):
+    layer = id_embedding.IdEmbedding(
+        5, 2, embeddings_initializer=_table(5, 2))
+    ids = tf.ragged.constant([[3], [], [0, 3]], tf.int64)
+    result = layer(ids)
+    self.assertIsInstance(result, tf.RaggedTensor)
+    self.assertAllEqual(result,
+                        tf.ragged.constant([[[6., 7.]], [], [[0., 1.], [6., 7.]]],
+                                           ragged_rank=1))
+
+  def testSparseGradientOfUniqueIds(self):
+    layer = id_embedding.IdEmbedding(
+        100, 2, embeddings_initializer=_table(100, 2))
+    ids = tf.constant([7, 3, 7, 7, 3])
+    with tf.GradientTape() as tape:
+      loss = tf.reduce_sum(layer(ids))
+    grad = tape.gradient(loss, layer.embeddings)
+    self.assertIsInstance(grad, tf.IndexedSlices)
+    self.assertAllEqual(grad.indices, [7, 3])
+    self.assertAllEqual(grad.values, [[3., 3.], [2., 2.]])
+
+  def testHashStrings(self):
+    layer = id_embedding.IdEmbedding(
+        10, 2, embeddings_initializer=_table(10, 2), hash_strings=True)
+    ids = tf.constant(["a", "b", "a"])
+    rows = tf.strings.to_hash_bucket_fast(ids, 10)
+    self.assertAllEqual(layer(ids), tf.gather(_table(10, 2)([10, 2]), rows))
+
+  def testStringsRequireHashing(self):
+    layer = id_embedding.IdEmbedding(10, 2)
+    with self.assertRaisesRegex(ValueError, "hash_strings=True"):
+      layer(tf.constant(["a"]))
+
+  def testMapFeatures(self):
+    graph = gt.GraphTensor.from_pieces(node_sets={
+        "paper": gt.NodeSet.from_fields(
+            sizes=tf.constant([3]),
+            features={"#id": tf.constant([2, 0, 2], tf.int64)})})
+    embedding = id_embedding.IdEmbedding(
+        3, 2, embeddings_initializer=_table(3, 2))
+    def node_sets_fn(node_set, node_set_name):
+      del node_set_name
+      return embedding(node_set["#id"])
+    graph = map_features.MapFeatures(node_sets_fn=node_sets_fn)(graph)
+    self.assertAllEqual(graph.node_sets["paper"]["hidden_state"],
+                        [[4., 5.], [0., 1.], [4., 5.]])
+
+  def testMixedPrecision(self):
+    layer = id_embedding.IdEmbedding(4, 2, dtype="mixed_float16")
+    result = layer(tf.constant([1, 2]))
+    self.assertEqual(result.dtype, tf.float16)
+    self.assertEqual(layer.embeddings.dtype, tf.float32)
+
+  def testConfig(self):
+    layer = id_embedding.IdEmbedding(
+        10, 4, hash_strings=True, embeddings_regularizer="l2", name="emb")
+    restored = id_embedding.IdEmbedding.from_config(layer.get_config())
+    self.assertEqual(restored.get_config(), layer.get_config())
+
+  def testShardedAcrossParameterServers(self):
+    # The servers change the process-wide eager context, so they are run in a
+    # separate process to not affect other tests.
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_lookup_on_parameter_servers,
+                              args=(queue,))
+    process.start()
+    num_shards, values, gradient_types = queue.get(timeout=300)
+    process.join()
+    self.assertEqual(num_shards, 2)
+    self.assertAllEqual(values, [[2., 3.], [16., 17.], [2., 3.]])
+    self.assertEqual(gradient_types, ["IndexedSlices"] * 2)
+
+
+def _lookup_on_parameter_servers(queue):
+  """Puts results of IdEmbedding on an in-process PS cluster into `queue`."""
+  cluster_spec = tf.train.ClusterSpec({
+      "worker": [f"localhost:{_free_port()}"],
+      "ps": [f"localhost:{_free_port()}", f"localhost:{_free_port()}"]})
+  for job_name, num_tasks in (("worker", 1), ("ps", 2)):
+    for task_index in range(num_tasks):
+      tf.distribute.Server(cluster_spec, job_name=job_name,
+                           task_index=task_index, protocol="grpc")
+  strategy = tf.distribute.ParameterServerStrategy(
+      tf.distribute.cluster_resolver.SimpleClusterResolver(
+          cluster_spec, rpc_layer="grpc"),
+      variable_partitioner=(
+          tf.distribute.experimental.partitioners.MinSizePartitioner(
+              min_shard_bytes=1, max_shards=2)))
+  with strategy.scope():
+    layer = id_embedding.IdEmbedding(
+        10, 2, embeddings_initializer=_table(10, 2))
+    layer.build(None)
+  ids = tf.constant([1, 8, 1])
+  with tf.GradientTape() as tape:
+    values = layer(ids)
+    loss = tf.reduce_sum(values)
+  gradients = tape.gradient(loss, layer.trainable_variables)
+  queue.put((len(layer.embeddings.variables), values.numpy().tolist(),
+             [type(g).__name__ for g in gradients]))
+
+if __name__ == "__main__":
+  tf.test.main()
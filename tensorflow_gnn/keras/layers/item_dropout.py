@@ -18,6 +18,8 @@ from typing import Optional
 
 import tensorflow as tf
 
+from tensorflow_gnn.keras.layers import recomputable_dropout
+
 
 @tf.keras.utils.register_keras_serializable(package="GNN")
 class ItemDropout(tf.keras.layers.Layer):
@@ -25,7 +27,9 @@ class ItemDropout(tf.keras.layers.Layer):
 
   This Layer class wraps `tf.keras.layers.Dropout` to perform edge dropout
   or node dropout (or "component dropout", which is rarely useful) on
-  Tensors shaped like features of a **scalar** GraphTensor.
+  Tensors shaped like features of a **scalar** GraphTensor. Like
+  `tfgnn.keras.layers.RecomputableDropout`, it can be used in a
+  `tfgnn.keras.layers.GraphUpdate` with `recompute_grad=True`.
 
   This layer can be restored from config by `tf.keras.models.load_model()`
   when saved as part of a Keras model using `save_format="tf"`.
@@ -67,7 +71,7 @@ class ItemDropout(tf.keras.layers.Layer):
       raise ValueError(
           "ItemDropout requires inputs of known fixed non-zero rank")
     noise_shape = tf.TensorShape([None] + (shape.rank - 1)*[1])
-    self._dropout = tf.keras.layers.Dropout(
+    self._dropout = recomputable_dropout.RecomputableDropout(
         rate=self._rate, noise_shape=noise_shape, seed=self._seed)
 
   def call(self, inputs):
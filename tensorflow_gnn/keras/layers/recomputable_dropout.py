@@ -0,0 +1,132 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""The RecomputableDropout class and its seed scopes."""
+
+import contextlib
+import threading
+from typing import Iterator, List, Optional
+
+import tensorflow as tf
+
+
+@tf.keras.utils.register_keras_serializable(package="GNN")
+class RecomputableDropout(tf.keras.layers.Dropout):
+  """Dropout that repeats its random choices when recomputed for gradients.
+
+  This Layer class is a drop-in replacement for `tf.keras.layers.Dropout`
+  that can be used inside a `tfgnn.keras.layers.GraphUpdate` with
+  `recompute_grad=True`. Such a GraphUpdate recomputes its forward pass
+  to compute gradients, and ordinary dropout would then drop out different
+  values than the forward pass whose result got used.
+
+  To avoid that, the GraphUpdate draws one random seed per call and makes
+  each RecomputableDropout inside it draw its mask by stateless random ops
+  from that seed, folded with the position of the dropout call within the
+  GraphUpdate. Hence the recomputation makes exactly the same choices
+  as the forward pass. Outside such a GraphUpdate, this layer behaves
+  exactly like `tf.keras.layers.Dropout`.
+
+  This layer can be restored from config by `tf.keras.models.load_model()`
+  when saved as part of a Keras model using `save_format="tf"`.
+
+  Init args:
+    rate: The dropout rate, forwarded to `tf.keras.layers.Dropout`.
+    noise_shape: Optionally, the noise shape, forwarded to
+      `tf.keras.layers.Dropout`.
+    seed: The random seed, forwarded to `tf.keras.layers.Dropout`. It is
+      not used for the recomputable calls, which get their seed from the
+      GraphUpdate.
+
+  Call args:
+    inputs: A float Tensor.
+    training: As for `tf.keras.layers.Dropout`.
+
+  Call returns:
+    A Tensor with the same shape and dtype as `inputs`, as for
+    `tf.keras.layers.Dropout`.
+  """
+
+  def call(self, inputs, training=None):
+    if training is not True or not self.rate:
+      return super().call(inputs, training=training)
+    seed = _next_seed()
+    if seed is None:
+      return super().call(inputs, training=training)
+    return tf.nn.experimental.stateless_dropout(
+        inputs, rate=self.rate, seed=seed,
+        noise_shape=self._get_stateless_noise_shape(inputs))
+
+  def _get_stateless_noise_shape(self, inputs):
+    if self.noise_shape is None:
+      return None
+    input_shape = tf.shape(inputs)
+    return tf.stack([input_shape[i] if dim is None else dim
+                     for i, dim in enumerate(self.noise_shape)])
+
+
+class _SeedScopes(threading.local):
+  """The stack of active seed scopes, per thread."""
+
+  def __init__(self):
+    super().__init__()
+    # Each entry holds a seed Tensor and the number of seeds derived from it.
+    self.stack: List[List[object]] = []
+
+
+_seed_scopes = _SeedScopes()
+
+
+@contextlib.contextmanager
+def seed_scope(seed: tf.Tensor) -> Iterator[None]:
+  """Makes the RecomputableDropout calls in this scope use `seed`.
+
+  Args:
+    seed: A seed for stateless random ops, that is, an int32 or int64 Tensor
+      of shape `[2]`. The i-th call to a RecomputableDropout layer in training
+      mode in this scope uses the seed folded with i, so repeating the same
+      sequence of calls in a new scope with the same seed repeats the same
+      random choices.
+
+  Yields:
+    Nothing.
+  """
+  _seed_scopes.stack.append([seed, 0])
+  try:
+    yield
+  finally:
+    _seed_scopes.stack.pop()
+
+
+def new_seed() -> tf.Tensor:
+  """Returns a new seed for `seed_scope()`.
+
+  Inside a seed scope, the new seed is derived from the seed of that scope,
+  so that nested seed scopes also repeat their random choices when the
+  enclosing one does. Outside, the new seed is drawn at random.
+  """
+  seed = _next_seed()
+  if seed is not None:
+    return seed
+  return tf.random.uniform([2], maxval=tf.int64.max, dtype=tf.int64)
+
+
+def _next_seed() -> Optional[tf.Tensor]:
+  """Returns the next seed from the innermost seed scope, if any."""
+  if not _seed_scopes.stack:
+    return None
+  scope = _seed_scopes.stack[-1]
+  seed, count = scope
+  scope[1] = count + 1
+  return tf.random.experimental.stateless_fold_in(seed, count)
@@ -0,0 +1,86 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for recomputable_dropout.py."""
+
+from absl.testing import parameterized
+import tensorflow as tf
+from tensorflow_gnn.keras.layers import recomputable_dropout
+from tensorflow_gnn.utils import tf_test_utils as tftu
+
+
+class RecomputableDropoutTest(tf.test.TestCase, parameterized.TestCase):
+
+  @parameterized.named_parameters(
+      ("", tftu.ModelReloading.SKIP),
+      ("Restored", tftu.ModelReloading.SAVED_MODEL),
+      ("RestoredKeras", tftu.ModelReloading.KERAS))
+  def testNoSeedScope(self, model_reloading):
+    # Avoid flakiness.
+    tf.random.set_seed(42)
+
+    inputs = tf.keras.layers.Input([4])
+    outputs = recomputable_dropout.RecomputableDropout(rate=0.5)(inputs)
+    model = tf.keras.Model(inputs, outputs)
+    model = tftu.maybe_reload_model(self, model, model_reloading,
+                                    "recomputable-dropout-model")
+
+    x = tf.ones([25, 4])
+    self.assertAllEqual(x, model(x))
+    self.assertAllEqual(x, model(x, training=False))
+    y = model(x, training=True)
+    # Some values are 0.0 (dropped out), some are 2.0 (scaled up).
+    # The risk of not seeing both is 2 * 0.5**100 for each fixed seed.
+    self.assertEqual(0.0, tf.reduce_min(y))
+    self.assertEqual(2.0, tf.reduce_max(y))
+
+  def testSeedScope(self):
+    layer = recomputable_dropout.RecomputableDropout(rate=0.5)
+    x = tf.ones([25, 4])
+    seed = tf.constant([1, 2], tf.int64)
+
+    def call_twice():
+      with recomputable_dropout.seed_scope(seed):
+        return layer(x, training=True), layer(x, training=True)
+
+    y1, y2 = call_twice()
+    y1_again, y2_again = call_twice()
+    self.assertAllEqual(y1, y1_again)
+    self.assertAllEqual(y2, y2_again)
+    # Successive calls in the same scope use different seeds.
+    self.assertNotAllEqual(y1, y2)
+    # Outside training, nothing is dropped.
+    with recomputable_dropout.seed_scope(seed):
+      self.assertAllEqual(x, layer(x, training=False))
+
+  def testSeedScopeWithNoiseShape(self):
+    layer = recomputable_dropout.RecomputableDropout(
+        rate=0.5, noise_shape=[None, 1])
+    x = tf.ones([25, 4])
+    with recomputable_dropout.seed_scope(tf.constant([3, 4], tf.int64)):
+      y = layer(x, training=True)
+    # In each row, all entries have the same value.
+    self.assertAllEqual(tf.reduce_min(y, axis=1), tf.reduce_max(y, axis=1))
+
+  def testNewSeed(self):
+    seed = tf.constant([5, 6], tf.int64)
+    with recomputable_dropout.seed_scope(seed):
+      inner_seed = recomputable_dropout.new_seed()
+    with recomputable_dropout.seed_scope(seed):
+      self.assertAllEqual(inner_seed, recomputable_dropout.new_seed())
+    self.assertEqual([2], recomputable_dropout.new_seed().shape)
+
+
+if __name__ == "__main__":
+  tf.test.main()
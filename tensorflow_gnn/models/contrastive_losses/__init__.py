@@ -47,6 +47,7 @@ AllSvdMetrics = metrics.AllSvdMetrics
 coherence = metrics.coherence
 numerical_rank = metrics.numerical_rank
 pseudo_condition_number = metrics.pseudo_condition_number
+randomized_svd = metrics.randomized_svd
 rankme = metrics.rankme
 self_clustering = metrics.self_clustering
 
@@ -234,6 +234,65 @@ def coherence_from_singular_vectors(u: tf.Tensor) -> tf.Tensor:
   )
 
 
+def randomized_svd(
+    representations: tf.Tensor,
+    rank: int,
+    *,
+    oversampling: int = 10,
+    num_power_iterations: int = 2,
+    seed: Optional[int] = None,
+) -> tuple[tf.Tensor, tf.Tensor, tf.Tensor]:
+  """Truncated SVD of representations by randomized subspace iteration.
+
+  Approximates the `rank` largest singular values and the corresponding left
+  singular vectors of a `[n, d]` matrix `A` from a random projection of it
+  onto `rank + oversampling` dimensions, refined by a few power iterations
+  (Halko et al., https://arxiv.org/abs/0909.4061). This costs `O(n * d * l)`
+  for `l = rank + oversampling`, much less than a full SVD if `l << d`.
+
+  The third result is the residual `||A - U @ diag(sigma) @ V^T||_F`, computed
+  exactly as `sqrt(||A||_F^2 - sum(sigma^2))`. It bounds the error of the
+  truncation: every singular value that is not returned, and the error of
+  every returned one, is at most the residual.
+
+  Args:
+    representations: Input representations, a rank-2 tensor.
+    rank: The number of singular values and vectors to compute.
+    oversampling: The number of extra random dimensions to project on.
+    num_power_iterations: The number of power iterations. More iterations
+      improve the accuracy for slowly decaying spectra.
+    seed: An optional random seed for the projection.
+
+  Returns:
+    A tuple `(sigma, u, residual)` of the singular values in decreasing order
+    (rank 1, up to `rank` values), the left singular vectors (rank 2,
+    `[n, rank]` or less) and the scalar residual.
+  """
+  if representations.shape.rank != 2:
+    raise ValueError(f"Expected 2D tensor (got shape {representations.shape})")
+  if rank <= 0:
+    raise ValueError(f"Expected rank > 0 (got {rank})")
+  num_dims = tf.shape(representations)[1]
+  num_samples = tf.minimum(rank + oversampling, num_dims)
+  omega = tf.random.normal(
+      tf.stack([num_dims, num_samples]), dtype=representations.dtype, seed=seed
+  )
+  q, _ = tf.linalg.qr(tf.matmul(representations, omega))
+  for _ in range(num_power_iterations):
+    # Re-orthonormalize after each product for numerical stability.
+    z, _ = tf.linalg.qr(tf.matmul(representations, q, transpose_a=True))
+    q, _ = tf.linalg.qr(tf.matmul(representations, z))
+  b = tf.matmul(q, representations, transpose_a=True)
+  sigma, u_b, _ = tf.linalg.svd(b, compute_uv=True, full_matrices=False)
+  sigma = sigma[:rank]
+  u = tf.matmul(q, u_b[:, :rank])
+  residual_squared = tf.reduce_sum(
+      tf.math.square(representations)
+  ) - tf.reduce_sum(tf.math.square(sigma))
+  residual = tf.math.sqrt(tf.math.maximum(residual_squared, 0.0))
+  return sigma, u, residual
+
+
 @tf.keras.utils.register_keras_serializable()
 class TripletLossMetrics(tf.keras.metrics.Metric):
   """Triplet loss metrics."""
@@ -298,9 +357,23 @@ class _SvdMetrics(tf.keras.metrics.Metric):
           Callable[[tf.Tensor], tf.Tensor]
       ] = None,
       name: str = "svd_metrics",
+      *,
+      rank: Optional[int] = None,
+      oversampling: int = 10,
+      num_power_iterations: int = 2,
   ):
     """Constructs the `tf.keras.metrics.Metric` that reuses SVD decomposition.
 
+    By default, a full SVD of the representations is computed on every update.
+    For wide representations, this can dominate the time of a training step.
+    If `rank` is set, a truncated SVD with the `rank` largest singular values
+    is approximated by `randomized_svd()` instead, and the metrics are computed
+    from it: `rankme` sees the top `rank` singular values only, and `coherence`
+    sees the top `rank` singular vectors only. To report the quality of the
+    approximation, the result has an extra entry `"svd_relative_residual"`:
+    the mean over updates of the truncation residual relative to the Frobenius
+    norm of the representations, which bounds each omitted singular value.
+
     Args:
       fns: a mapping from a metric name to a `Callable` that accepts
         representations as well as the result of their SVD decomposition.
@@ -308,12 +381,28 @@ class _SvdMetrics(tf.keras.metrics.Metric):
       y_pred_transform_fn: a function to extract clean representations
         from model predictions. By default, no transformation is applied.
       name: Name for the metric class, used for Keras bookkeeping.
+      rank: If set, the number of singular values to approximate by a
+        randomized truncated SVD.
+      oversampling: The oversampling of the randomized SVD.
+      num_power_iterations: The number of power iterations of the randomized
+        SVD.
     """
     super().__init__(name=name)
+    if rank is not None and rank <= 0:
+      raise ValueError(f"Expected rank > 0 (got {rank})")
     self._fns = fns
     self._metric_container = {
         k: tf.keras.metrics.Mean(name=k) for k in fns.keys()
     }
+    self._rank = rank
+    self._oversampling = oversampling
+    self._num_power_iterations = num_power_iterations
+    if rank is not None:
+      self._residual_metric = tf.keras.metrics.Mean(
+          name="svd_relative_residual"
+      )
+    else:
+      self._residual_metric = None
     if not y_pred_transform_fn:
       y_pred_transform_fn = lambda x: x
     self._y_pred_transform_fn = y_pred_transform_fn
@@ -321,17 +410,33 @@ class _SvdMetrics(tf.keras.metrics.Metric):
   def reset_state(self) -> None:
     for v in self._metric_container.values():
       v.reset_state()
+    if self._residual_metric is not None:
+      self._residual_metric.reset_state()
 
   def update_state(self, _, y_pred: tf.Tensor, sample_weight=None) -> None:
     representations = self._y_pred_transform_fn(y_pred)
-    sigma, u, _ = tf.linalg.svd(
-        representations, compute_uv=True, full_matrices=False
-    )
+    if self._rank is None:
+      sigma, u, _ = tf.linalg.svd(
+          representations, compute_uv=True, full_matrices=False
+      )
+    else:
+      sigma, u, residual = randomized_svd(
+          representations,
+          self._rank,
+          oversampling=self._oversampling,
+          num_power_iterations=self._num_power_iterations,
+      )
+      self._residual_metric.update_state(
+          tf.math.divide_no_nan(residual, tf.norm(representations))
+      )
     for k, v in self._metric_container.items():
       v.update_state(self._fns[k](representations, sigma=sigma, u=u))
 
   def result(self) -> Mapping[str, tf.Tensor]:
-    return {k: v.result() for k, v in self._metric_container.items()}
+    result = {k: v.result() for k, v in self._metric_container.items()}
+    if self._residual_metric is not None:
+      result["svd_relative_residual"] = self._residual_metric.result()
+    return result
 
 
 class AllSvdMetrics(_SvdMetrics):
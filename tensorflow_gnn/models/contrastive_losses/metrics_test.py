@@ -167,6 +167,51 @@ class MetricsTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllClose(result["numerical_rank"], 1)
     self.assertAllClose(result["rankme"], 1)
 
+  def test_randomized_svd(self):
+    # A rank-3 matrix is recovered exactly by a truncated SVD of rank 3.
+    left = tf.random.stateless_normal((64, 3), seed=(1, 2))
+    right = tf.random.stateless_normal((3, 32), seed=(3, 4))
+    representations = tf.matmul(left, right)
+    expected_sigma = tf.linalg.svd(representations, compute_uv=False)
+    sigma, u, residual = metrics.randomized_svd(representations, 3, seed=5)
+    self.assertAllClose(sigma, expected_sigma[:3], rtol=1e-4, atol=1e-3)
+    self.assertAllClose(tf.matmul(u, u, transpose_a=True), tf.eye(3),
+                        atol=1e-4)
+    self.assertAllClose(residual, 0.0, atol=1e-2)
+
+  def test_randomized_svd_residual(self):
+    representations = tf.random.stateless_normal((32, 16), seed=(1, 2))
+    expected_sigma = tf.linalg.svd(representations, compute_uv=False)
+    sigma, _, residual = metrics.randomized_svd(
+        representations, 4, num_power_iterations=4, seed=3
+    )
+    self.assertAllClose(
+        residual, tf.norm(expected_sigma[4:]), rtol=1e-3, atol=1e-3
+    )
+    self.assertAllGreaterEqual(residual - expected_sigma[4], 0.0)
+    self.assertAllClose(sigma, expected_sigma[:4], rtol=1e-3)
+
+  def test_svd_metrics_truncated(self):
+    left = tf.random.stateless_normal((64, 2), seed=(1, 2))
+    right = tf.random.stateless_normal((2, 32), seed=(3, 4))
+    representations = tf.matmul(left, right)
+    expected = metrics.AllSvdMetrics()
+    expected.update_state(None, representations)
+    metric_object = metrics.AllSvdMetrics(rank=4)
+    metric_object.update_state(None, representations)
+    result = metric_object.result()
+    expected_result = expected.result()
+    self.assertAllClose(result["numerical_rank"],
+                        expected_result["numerical_rank"], rtol=1e-3)
+    self.assertAllClose(result["rankme"], expected_result["rankme"],
+                        rtol=1e-3)
+    self.assertAllClose(result["svd_relative_residual"], 0.0, atol=1e-3)
+    self.assertNotIn("svd_relative_residual", expected_result)
+
+  def test_svd_metrics_bad_rank(self):
+    with self.assertRaisesRegex(ValueError, r"Expected rank > 0"):
+      metrics.AllSvdMetrics(rank=0)
+
 
 if __name__ == "__main__":
   tf.test.main()
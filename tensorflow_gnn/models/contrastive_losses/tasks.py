@@ -68,6 +68,7 @@ class ContrastiveLossTask(runner.Task):
       corruptor: Optional[layers.Corruptor] = None,
       projector_units: Optional[Sequence[int]] = None,
       seed: Optional[int] = None,
+      svd_metrics_rank: Optional[int] = None,
   ):
     """Constructs the `runner.Task`.
 
@@ -86,6 +87,9 @@ class ContrastiveLossTask(runner.Task):
         easy corruptions. For more details, see
         https://arxiv.org/abs/2304.12210.
       seed: Random seed for the default corruptor (`ShuffleFeaturesGlobally`).
+      svd_metrics_rank: If set, the SVD-based metrics of the representations
+        are computed from a randomized truncated SVD of this rank instead of a
+        full SVD. See `AllSvdMetrics` for details.
     """
     self._representations_layer_name = (
         representations_layer_name or "clean_representations"
@@ -103,6 +107,7 @@ class ContrastiveLossTask(runner.Task):
       )
     else:
       self._projector = None
+    self._svd_metrics_rank = svd_metrics_rank
 
   def preprocess(
       self, inputs: GraphTensor
@@ -122,29 +127,32 @@ class ContrastiveLossTask(runner.Task):
       The logits for some contrastive loss as produced by the implementing
       subclass.
     """
-    gt_clean, gt_corrupted = args
-
-    if not tfgnn.is_graph_tensor(gt_clean):
-      raise ValueError(f"Expected a `GraphTensor` input (got {gt_clean})")
-    if not tfgnn.is_graph_tensor(gt_corrupted):
-      raise ValueError(f"Expected a `GraphTensor` input (got {gt_corrupted})")
     if isinstance(tf.distribute.get_strategy(), tf.distribute.TPUStrategy):
       raise AssertionError(
           "Contrastive learning tasks do not support TPU (see b/269648832)."
       )
-
+    x_clean, x_corrupted = self._read_out(*args)
     # Clean representations.
     x_clean = tf.keras.layers.Layer(name=self._representations_layer_name)(
-        self._readout(gt_clean)
+        x_clean
     )
-    # Corrupted representations.
-    x_corrupted = self._readout(gt_corrupted)
     if self._projector:
       x_clean = self._projector(x_clean)
       x_corrupted = self._projector(x_corrupted)
     outputs = tf.stack((x_clean, x_corrupted), axis=1)
     return self.make_contrastive_layer()(outputs)
 
+  def _read_out(
+      self, *args: tfgnn.GraphTensor
+  ) -> tuple[tf.Tensor, tf.Tensor]:
+    """Returns the readouts of the clean and the corrupted graph."""
+    gt_clean, gt_corrupted = args
+    if not tfgnn.is_graph_tensor(gt_clean):
+      raise ValueError(f"Expected a `GraphTensor` input (got {gt_clean})")
+    if not tfgnn.is_graph_tensor(gt_corrupted):
+      raise ValueError(f"Expected a `GraphTensor` input (got {gt_corrupted})")
+    return self._readout(gt_clean), self._readout(gt_corrupted)
+
   @abc.abstractmethod
   def make_contrastive_layer(self) -> tf.keras.layers.Layer:
     """Returns the layer contrasting clean outputs with the correupted ones."""
@@ -153,6 +161,11 @@ class ContrastiveLossTask(runner.Task):
   def metrics(self) -> runner.Metrics:
     return tuple()
 
+  def _svd_metrics(self) -> metrics.AllSvdMetrics:
+    return metrics.AllSvdMetrics(
+        y_pred_transform_fn=_UNSTACK_FN, rank=self._svd_metrics_rank
+    )
+
 
 class _DgiPassthrough(tf.keras.layers.Layer):
   """Applies logits layer and returns both predictions and representations."""
@@ -188,16 +201,71 @@ class _ZeroLoss(tf.keras.losses.Loss):
     return tf.zeros_like(y_pred[..., 0])
 
 
+class _StackGraphFeatures(tf.keras.layers.Layer):
+  """Stacks the features of GraphTensors with the same structure on axis 1.
+
+  The result has the sizes and adjacencies of the first GraphTensor. Each of
+  its features has a new axis 1 that indexes the input GraphTensors.
+  """
+
+  def call(self, graphs: Sequence[GraphTensor]) -> GraphTensor:
+    def stack(pieces):
+      return {
+          name: tf.stack([piece[name] for piece in pieces], axis=1)
+          for name in pieces[0].features
+      }
+
+    first = graphs[0]
+    return first.replace_features(
+        context=stack([graph.context for graph in graphs]),
+        node_sets={
+            name: stack([graph.node_sets[name] for graph in graphs])
+            for name in first.node_sets
+        },
+        edge_sets={
+            name: stack([graph.edge_sets[name] for graph in graphs])
+            for name in first.edge_sets
+        },
+    )
+
+
 class DeepGraphInfomaxTask(ContrastiveLossTask):
-  """A Deep Graph Infomax (DGI) Task."""
+  """A Deep Graph Infomax (DGI) Task.
+
+  By default, `preprocess` returns the clean and the corrupted graph separately,
+  so the model is applied twice. With `single_pass=True`, it returns a single
+  graph with the sizes and adjacencies of the input graph, whose features have
+  the clean and the corrupted values stacked along a new axis 1 (like the
+  inputs of `TripletLossTask`). The model is applied once to it, so the work
+  on the graph structure (like gathering and pooling along edges) is done once
+  for both views, and `predict` unstacks the readouts. This requires a
+  corruptor that only changes feature values and keeps the graph structure
+  (like the default `ShuffleFeaturesGlobally`), and a model that treats axis 1
+  of all features as another batch dimension: layers like `Dense` that act on
+  the last axis and GNN ops that broadcast and pool along axis 0 (as in
+  `vanilla_mpnn.VanillaMPNNGraphUpdate`) qualify; layers that reshape or mix
+  values across that axis (like the attention convolutions) do not.
+  """
 
   def __init__(
       self,
       *args,
+      single_pass: bool = False,
       **kwargs,
   ):
+    """Constructs the `runner.Task`.
+
+    Args:
+      *args: Positional arguments for `ContrastiveLossTask`.
+      single_pass: If true, the features of the clean and corrupted graphs are
+        stacked into one GraphTensor by `preprocess`, and the model is applied
+        once. See the class docstring for details.
+      **kwargs: Keyword arguments for `ContrastiveLossTask`.
+    """
     super().__init__(*args, **kwargs)
     self._logits_layer = layers.DeepGraphInfomaxLogits()
+    self._single_pass = single_pass
+    self._stack_layer = _StackGraphFeatures() if single_pass else None
 
   def make_contrastive_layer(self) -> tf.keras.layers.Layer:
     return _DgiPassthrough(self._logits_layer)
@@ -210,11 +278,29 @@ class DeepGraphInfomaxTask(ContrastiveLossTask):
         for k, v in super().predict(*args).items()
     }
 
+  def _read_out(
+      self, *args: tfgnn.GraphTensor
+  ) -> tuple[tf.Tensor, tf.Tensor]:
+    if not self._single_pass:
+      return super()._read_out(*args)
+    if len(args) != 1:
+      raise ValueError(
+          f"Expected a single `GraphTensor` input (got {len(args)} inputs)"
+      )
+    (graph,) = args
+    if not tfgnn.is_graph_tensor(graph):
+      raise ValueError(f"Expected a `GraphTensor` input (got {graph})")
+    # The clean features come first (see `preprocess`).
+    x_clean, x_corrupted = tf.unstack(self._readout(graph), 2, axis=1)
+    return x_clean, x_corrupted
+
   def preprocess(
       self, inputs: GraphTensor
   ) -> tuple[Sequence[GraphTensor], Mapping[str, Field]]:
     """Creates labels--i.e., (positive, negative)--for Deep Graph Infomax."""
     x = (inputs, self._corruptor(inputs))
+    if self._single_pass:
+      x = (self._stack_layer(x),)
     y_dgi = tf.tile(tf.constant([[0, 1]]), (inputs.num_components, 1))
     y_empty = tf.zeros((inputs.num_components, 0), dtype=tf.int32)
     return x, {"predictions": y_dgi, "representations": y_empty}
@@ -231,9 +317,7 @@ class DeepGraphInfomaxTask(ContrastiveLossTask):
             tf.keras.metrics.BinaryCrossentropy(from_logits=True),
             tf.keras.metrics.BinaryAccuracy(),
         ),
-        "representations": (
-            metrics.AllSvdMetrics(y_pred_transform_fn=_UNSTACK_FN),
-        ),
+        "representations": (self._svd_metrics(),),
     }
 
 
@@ -278,7 +362,7 @@ class BarlowTwinsTask(ContrastiveLossTask):
     return loss_fn
 
   def metrics(self) -> runner.Metrics:
-    return (metrics.AllSvdMetrics(y_pred_transform_fn=_UNSTACK_FN),)
+    return (self._svd_metrics(),)
 
 
 class VicRegTask(ContrastiveLossTask):
@@ -312,7 +396,7 @@ class VicRegTask(ContrastiveLossTask):
     return loss_fn
 
   def metrics(self) -> runner.Metrics:
-    return (metrics.AllSvdMetrics(y_pred_transform_fn=_UNSTACK_FN),)
+    return (self._svd_metrics(),)
 
 
 class TripletLossTask(ContrastiveLossTask):
@@ -308,6 +308,75 @@ class DeepGraphInfomaxTaskTest(tf.test.TestCase):
           self.assertEqual(metric_value.shape, ())
 
 
+class DeepGraphInfomaxSinglePassTest(tf.test.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    tfgnn.enable_graph_tensor_validation_at_runtime()
+
+  def test_preprocess(self):
+    task = tasks.DeepGraphInfomaxTask("node", seed=8191, single_pass=True)
+    gts, pseudolabels = task.preprocess(graph_tensor())
+    self.assertLen(gts, 1)
+    # The graph structure is not repeated for the corrupted view.
+    self.assertAllEqual(gts[0].node_sets["node"].sizes, [2])
+    self.assertAllEqual(gts[0].edge_sets["edge"].adjacency.source, [0, 1])
+    states = gts[0].node_sets["node"][tfgnn.HIDDEN_STATE]
+    self.assertEqual(states.shape, (2, 2, 4))
+    self.assertAllEqual(states[:, 0],
+                        graph_tensor().node_sets["node"][tfgnn.HIDDEN_STATE])
+    self.assertAllEqual(pseudolabels["predictions"], ((0, 1),))
+
+  def test_predict(self):
+    task = tasks.DeepGraphInfomaxTask("node", seed=8191)
+    single_pass_task = tasks.DeepGraphInfomaxTask(
+        "node", seed=8191, single_pass=True
+    )
+    # Use the same corrupted graph for both tasks.
+    corrupted = task.preprocess(graph_tensor())[0][1]
+    model = gnn_static(graph_tensor().spec)
+    expected = task.predict(model(graph_tensor()), model(corrupted))
+
+    stacked = single_pass_task._stack_layer((graph_tensor(), corrupted))
+    actual = single_pass_task.predict(gnn_static(stacked.spec)(stacked))
+    self.assertAllClose(actual["representations"], expected["representations"])
+    self.assertEqual(actual["predictions"].shape, (1, 2))
+
+  def test_bad_parameters(self):
+    task = tasks.DeepGraphInfomaxTask("node", single_pass=True)
+    with self.assertRaisesRegex(ValueError, r"Expected a single"):
+      task.predict(graph_tensor(), graph_tensor())
+    with self.assertRaisesRegex(ValueError, r"Expected a `GraphTensor`"):
+      task.predict(tf.constant(range(8)))
+
+  def test_fit(self):
+    task = tasks.DeepGraphInfomaxTask("node", seed=8191, single_pass=True)
+    ds = tf.data.Dataset.from_tensors(graph_tensor()).repeat()
+    ds = ds.batch(2).map(tfgnn.GraphTensor.merge_batch_to_components)
+
+    # Preprocess in a Keras model, like the runner does.
+    example = next(iter(ds))
+    preprocess_input = tf.keras.Input(type_spec=example.spec)
+    preprocess_model = tf.keras.Model(
+        preprocess_input, task.preprocess(preprocess_input)
+    )
+    ds = ds.map(preprocess_model).take(5)
+
+    gts, _ = next(iter(ds))
+    self.assertLen(gts, 1)
+    inputs = [tf.keras.Input(type_spec=gt.spec) for gt in gts]
+    model = gnn_real(inputs[0].spec)
+    outputs = task.predict(*[model(i) for i in inputs])
+
+    predicted = tf.keras.Model(inputs, outputs)
+    predicted.compile(loss=task.losses(), metrics=task.metrics())
+
+    before = predicted.evaluate(ds)
+    predicted.fit(ds)
+
+    self.assertLess(predicted.evaluate(ds), before)
+
+
 class BarlowTwinsTaskTest(tf.test.TestCase):
   task = tasks.BarlowTwinsTask("node", seed=8191)
 
@@ -37,6 +37,7 @@ def graph_update_get_config_dict() -> config_dict.ConfigDict:
   cfg.attention_activation = "leaky_relu"
   cfg.conv_activation = "relu"
   cfg.activation = "relu"
+  cfg.recompute_grad = False
   cfg.lock()
   # LINT.ThenChange(./layers.py:GATv2MPNNGraphUpdate_args)
   return cfg
@@ -172,7 +172,8 @@ class GATv2Conv(tfgnn.keras.layers.AnyToAnyConvolutionBase):
       raise ValueError(f"Edge dropout {edge_dropout} must be in [0, 1).")
     self._edge_dropout = edge_dropout
     if self._edge_dropout > 0:
-      self._edge_dropout_layer = tf.keras.layers.Dropout(self._edge_dropout)
+      self._edge_dropout_layer = tfgnn.keras.layers.RecomputableDropout(
+          self._edge_dropout)
     else:
       self._edge_dropout_layer = None
 
@@ -518,6 +519,7 @@ def GATv2MPNNGraphUpdate(  # To be called like a class initializer.  pylint: dis
     conv_activation: Union[str, Callable[..., Any]] = "relu",
     activation: Union[str, Callable[..., Any]] = "relu",
     kernel_initializer: Any = "glorot_uniform",
+    recompute_grad: bool = False,
     # LINT.ThenChange(./config_dict.py:graph_update_get_config_dict)
 ) -> tf.keras.layers.Layer:
   """Returns a GraphUpdate layer for message passing with GATv2 pooling.
@@ -564,6 +566,10 @@ def GATv2MPNNGraphUpdate(  # To be called like a class initializer.  pylint: dis
       this graph update.
     kernel_initializer: Can be set to a `kernel_initializer` as understood
       by `tf.keras.layers.Dense` etc.
+    recompute_grad: If true, the intermediate results of the returned
+      GraphUpdate are recomputed during backpropagation instead of being kept
+      in memory; see `tfgnn.keras.layers.GraphUpdate`. Dropout is repeated
+      exactly in the recomputation. Defaults to false.
 
   Returns:
     A GraphUpdate layer for use on a scalar GraphTensor with
@@ -586,7 +592,7 @@ def GATv2MPNNGraphUpdate(  # To be called like a class initializer.  pylint: dis
             bias_initializer="zeros",
             kernel_regularizer=regularizer,
             bias_regularizer=regularizer),
-        tf.keras.layers.Dropout(state_dropout_rate)])
+        tfgnn.keras.layers.RecomputableDropout(state_dropout_rate)])
 
   # pylint: disable=g-long-lambda
   gnn_builder = tfgnn.keras.ConvGNNBuilder(
@@ -600,5 +606,6 @@ def GATv2MPNNGraphUpdate(  # To be called like a class initializer.  pylint: dis
           kernel_initializer=tfgnn.keras.clone_initializer(kernel_initializer)),
       lambda node_set_name: tfgnn.keras.layers.NextStateFromConcat(
           dense(units)),
-      receiver_tag=receiver_tag)
+      receiver_tag=receiver_tag,
+      recompute_grad=recompute_grad)
   return gnn_builder.Convolve(node_set_names)
@@ -218,13 +218,20 @@ class GCNConv(tf.keras.layers.Layer):
       # If node_tag is receiver, this function computes the in_degree of nodes
       # and if node_tag is sender, it comptes the out_degree of nodes.
       # Shape of node_degree is [nnodes, 1]
-      node_degree = tfgnn.pool_edges_to_node(
-          graph,
-          edge_set_name,
-          node_tag,
-          'sum',
-          feature_value=edge_weights,
-      )
+      if self._edge_weight_feature_name is not None:
+        node_degree = tfgnn.pool_edges_to_node(
+            graph,
+            edge_set_name,
+            node_tag,
+            'sum',
+            feature_value=edge_weights,
+        )
+      else:
+        # Unweighted degrees come for free with a CsrAdjacency.
+        node_degree = tf.expand_dims(
+            tf.cast(tfgnn.node_degree(graph, edge_set_name, node_tag),
+                    edge_weights.dtype),
+            axis=-1)
       # Adding self-loops connects each node to itself.
       # This adds 1 to each diagonal element of the degree matrix
       if self._add_self_loops:
@@ -260,16 +267,22 @@ class GCNConv(tf.keras.layers.Layer):
     else:
       normalized_values = graph.node_sets[sender_name][self._node_feature]
 
-    source_bcast = tfgnn.broadcast_node_to_edges(
-        graph,
-        edge_set_name,
-        self._sender,
-        feature_value=normalized_values,
-    )
     if self._edge_weight_feature_name is not None:
+      source_bcast = tfgnn.broadcast_node_to_edges(
+          graph,
+          edge_set_name,
+          self._sender,
+          feature_value=normalized_values,
+      )
       source_bcast = source_bcast * edge_weights
-    pooled = tfgnn.pool_edges_to_node(
-        graph, edge_set_name, self._receiver, 'sum', feature_value=source_bcast)
+      pooled = tfgnn.pool_edges_to_node(
+          graph, edge_set_name, self._receiver, 'sum',
+          feature_value=source_bcast)
+    else:
+      # Lets a CsrAdjacency sorted by receiver use a sparse-dense matmul.
+      pooled = tfgnn.pool_neighbors_to_node(
+          graph, edge_set_name, self._receiver, reduce_type='sum',
+          from_tag=self._sender, feature_value=normalized_values)
     if receiver_scale is not None:
       pooled = receiver_scale * pooled
 
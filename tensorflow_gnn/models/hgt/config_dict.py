@@ -31,6 +31,7 @@ def graph_update_get_config_dict() -> config_dict.ConfigDict:
   cfg.use_layer_norm = config_dict.placeholder(bool)
   cfg.use_bias = config_dict.placeholder(bool)
   cfg.activation = config_dict.placeholder(str)
+  cfg.use_grouped_projections = config_dict.placeholder(bool)
   # LINT.ThenChange(./layers.py:HGTGraphUpdate_args)
   cfg.lock()
   return cfg
@@ -17,11 +17,14 @@
 This file contains an implementation of HGT from Hu et al. 2020.
 """
 import collections
-from typing import Any, Callable, Union
+from typing import Any, Callable, List, Union
 
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 
+# The number of rows per block in the batched einsum of grouped projections.
+_GROUPED_EINSUM_BLOCK_SIZE = 128
+
 
 @tf.keras.utils.register_keras_serializable(package='GNN>models>hgt')
 class HGTGraphUpdate(tf.keras.layers.Layer):
@@ -60,6 +63,13 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
       if not set explicitly. For more, see `tfgnn.keras.clone_initializer()`.
     use_bias: If True, bias terms are added to the transformations of query,
       key, message, and aggregation inputs.
+    use_grouped_projections: If True, the per-type projections are computed
+      with one batched einsum over all node sets (per input size) and one over
+      all edge sets, instead of one small matmul per type. The rows of each
+      type are padded to a multiple of a fixed block size (128 rows), so the
+      cost stays proportional to the number of rows, and the number of ops
+      no longer grows with the number of types. The weights and the results
+      are the same in both modes.
     name: Optionally, a name for the layer returned.
     **kwargs: Arguments for the Layer base class.
   """
@@ -78,6 +88,7 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
       use_bias: bool = True,
       activation: Union[str, Callable[..., Any]] = 'gelu',
       feature_name: str = tfgnn.HIDDEN_STATE,
+      use_grouped_projections: bool = False,
       **kwargs,
       # LINT.ThenChange(./config_dict.py:graph_update_get_config_dict)
   ):
@@ -93,6 +104,7 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
     self._use_bias = use_bias
     self._activation = tf.keras.activations.get(activation)
     self._feature_name = feature_name
+    self._use_grouped_projections = use_grouped_projections
     # The following attributes are initialized by _maybe_init_from_spec().
     # See comments there for why they are already created here.
     self._edge_set_names = None
@@ -123,6 +135,7 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
         use_bias=self._use_bias,
         activation=self._activation,
         feature_name=self._feature_name,
+        use_grouped_projections=self._use_grouped_projections,
         **super().get_config(),
     )
 
@@ -167,6 +180,9 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
       with tf.init_scope():
         self._do_init_trackables()
     assert not self._need_init_trackables()
+    if self._use_grouped_projections:
+      with tf.init_scope():
+        self._maybe_build_projections(graph.spec)
     return self._graph_update(graph)
 
   def _need_init_nontrackables(self):
@@ -337,6 +353,24 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
           name=f'priors_{edge_set_name}',
       )
 
+  def _maybe_build_projections(self, spec: tfgnn.GraphTensorSpec):
+    """Builds the projections that are not called in grouped mode."""
+    for projections, node_set_names in [
+        (self._key_projections, self._senders),
+        (self._message_projections, self._senders),
+        (self._query_projections, self._receivers)]:
+      for node_set_name in node_set_names:
+        layer = projections[node_set_name]
+        if not layer.built:
+          shape = spec.node_sets_spec[node_set_name][self._feature_name].shape
+          layer.build(tf.TensorShape([None, shape[-1]]))
+    shape = tf.TensorShape([None, self._num_heads, self._per_head_channels])
+    for projections in [self._edge_type_attention_projections,
+                        self._edge_type_message_projections]:
+      for layer in projections.values():
+        if not layer.built:
+          layer.build(shape)
+
   # The following helpers map back and forth between tensors with...
   #  - a separate heads dimension: shape [..., num_heads, channels_per_head],
   #  - all heads concatenated:    shape [..., num_heads * channels_per_head].
@@ -366,10 +400,8 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
     new_shape = (-1, *extra_dims, merged_dims.num_elements())
     return tf.reshape(tensor, new_shape)
 
-  def _graph_update(self, graph: tfgnn.GraphTensor) -> tfgnn.GraphTensor:
-    receiver_tag = self._receiver_tag
-    sender_tag = tfgnn.reverse_tag(receiver_tag)
-
+  def _node_projections(self, graph: tfgnn.GraphTensor):
+    """Returns keys and messages by sender and queries by receiver."""
     # Compute keys and messages for senders
     keys_by_sender = {}
     messages_by_sender = {}
@@ -389,6 +421,97 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
       queries_by_receiver[node_set_name] = self._split_heads(
           self._query_projections[node_set_name](x),
       )
+    return keys_by_sender, messages_by_sender, queries_by_receiver
+
+  def _grouped_node_projections(self, graph: tfgnn.GraphTensor):
+    """Like _node_projections(), with one einsum per group of input sizes."""
+    units = self._num_heads * self._per_head_channels
+
+    def project(node_set_names, projections_list):
+      """Returns the concatenated projections for each node set."""
+      # Node sets can only share a kernel shape if their input sizes agree.
+      names_by_size = collections.defaultdict(list)
+      for node_set_name in sorted(node_set_names):
+        x = graph.node_sets[node_set_name][self._feature_name]
+        names_by_size[x.shape[-1]].append(node_set_name)
+      result = {}
+      for names in names_by_size.values():
+        inputs = []
+        kernels = []
+        biases = []
+        for node_set_name in names:
+          x = graph.node_sets[node_set_name][self._feature_name]
+          inputs.append(tf.cast(tf.reshape(x, [-1, x.shape[-1]]),
+                                self.compute_dtype))
+          dense_layers = [projections[node_set_name]
+                          for projections in projections_list]
+          kernels.append(tf.concat([l.kernel for l in dense_layers], axis=-1))
+          if self._use_bias:
+            biases.append(tf.concat([l.bias for l in dense_layers], axis=-1))
+        outputs = _grouped_einsum(
+            'gnd,gdu->gnu', inputs,
+            tf.cast(tf.stack(kernels), self.compute_dtype))
+        for i, node_set_name in enumerate(names):
+          y = outputs[i]
+          if self._use_bias:
+            y += tf.cast(biases[i], self.compute_dtype)
+          x = graph.node_sets[node_set_name][self._feature_name]
+          y = tf.reshape(y, [-1, *x.shape[1:-1], y.shape[-1]])
+          result[node_set_name] = [
+              self._split_heads(t)
+              for t in tf.split(y, [units] * len(projections_list), axis=-1)]
+      return result
+
+    keys_and_messages = project(
+        self._senders, [self._key_projections, self._message_projections])
+    keys_by_sender = {k: v[0] for k, v in keys_and_messages.items()}
+    messages_by_sender = {k: v[1] for k, v in keys_and_messages.items()}
+    queries_by_receiver = {
+        k: v[0]
+        for k, v in project(self._receivers, [self._query_projections]).items()
+    }
+    return keys_by_sender, messages_by_sender, queries_by_receiver
+
+  def _grouped_edge_projections(self, graph: tfgnn.GraphTensor,
+                                messages_by_sender, queries_by_receiver):
+    """Returns the messages and queries by edge set from one einsum each."""
+    receiver_tag = self._receiver_tag
+    sender_tag = tfgnn.reverse_tag(receiver_tag)
+
+    def project(projections, values_by_node_set, tag):
+      inputs = [values_by_node_set[
+          graph.edge_sets[edge_set_name].adjacency.node_set_name(tag)]
+                for edge_set_name in self._edge_set_names]
+      # All relation matrices have shape [num_heads, channels, channels].
+      kernels = tf.stack([projections[edge_set_name].kernel
+                          for edge_set_name in self._edge_set_names])
+      outputs = _grouped_einsum(
+          'gnhc,ghcd->gnhd',
+          [tf.reshape(x, [-1, *x.shape[-2:]]) for x in inputs],
+          tf.cast(kernels, self.compute_dtype))
+      return {
+          edge_set_name: tf.reshape(y, [-1, *x.shape[1:]])
+          for edge_set_name, x, y in zip(self._edge_set_names, inputs, outputs)
+      }
+
+    return (project(self._edge_type_message_projections, messages_by_sender,
+                    sender_tag),
+            project(self._edge_type_attention_projections, queries_by_receiver,
+                    receiver_tag))
+
+  def _graph_update(self, graph: tfgnn.GraphTensor) -> tfgnn.GraphTensor:
+    receiver_tag = self._receiver_tag
+    sender_tag = tfgnn.reverse_tag(receiver_tag)
+
+    if self._use_grouped_projections:
+      keys_by_sender, messages_by_sender, queries_by_receiver = (
+          self._grouped_node_projections(graph))
+      relation_messages, relation_queries = self._grouped_edge_projections(
+          graph, messages_by_sender, queries_by_receiver)
+    else:
+      keys_by_sender, messages_by_sender, queries_by_receiver = (
+          self._node_projections(graph))
+      relation_messages = relation_queries = None
 
     # Broadcast the scores and messages over the edge sets
     messages_by_edge_set = {}
@@ -402,8 +525,11 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
       sender_name = edge_set.adjacency.node_set_name(sender_tag)
       receiver_name = edge_set.adjacency.node_set_name(receiver_tag)
 
-      messages = self._edge_type_message_projections[edge_set_name](
-          messages_by_sender[sender_name])
+      if relation_messages is not None:
+        messages = relation_messages[edge_set_name]
+      else:
+        messages = self._edge_type_message_projections[edge_set_name](
+            messages_by_sender[sender_name])
       messages_by_edge_set[edge_set_name] = tfgnn.broadcast_node_to_edges(
           graph,
           edge_set_name,
@@ -416,8 +542,11 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
           sender_tag,
           feature_value=keys_by_sender[sender_name],
       )
-      queries = self._edge_type_attention_projections[edge_set_name](
-          queries_by_receiver[receiver_name])
+      if relation_queries is not None:
+        queries = relation_queries[edge_set_name]
+      else:
+        queries = self._edge_type_attention_projections[edge_set_name](
+            queries_by_receiver[receiver_name])
       queries = tfgnn.broadcast_node_to_edges(
           graph,
           edge_set_name,
@@ -481,3 +610,44 @@ class HGTGraphUpdate(tf.keras.layers.Layer):
       updated_node_features[node_set_name] = features
 
     return graph.replace_features(node_sets=updated_node_features)
+
+
+def _grouped_einsum(equation: str, inputs: List[tf.Tensor],
+                    kernels: tf.Tensor) -> List[tf.Tensor]:
+  """Applies `kernels[i]` to `inputs[i]` for all i with one batched einsum.
+
+  The rows of all inputs are concatenated in order (that is, sorted by type)
+  and cut into blocks of `_GROUPED_EINSUM_BLOCK_SIZE` rows, padding each input
+  only up to the next multiple of the block size. The kernel of each block is
+  gathered by its type, and one einsum batched over the blocks multiplies
+  them. Unlike padding every input to the largest one, this keeps memory and
+  FLOPs proportional to the actual number of rows, even for skewed sizes.
+
+  Args:
+    equation: An einsum equation for the stacked inputs and kernels, with the
+      group dimension `g` first and the item dimension `n` second on inputs
+      and outputs, like `'gnd,gdu->gnu'`.
+    inputs: A list of tensors whose shapes agree except in the first dimension.
+    kernels: The kernels stacked along a new first dimension.
+
+  Returns:
+    The list of results, one for each tensor in `inputs`.
+  """
+  if len(inputs) == 1:
+    return [tf.einsum(equation, inputs[0][tf.newaxis], kernels)[0]]
+  block_size = _GROUPED_EINSUM_BLOCK_SIZE
+  sizes = [tf.shape(x)[0] for x in inputs]
+  num_blocks = [(size + block_size - 1) // block_size for size in sizes]
+  padded = [
+      tf.pad(x, [[0, n * block_size - size]] + [[0, 0]] * (x.shape.rank - 1))
+      for x, size, n in zip(inputs, sizes, num_blocks)]
+  item_shape = inputs[0].shape[1:]
+  blocks = tf.reshape(tf.concat(padded, axis=0),
+                      [-1, block_size, *item_shape])
+  block_kernels = tf.gather(
+      kernels, tf.repeat(tf.range(len(inputs)), tf.stack(num_blocks)))
+  outputs = tf.einsum(equation, blocks, block_kernels)
+  outputs = tf.reshape(outputs, [-1, *outputs.shape[2:]])
+  outputs = tf.split(outputs, tf.stack(num_blocks) * block_size,
+                     num=len(inputs), axis=0)
+  return [y[:size] for y, size in zip(outputs, sizes)]
@@ -113,6 +113,38 @@ def _parallel_vee_example_graph():
   )
 
 
+def _many_types_example_graph():
+  """Returns a graph with node sets of different sizes and state dims."""
+  def edge_set(source, target):
+    return tfgnn.EdgeSet.from_fields(
+        sizes=[len(source[1])],
+        adjacency=tfgnn.Adjacency.from_indices(source=source, target=target))
+
+  return tfgnn.GraphTensor.from_pieces(
+      node_sets={
+          "a": tfgnn.NodeSet.from_fields(
+              sizes=[3],
+              features={tfgnn.HIDDEN_STATE: tf.reshape(
+                  tf.range(12, dtype=tf.float32), [3, 4]) / 12.0}),
+          "b": tfgnn.NodeSet.from_fields(
+              sizes=[2],
+              features={tfgnn.HIDDEN_STATE: tf.constant(
+                  [[1.0, -1.0, 0.5, 0.0], [0.0, 2.0, -0.5, 1.0]])}),
+          "c": tfgnn.NodeSet.from_fields(
+              sizes=[4],
+              features={tfgnn.HIDDEN_STATE: tf.constant(
+                  [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0], [-1.0, 0.5]])}),
+      },
+      edge_sets={
+          "a->a": edge_set(("a", [0, 1, 2]), ("a", [1, 2, 0])),
+          "a->b": edge_set(("a", [0, 2]), ("b", [1, 0])),
+          "b->a": edge_set(("b", [0, 1, 1]), ("a", [0, 1, 2])),
+          "c->a": edge_set(("c", [0, 1, 2, 3]), ("a", [0, 0, 1, 2])),
+          "c->b": edge_set(("c", [3, 2]), ("b", [0, 1])),
+      },
+  )
+
+
 class HgtTest(tf.test.TestCase, parameterized.TestCase):
 
   def setUp(self):
@@ -723,6 +755,70 @@ class HgtTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllEqual(got.shape, (3, 2))
     self.assertAllEqual(got, layer_before_engine_state)
 
+  @parameterized.named_parameters(("", False), ("NoBias", True))
+  def test_grouped_projections(self, no_bias):
+    graph = _many_types_example_graph()
+    kwargs = dict(num_heads=2, per_head_channels=2, receiver_tag=tfgnn.TARGET,
+                  dropout_rate=0.0, use_bias=not no_bias,
+                  kernel_initializer="glorot_uniform")
+    conv = layers.HGTGraphUpdate(**kwargs)
+    grouped_conv = layers.HGTGraphUpdate(use_grouped_projections=True,
+                                         **kwargs)
+    expected = conv(graph)
+    _ = grouped_conv(graph)
+    self.assertEqual(
+        [v.shape for v in conv.weights], [v.shape for v in grouped_conv.weights])
+    grouped_conv.set_weights(conv.get_weights())
+    actual = grouped_conv(graph)
+    for node_set_name in ["a", "b"]:
+      self.assertAllClose(
+          expected.node_sets[node_set_name][tfgnn.HIDDEN_STATE],
+          actual.node_sets[node_set_name][tfgnn.HIDDEN_STATE])
+
+  def test_grouped_einsum_skewed_sizes(self):
+    # Sizes that span several blocks, fit exactly, or are empty.
+    sizes = [300, 1, 0, 128]
+    inputs = [tf.random.normal([size, 3]) for size in sizes]
+    kernels = tf.random.normal([len(sizes), 3, 5])
+    actual = layers._grouped_einsum("gnd,gdu->gnu", inputs, kernels)
+    self.assertLen(actual, len(sizes))
+    for i, (x, y) in enumerate(zip(inputs, actual)):
+      self.assertAllClose(tf.matmul(x, kernels[i]), y, msg=f"i={i}")
+
+  def test_grouped_projections_ndim_input(self):
+    test_graph = _homogeneous_cycle_graph(
+        tf.reshape(tf.range(18, dtype=tf.float32), (3, 2, 3)))
+    kwargs = dict(num_heads=1, per_head_channels=3, receiver_tag=tfgnn.TARGET,
+                  dropout_rate=0.0)
+    conv = layers.HGTGraphUpdate(**kwargs)
+    grouped_conv = layers.HGTGraphUpdate(use_grouped_projections=True,
+                                         **kwargs)
+    expected = conv(test_graph).node_sets["nodes"][tfgnn.HIDDEN_STATE]
+    _ = grouped_conv(test_graph)
+    grouped_conv.set_weights(conv.get_weights())
+    actual = grouped_conv(test_graph).node_sets["nodes"][tfgnn.HIDDEN_STATE]
+    self.assertAllClose(expected, actual)
+
+  @parameterized.named_parameters(
+      ("", tftu.ModelReloading.SKIP),
+      ("Restored", tftu.ModelReloading.SAVED_MODEL),
+      ("RestoredKeras", tftu.ModelReloading.KERAS))
+  def test_grouped_projections_saving(self, model_reloading):
+    graph = _many_types_example_graph()
+    inputs = tf.keras.layers.Input(type_spec=graph.spec)
+    layer = layers.HGTGraphUpdate(
+        num_heads=2, per_head_channels=2, receiver_tag=tfgnn.TARGET,
+        dropout_rate=0.0, use_grouped_projections=True)
+    model = tf.keras.Model(inputs, layer(inputs))
+    expected = model(graph).node_sets["a"][tfgnn.HIDDEN_STATE]
+    model = tftu.maybe_reload_model(self, model, model_reloading,
+                                    "hgt-grouped-model")
+    actual = model(graph).node_sets["a"][tfgnn.HIDDEN_STATE]
+    self.assertAllClose(expected, actual)
+    if tftu.is_keras_model_reloading(model_reloading):
+      self.assertTrue(
+          model.get_layer(index=1).get_config()["use_grouped_projections"])
+
   @parameterized.named_parameters(("baseline", False), ("", True))
   def test_ignores_readout(self, add_readout):
     test_graph = _heterogeneous_example_graph(add_readout=add_readout)
@@ -35,6 +35,7 @@ def graph_update_get_config_dict() -> config_dict.ConfigDict:
   cfg.attention_num_heads = 4
   cfg.simple_conv_reduce_type = "mean"
   cfg.simple_conv_use_receiver_state = True
+  cfg.simple_conv_decompose_message = False
   cfg.state_dropout_rate = 0.0
   cfg.edge_dropout_rate = 0.0
   cfg.l2_regularization = 0.0
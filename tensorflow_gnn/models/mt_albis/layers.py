@@ -34,6 +34,7 @@ def MtAlbisSimpleConv(  # To be called like a class initializer.  pylint: disabl
     edge_feature_name: Optional[tfgnn.FieldName] = None,
     kernel_initializer: Any = "glorot_uniform",
     kernel_regularizer: Any = None,
+    decompose_message: bool = False,
     name: Optional[str] = None,
 ) -> tf.keras.layers.Layer:
   """Returns a Layer object for the non-attention flavor of Conv in MtAlbis.
@@ -66,6 +67,9 @@ def MtAlbisSimpleConv(  # To be called like a class initializer.  pylint: disabl
       if not set explicitly. For more, see `tfgnn.keras.clone_initializer()`.
     kernel_regularizer: Can be set to a `kernel_regularizer` as understood
       by `tf.keras.layers.Dense` etc.
+    decompose_message: If true, the node states are multiplied with the
+      message weights once per node before broadcasting to edges, instead of
+      once per edge. See `tfgnn.keras.layers.SimpleConv` for details.
     name: Optionally, a Layer.name for the returned object.
   """
   message_fn = tf.keras.Sequential([
@@ -85,6 +89,7 @@ def MtAlbisSimpleConv(  # To be called like a class initializer.  pylint: disabl
       receiver_tag=receiver_tag,
       receiver_feature=(tfgnn.HIDDEN_STATE if use_receiver_state else None),
       sender_edge_feature=edge_feature_name,
+      decompose_message=decompose_message,
       name=name)
 
 
@@ -253,6 +258,7 @@ def MtAlbisGraphUpdate(  # To be called like a class initializer.  pylint: disab
     attention_num_heads: int = 4,
     simple_conv_reduce_type: str = "mean",
     simple_conv_use_receiver_state: bool = True,
+    simple_conv_decompose_message: bool = False,
     state_dropout_rate: float = 0.0,
     edge_dropout_rate: float = 0.0,
     l2_regularization: float = 0.0,
@@ -298,6 +304,11 @@ def MtAlbisGraphUpdate(  # To be called like a class initializer.  pylint: disab
     simple_conv_use_receiver_state: For attention_type `"none"`, controls
       whether the receiver node state is used in computing each edge's message
       (in addition to the sender node state and possibly an `edge feature`).
+    simple_conv_decompose_message: For attention_type `"none"`, controls
+      whether the node states are multiplied with the message weights once per
+      node before broadcasting them to edges, instead of once per edge. This
+      computes the same messages with fewer operations if there are many more
+      edges than nodes.
     state_dropout_rate: The dropout rate applied to the pooled and combined
       messages from all edges, to the optional input from context, and to the
       new node state. This is conventional dropout, independently for each
@@ -347,6 +358,7 @@ def MtAlbisGraphUpdate(  # To be called like a class initializer.  pylint: disab
           reduce_type=simple_conv_reduce_type,
           edge_dropout_rate=edge_dropout_rate,
           use_receiver_state=simple_conv_use_receiver_state,
+          decompose_message=simple_conv_decompose_message,
           edge_feature_name=edge_feature_name,
           kernel_initializer=kernel_initializer,  # Cloned by the layer.
           kernel_regularizer=kernel_regularizer)
@@ -35,6 +35,7 @@ def graph_update_get_config_dict() -> config_dict.ConfigDict:
   cfg.state_dropout_rate = 0.0
   cfg.conv_activation = "relu"
   cfg.activation = "relu"
+  cfg.recompute_grad = False
   cfg.lock()
   # LINT.ThenChange(./layers.py:MultiHeadAttentionMPNNGraphUpdate_args)
   return cfg
@@ -231,8 +231,10 @@ class MultiHeadAttentionConv(tfgnn.keras.layers.AnyToAnyConvolutionBase):
 
     # Create dropout layers. Note that if the dropout rate is zero, then the
     # layer will just be a pass-through.
-    self._edge_dropout_layer = tf.keras.layers.Dropout(edge_dropout)
-    self._inputs_dropout_layer = tf.keras.layers.Dropout(inputs_dropout)
+    self._edge_dropout_layer = tfgnn.keras.layers.RecomputableDropout(
+        edge_dropout)
+    self._inputs_dropout_layer = tfgnn.keras.layers.RecomputableDropout(
+        inputs_dropout)
 
     # Check for conflicting options.
     if attention_activation is not None and score_scaling != "none":
@@ -709,6 +711,7 @@ def MultiHeadAttentionMPNNGraphUpdate(  # To be called like a class initializer.
     conv_activation: Union[str, Callable[..., Any]] = "relu",
     activation: Union[str, Callable[..., Any]] = "relu",
     kernel_initializer: Any = "glorot_uniform",
+    recompute_grad: bool = False,
     # LINT.ThenChange(./config_dict.py:graph_update_get_config_dict)
 ) -> tf.keras.layers.Layer:
   """Returns a GraphUpdate layer for message passing with MultiHeadAttention pooling.
@@ -755,6 +758,10 @@ def MultiHeadAttentionMPNNGraphUpdate(  # To be called like a class initializer.
       by `tf.keras.layers.Dense` etc.
       An `Initializer` object gets cloned before use to ensure a fresh seed,
       if not set explicitly. For more, see `tfgnn.keras.clone_initializer()`.
+    recompute_grad: If true, the intermediate results of the returned
+      GraphUpdate are recomputed during backpropagation instead of being kept
+      in memory; see `tfgnn.keras.layers.GraphUpdate`. Dropout is repeated
+      exactly in the recomputation. Defaults to false.
 
   Returns:
     A GraphUpdate layer for use on a scalar GraphTensor with
@@ -777,7 +784,7 @@ def MultiHeadAttentionMPNNGraphUpdate(  # To be called like a class initializer.
             bias_initializer="zeros",
             kernel_regularizer=regularizer,
             bias_regularizer=regularizer),
-        tf.keras.layers.Dropout(state_dropout_rate)
+        tfgnn.keras.layers.RecomputableDropout(state_dropout_rate)
     ])
 
   # pylint: disable=g-long-lambda
@@ -793,5 +800,6 @@ def MultiHeadAttentionMPNNGraphUpdate(  # To be called like a class initializer.
           kernel_initializer=kernel_initializer),  # Cloned by the layer.
       lambda node_set_name: tfgnn.keras.layers.NextStateFromConcat(
           dense(units)),
-      receiver_tag=receiver_tag)
+      receiver_tag=receiver_tag,
+      recompute_grad=recompute_grad)
   return gnn_builder.Convolve(node_set_names)
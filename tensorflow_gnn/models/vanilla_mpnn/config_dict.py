@@ -33,6 +33,7 @@ def graph_update_get_config_dict() -> config_dict.ConfigDict:
   cfg.l2_regularization = 0.0
   cfg.dropout_rate = 0.0
   cfg.use_layer_normalization = False
+  cfg.decompose_message = False
   cfg.lock()
   # LINT.ThenChange(./layers.py:VanillaMPNNGraphUpdate_args)
   return cfg
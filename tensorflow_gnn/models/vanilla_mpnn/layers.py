@@ -32,6 +32,7 @@ def VanillaMPNNGraphUpdate(  # To be called like a class initializer.  pylint: d
     dropout_rate: float = 0.0,
     kernel_initializer: Any = "glorot_uniform",
     use_layer_normalization: bool = False,
+    decompose_message: bool = False,
     # LINT.ThenChange(./config_dict.py:graph_update_get_config_dict)
 ) -> tf.keras.layers.Layer:
   r"""Returns a GraphUpdate layer for a Vanilla MPNN.
@@ -86,6 +87,11 @@ def VanillaMPNNGraphUpdate(  # To be called like a class initializer.  pylint: d
       if not set explicitly. For more, see `tfgnn.keras.clone_initializer()`.
     use_layer_normalization: Flag to determine whether to apply layer
       normalization to the new node state.
+    decompose_message: If true, the message layer multiplies the node states
+      with its weights once per node before broadcasting them to edges,
+      instead of once per edge. The messages are the same (up to float
+      rounding), but fewer operations are needed if there are many more edges
+      than nodes. See `tfgnn.keras.layers.SimpleConv` for details.
 
   Returns:
     A GraphUpdate layer for use on a scalar GraphTensor with
@@ -112,7 +118,8 @@ def VanillaMPNNGraphUpdate(  # To be called like a class initializer.  pylint: d
   gnn_builder = tfgnn.keras.ConvGNNBuilder(
       lambda edge_set_name, receiver_tag: tfgnn.keras.layers.SimpleConv(
           dense(message_dim), reduce_type, receiver_tag=receiver_tag,
-          sender_edge_feature=edge_feature),
+          sender_edge_feature=edge_feature,
+          decompose_message=decompose_message),
       lambda node_set_name: tfgnn.keras.layers.NextStateFromConcat(
           dense(units, use_layer_normalization=use_layer_normalization)),
       receiver_tag=receiver_tag)
@@ -43,10 +43,11 @@ class VanillaMPNNTest(tf.test.TestCase, parameterized.TestCase):
     # Node "b" receives message 1+2+16 = 19 and combines it with old state 2.
     self.assertAllEqual([[21.]*units], graph.node_sets["b"][tfgnn.HIDDEN_STATE])
 
-  @parameterized.named_parameters(("WithoutLayerNorm", False),
-                                  ("WithLayerNorm", True))
+  @parameterized.named_parameters(("WithoutLayerNorm", False, False),
+                                  ("WithLayerNorm", True, False),
+                                  ("DecomposeMessage", False, True))
   def testVanillaMPNNGraphUpdateWithCustomKernelInitializer(
-      self, use_layer_normalization):
+      self, use_layer_normalization, decompose_message):
     input_graph = _make_test_graph_abc()
     # To ensure that the updated node-state has non-identical entries
     kernel_initializer = tf.constant_initializer([[1., 1.],
@@ -60,7 +61,8 @@ class VanillaMPNNTest(tf.test.TestCase, parameterized.TestCase):
         node_set_names=["b"],
         edge_feature="fab",
         kernel_initializer=kernel_initializer,
-        use_layer_normalization=use_layer_normalization)
+        use_layer_normalization=use_layer_normalization,
+        decompose_message=decompose_message)
     graph = layer(input_graph)
 
     # Nodes "a" and "c" are unchanged.
@@ -42,6 +42,7 @@ from tensorflow_gnn.utils import api_utils
 # Same order as in the proto file.
 GraphSchema = graph_schema.GraphSchema
 Feature = graph_schema.Feature
+Quantization = graph_schema.Quantization
 BigQuery = graph_schema.BigQuery
 Metadata = graph_schema.Metadata
 Context = graph_schema.Context
@@ -38,6 +38,11 @@ Feature.__doc__ = """\
 The schema entry for a single feature.
 """ + _SEE_PROTOFILE_SUFFIX
 
+Quantization = graph_schema_pb2.Quantization
+Quantization.__doc__ = """
+Describes how a floating-point feature is stored with reduced precision.
+""" + _SEE_PROTOFILE_SUFFIX
+
 BigQuery = graph_schema_pb2.BigQuery
 BigQuery.__doc__ = """
 Describes a BigQuery table or SQL statement as datasource of a graph piece.
@@ -15,6 +15,7 @@
 """A general purpose runner for TF-GNN."""
 # pylint: disable=line-too-long
 
+from tensorflow_gnn.runner import batch_prediction
 from tensorflow_gnn.runner import interfaces
 from tensorflow_gnn.runner import orchestration
 from tensorflow_gnn.runner.input import datasets
@@ -23,6 +24,7 @@ from tensorflow_gnn.runner.tasks import link_prediction
 from tensorflow_gnn.runner.tasks import regression
 from tensorflow_gnn.runner.trainers import keras_fit
 from tensorflow_gnn.runner.utils import attribution
+from tensorflow_gnn.runner.utils import input_diagnostics
 from tensorflow_gnn.runner.utils import label_fns
 from tensorflow_gnn.runner.utils import model_dir
 from tensorflow_gnn.runner.utils import model_export
@@ -37,6 +39,10 @@ from tensorflow_gnn.utils import api_utils
 # Attribution
 integrated_gradients = attribution.integrated_gradients
 
+# Batch prediction
+BatchPredictionResult = batch_prediction.BatchPredictionResult
+run_batch_prediction = batch_prediction.run_batch_prediction
+
 # Input
 PassthruDatasetProvider = datasets.PassthruDatasetProvider
 PassthruSampleDatasetsProvider = datasets.PassthruSampleDatasetsProvider
@@ -70,6 +76,7 @@ RootNodeLabelFn = label_fns.RootNodeLabelFn
 incrementing_model_dir = model_dir.incrementing_model_dir
 
 # Model export
+BucketedPaddingExporter = model_export.BucketedPaddingExporter
 export_model = model_export.export_model
 IntegratedGradientsExporter = attribution.IntegratedGradientsExporter
 KerasModelExporter = model_export.KerasModelExporter
@@ -77,8 +84,12 @@ SubmoduleExporter = model_export.SubmoduleExporter
 
 # Orchestration
 run = orchestration.run
+PreprocessingCacheConfig = orchestration.PreprocessingCacheConfig
 TFDataServiceConfig = orchestration.TFDataServiceConfig
 
+# Input diagnostics
+InputDiagnosticsConfig = input_diagnostics.InputDiagnosticsConfig
+
 # Padding
 one_node_per_component = padding_utils.one_node_per_component
 FitOrSkipPadding = padding_utils.FitOrSkipPadding
@@ -103,6 +114,7 @@ RootNodeMulticlassClassification = classification.RootNodeMulticlassClassificati
 # Tasks (Link Prediction)
 DotProductLinkPrediction = link_prediction.DotProductLinkPrediction
 HadamardProductLinkPrediction = link_prediction.HadamardProductLinkPrediction
+InBatchNegativesLinkPrediction = link_prediction.InBatchNegativesLinkPrediction
 # Tasks (Regression)
 GraphMeanAbsoluteError = regression.GraphMeanAbsoluteError
 GraphMeanAbsolutePercentageError = regression.GraphMeanAbsolutePercentageError
@@ -0,0 +1,289 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""The runner entry point for offline batch prediction."""
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import os
+import queue
+import time
+from typing import List, Optional
+
+from absl import logging
+import numpy as np
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+from tensorflow_gnn.runner import interfaces
+
+DatasetProvider = interfaces.DatasetProvider
+
+# The feature name of the seed ids in the output `tf.train.Example`s.
+SEED_ID_FEATURE_NAME = "seed_id"
+
+# Markers for the end of the batches of a shard that is complete or aborted.
+_SHARD_DONE = object()
+_SHARD_ABORTED = object()
+
+
+@dataclasses.dataclass
+class BatchPredictionResult:
+  """Holds the return values of `run_batch_prediction(...)`.
+
+  Attributes:
+    output_filenames: The filenames of all output shards, in order.
+    num_examples: The number of examples scored by this call (excluding the
+      shards skipped as already done).
+    num_skipped_shards: The number of shards skipped as already done by a
+      previous call.
+    elapsed_seconds: The wall time of this call.
+    examples_per_second: The throughput of this call.
+  """
+  output_filenames: List[str]
+  num_examples: int
+  num_skipped_shards: int
+  elapsed_seconds: float
+  examples_per_second: float
+
+
+def _output_filename(output_dir: str, index: int, num_shards: int) -> str:
+  return os.path.join(
+      output_dir, f"predictions.tfrecord-{index:05d}-of-{num_shards:05d}")
+
+
+def _get_signature(saved_model_dir: str, signature_name: str):
+  """Returns the signature and its only input name of a SavedModel."""
+  loaded = tf.saved_model.load(saved_model_dir)
+  if signature_name not in loaded.signatures:
+    raise ValueError(f"No signature `{signature_name}` in {saved_model_dir} "
+                     f"(got {list(loaded.signatures.keys())})")
+  signature = loaded.signatures[signature_name]
+  _, input_specs = signature.structured_input_signature
+  if len(input_specs) != 1:
+    raise ValueError("Expected a signature with a single input of serialized "
+                     f"`GraphTensor`s (got {input_specs})")
+  [input_name] = input_specs.keys()
+  return loaded, signature, input_name
+
+
+def _feature(values: np.ndarray) -> tf.train.Feature:
+  values = np.reshape(values, [-1])
+  if values.dtype.kind in ("S", "O", "U"):
+    return tf.train.Feature(bytes_list=tf.train.BytesList(
+        value=[v.encode() if isinstance(v, str) else v for v in values]))
+  if values.dtype.kind in ("i", "u", "b"):
+    return tf.train.Feature(int64_list=tf.train.Int64List(value=values))
+  return tf.train.Feature(float_list=tf.train.FloatList(value=values))
+
+
+def _write_shard(filename: str, batches: queue.Queue):
+  """Writes the batches from `batches` to `filename` via a temporary file.
+
+  Args:
+    filename: The name of the output shard.
+    batches: A queue of `(seed_ids, predictions)` pairs of numpy arrays,
+      followed by `_SHARD_DONE` if the shard is complete, or by
+      `_SHARD_ABORTED` if it is not (then `filename` does not get created).
+  """
+  tmp_filename = filename + ".tmp"
+  try:
+    with tf.io.TFRecordWriter(tmp_filename) as writer:
+      while True:
+        batch = batches.get()
+        if batch is _SHARD_DONE:
+          break
+        if batch is _SHARD_ABORTED:
+          return
+        seed_ids, predictions = batch
+        for i, seed_id in enumerate(seed_ids):
+          features = {SEED_ID_FEATURE_NAME: _feature(np.asarray(seed_id))}
+          for name, values in predictions.items():
+            features[name] = _feature(values[i])
+          example = tf.train.Example(
+              features=tf.train.Features(feature=features))
+          writer.write(example.SerializeToString())
+  except Exception:
+    # Unblock the producer of `batches` before reraising.
+    while batches.get() not in (_SHARD_DONE, _SHARD_ABORTED):
+      pass
+    raise
+  # Renaming marks the shard as done, see `run_batch_prediction(...)`.
+  tf.io.gfile.rename(tmp_filename, filename, overwrite=True)
+
+
+def _num_workers(strategy: tf.distribute.Strategy) -> int:
+  """Returns the number of workers (hosts) that run replicas of `strategy`."""
+  resolver = getattr(strategy, "cluster_resolver", None)
+  if resolver is None:
+    return 1
+  cluster_spec = resolver.cluster_spec()
+  return sum(cluster_spec.num_tasks(job) for job in ("chief", "worker")
+             if job in cluster_spec.jobs) or 1
+
+
+def run_batch_prediction(
+    *,
+    ds_provider: DatasetProvider,
+    saved_model_dir: str,
+    output_dir: str,
+    seed_node_set_name: str,
+    global_batch_size: int,
+    num_shards: int = 1,
+    seed_id_feature_name: str = "#id",
+    seed_id_dtype: tf.dtypes.DType = tf.string,
+    signature_name: str = tf.saved_model.DEFAULT_SERVING_SIGNATURE_DEF_KEY,
+    strategy: Optional[tf.distribute.Strategy] = None,
+    num_writer_threads: int = 4,
+    max_queued_batches: int = 16) -> BatchPredictionResult:
+  """Scores sampled subgraphs with an exported model and writes predictions.
+
+  This is the inference counterpart of `run(...)`: it reads serialized
+  `GraphTensor`s (like the sampled subgraphs, one per seed node, from the
+  TF-GNN samplers) and scores them with a model exported for inference, like
+  by `KerasModelExporter` with its default `include_preprocessing=True`. The
+  exported signature is expected to take a batch of serialized `GraphTensor`s
+  as its only input, so that it does the parsing and feature preprocessing
+  itself.
+
+  The input is split into `num_shards` work units by calling
+  `ds_provider.get_dataset(...)` with an `InputContext` of `num_shards` input
+  pipelines; the file-based dataset providers of the runner shard their files
+  accordingly. (`PassthruDatasetProvider` ignores the `InputContext`, so it can
+  only be used with `num_shards=1`.) Each work unit is batched to
+  `global_batch_size`, distributed by `strategy` and written as one output
+  shard `predictions.tfrecord-?????-of-?????` in `output_dir`. Each scored
+  batch is handed to a background writer thread through a queue of at most
+  `max_queued_batches` batches, so host memory does not grow with the size
+  of a shard; scoring waits for the writer if the queue is full. Up to
+  `num_writer_threads` shards are written in parallel. An output shard is only
+  created when it is complete, and the shards that exist already are skipped:
+  rerunning an interrupted call resumes it.
+
+  The `strategy` must run on a single worker (like `MirroredStrategy` or a
+  single-host `TPUStrategy`): every worker would score and write the same
+  output shards. To use several hosts, run one call per host with its own
+  `output_dir` and an input split of its own.
+
+  Each output record is a `tf.train.Example` with the seed id as feature
+  `"seed_id"` and each output of the signature as a flattened feature of
+  the same name. The seed id is the first value of the feature
+  `seed_id_feature_name` of node set `seed_node_set_name`, which is the id of
+  the seed node in sampled subgraphs.
+
+  Args:
+    ds_provider: A `DatasetProvider` of serialized `GraphTensor`s.
+    saved_model_dir: The directory of the exported SavedModel.
+    output_dir: The directory for the output shards.
+    seed_node_set_name: The node set of the seed nodes.
+    global_batch_size: The batch size across all replicas.
+    num_shards: The number of work units and output shards.
+    seed_id_feature_name: The feature with the seed id.
+    seed_id_dtype: The dtype of the seed id, `tf.string` or `tf.int64`.
+    signature_name: The name of the signature to call.
+    strategy: An optional `tf.distribute.Strategy` to run the model with, on
+      a single worker. Defaults to the default strategy.
+    num_writer_threads: The maximum number of shards written in parallel.
+    max_queued_batches: The maximum number of scored batches per shard that
+      wait to be written.
+
+  Returns:
+    A `BatchPredictionResult` with the output filenames and the throughput.
+  """
+  if num_shards < 1:
+    raise ValueError(f"Expected `num_shards` >= 1 (got {num_shards})")
+  if max_queued_batches < 1:
+    raise ValueError(
+        f"Expected `max_queued_batches` >= 1 (got {max_queued_batches})")
+  if strategy is None:
+    strategy = tf.distribute.get_strategy()
+  num_workers = _num_workers(strategy)
+  if num_workers > 1:
+    raise ValueError("`run_batch_prediction` supports strategies on a single "
+                     f"worker only (got {num_workers} workers)")
+
+  tf.io.gfile.makedirs(output_dir)
+  output_filenames = [_output_filename(output_dir, i, num_shards)
+                      for i in range(num_shards)]
+  pending = [i for i, filename in enumerate(output_filenames)
+             if not tf.io.gfile.exists(filename)]
+  num_skipped_shards = num_shards - len(pending)
+  if num_skipped_shards:
+    logging.info("Skipping %d of %d output shards as done.",
+                 num_skipped_shards, num_shards)
+
+  with strategy.scope():
+    # The loaded object needs to be kept alive while its signature is used.
+    loaded, signature, input_name = _get_signature(saved_model_dir,
+                                                   signature_name)
+
+  id_key = f"{tfgnn.NODES}/{seed_node_set_name}.{seed_id_feature_name}"
+  id_features = {id_key: tf.io.RaggedFeature(seed_id_dtype)}
+  id_default = "" if seed_id_dtype == tf.string else -1
+
+  def add_seed_ids(examples):
+    ids = tf.io.parse_example(examples, id_features)[id_key]
+    ids = ids.to_tensor(default_value=id_default, shape=[None, 1])
+    return tf.squeeze(ids, axis=1), examples
+
+  @tf.function
+  def predict_step(inputs):
+    def replica_fn(seed_ids, examples):
+      return seed_ids, signature(**{input_name: examples})
+    return strategy.run(replica_fn, args=inputs)
+
+  def local_numpy(values):
+    results = strategy.experimental_local_results(values)
+    return np.concatenate([r.numpy() for r in results], axis=0)
+
+  num_examples = 0
+  start_time = time.monotonic()
+  with concurrent.futures.ThreadPoolExecutor(num_writer_threads) as executor:
+    futures = []
+    for index in pending:
+      context = tf.distribute.InputContext(
+          num_input_pipelines=num_shards, input_pipeline_id=index)
+      ds = ds_provider.get_dataset(context)
+      ds = ds.batch(global_batch_size)
+      ds = ds.map(add_seed_ids, num_parallel_calls=tf.data.AUTOTUNE)
+      ds = ds.prefetch(tf.data.AUTOTUNE)
+      batches = queue.Queue(maxsize=max_queued_batches)
+      futures.append(executor.submit(
+          _write_shard, output_filenames[index], batches))
+      try:
+        for inputs in strategy.experimental_distribute_dataset(ds):
+          seed_ids, predictions = predict_step(inputs)
+          seed_ids = local_numpy(seed_ids)
+          predictions = {k: local_numpy(v) for k, v in predictions.items()}
+          batches.put((seed_ids, predictions))
+          num_examples += len(seed_ids)
+      except BaseException:
+        batches.put(_SHARD_ABORTED)
+        raise
+      batches.put(_SHARD_DONE)
+      elapsed_seconds = time.monotonic() - start_time
+      logging.info("Scored shard %d of %d: %d examples at %.1f examples/s.",
+                   index + 1, num_shards, num_examples,
+                   num_examples / max(elapsed_seconds, 1e-9))
+    for future in futures:
+      future.result()  # Reraises any errors.
+  del loaded
+
+  elapsed_seconds = time.monotonic() - start_time
+  return BatchPredictionResult(
+      output_filenames=output_filenames,
+      num_examples=num_examples,
+      num_skipped_shards=num_skipped_shards,
+      elapsed_seconds=elapsed_seconds,
+      examples_per_second=num_examples / max(elapsed_seconds, 1e-9))
@@ -0,0 +1,224 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for batch_prediction."""
+import os
+
+from absl.testing import parameterized
+import numpy as np
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+from tensorflow_gnn.runner import batch_prediction
+from tensorflow_gnn.runner.input import datasets
+from tensorflow_gnn.runner.utils import model_export
+
+_SCHEMA = """
+  node_sets {
+    key: "nodes"
+    value {
+      features {
+        key: "features"
+        value {
+          dtype: DT_FLOAT
+          shape { dim { size: 4 } }
+        }
+      }
+    }
+  }
+  edge_sets {
+    key: "edges"
+    value {
+      source: "nodes"
+      target: "nodes"
+    }
+  }
+"""
+
+_NUM_FILES = 4
+_NUM_EXAMPLES_PER_FILE = 5
+
+
+def gt_spec() -> tfgnn.GraphTensorSpec:
+  return tfgnn.create_graph_spec_from_schema_pb(tfgnn.parse_schema(_SCHEMA))
+
+
+def serialized_example(seed_id: bytes) -> bytes:
+  graph = tfgnn.random_graph_tensor(gt_spec())
+  example = tfgnn.write_example(graph)
+  ids = example.features.feature["nodes/nodes.#id"].bytes_list.value
+  ids.append(seed_id)
+  num_nodes = graph.node_sets["nodes"].total_size
+  ids.extend(b"other" for _ in range(num_nodes - 1))
+  return example.SerializeToString()
+
+
+def export_inference_model(export_dir: str) -> tf.keras.Model:
+  """Exports a model from serialized `GraphTensor`s to seed node logits."""
+  examples = tf.keras.Input(shape=(), dtype=tf.string, name="examples")
+  graph = tfgnn.keras.layers.ParseExample(gt_spec())(examples)
+  graph = graph.merge_batch_to_components()
+  features = tfgnn.keras.layers.ReadoutFirstNode(
+      node_set_name="nodes", feature_name="features")(graph)
+  logits = tf.keras.layers.Dense(3, name="logits")(features)
+  model = tf.keras.Model(examples, logits)
+  model_export.export_model(model, export_dir)
+  return model
+
+
+class BatchPredictionTest(tf.test.TestCase, parameterized.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self._tmpdir = self.get_temp_dir()
+    self._seed_ids = []
+    self._examples = []
+    filenames = []
+    for i in range(_NUM_FILES):
+      filename = os.path.join(self._tmpdir, f"input-{i}.tfrecord")
+      with tf.io.TFRecordWriter(filename) as writer:
+        for j in range(_NUM_EXAMPLES_PER_FILE):
+          seed_id = f"seed{i}.{j}".encode()
+          example = serialized_example(seed_id)
+          writer.write(example)
+          self._seed_ids.append(seed_id)
+          self._examples.append(example)
+      filenames.append(filename)
+    self._ds_provider = datasets.TFRecordDatasetProvider(filenames=filenames)
+    self._saved_model_dir = os.path.join(self._tmpdir, "saved_model")
+    self._model = export_inference_model(self._saved_model_dir)
+
+  def read_predictions(self, filenames):
+    features = {
+        batch_prediction.SEED_ID_FEATURE_NAME: tf.io.FixedLenFeature(
+            [], tf.string),
+        "logits": tf.io.FixedLenFeature([3], tf.float32),
+    }
+    results = {}
+    for element in tf.data.TFRecordDataset(filenames):
+      parsed = tf.io.parse_single_example(element, features)
+      seed_id = parsed[batch_prediction.SEED_ID_FEATURE_NAME].numpy()
+      self.assertNotIn(seed_id, results)
+      results[seed_id] = parsed["logits"].numpy()
+    return results
+
+  @parameterized.named_parameters(
+      ("OneShard", 1, 4, 16),
+      ("ManyShards", _NUM_FILES, 3, 16),
+      ("OneQueuedBatch", 1, 2, 1),
+  )
+  def test_run_batch_prediction(self, num_shards, global_batch_size,
+                                max_queued_batches):
+    output_dir = os.path.join(self._tmpdir, "output")
+    result = batch_prediction.run_batch_prediction(
+        ds_provider=self._ds_provider,
+        saved_model_dir=self._saved_model_dir,
+        output_dir=output_dir,
+        seed_node_set_name="nodes",
+        global_batch_size=global_batch_size,
+        num_shards=num_shards,
+        max_queued_batches=max_queued_batches)
+
+    self.assertLen(result.output_filenames, num_shards)
+    self.assertEqual(result.num_examples, len(self._seed_ids))
+    self.assertEqual(result.num_skipped_shards, 0)
+    self.assertGreater(result.examples_per_second, 0.)
+
+    predictions = self.read_predictions(result.output_filenames)
+    self.assertCountEqual(predictions.keys(), self._seed_ids)
+    expected = self._model(tf.constant(self._examples)).numpy()
+    for seed_id, logits in zip(self._seed_ids, expected):
+      self.assertAllClose(predictions[seed_id], logits, rtol=1e-5, atol=1e-5)
+
+  def test_resume(self):
+    output_dir = os.path.join(self._tmpdir, "output")
+    kwargs = dict(
+        ds_provider=self._ds_provider,
+        saved_model_dir=self._saved_model_dir,
+        output_dir=output_dir,
+        seed_node_set_name="nodes",
+        global_batch_size=2,
+        num_shards=_NUM_FILES)
+    result = batch_prediction.run_batch_prediction(**kwargs)
+    # Pretend the run got interrupted before the last two shards were done.
+    for filename in result.output_filenames[-2:]:
+      tf.io.gfile.remove(filename)
+
+    result = batch_prediction.run_batch_prediction(**kwargs)
+    self.assertEqual(result.num_skipped_shards, 2)
+    self.assertEqual(result.num_examples, 2 * _NUM_EXAMPLES_PER_FILE)
+    predictions = self.read_predictions(result.output_filenames)
+    self.assertCountEqual(predictions.keys(), self._seed_ids)
+
+  def test_no_output_for_failed_shard(self):
+    output_dir = os.path.join(self._tmpdir, "output")
+    # A record that cannot be parsed fails the third batch of the shard.
+    ds = tf.data.Dataset.from_tensor_slices(self._examples[:5] + [b"garbage"])
+    with self.assertRaises(tf.errors.InvalidArgumentError):
+      batch_prediction.run_batch_prediction(
+          ds_provider=datasets.PassthruDatasetProvider(ds),
+          saved_model_dir=self._saved_model_dir,
+          output_dir=output_dir,
+          seed_node_set_name="nodes",
+          global_batch_size=2,
+          max_queued_batches=1)
+    self.assertFalse(tf.io.gfile.exists(
+        os.path.join(output_dir, "predictions.tfrecord-00000-of-00001")))
+
+  def test_mirrored_strategy(self):
+    output_dir = os.path.join(self._tmpdir, "output")
+    result = batch_prediction.run_batch_prediction(
+        ds_provider=self._ds_provider,
+        saved_model_dir=self._saved_model_dir,
+        output_dir=output_dir,
+        seed_node_set_name="nodes",
+        global_batch_size=4,
+        strategy=tf.distribute.MirroredStrategy())
+    predictions = self.read_predictions(result.output_filenames)
+    self.assertCountEqual(predictions.keys(), self._seed_ids)
+    self.assertEqual(np.stack(list(predictions.values())).shape,
+                     (len(self._seed_ids), 3))
+
+  def test_multi_worker_strategy(self):
+
+    class TwoWorkerStrategy(tf.distribute.MirroredStrategy):
+
+      @property
+      def cluster_resolver(self):
+        return tf.distribute.cluster_resolver.SimpleClusterResolver(
+            tf.train.ClusterSpec({"chief": ["localhost:1"],
+                                  "worker": ["localhost:2"]}),
+            task_type="chief", task_id=0)
+
+    with self.assertRaisesRegex(ValueError, r"single worker only"):
+      batch_prediction.run_batch_prediction(
+          ds_provider=self._ds_provider,
+          saved_model_dir=self._saved_model_dir,
+          output_dir=os.path.join(self._tmpdir, "output"),
+          seed_node_set_name="nodes",
+          global_batch_size=4,
+          strategy=TwoWorkerStrategy())
+
+  def test_bad_signature(self):
+    with self.assertRaisesRegex(ValueError, "No signature `foo`"):
+      batch_prediction.run_batch_prediction(
+          ds_provider=self._ds_provider,
+          saved_model_dir=self._saved_model_dir,
+          output_dir=os.path.join(self._tmpdir, "output"),
+          seed_node_set_name="nodes",
+          global_batch_size=4,
+          signature_name="foo")
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -18,13 +18,17 @@ from __future__ import annotations
 import collections
 import dataclasses
 import functools
+import hashlib
 import operator
 import os
+import time
 from typing import Callable, Mapping, Optional, Sequence, Tuple, TypeVar, Union
 
+from absl import logging
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 from tensorflow_gnn.runner import interfaces
+from tensorflow_gnn.runner.utils import input_diagnostics as input_diagnostics_utils
 from tensorflow_gnn.runner.utils import model_export
 from tensorflow_gnn.runner.utils import parsing as parsing_utils
 
@@ -37,6 +41,7 @@ GraphTensor = tfgnn.GraphTensor
 # when we drop py38 support.
 GraphTensorAndField = Tuple[GraphTensor, Field]
 GraphTensorSpec = tfgnn.GraphTensorSpec
+InputDiagnosticsConfig = input_diagnostics_utils.InputDiagnosticsConfig
 TaskPreprocessFn = Callable[
     [GraphTensor],
     Tuple[Union[GraphTensor, Sequence[GraphTensor]], Field]
@@ -79,20 +84,104 @@ class TFDataServiceConfig:
   tf_data_service_mode: Union[str, tf.data.experimental.service.ShardingPolicy]
 
 
+@dataclasses.dataclass
+class PreprocessingCacheConfig:
+  """Configures a cache of the parsed and padded training batches.
+
+  Caching is meant for training datasets that are finite and stay the same
+  for all epochs (e.g., subgraphs sampled once, offline), and that fit on
+  local disk. Before training, each input pipeline makes one complete pass
+  over its training data and saves the batches after parsing,
+  `merge_batch_to_components()` and padding (if any) under `cache_dir`, with
+  `tf.data.Dataset.save()`. Training then replays these batches in every epoch
+  (optionally shuffled as a whole), and only applies the `feature_processors`
+  and `Task.preprocess(...)`, which may be randomized. A marker file is
+  written once the pass is complete; the leftovers of an interrupted pass
+  (e.g., by preemption) are cleared and the pass is redone.
+
+  The cache is reused across calls to `runner.run(...)`, without running the
+  input pipeline up to the cache. The cache files are keyed by the input
+  pipeline, the per-replica batch size, the spec of the cached batches and the
+  padding, but not by the contents of the training dataset, so `cache_dir`
+  must be specific to the training dataset and needs to be cleared when it
+  changes. Repeated (infinite) training datasets are not supported.
+
+  Attributes:
+    cache_dir: The directory for the cache files.
+    shuffle_batches_buffer_size: If set, the number of batches to shuffle
+      over, after caching.
+  """
+  cache_dir: str
+  shuffle_batches_buffer_size: Optional[int] = None
+
+
+def _cache_filename(config: PreprocessingCacheConfig,
+                    context: tf.distribute.InputContext,
+                    batch_size: int,
+                    drop_remainder: bool) -> str:
+  """Returns the cache file prefix of the input pipeline with `context`."""
+  return os.path.join(
+      config.cache_dir,
+      f"batches-{context.input_pipeline_id:05d}"
+      f"-of-{context.num_input_pipelines:05d}"
+      f"-bs{batch_size}{'-drop' if drop_remainder else ''}")
+
+
+def _cache_path(cache_filename: str,
+                element_spec,
+                size_constraints: Optional[SizeConstraints]) -> str:
+  """Returns the cache path for `cache_filename` and the cached batches."""
+  key = repr((element_spec, size_constraints)).encode()
+  return f"{cache_filename}-{hashlib.sha256(key).hexdigest()[:16]}"
+
+
+def _load_or_save_cache(ds: tf.data.Dataset, path: str) -> tf.data.Dataset:
+  """Returns the batches saved at `path`, saving `ds` there first if needed.
+
+  The batches are saved by one complete pass over `ds`, here and now. The
+  marker file `<path>.done` is only written after that pass has finished, so
+  the leftovers of an interrupted pass are cleared and the pass is redone.
+
+  Args:
+    ds: The finite `tf.data.Dataset` of batches to cache.
+    path: The directory for the cached batches.
+
+  Returns:
+    A `tf.data.Dataset` that reads the cached batches.
+  """
+  done_marker = f"{path}.done"
+  if not tf.io.gfile.exists(done_marker):
+    if not tf.executing_eagerly():
+      raise ValueError("`preprocessing_cache_config` requires input pipelines "
+                       "that are created eagerly")
+    if tf.io.gfile.exists(path):
+      logging.info("Clearing the incomplete preprocessing cache at %s", path)
+      tf.io.gfile.rmtree(path)
+    logging.info("Saving the preprocessing cache to %s", path)
+    ds.save(path)
+    with tf.io.gfile.GFile(done_marker, "w") as f:
+      f.write("")
+  logging.info("Loading the preprocessing cache from %s", path)
+  return tf.data.Dataset.load(path, element_spec=ds.element_spec)
+
+
 class _WrappedDatasetProvider(DatasetProvider):
   """Wraps a `DatasetProvider` with batching and processing."""
 
   def __init__(self,
-               apply_fn: Callable[[tf.data.Dataset], tf.data.Dataset],
+               apply_fn: Callable[..., tf.data.Dataset],
                delegate: DatasetProvider,
                drop_remainder: bool,
                global_batch_size: int,
-               tf_data_service_config: Optional[TFDataServiceConfig] = None):
+               tf_data_service_config: Optional[TFDataServiceConfig] = None,
+               preprocessing_cache_config: Optional[
+                   PreprocessingCacheConfig] = None):
     self._apply_fn = apply_fn
     self._delegate = delegate
     self._drop_remainder = drop_remainder
     self._global_batch_size = global_batch_size
     self._tf_data_service_config = tf_data_service_config
+    self._preprocessing_cache_config = preprocessing_cache_config
 
   def get_dataset(self, context: tf.distribute.InputContext) -> tf.data.Dataset:
     """Gets a batched dataset with `apply_fn` applied."""
@@ -118,6 +207,15 @@ class _WrappedDatasetProvider(DatasetProvider):
               processing_mode=self._tf_data_service_config.tf_data_service_mode,
               service=self._tf_data_service_config.tf_data_service_address,
               job_name=self._tf_data_service_config.tf_data_service_job_name))
+    if self._preprocessing_cache_config:
+      return self._apply_fn(
+          ds,
+          cache_config=self._preprocessing_cache_config,
+          cache_filename=_cache_filename(
+              self._preprocessing_cache_config,
+              context,
+              context.get_per_replica_batch_size(self._global_batch_size),
+              self._drop_remainder))
     return ds.apply(self._apply_fn)
 
 
@@ -128,7 +226,8 @@ def _make_padding_preprocessing_model(
   """Builds a `tf.keras.Model` that applies padding and preprocessing.
 
   Args:
-    gtspec: The `GraphTensorSpec` for input.
+    gtspec: The `GraphTensorSpec` for input. Batches of rank 1 are merged into
+      components while padding.
     preprocessing_model: The preprocessing model.
     size_constraints: Size constraints for padding.
 
@@ -290,6 +389,128 @@ _map_over_dataset = functools.partial(
     num_parallel_calls=tf.data.experimental.AUTOTUNE)
 
 
+def _input_pipeline_stages(
+    ds_provider: DatasetProvider,
+    gtspec: GraphTensorSpec,
+    batch_size: int,
+    preprocess_model: tf.keras.Model,
+    *,
+    drop_remainder: bool,
+    filter_fn: Optional[Callable[..., bool]] = None,
+    size_constraints: Optional[SizeConstraints] = None
+) -> list[tuple[str, tf.data.Dataset, int]]:
+  """Returns the prefixes of the input pipeline of `run(...)` for diagnostics.
+
+  The stages follow `_WrappedDatasetProvider` and the `apply_fn` of `run(...)`
+  for a single input pipeline, so that the training step of the model can run
+  on the batches of the last stage. Each stage reads from a fresh iterator of
+  `ds_provider`, independent of the one used for training.
+
+  Args:
+    ds_provider: The `DatasetProvider` of unbatched inputs.
+    gtspec: The `GraphTensorSpec` for parsing.
+    batch_size: The per replica batch size.
+    preprocess_model: The preprocessing model.
+    drop_remainder: Whether to drop the remainder at batching, as in training.
+    filter_fn: The optional filter before padding.
+    size_constraints: The optional size constraints for padding.
+
+  Returns:
+    A list of `(stage, dataset, records_per_batch)` as expected by
+    `input_diagnostics.diagnose_input_pipeline(...)`.
+  """
+  # The dataset provider covers both reading and interleaving its files.
+  ds = ds_provider.get_dataset(tf.distribute.InputContext())
+  stages = [("read", ds, 1)]
+  ds = ds.batch(batch_size, drop_remainder=drop_remainder)
+  stages.append(("batch", ds, batch_size))
+  parsed = parsing_utils.maybe_parse_graph_tensor_dataset(ds, gtspec)
+  if parsed is not ds:
+    stages.append(("parse_example", parsed, batch_size))
+  if size_constraints is not None:
+    # Padding merges the batches into components in the same pass.
+    ds = parsed
+    if filter_fn is not None:
+      ds = ds.filter(filter_fn)
+    padded = _map_over_dataset(
+        ds, tfgnn.keras.layers.PadToTotalSizes(size_constraints))
+    stages.append(("merge_and_pad_to_total_sizes", padded, batch_size))
+    padding_preprocess_model = _make_padding_preprocessing_model(
+        ds.element_spec,
+        preprocess_model,
+        size_constraints)
+    ds = _map_over_dataset(ds, padding_preprocess_model)
+  else:
+    ds = _map_over_dataset(
+        parsed, tfgnn.GraphTensor.merge_batch_to_components)
+    stages.append(("merge_batch_to_components", ds, batch_size))
+    ds = _map_over_dataset(ds, preprocess_model)
+  stages.append(("preprocess", ds, batch_size))
+  return stages
+
+
+def _diagnose_input_pipeline(
+    config: InputDiagnosticsConfig,
+    stages: Sequence[tuple[str, tf.data.Dataset, int]],
+    model_fn: Callable[[], tf.keras.Model],
+    trainer: Trainer,
+) -> input_diagnostics_utils.InputDiagnosticsReport:
+  """Times `stages` and the training steps, and writes the report.
+
+  The training steps are timed on a separate model from `model_fn`, so the
+  model for training is left untouched.
+
+  Args:
+    config: The `InputDiagnosticsConfig`.
+    stages: The input pipeline stages from `_input_pipeline_stages(...)`.
+    model_fn: Returns a new compiled model, like the one for training.
+    trainer: The `Trainer` whose strategy and model directory are used.
+
+  Returns:
+    The report, as written to the `config.subdirectory` of the model dir.
+  """
+  strategy = trainer.strategy
+  _, final_ds, batch_size = stages[-1]
+  num_replicas = strategy.num_replicas_in_sync
+  num_steps = max(config.num_batches // num_replicas, 1)
+
+  def step_fn():
+    cached_ds = final_ds.take(num_steps * num_replicas).cache()
+    iterator = iter(strategy.distribute_datasets_from_function(
+        lambda _: cached_ds.repeat()))
+    with strategy.scope():
+      model = model_fn()
+    train_function = model.make_train_function()
+    iterations = model.optimizer.iterations
+
+    def train_steps():
+      # Each call runs `steps_per_execution` steps of the compiled model.
+      start_step = int(iterations.numpy())
+      while int(iterations.numpy()) - start_step < num_steps:
+        train_function(iterator)
+      return int(iterations.numpy()) - start_step
+
+    # The first pass fills the cache and traces the training step.
+    train_steps()
+    start = time.perf_counter()
+    steps = train_steps()
+    elapsed = time.perf_counter() - start
+    return elapsed, steps * num_replicas * batch_size
+
+  if isinstance(strategy, tf.distribute.experimental.ParameterServerStrategy):
+    # Training steps with a `ParameterServerStrategy` run on remote workers
+    # scheduled by a coordinator, not on the cached local inputs.
+    step_fn = None
+
+  report = input_diagnostics_utils.diagnose_input_pipeline(
+      stages, num_batches=config.num_batches, step_fn=step_fn)
+  logging.info("Input pipeline diagnostics:\n%s",
+               input_diagnostics_utils.format_report(report))
+  input_diagnostics_utils.write_report(
+      report, os.path.join(trainer.model_dir, config.subdirectory))
+  return report
+
+
 def _maybe_to_floatx(tensor: Field) -> Field:
   dtype = tensor.dtype
   floatx = tf.dtypes.as_dtype(tf.keras.backend.floatx())
@@ -320,6 +541,17 @@ def _without_aux_graph_piece_features() -> tf.keras.layers.Layer:
       name="without_aux_graph_piece_features")
 
 
+def _trial_model_tag(trial: str) -> str:
+  return f"trial_{trial}"
+
+
+def _with_output_names(outputs: Predictions, name: str) -> Predictions:
+  """Returns `outputs` from layers named by `name` and their mapping keys."""
+  if isinstance(outputs, Mapping):
+    return {k: _with_output_names(v, f"{name}_{k}") for k, v in outputs.items()}
+  return tf.keras.layers.Identity(name=name)(outputs)
+
+
 def _check_prediction_rules(p: Predictions, l: Losses, m: Metrics) -> None:
   """Checks predictions to conform with model losses and metrics.
 
@@ -363,7 +595,7 @@ def _check_prediction_rules(p: Predictions, l: Losses, m: Metrics) -> None:
 
 def run(*,
         train_ds_provider: DatasetProvider,
-        model_fn: Callable[[GraphTensorSpec], tf.keras.Model],
+        model_fn: OneOrMappingOf[Callable[[GraphTensorSpec], tf.keras.Model]],
         optimizer_fn: Callable[[], tf.keras.optimizers.Optimizer],
         trainer: Trainer,
         task: OneOrMappingOf[Task],
@@ -380,7 +612,10 @@ def run(*,
         valid_padding: Optional[GraphTensorPadding] = None,
         tf_data_service_config: Optional[TFDataServiceConfig] = None,
         steps_per_execution: Optional[int] = None,
-        run_eagerly: bool = False):
+        run_eagerly: bool = False,
+        input_diagnostics: Optional[InputDiagnosticsConfig] = None,
+        preprocessing_cache_config: Optional[PreprocessingCacheConfig] = None
+) -> OneOrMappingOf[RunResult]:
   """Runs training (and validation) of a model on task(s) with the given data.
 
   This includes preprocessing the input data, appending any suitable head(s),
@@ -393,7 +628,10 @@ def run(*,
    1. Input examples are batched.
    2. If necessary, input batches are parsed as `GraphTensor` values and merged
       into components (see: `GraphTensor.merge_batch_to_components`).
-   3. If set, `train_padding` and `valid_padding`, resp., are applied.
+   3. If set, `train_padding` and `valid_padding`, resp., are applied. Padding
+      merges the batches into components in the same pass as step (2), without
+      building the intermediate merged `GraphTensor`s (see:
+      `tfgnn.pad_to_total_sizes`).
    4. The given `feature_processors` are applied in order for all non-trainable
       feature transformations on CPU (as part of `tf.data.Dataset.map(...)`).
    5. The `Task.preprocess(...)` method is applied to extract training targets
@@ -411,6 +649,28 @@ def run(*,
   Trainable transformations of inputs (notably lookups in trainable embedding
   tables) are required to happen inside `model_fn`.
 
+  For hyperparameter search, `model_fn` can be a `Mapping` from trial names
+  to the `model_fn`s of several model variants (say, for different settings of
+  a `config_dict`). Their base GNNs and `Task.predict(...)` heads are then
+  stacked side by side into one Keras model that is trained on the one input
+  pipeline above: examples are read, parsed, padded and preprocessed once for
+  all trials. As the trials share no weights, their sum of losses trains each
+  of them as if on its own, except that they share the `optimizer_fn` and its
+  hyperparameters (like the learning rate), the `trainer` and the batches of
+  input. The metrics of each trial are reported with its name as a prefix,
+  like `"<trial>_loss"`, alongside the total loss. Each trial is exported to
+  the subdirectory of its name in the `export_dirs`.
+
+  Sharing one optimizer couples the trials wherever it looks at all gradients
+  at once: notably, clipping by the global norm (`global_clipnorm=...`) scales
+  the updates of every trial by the gradients of all of them. Use per-variable
+  clipping (`clipnorm=...`) for trials that are meant to be independent.
+  Likewise, checkpoints are taken of all trials together, so restoring the
+  best weights after training would pick the epoch with the best total loss
+  for all trials, not the best epoch of each; multi-trial training requires
+  a `trainer` that does not restore best weights (for `KerasTrainer`, pass
+  `restore_best_weights=False` if training with validation).
+
   For supervised learning, training labels enter the pipeline as features
   on the `GraphTensor` that undergo the `feature_processors` (shared by all
   `Task`s) and are read out of the `GraphTensor` by `Task.preprocess(...)`.
@@ -434,7 +694,8 @@ def run(*,
       is not batched and contains scalar `GraphTensor` values conforming to
       `gtspec`, possibly serialized as a `tf.train.Example` proto.
     model_fn: Returns the base GNN `tf.keras.Model` for use in training and
-      validation.
+      validation. May also be a `Mapping[str, Callable[...]]` from trial names
+      to `model_fn`s, for multi-trial training (see above).
     optimizer_fn: Returns a `tf.keras.optimizers.Optimizer` for use in training.
     trainer: A `Trainer`.
     task: A `Task` for single-Task training or a `Mapping[str, Task]` for
@@ -481,11 +742,28 @@ def run(*,
       debugging purposes. Note that the symbolic model will still be run twice,
       so if you use a `breakpoint()` you will have to Continue twice before you
       are in a real eager execution.
+    input_diagnostics: If set, before training, each stage of the training
+      input pipeline (steps 1-5 above, for a single input pipeline) is timed in
+      isolation over some batches and compared to the time of training steps
+      (forward and backward pass, and optimizer update) on prepared inputs.
+      The stages read from their own iterators, and the training steps run on
+      a separate copy of the model, so training itself is unaffected. With
+      `preprocessing_cache_config`, the stages are still those of steps 1-5,
+      which run once to fill the cache; reading from the cache is not
+      diagnosed. The report is logged and written as TensorBoard summaries
+      next to those of the `trainer`. This is for diagnosing input bound
+      training and costs extra time.
+    preprocessing_cache_config: If set, the training batches are cached after
+      steps 1-3 above in one pass before training, and replayed from the cache
+      in all epochs. See `PreprocessingCacheConfig` for details. Not supported
+      with `tf_data_service_config`.
 
   Returns:
-    A `RunResult` object containing models and information about this run.
+    A `RunResult` object containing models and information about this run or,
+    for multi-trial training, a `Mapping[str, RunResult]` with one per trial.
   """
   validate = valid_ds_provider is not None
+  is_multi_trial = isinstance(model_fn, collections.abc.Mapping)
 
   if isinstance(trainer.strategy, tf.distribute.TPUStrategy):
     if train_padding is None:
@@ -503,6 +781,23 @@ def run(*,
   if loss_weights is not None:
     tf.nest.assert_same_structure(task, loss_weights)
 
+  if preprocessing_cache_config and tf_data_service_config:
+    raise ValueError("`preprocessing_cache_config` is not supported with "
+                     "`tf_data_service_config`")
+
+  if is_multi_trial:
+    if not model_fn:
+      raise ValueError("Expected one or more trials in `model_fn` (got none)")
+    if input_diagnostics is not None:
+      raise ValueError("`input_diagnostics` is not supported for multi-trial "
+                       "training")
+    # The best checkpoint is chosen by the total loss of all trials.
+    restore_best_weights = getattr(trainer, "restore_best_weights", False)
+    if restore_best_weights or (restore_best_weights is None and validate):
+      raise ValueError("Restoring best weights is not supported for "
+                       "multi-trial training (set "
+                       "`restore_best_weights=False` on the trainer)")
+
   preprocess_model, oimap = _make_preprocessing_model(
       gtspec,
       feature_processors or tuple(),
@@ -512,19 +807,47 @@ def run(*,
       ds,
       *,
       filter_fn: Optional[Callable[..., bool]] = None,
-      size_constraints: Optional[SizeConstraints] = None):
+      size_constraints: Optional[SizeConstraints] = None,
+      cache_config: Optional[PreprocessingCacheConfig] = None,
+      cache_filename: Optional[str] = None):
+    if (cache_config is not None and
+        ds.cardinality() == tf.data.INFINITE_CARDINALITY):
+      raise ValueError("`preprocessing_cache_config` requires a finite "
+                       "training dataset")
     ds = parsing_utils.maybe_parse_graph_tensor_dataset(ds, gtspec)
-    ds = _map_over_dataset(ds, tfgnn.GraphTensor.merge_batch_to_components)
+    if size_constraints is None:
+      ds = _map_over_dataset(ds, tfgnn.GraphTensor.merge_batch_to_components)
+    # Otherwise, padding merges the batches into components in the same pass.
     if filter_fn is not None:
       ds = ds.filter(filter_fn)
-    if size_constraints is not None:
+    if cache_config is not None:
+      # Cache the parsed and padded batches, but not the results of
+      # preprocessing, which may be randomized.
+      if size_constraints is not None:
+        ds = _map_over_dataset(
+            ds, tfgnn.keras.layers.PadToTotalSizes(size_constraints))
+      tf.io.gfile.makedirs(cache_config.cache_dir)
+      ds = _load_or_save_cache(
+          ds, _cache_path(cache_filename, ds.element_spec, size_constraints))
+      if cache_config.shuffle_batches_buffer_size:
+        ds = ds.shuffle(cache_config.shuffle_batches_buffer_size)
+      if size_constraints is not None:
+        ds = _map_over_dataset(
+            ds, lambda gt, mask: (*preprocess_model(gt), mask))
+      else:
+        ds = _map_over_dataset(ds, preprocess_model)
+    elif size_constraints is not None:
       padding_preprocess_model = _make_padding_preprocessing_model(
-          gtspec,
+          ds.element_spec,
           preprocess_model,
           size_constraints)
       ds = _map_over_dataset(ds, padding_preprocess_model)
     else:
       ds = _map_over_dataset(ds, preprocess_model)
+    if is_multi_trial:
+      # Each trial has its own outputs to compare against the same labels.
+      ds = ds.map(lambda xs, labels, *mask:
+                  (xs, dict.fromkeys(model_fn, labels), *mask))
     return ds
 
   target_batch_size = _per_replica_batch_size(
@@ -536,11 +859,12 @@ def run(*,
   # datasets are created (possibly replicated, possibly distributed to
   # one or more worker jobs).
   if train_padding is not None:
-    size_constraints = train_padding.get_size_constraints(target_batch_size)
+    train_size_constraints = train_padding.get_size_constraints(
+        target_batch_size)
     train_apply_fn = functools.partial(
         apply_fn,
-        filter_fn=train_padding.get_filter_fn(size_constraints),
-        size_constraints=size_constraints)
+        filter_fn=train_padding.get_filter_fn(train_size_constraints),
+        size_constraints=train_size_constraints)
   else:
     train_apply_fn = apply_fn
 
@@ -553,12 +877,14 @@ def run(*,
   elif validate:
     valid_apply_fn = apply_fn
 
+  unwrapped_train_ds_provider = train_ds_provider
   train_ds_provider = _WrappedDatasetProvider(
       train_apply_fn,
       train_ds_provider,
       drop_remainder,
       global_batch_size,
-      tf_data_service_config)
+      tf_data_service_config,
+      preprocessing_cache_config)
 
   if validate:
     valid_ds_provider = _WrappedDatasetProvider(
@@ -567,29 +893,55 @@ def run(*,
         drop_remainder,
         global_batch_size)
 
-  def adapted_model_fn():
-    xs, *_ = preprocess_model.output
-    specs = [x.spec for x in xs]
-    inputs = [tf.keras.Input(type_spec=spec) for spec in specs]
-    # All specs are the same (asserted in `_make_preprocessing_model`).
-    gnn = tf.keras.Sequential((model_fn(specs[0]),), name=_BASE_MODEL_TAG)
-    outputs = [gnn(i) for i in inputs]
-
+  def predict(inputs: Sequence[GraphTensor]) -> Predictions:
     if isinstance(task, collections.abc.Mapping):
       outputs = {
-          k: v.predict(*[outputs[i] for i in tf.nest.flatten(oimap[k])])
+          k: v.predict(*[inputs[i] for i in tf.nest.flatten(oimap[k])])
           for k, v in task.items()
       }
     else:
-      outputs = task.predict(*[outputs[i] for i in tf.nest.flatten(oimap)])
-
+      outputs = task.predict(*[inputs[i] for i in tf.nest.flatten(oimap)])
     # Maybe cast to the default float type for final outputs.
-    outputs = tf.nest.map_structure(_maybe_to_floatx, outputs)
+    return tf.nest.map_structure(_maybe_to_floatx, outputs)
 
-    model = tf.keras.Model(inputs, outputs)
+  def adapted_model_fn():
+    xs, *_ = preprocess_model.output
+    specs = [x.spec for x in xs]
+    inputs = [tf.keras.Input(type_spec=spec) for spec in specs]
 
-    losses = tf.nest.map_structure(operator.methodcaller("losses"), task)
-    metrics = tf.nest.map_structure(operator.methodcaller("metrics"), task)
+    if is_multi_trial:
+      outputs, losses, metrics = {}, {}, {}
+      for trial, trial_model_fn in model_fn.items():
+        # Each trial is a nested model, which scopes the names of its layers
+        # (notably, those of the `Task.predict(...)` heads).
+        trial_inputs = [tf.keras.Input(type_spec=spec) for spec in specs]
+        # All specs are the same (asserted in `_make_preprocessing_model`).
+        gnn = tf.keras.Sequential(
+            (trial_model_fn(specs[0]),), name=_BASE_MODEL_TAG)
+        trial_model = tf.keras.Model(
+            trial_inputs,
+            predict([gnn(i) for i in trial_inputs]),
+            name=_trial_model_tag(trial))
+        # Keras names metrics after output layers: prefix them by the trial.
+        outputs[trial] = _with_output_names(trial_model(inputs), trial)
+        losses[trial] = tf.nest.map_structure(
+            operator.methodcaller("losses"), task)
+        # Each trial needs its own `Metric` objects.
+        metrics[trial] = tf.nest.map_structure(
+            operator.methodcaller("metrics"), task)
+      if loss_weights is None:
+        weights = None
+      else:
+        weights = {trial: loss_weights for trial in model_fn}
+    else:
+      # All specs are the same (asserted in `_make_preprocessing_model`).
+      gnn = tf.keras.Sequential((model_fn(specs[0]),), name=_BASE_MODEL_TAG)
+      outputs = predict([gnn(i) for i in inputs])
+      losses = tf.nest.map_structure(operator.methodcaller("losses"), task)
+      metrics = tf.nest.map_structure(operator.methodcaller("metrics"), task)
+      weights = loss_weights
+
+    model = tf.keras.Model(inputs, outputs)
 
     _check_prediction_rules(outputs, losses, metrics)
 
@@ -597,7 +949,7 @@ def run(*,
       model.compile(
           optimizer_fn(),
           loss=losses,
-          loss_weights=loss_weights,
+          loss_weights=weights,
           metrics=metrics,
           steps_per_execution=steps_per_execution,
           run_eagerly=run_eagerly,
@@ -606,7 +958,7 @@ def run(*,
       model.compile(
           optimizer_fn(),
           loss=losses,
-          loss_weights=loss_weights,
+          loss_weights=weights,
           weighted_metrics=metrics,
           steps_per_execution=steps_per_execution,
           run_eagerly=run_eagerly,
@@ -614,6 +966,23 @@ def run(*,
 
     return model
 
+  if input_diagnostics is not None:
+    if train_padding is not None:
+      padding_kwargs = dict(
+          filter_fn=train_padding.get_filter_fn(train_size_constraints),
+          size_constraints=train_size_constraints)
+    else:
+      padding_kwargs = {}
+    stages = _input_pipeline_stages(
+        unwrapped_train_ds_provider,
+        gtspec,
+        target_batch_size,
+        preprocess_model,
+        drop_remainder=drop_remainder,
+        **padding_kwargs)
+    _diagnose_input_pipeline(
+        input_diagnostics, stages, adapted_model_fn, trainer)
+
   model = trainer.train(
       adapted_model_fn,
       train_ds_provider,
@@ -627,13 +996,30 @@ def run(*,
       gtspec,
       preprocess_model)
 
-  run_result = RunResult(
-      preprocess_model=parsing_and_preprocess_model,
-      base_model=model.get_layer(_BASE_MODEL_TAG),
-      trained_model=model)
+  if not is_multi_trial:
+    run_result = RunResult(
+        preprocess_model=parsing_and_preprocess_model,
+        base_model=model.get_layer(_BASE_MODEL_TAG),
+        trained_model=model)
+
+    for export_dir in export_dirs or (
+        os.path.join(trainer.model_dir, "export"),):
+      for exporter in model_exporters:
+        exporter.save(run_result, export_dir)
+
+    return run_result
+
+  run_results = {}
+  for trial in model_fn:
+    trial_model = model.get_layer(_trial_model_tag(trial))
+    run_results[trial] = RunResult(
+        preprocess_model=parsing_and_preprocess_model,
+        base_model=trial_model.get_layer(_BASE_MODEL_TAG),
+        trained_model=trial_model)
 
   for export_dir in export_dirs or (os.path.join(trainer.model_dir, "export"),):
-    for exporter in model_exporters:
-      exporter.save(run_result, export_dir)
+    for trial, run_result in run_results.items():
+      for exporter in model_exporters:
+        exporter.save(run_result, os.path.join(export_dir, trial))
 
-  return run_result
+  return run_results
@@ -25,8 +25,10 @@ from tensorflow_gnn.models import vanilla_mpnn
 from tensorflow_gnn.runner import interfaces
 from tensorflow_gnn.runner import orchestration
 from tensorflow_gnn.runner.tasks import classification
+from tensorflow_gnn.runner.tasks import link_prediction
 from tensorflow_gnn.runner.trainers import keras_fit
 from tensorflow_gnn.runner.utils import label_fns
+from tensorflow_gnn.runner.utils import padding as padding_utils
 
 _CLASSES = tuple(range(32))
 _SCHEMA = """
@@ -357,6 +359,294 @@ class OrchestrationTests(tf.test.TestCase, parameterized.TestCase):
 
     self.assertAllEqual(expected, actual)
 
+  @parameterized.named_parameters([
+      dict(testcase_name="NoPadding", padding=False),
+      dict(testcase_name="Padding", padding=True),
+  ])
+  def test_input_diagnostics(self, padding: bool):
+    ds_provider = DatasetProvider(random_serialized_graph_tensor(), 32)
+    task = classification.RootNodeMulticlassClassification(
+        "nodes",
+        num_classes=len(_CLASSES),
+        label_fn=label_fns.ContextLabelFn("classes"))
+    model_dir = self.create_tempdir().full_path
+    trainer = keras_fit.KerasTrainer(
+        strategy=tf.distribute.get_strategy(),
+        model_dir=model_dir,
+        steps_per_epoch=1,
+        restore_best_weights=False)
+
+    run_result = orchestration.run(
+        train_ds_provider=ds_provider,
+        model_fn=lambda _: model_fn(),
+        optimizer_fn=tf.keras.optimizers.Adam,
+        epochs=1,
+        trainer=trainer,
+        task=task,
+        gtspec=gt_spec(),
+        global_batch_size=2,
+        train_padding=(
+            padding_utils.TightPadding(gt_spec(), ds_provider)
+            if padding else None),
+        input_diagnostics=orchestration.InputDiagnosticsConfig(num_batches=3))
+    # The training steps for diagnostics do not touch the trained model.
+    self.assertEqual(
+        run_result.trained_model.optimizer.iterations.numpy(), 1)
+
+    tags = set()
+    for filename in tf.io.gfile.glob(
+        os.path.join(model_dir, "input_diagnostics", "events*")):
+      for event in tf.compat.v1.train.summary_iterator(filename):
+        tags.update(v.tag for v in event.summary.value)
+
+    expected_stages = ["read", "batch", "parse_example"]
+    if padding:
+      expected_stages.append("merge_and_pad_to_total_sizes")
+    else:
+      expected_stages.append("merge_batch_to_components")
+    expected_stages.append("preprocess")
+    expected_tags = {f"records_per_second/{i:02d}_{stage}"
+                     for i, stage in enumerate(expected_stages)}
+    expected_tags.update(["records_per_second/train_step", "report"])
+    self.assertEqual(tags, expected_tags)
+
+  @parameterized.named_parameters([
+      dict(testcase_name="NoPadding", padding=False),
+      dict(testcase_name="Padding", padding=True),
+  ])
+  def test_preprocessing_cache(self, padding: bool):
+    ds_provider = DatasetProvider(random_serialized_graph_tensor(), 8)
+    # Fails to parse if the input pipeline up to the cache is run.
+    unparsable_ds_provider = DatasetProvider(b"unparsable", 8)
+    train_padding = (
+        padding_utils.TightPadding(gt_spec(), ds_provider)
+        if padding else None)
+    model_dir = self.create_tempdir().full_path
+    cache_dir = os.path.join(model_dir, "cache")
+
+    def run(train_ds_provider):
+      return orchestration.run(
+          train_ds_provider=train_ds_provider,
+          model_fn=lambda _: model_fn(),
+          optimizer_fn=tf.keras.optimizers.Adam,
+          epochs=2,
+          trainer=keras_fit.KerasTrainer(
+              strategy=tf.distribute.get_strategy(),
+              model_dir=model_dir,
+              restore_best_weights=False),
+          task=classification.RootNodeMulticlassClassification(
+              "nodes",
+              num_classes=len(_CLASSES),
+              label_fn=label_fns.ContextLabelFn("classes")),
+          gtspec=gt_spec(),
+          global_batch_size=2,
+          train_padding=train_padding,
+          preprocessing_cache_config=orchestration.PreprocessingCacheConfig(
+              cache_dir, shuffle_batches_buffer_size=4))
+
+    # An interrupted pass leaves no complete cache behind...
+    with self.assertRaises(tf.errors.OpError):
+      run(unparsable_ds_provider)
+    self.assertEmpty(tf.io.gfile.glob(os.path.join(cache_dir, "*.done")))
+
+    # ...and is redone.
+    run(ds_provider)
+    markers = tf.io.gfile.glob(
+        os.path.join(cache_dir, "batches-00000-of-00001-bs2-*.done"))
+    self.assertLen(markers, 1)
+    cache_path = markers[0][:-len(".done")]
+    cached_batches = list(tf.data.Dataset.load(cache_path))
+    self.assertLen(cached_batches, 4)
+    mtimes = {filename: tf.io.gfile.stat(filename).mtime_nsec
+              for filename in tf.io.gfile.glob(os.path.join(cache_path, "*"))}
+
+    # A second run replays the same batches without running the input
+    # pipeline up to the cache.
+    run(unparsable_ds_provider)
+    self.assertEqual(
+        mtimes,
+        {filename: tf.io.gfile.stat(filename).mtime_nsec
+         for filename in tf.io.gfile.glob(os.path.join(cache_path, "*"))})
+    self.assertEqual(markers, tf.io.gfile.glob(
+        os.path.join(cache_dir, "*.done")))
+
+  def test_preprocessing_cache_with_infinite_dataset(self):
+    ds_provider = DatasetProvider(random_serialized_graph_tensor(), -1)
+    with self.assertRaisesRegex(ValueError, r"requires a finite"):
+      orchestration.run(
+          train_ds_provider=ds_provider,
+          model_fn=lambda _: model_fn(),
+          optimizer_fn=tf.keras.optimizers.Adam,
+          trainer=keras_fit.KerasTrainer(
+              strategy=tf.distribute.get_strategy(),
+              model_dir=self.create_tempdir(),
+              steps_per_epoch=1,
+              restore_best_weights=False),
+          task=classification.RootNodeMulticlassClassification(
+              "nodes",
+              num_classes=len(_CLASSES),
+              label_fn=label_fns.ContextLabelFn("classes")),
+          gtspec=gt_spec(),
+          global_batch_size=2,
+          preprocessing_cache_config=orchestration.PreprocessingCacheConfig(
+              self.create_tempdir().full_path))
+
+  def test_async_checkpoint(self):
+    ds_provider = DatasetProvider(random_serialized_graph_tensor())
+    task = classification.RootNodeMulticlassClassification(
+        "nodes",
+        num_classes=len(_CLASSES),
+        label_fn=label_fns.ContextLabelFn("classes"))
+    model_dir = self.create_tempdir().full_path
+    trainer = keras_fit.KerasTrainer(
+        strategy=tf.distribute.get_strategy(),
+        model_dir=model_dir,
+        checkpoint_options=keras_fit.KerasTrainerCheckpointOptions(
+            async_checkpoint=True),
+        steps_per_epoch=2,
+        checkpoint_every_n_steps=1,
+        restore_best_weights=True)
+
+    run_result = orchestration.run(
+        train_ds_provider=ds_provider,
+        valid_ds_provider=ds_provider,
+        model_fn=lambda _: model_fn(),
+        optimizer_fn=tf.keras.optimizers.Adam,
+        epochs=2,
+        trainer=trainer,
+        task=task,
+        gtspec=gt_spec(),
+        global_batch_size=2)
+
+    for name in ("best", "latest"):
+      self.assertTrue(tf.io.gfile.exists(
+          os.path.join(model_dir, "ckpnt", f"{name}.index")))
+    self.assertTrue(run_result.trained_model.built)
+
+  def test_backup_input(self):
+    ds_provider = DatasetProvider(random_serialized_graph_tensor())
+    task = classification.RootNodeMulticlassClassification(
+        "nodes",
+        num_classes=len(_CLASSES),
+        label_fn=label_fns.ContextLabelFn("classes"))
+    model_dir = self.create_tempdir().full_path
+    trainer = keras_fit.KerasTrainer(
+        strategy=tf.distribute.get_strategy(),
+        model_dir=model_dir,
+        steps_per_epoch=4,
+        backup_every_n_steps=2,
+        backup_input=True)
+
+    run_result = orchestration.run(
+        train_ds_provider=ds_provider,
+        model_fn=lambda _: model_fn(),
+        optimizer_fn=tf.keras.optimizers.Adam,
+        epochs=2,
+        trainer=trainer,
+        task=task,
+        gtspec=gt_spec(),
+        global_batch_size=2)
+
+    self.assertTrue(run_result.trained_model.built)
+    # The backups are deleted after training.
+    self.assertFalse(tf.io.gfile.exists(
+        os.path.join(model_dir, "backup", "input", "worker_0")))
+
+  def test_backup_input_requires_backup_and_restore(self):
+    with self.assertRaisesRegex(ValueError, "requires `backup_and_restore`"):
+      keras_fit.KerasTrainer(
+          strategy=tf.distribute.get_strategy(),
+          model_dir=self.create_tempdir().full_path,
+          backup_and_restore=False,
+          backup_input=True)
+
+  def test_preprocessing_cache_with_tf_data_service(self):
+    with self.assertRaisesRegex(ValueError, "not supported"):
+      orchestration.run(
+          train_ds_provider=DatasetProvider(random_graph_tensor()),
+          model_fn=lambda _: model_fn(),
+          optimizer_fn=tf.keras.optimizers.Adam,
+          trainer=keras_fit.KerasTrainer(
+              strategy=tf.distribute.get_strategy(),
+              model_dir=self.create_tempdir().full_path),
+          task=classification.RootNodeMulticlassClassification(
+              "nodes",
+              num_classes=len(_CLASSES),
+              label_fn=label_fns.ContextLabelFn("classes")),
+          gtspec=gt_spec(),
+          global_batch_size=2,
+          tf_data_service_config=orchestration.TFDataServiceConfig(
+              "grpc://localhost:5050", "job", "OFF"),
+          preprocessing_cache_config=orchestration.PreprocessingCacheConfig(
+              self.create_tempdir().full_path))
+
+  def test_in_batch_negatives_with_padding(self):
+    def link_graph(i, label):
+      return tfgnn.GraphTensor.from_pieces(
+          node_sets={
+              "nodes": tfgnn.NodeSet.from_fields(
+                  sizes=[2],
+                  features={"features": tf.fill([2, 4], float(i))}),
+              "_readout": tfgnn.NodeSet.from_fields(
+                  sizes=[1], features={"label": [label]}),
+          },
+          edge_sets={
+              "_readout/source": tfgnn.EdgeSet.from_fields(
+                  sizes=[1],
+                  adjacency=tfgnn.Adjacency.from_indices(
+                      ("nodes", [0]), ("_readout", [0]))),
+              "_readout/target": tfgnn.EdgeSet.from_fields(
+                  sizes=[1],
+                  adjacency=tfgnn.Adjacency.from_indices(
+                      ("nodes", [1]), ("_readout", [0]))),
+          })
+
+    labels = (1., 1., 0., 1., 1.)
+    graphs = [link_graph(i, label) for i, label in enumerate(labels)]
+    class LinkDatasetProvider(interfaces.DatasetProvider):
+
+      def get_dataset(self, _: tf.distribute.InputContext) -> tf.data.Dataset:
+        return tf.data.Dataset.from_generator(
+            lambda: iter(graphs), output_signature=graphs[0].spec)
+
+    ds_provider = LinkDatasetProvider()
+    gtspec = graphs[0].spec
+
+    def link_model_fn(_):
+      inputs = tf.keras.layers.Input(type_spec=gtspec)
+      outputs = tfgnn.keras.layers.MapFeatures(
+          node_sets_fn=lambda node_set, node_set_name: (
+              tf.keras.layers.Dense(4)(node_set["features"])
+              if node_set_name == "nodes" else node_set.features))(inputs)
+      return tf.keras.Model(inputs, outputs)
+
+    task = link_prediction.InBatchNegativesLinkPrediction(
+        negatives_cache_size=8)
+    trainer = keras_fit.KerasTrainer(
+        strategy=tf.distribute.get_strategy(),
+        model_dir=self.create_tempdir().full_path,
+        restore_best_weights=False)
+
+    # The last batch of one pair is padded by a fake pair.
+    run_result = orchestration.run(
+        train_ds_provider=ds_provider,
+        model_fn=link_model_fn,
+        optimizer_fn=tf.keras.optimizers.Adam,
+        epochs=1,
+        trainer=trainer,
+        task=task,
+        gtspec=gtspec,
+        global_batch_size=2,
+        train_padding=padding_utils.TightPadding(gtspec, ds_provider),
+        model_exporters=())
+
+    cache, = [m for m in run_result.trained_model.submodules
+              if isinstance(m, link_prediction._NegativesCache)]
+    # All six targets (with padding) went into the cache, but only those of
+    # the four positive pairs are valid negatives.
+    self.assertEqual(int(cache._count), 6)
+    self.assertEqual(int(tf.reduce_sum(cache._valid)), 4)
+
   def test_multi_task(self):
     gt = with_readout(random_graph_tensor())
     tasks = {
@@ -427,6 +717,114 @@ class OrchestrationTests(tf.test.TestCase, parameterized.TestCase):
     self.assertAllClose(actual["s3"], actual["s4"]["output_1"])
     self.assertAllClose(actual["s3"], actual["s4"]["output_2"])
 
+  @parameterized.named_parameters([
+      dict(testcase_name="NoPadding", padding=False),
+      dict(testcase_name="Padding", padding=True),
+  ])
+  def test_multi_trial(self, padding: bool):
+    task = classification.RootNodeMulticlassClassification(
+        "nodes",
+        num_classes=len(_CLASSES),
+        label_fn=label_fns.ContextLabelFn("classes"))
+    models = {"small": model_fn(), "large": model_fn()}
+    model_dir = self.create_tempdir()
+    history = tf.keras.callbacks.History()
+    trainer = keras_fit.KerasTrainer(
+        strategy=tf.distribute.get_strategy(),
+        model_dir=model_dir,
+        steps_per_epoch=1,
+        restore_best_weights=False,
+        callbacks=(history,))
+    ds_provider = DatasetProvider(random_serialized_graph_tensor())
+    if padding:
+      train_padding = padding_utils.TightPadding(gt_spec(), ds_provider)
+    else:
+      train_padding = None
+
+    run_results = orchestration.run(
+        train_ds_provider=ds_provider,
+        model_fn={"small": lambda _: models["small"],
+                  "large": lambda _: models["large"]},
+        optimizer_fn=tf.keras.optimizers.Adam,
+        epochs=1,
+        trainer=trainer,
+        task=task,
+        gtspec=gt_spec(),
+        global_batch_size=2,
+        train_padding=train_padding)
+
+    self.assertCountEqual(run_results.keys(), models.keys())
+
+    examples = tf.constant((random_serialized_graph_tensor(),) * 2)
+    for trial, model in models.items():
+      run_result = run_results[trial]
+      # Each trial keeps its own base model.
+      inputs = tfgnn.random_graph_tensor(gt_spec())
+      self.assertAllClose(
+          model(inputs).node_sets["nodes"][tfgnn.HIDDEN_STATE],
+          run_result.base_model(inputs).node_sets["nodes"][tfgnn.HIDDEN_STATE])
+      # Each trial is exported on its own, with one output.
+      saved_model = tf.saved_model.load(
+          os.path.join(model_dir, "export", trial))
+      output = saved_model.signatures["serving_default"](examples=examples)
+      self.assertLen(output, 1)
+      self.assertAllEqual(next(iter(output.values())).shape,
+                          (examples.shape[0], len(_CLASSES)))
+
+    # The preprocessing is shared.
+    self.assertIs(run_results["small"].preprocess_model,
+                  run_results["large"].preprocess_model)
+    # Losses and metrics are reported per trial.
+    self.assertContainsSubset(
+        ("loss", "small_loss", "large_loss"), history.history.keys())
+    self.assertTrue(any(k.startswith("small_") and k != "small_loss"
+                        for k in history.history))
+
+  def test_multi_trial_input_diagnostics(self):
+    with self.assertRaisesRegex(ValueError, "not supported for multi-trial"):
+      orchestration.run(
+          train_ds_provider=DatasetProvider(random_graph_tensor()),
+          model_fn={"trial": lambda _: model_fn()},
+          optimizer_fn=tf.keras.optimizers.Adam,
+          trainer=keras_fit.KerasTrainer(
+              strategy=tf.distribute.get_strategy(),
+              model_dir=self.create_tempdir(),
+              steps_per_epoch=1),
+          task=classification.RootNodeMulticlassClassification(
+              "nodes",
+              num_classes=len(_CLASSES),
+              label_fn=label_fns.ContextLabelFn("classes")),
+          gtspec=gt_spec(),
+          global_batch_size=2,
+          input_diagnostics=orchestration.InputDiagnosticsConfig())
+
+  @parameterized.named_parameters([
+      dict(testcase_name="Explicit", restore_best_weights=True,
+           validate=False),
+      dict(testcase_name="DefaultWithValidation", restore_best_weights=None,
+           validate=True),
+  ])
+  def test_multi_trial_restore_best_weights(
+      self, restore_best_weights: Optional[bool], validate: bool):
+    ds_provider = DatasetProvider(random_serialized_graph_tensor())
+    with self.assertRaisesRegex(ValueError, "not supported for multi-trial"):
+      orchestration.run(
+          train_ds_provider=ds_provider,
+          model_fn={"trial": lambda _: model_fn()},
+          optimizer_fn=tf.keras.optimizers.Adam,
+          trainer=keras_fit.KerasTrainer(
+              strategy=tf.distribute.get_strategy(),
+              model_dir=self.create_tempdir(),
+              steps_per_epoch=1,
+              restore_best_weights=restore_best_weights),
+          task=classification.RootNodeMulticlassClassification(
+              "nodes",
+              num_classes=len(_CLASSES),
+              label_fn=label_fns.ContextLabelFn("classes")),
+          gtspec=gt_spec(),
+          global_batch_size=2,
+          valid_ds_provider=ds_provider if validate else None)
+
   def test_multioutput(self):
     gt = with_readout(random_graph_tensor())
     task = MultioutputSentinelTask()
@@ -19,6 +19,7 @@ from typing import Optional, Tuple
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 from tensorflow_gnn.runner import interfaces
+from tensorflow_gnn.utils import distribute_utils
 
 
 def _validate_readout_for_link_prediction(
@@ -141,12 +142,18 @@ class _LinkPrediction(interfaces.Task):
         node_set_name=self._readout_node_set_name)(gt)
     return x, y
 
-  def predict(self, graph: tfgnn.GraphTensor) -> interfaces.Predictions:
+  def _read_out_pairs(
+      self, graph: tfgnn.GraphTensor) -> Tuple[tf.Tensor, tf.Tensor]:
+    """Returns the source and target features of the readout pairs."""
     tfgnn.check_scalar_graph_tensor(graph, name='LinkPrediction')
     src_features = tfgnn.keras.layers.StructuredReadout(
         key='source', feature_name=self._node_feature_name)(graph)
     tgt_features = tfgnn.keras.layers.StructuredReadout(
         key='target', feature_name=self._node_feature_name)(graph)
+    return src_features, tgt_features
+
+  def predict(self, graph: tfgnn.GraphTensor) -> interfaces.Predictions:
+    src_features, tgt_features = self._read_out_pairs(graph)
     scores = self._compute_edge_scores(src_features, tgt_features)
 
     return scores
@@ -188,3 +195,380 @@ class HadamardProductLinkPrediction(_LinkPrediction):
                        'mean to reshape?')
     hadamard = src_features * tgt_features
     return self._dense_layer(hadamard)
+
+
+
+
+def _target_ids_to_int64(ids: tf.Tensor) -> tf.Tensor:
+  """Returns integer ids as int64 and string ids as their int64 hashes."""
+  ids = tf.reshape(ids, [-1])
+  if ids.dtype == tf.string:
+    return tf.strings.to_hash_bucket_fast(ids, 2**62)
+  return tf.cast(ids, tf.int64)
+
+
+class _NegativesCache(tf.keras.layers.Layer):
+  """Scores sources against in-batch targets and a cache of recent targets.
+
+  Returns logits of shape `[B, B + C]`: column `j < B` scores target `j` of
+  the batch, the other columns score `C` cached targets (all of the cache, or
+  `num_sampled_negatives` sampled from it). When training, the targets of the
+  batch (of all replicas, under a distribution strategy) replace the oldest
+  cache entries after scoring. `invalidate_last_write()` can then remove the
+  ones that should not serve as negatives, based on labels that this layer
+  does not see.
+
+  If the inputs have a third item, the ids of the targets with shape `[B]`
+  (integers or strings), a target is not scored as a negative for a pair with
+  the same target id, neither in the batch nor in the cache ("accidental
+  hits").
+  """
+
+  def __init__(self, *,
+               cache_size: int = 0,
+               num_sampled_negatives: Optional[int] = None,
+               **kwargs):
+    super().__init__(**kwargs)
+    self._cache_size = cache_size
+    self._num_sampled_negatives = num_sampled_negatives
+
+  def get_config(self):
+    return dict(cache_size=self._cache_size,
+                num_sampled_negatives=self._num_sampled_negatives,
+                **super().get_config())
+
+  def build(self, input_shape):
+    _, tgt_shape, *_ = input_shape
+    if self._cache_size:
+      self._cache = self.add_weight(
+          name='cache', shape=[self._cache_size, tgt_shape[-1]],
+          initializer='zeros', trainable=False,
+          **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+      # Whether each entry may serve as a negative (1.0) or not (0.0).
+      self._valid = self.add_weight(
+          name='valid', shape=[self._cache_size], initializer='zeros',
+          trainable=False, **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+      # The target id of each entry, or -1.
+      self._ids = self.add_weight(
+          name='ids', shape=[self._cache_size], dtype=tf.int64,
+          initializer=tf.keras.initializers.Constant(-1), trainable=False,
+          **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+      # The number of targets ever added; the next one goes to `count % C`.
+      self._count = self.add_weight(
+          name='count', shape=[], dtype=tf.int64, initializer='zeros',
+          trainable=False, **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+      # The number of targets added by the last training step, until
+      # `invalidate_last_write()` is done with them.
+      self._last_write_size = self.add_weight(
+          name='last_write_size', shape=[], dtype=tf.int64,
+          initializer='zeros', trainable=False,
+          **distribute_utils.MIRRORED_VARIABLE_KWARGS)
+    super().build(input_shape)
+
+  def call(self, inputs, training=None):
+    src_features, tgt_features, *tgt_ids = inputs
+    logits = tf.matmul(src_features, tgt_features, transpose_b=True)
+    if tgt_ids:
+      tgt_ids = _target_ids_to_int64(tgt_ids[0])
+      same_target = tf.logical_and(
+          tf.equal(tgt_ids[:, tf.newaxis], tgt_ids[tf.newaxis, :]),
+          tf.logical_not(tf.cast(tf.eye(tf.size(tgt_ids)), tf.bool)))
+      logits = tf.where(same_target, tf.cast(-1e9, logits.dtype), logits)
+    else:
+      tgt_ids = None
+    if not self._cache_size:
+      return logits
+
+    cache = tf.cast(self._cache, src_features.dtype)
+    num_written = tf.minimum(self._count, self._cache_size)
+    if self._num_sampled_negatives is None:
+      cached_logits = tf.matmul(src_features, cache, transpose_b=True)
+      valid = tf.convert_to_tensor(self._valid) > 0
+      cached_ids = tf.convert_to_tensor(self._ids)
+    else:
+      # Uniform sampling from the written entries, corrected by the log of the
+      # expected count of each entry in the sample ("logQ correction").
+      indices = tf.random.uniform(
+          [self._num_sampled_negatives], maxval=tf.maximum(num_written, 1),
+          dtype=tf.int64)
+      cached_logits = tf.matmul(src_features, tf.gather(cache, indices),
+                                transpose_b=True)
+      log_expected_count = (
+          tf.math.log(float(self._num_sampled_negatives)) -
+          tf.math.log(tf.cast(tf.maximum(num_written, 1), tf.float32)))
+      cached_logits -= tf.cast(log_expected_count, cached_logits.dtype)
+      valid = tf.gather(self._valid, indices) > 0
+      cached_ids = tf.gather(self._ids, indices)
+    valid = tf.broadcast_to(valid[tf.newaxis, :], tf.shape(cached_logits))
+    if tgt_ids is not None:
+      valid = tf.logical_and(
+          valid, tf.not_equal(tgt_ids[:, tf.newaxis],
+                              cached_ids[tf.newaxis, :]))
+    cached_logits = tf.where(valid, cached_logits,
+                             tf.cast(-1e9, cached_logits.dtype))
+
+    if training:
+      new_features = tf.cast(tf.stop_gradient(tgt_features), self._cache.dtype)
+      if tgt_ids is None:
+        new_ids = tf.fill(tf.shape(new_features)[:1], tf.constant(-1, tf.int64))
+      else:
+        new_ids = tgt_ids
+      new_features, new_ids = distribute_utils.all_gather_from_replicas(
+          new_features, new_ids)
+      batch_size = tf.shape(new_features, out_type=tf.int64)[0]
+      positions = (self._count + tf.range(batch_size)) % self._cache_size
+      # If the batch is larger than the cache, only the last targets fit.
+      num_new = tf.minimum(batch_size, self._cache_size)
+      positions = positions[-num_new:]
+      updates = [
+          self._cache.scatter_update(
+              tf.IndexedSlices(new_features[-num_new:], positions)),
+          self._ids.scatter_update(
+              tf.IndexedSlices(new_ids[-num_new:], positions)),
+          self._valid.scatter_update(
+              tf.IndexedSlices(tf.ones([num_new], self._valid.dtype),
+                               positions)),
+      ]
+      with tf.control_dependencies(updates):
+        update_count = tf.group(self._count.assign_add(batch_size),
+                                self._last_write_size.assign(batch_size))
+      with tf.control_dependencies([update_count]):
+        cached_logits = tf.identity(cached_logits)
+
+    return tf.concat([logits, cached_logits], axis=1)
+
+  def invalidate_last_write(self, keep: tf.Tensor) -> tf.Operation:
+    """Marks targets written by the last training step as invalid negatives.
+
+    Args:
+      keep: A boolean tensor of shape `[B]` that is true for the targets of
+        this replica in the last training step that may serve as negatives
+        later on. After calls with `training=False`, nothing is invalidated.
+
+    Returns:
+      The update op.
+    """
+    if not self._cache_size:
+      return tf.no_op()
+    (keep,) = distribute_utils.all_gather_from_replicas(tf.reshape(keep, [-1]))
+    batch_size = tf.shape(keep, out_type=tf.int64)[0]
+    num_new = tf.minimum(self._last_write_size, self._cache_size)
+    positions = (self._count - num_new + tf.range(num_new)) % self._cache_size
+    drop = tf.logical_not(keep[batch_size - num_new:])
+    dropped_positions = tf.boolean_mask(positions, drop)
+    update = self._valid.scatter_update(tf.IndexedSlices(
+        tf.zeros(tf.shape(dropped_positions), self._valid.dtype),
+        dropped_positions))
+    with tf.control_dependencies([update]):
+      return self._last_write_size.assign(0)
+
+
+def _mask_in_batch_targets(logits: tf.Tensor,
+                           sample_weight: Optional[tf.Tensor]) -> tf.Tensor:
+  """Masks the in-batch targets of pairs with zero `sample_weight`."""
+  if sample_weight is None:
+    return logits
+  valid = tf.cast(tf.reshape(sample_weight, [-1]), tf.float32) > 0
+  num_cached = tf.shape(logits)[1] - tf.shape(valid)[0]
+  valid = tf.concat([valid, tf.ones([num_cached], tf.bool)], axis=0)
+  return tf.where(valid[tf.newaxis, :], logits,
+                  tf.cast(-1e9, logits.dtype))
+
+
+def _in_batch_softmax_loss(y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+  """Returns the softmax cross-entropy of each positive pair, else zero."""
+  positive = tf.reshape(y_true, [-1]) > 0
+  batch_size = tf.shape(y_pred)[0]
+  losses = tf.nn.sparse_softmax_cross_entropy_with_logits(
+      labels=tf.range(batch_size), logits=tf.cast(y_pred, tf.float32))
+  return tf.where(positive, losses, 0.)
+
+
+def _in_batch_top1_accuracy(y_true: tf.Tensor,
+                            y_pred: tf.Tensor) -> tf.Tensor:
+  """Returns whether each positive pair scores highest, else zero."""
+  positive = tf.reshape(y_true, [-1]) > 0
+  batch_size = tf.shape(y_pred)[0]
+  correct = tf.equal(tf.argmax(y_pred, axis=1, output_type=tf.int32),
+                     tf.range(batch_size))
+  return tf.cast(tf.logical_and(positive, correct), tf.float32)
+
+
+class _InBatchSoftmaxLoss(tf.keras.losses.Loss):
+  """Softmax cross-entropy over in-batch (and cached) targets.
+
+  Pairs with zero `sample_weight` (like the fake pairs of padding, masked by
+  `runner.run()`) are left out both as positives and as in-batch negatives.
+  If a `_NegativesCache` is passed, the targets that it wrote in the training
+  step of this loss are kept as cached negatives only for positive pairs with
+  non-zero `sample_weight`.
+  """
+
+  def __init__(self,
+               negatives_cache: Optional[_NegativesCache] = None,
+               **kwargs):
+    super().__init__(**kwargs)
+    self._negatives_cache = negatives_cache
+
+  def __call__(self,
+               y_true: tf.Tensor,
+               y_pred: tf.Tensor,
+               sample_weight: Optional[tf.Tensor] = None) -> tf.Tensor:
+    loss = super().__call__(
+        y_true, _mask_in_batch_targets(y_pred, sample_weight), sample_weight)
+    if self._negatives_cache is None:
+      return loss
+    keep = tf.reshape(y_true, [-1]) > 0
+    if sample_weight is not None:
+      keep = tf.logical_and(
+          keep, tf.cast(tf.reshape(sample_weight, [-1]), tf.float32) > 0)
+    with tf.control_dependencies(
+        [self._negatives_cache.invalidate_last_write(keep)]):
+      return tf.identity(loss)
+
+  def call(self, y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+    return _in_batch_softmax_loss(y_true, y_pred)
+
+
+class _InBatchTop1Accuracy(tf.keras.metrics.Mean):
+  """The fraction of positive pairs whose target scores highest.
+
+  Pairs with zero `sample_weight` (like the fake pairs of padding, masked by
+  `runner.run()`) are left out both as positives and as in-batch negatives.
+  """
+
+  def __init__(self, name: str = 'in_batch_top1_accuracy', **kwargs):
+    super().__init__(name=name, **kwargs)
+
+  def update_state(self,
+                   y_true: tf.Tensor,
+                   y_pred: tf.Tensor,
+                   sample_weight: Optional[tf.Tensor] = None) -> None:
+    weight = tf.cast(tf.reshape(y_true, [-1]) > 0, tf.float32)
+    if sample_weight is not None:
+      weight *= tf.cast(tf.reshape(sample_weight, [-1]), tf.float32)
+    return super().update_state(
+        _in_batch_top1_accuracy(
+            y_true, _mask_in_batch_targets(y_pred, sample_weight)),
+        weight)
+
+
+class InBatchNegativesLinkPrediction(_LinkPrediction):
+  """Scores each source against all targets in the batch, as a softmax.
+
+  This is a two-tower link prediction task: sources and targets are embedded
+  separately (by the base GNN, followed by an optional `Dense` projection per
+  side) and scored by their dot product. For the readout pairs
+  `(source_i, target_i)` of a batch of `B` pairs, it computes all `B x B`
+  scores in one matmul and trains each positive pair with a softmax over the
+  targets of the batch: the targets of the other pairs serve as negatives,
+  without sampling subgraphs for them. (Pairs with label 0 are not trained as
+  positives, but their targets are still negatives for the others.)
+
+  Optionally, a cache of the `negatives_cache_size` most recent target
+  embeddings of positive pairs adds more negatives (with stale embeddings, not
+  backpropagated).
+  With `num_sampled_negatives`, each step uses a uniform sample of that many
+  cache entries instead of all of them, as a sampled softmax with logQ
+  correction. The cache is filled from the targets of each training step,
+  gathered from all replicas under a distribution strategy. The loss of this
+  task then drops the entries of pairs with label 0 or zero `sample_weight`,
+  so the labels are only read on the loss side and not by the model.
+
+  The prediction is a matrix of logits with shape `[B, B + C]`, for the `C`
+  cached negatives: its diagonal holds the (scaled) score of each readout
+  pair. If `target_id_feature_name` is set, a target is not scored as a
+  negative for pairs with the same target id (in the batch or the cache).
+  Otherwise, the same target in several positive pairs of a batch (or in the
+  cache) counts as a negative for the others.
+
+  The loss and metric compute one value per pair (zero unless positive), so
+  they can be weighted by the padding mask of `runner.run()`. The targets of
+  the fake pairs of padding are left out of the in-batch negatives and of the
+  cache by that mask.
+  """
+
+  def __init__(self, *,
+               temperature: float = 1.0,
+               projection_dim: Optional[int] = None,
+               negatives_cache_size: int = 0,
+               num_sampled_negatives: Optional[int] = None,
+               target_id_feature_name: Optional[tfgnn.FieldName] = None,
+               **kwargs):
+    """Constructs the task.
+
+    Args:
+      temperature: Divides the scores before the softmax.
+      projection_dim: If set, sources and targets are projected by separate
+        `Dense` layers to this dimension before scoring.
+      negatives_cache_size: The number of recent target embeddings to keep as
+        extra negatives. Zero disables the cache.
+      num_sampled_negatives: If set, the number of cache entries sampled per
+        step (requires a cache). If unset, all cache entries are scored.
+      target_id_feature_name: If set, the feature of the target node set with
+        integer or string node ids, used to avoid scoring a pair's own target
+        (from another pair or the cache) as its negative.
+      **kwargs: `node_feature_name`, `readout_label_feature_name` and
+        `readout_node_set_name`, as for `DotProductLinkPrediction`.
+    """
+    super().__init__(**kwargs)
+    if temperature <= 0:
+      raise ValueError(f'Expected `temperature` > 0 (got {temperature})')
+    if negatives_cache_size < 0:
+      raise ValueError('Expected `negatives_cache_size` >= 0 '
+                       f'(got {negatives_cache_size})')
+    if num_sampled_negatives is not None and not negatives_cache_size:
+      raise ValueError('`num_sampled_negatives` requires a '
+                       '`negatives_cache_size`')
+    self._temperature = temperature
+    self._projection_dim = projection_dim
+    self._negatives_cache_size = negatives_cache_size
+    self._num_sampled_negatives = num_sampled_negatives
+    self._target_id_feature_name = target_id_feature_name
+    # The cache layer of the last `predict()`, for use by `losses()`.
+    self._negatives_cache = None
+
+  def predict(self, graph: tfgnn.GraphTensor) -> interfaces.Predictions:
+    src_features, tgt_features = self._read_out_pairs(graph)
+    if self._target_id_feature_name is None:
+      return self._compute_edge_scores(src_features, tgt_features)
+    tgt_ids = tfgnn.keras.layers.StructuredReadout(
+        key='target', feature_name=self._target_id_feature_name)(graph)
+    return self._compute_edge_scores(src_features, tgt_features,
+                                     tgt_ids=tgt_ids)
+
+  def _compute_edge_scores(
+      self, src_features: tf.Tensor, tgt_features: tf.Tensor,
+      tgt_ids: Optional[tf.Tensor] = None) -> tf.Tensor:
+    """Returns the `[B, B + C]` scores of all sources against all targets."""
+    if src_features.shape.rank != 2 or tgt_features.shape.rank != 2:
+      raise ValueError('InBatchNegativesLinkPrediction is only supported for '
+                       'matrix Tensors (batch size x feature size). Did you '
+                       'mean to reshape?')
+    if self._projection_dim is not None:
+      src_features = tf.keras.layers.Dense(
+          self._projection_dim, name='source_projection')(src_features)
+      tgt_features = tf.keras.layers.Dense(
+          self._projection_dim, name='target_projection')(tgt_features)
+    inputs = (src_features, tgt_features)
+    if tgt_ids is not None:
+      inputs += (tgt_ids,)
+    self._negatives_cache = _NegativesCache(
+        cache_size=self._negatives_cache_size,
+        num_sampled_negatives=self._num_sampled_negatives,
+        name='negatives_cache')
+    logits = self._negatives_cache(inputs)
+    return logits / self._temperature
+
+  def losses(self) -> interfaces.Losses:
+    """Softmax cross-entropy over in-batch (and cached) targets."""
+    if not self._negatives_cache_size:
+      return _InBatchSoftmaxLoss()
+    if self._negatives_cache is None:
+      raise ValueError('InBatchNegativesLinkPrediction with a '
+                       '`negatives_cache_size` requires `predict()` to be '
+                       'called before `losses()`')
+    return _InBatchSoftmaxLoss(self._negatives_cache)
+
+  def metrics(self) -> interfaces.Metrics:
+    return _InBatchTop1Accuracy()
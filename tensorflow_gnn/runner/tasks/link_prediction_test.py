@@ -23,6 +23,13 @@ import tensorflow_gnn as tfgnn
 from tensorflow_gnn.runner.tasks import link_prediction
 
 
+def setUpModule():
+  # Splits the CPU into two logical devices for MirroredStrategy tests.
+  cpus = tf.config.list_physical_devices('CPU')
+  tf.config.set_logical_device_configuration(
+      cpus[0], [tf.config.LogicalDeviceConfiguration()] * 2)
+
+
 def _get_graph_tensor(
     readout_ns_name='_readout',
     readout_src_es_names=('_readout/source', 'nodes1', '_readout'),
@@ -132,6 +139,161 @@ class LinkPredictionTest(tf.test.TestCase, parameterized.TestCase):
     self.assertAllClose(label, tf.constant([[1.0], [0.0]]))
 
 
+  def test_predict_on_in_batch_negatives_link_prediction(self):
+    task = link_prediction.InBatchNegativesLinkPrediction(temperature=2.0)
+    logits = task.predict(_get_graph_tensor())
+    src_feats = tf.constant([[4.0, 5.0], [4.0, 5.0]])
+    tgt_feats = tf.constant([[1.0, -2.0], [3.0, -4.0]])
+    self.assertAllClose(
+        logits, tf.matmul(src_feats, tgt_feats, transpose_b=True) / 2.0)
+
+  def test_in_batch_negatives_loss_and_metric(self):
+    task = link_prediction.InBatchNegativesLinkPrediction()
+    labels = tf.constant([[1.0], [0.0], [1.0]])
+    logits = tf.constant([[2.0, 1.0, 0.0, 5.0],
+                          [9.0, 9.0, 9.0, 9.0],
+                          [0.0, 3.0, 1.0, 0.0]])
+    expected_losses = [
+        -tf.nn.log_softmax(logits[0])[0],
+        0.0,
+        -tf.nn.log_softmax(logits[2])[2],
+    ]
+    self.assertAllClose(
+        link_prediction._in_batch_softmax_loss(labels, logits),
+        expected_losses)
+    self.assertAllClose(task.losses()(labels, logits),
+                        tf.reduce_sum(expected_losses) / 3)
+    metric = task.metrics()
+    metric.update_state(labels, logits)
+    self.assertAllClose(metric.result(), 0.0)
+    metric.reset_state()
+    metric.update_state(labels, logits + tf.eye(3, 4) * 9.0)
+    self.assertAllClose(metric.result(), 1.0)
+
+  def test_in_batch_negatives_loss_and_metric_with_mask(self):
+    task = link_prediction.InBatchNegativesLinkPrediction()
+    # The last pair is padding: it is neither a positive nor a negative.
+    labels = tf.constant([[1.0], [1.0], [0.0]])
+    logits = tf.constant([[2.0, 1.0, 9.0],
+                          [0.0, 3.0, 9.0],
+                          [9.0, 9.0, 9.0]])
+    mask = tf.constant([True, True, False])
+    expected_losses = [
+        -tf.nn.log_softmax(logits[0, :2])[0],
+        -tf.nn.log_softmax(logits[1, :2])[1],
+    ]
+    self.assertAllClose(task.losses()(labels, logits, mask),
+                        tf.reduce_sum(expected_losses) / 3)
+    metric = task.metrics()
+    metric.update_state(labels, logits, mask)
+    self.assertAllClose(metric.result(), 1.0)
+
+  @parameterized.named_parameters(
+      ('AllCached', None, 6),
+      ('SampledCache', 4, 4),
+  )
+  def test_in_batch_negatives_cache(self, num_sampled_negatives,
+                                    expected_num_cached):
+    cache = link_prediction._NegativesCache(
+        cache_size=6, num_sampled_negatives=num_sampled_negatives)
+    src = tf.constant([[1.0, 0.0], [0.0, 1.0]])
+    tgt = tf.constant([[2.0, 3.0], [4.0, 5.0]])
+
+    logits = cache((src, tgt), training=False)
+    self.assertEqual(logits.shape, [2, 2 + expected_num_cached])
+    self.assertAllClose(logits[:, :2], [[2.0, 4.0], [3.0, 5.0]])
+    # The cache is empty: its scores must not win the softmax.
+    self.assertAllLess(logits[:, 2:], -1e8)
+
+    for _ in range(4):
+      logits = cache((src, tgt), training=True)
+    # Eight targets went into a cache of six, the oldest were replaced.
+    self.assertEqual(int(cache._count), 8)
+    self.assertAllClose(
+        cache._cache, [[2.0, 3.0], [4.0, 5.0]] * 3)
+    logits = cache((src, tgt), training=False)
+    self.assertAllGreater(logits[:, 2:], 1.0)
+
+  def test_in_batch_negatives_cache_invalidation(self):
+    cache = link_prediction._NegativesCache(cache_size=4)
+    loss = link_prediction._InBatchSoftmaxLoss(cache)
+    src = tf.constant([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    tgt = tf.constant([[2.0, 3.0], [4.0, 5.0], [6.0, 7.0]])
+    labels = tf.constant([[1.0], [0.0], [1.0]])
+    # The second pair is a negative, the third one is padding.
+    loss(labels, cache((src, tgt), training=True),
+         tf.constant([True, True, False]))
+    self.assertEqual(int(cache._count), 3)
+    self.assertAllEqual(cache._valid, [1.0, 0.0, 0.0, 0.0])
+    self.assertEqual(int(cache._last_write_size), 0)
+    # Evaluation neither writes to the cache nor invalidates entries.
+    loss(tf.zeros_like(labels), cache((src, tgt), training=False))
+    self.assertAllEqual(cache._valid, [1.0, 0.0, 0.0, 0.0])
+    logits = cache((src, tgt), training=False)
+    self.assertAllGreater(logits[:, 3], 1.0)
+    self.assertAllLess(logits[:, 4:], -1e8)
+
+  def test_in_batch_negatives_accidental_hits(self):
+    cache = link_prediction._NegativesCache(cache_size=2)
+    src = tf.constant([[1.0, 0.0], [0.0, 1.0]])
+    tgt = tf.constant([[2.0, 3.0], [4.0, 5.0]])
+    # The same target in the batch is not a negative for its pairs.
+    logits = cache((src, tgt, tf.constant(['a', 'a'])), training=True)
+    self.assertAllClose(tf.linalg.diag_part(logits[:, :2]), [2.0, 5.0])
+    self.assertAllLess(logits[0, 1], -1e8)
+    self.assertAllLess(logits[1, 0], -1e8)
+    # Neither is a cached target with the same id.
+    logits = cache((src, tgt, tf.constant(['b', 'a'])), training=False)
+    self.assertAllClose(logits[:, :2], [[2.0, 4.0], [3.0, 5.0]])
+    self.assertAllClose(logits[0, 2:], [2.0, 4.0])
+    self.assertAllLess(logits[1, 2:], -1e8)
+
+  def test_in_batch_negatives_cache_does_not_read_labels(self):
+    task = link_prediction.InBatchNegativesLinkPrediction(
+        negatives_cache_size=4)
+    graph = _get_graph_tensor().remove_features(
+        node_sets={'_readout': ['label']})
+    logits = task.predict(graph)
+    self.assertEqual(logits.shape, [2, 6])
+    self.assertIs(task.losses()._negatives_cache, task._negatives_cache)
+
+  def test_in_batch_negatives_cache_mirrored_strategy(self):
+    strategy = tf.distribute.MirroredStrategy(['/cpu:0', '/cpu:1'])
+    src = tf.constant([[1.0, 0.0], [0.0, 1.0]])
+    tgts = [tf.constant([[2.0, 3.0], [4.0, 5.0]]),
+            tf.constant([[6.0, 7.0], [8.0, 9.0]])]
+    labels = [tf.constant([[1.0], [0.0]]), tf.constant([[1.0], [1.0]])]
+    with strategy.scope():
+      cache = link_prediction._NegativesCache(cache_size=4)
+      _ = cache((src, tgts[0]), training=False)
+      loss = link_prediction._InBatchSoftmaxLoss(
+          cache, reduction=tf.keras.losses.Reduction.SUM)
+    inputs = strategy.experimental_distribute_values_from_function(
+        lambda ctx: (tgts[ctx.replica_id_in_sync_group],
+                     labels[ctx.replica_id_in_sync_group]))
+
+    @tf.function
+    def train_step(inputs):
+      def step_fn(tgt, label):
+        return loss(label, cache((src, tgt), training=True))
+      return strategy.run(step_fn, args=inputs)
+
+    train_step(inputs)
+    # Each replica holds the targets of both, in the order of the replicas,
+    # and the negative pair of the first replica is invalid.
+    for values in strategy.experimental_local_results(cache._cache):
+      self.assertAllClose(values, tf.concat(tgts, axis=0))
+    for valid in strategy.experimental_local_results(cache._valid):
+      self.assertAllEqual(valid, [1.0, 0.0, 1.0, 1.0])
+    for count in strategy.experimental_local_results(cache._count):
+      self.assertEqual(count, 4)
+
+  def test_in_batch_negatives_fails_on_bad_args(self):
+    with self.assertRaisesRegex(ValueError, 'temperature'):
+      link_prediction.InBatchNegativesLinkPrediction(temperature=0.0)
+    with self.assertRaisesRegex(ValueError, 'requires a'):
+      link_prediction.InBatchNegativesLinkPrediction(num_sampled_negatives=4)
+
 class LinkPredictionValidationTest(tf.test.TestCase, parameterized.TestCase):
 
   def setUp(self):
@@ -0,0 +1,128 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""A Keras callback for asynchronous checkpointing."""
+from typing import Any, Mapping, Optional, Union
+
+import numpy as np
+import tensorflow as tf
+
+
+class AsyncModelCheckpoint(tf.keras.callbacks.Callback):
+  """Saves model weights like `ModelCheckpoint`, but without blocking training.
+
+  This callback saves the same checkpoints as
+  `tf.keras.callbacks.ModelCheckpoint(..., save_weights_only=True)`, which
+  can be restored by `tf.keras.Model.load_weights()`. Saving uses the
+  asynchronous mode of `tf.train.Checkpoint`: it copies the variables to host
+  memory and returns, while the files get written in a background thread.
+  Training only waits for the copy (and for the previous write, if it has not
+  finished yet). The end of training waits for all writes.
+
+  As with any TF2 checkpoint, the variables of each device (like each
+  parameter server task) are saved as a separate shard.
+
+  Unlike `ModelCheckpoint`, `filepath` is used literally (no formatting with
+  epoch and logs).
+  """
+
+  def __init__(self,
+               filepath: str,
+               *,
+               monitor: str = "val_loss",
+               save_best_only: bool = False,
+               mode: str = "auto",
+               save_freq: Union[int, str] = "epoch",
+               io_device: Optional[str] = None):
+    """Initializes the callback.
+
+    Args:
+      filepath: The file prefix of the checkpoint.
+      monitor: The metric to monitor for `save_best_only`.
+      save_best_only: Whether to only save when `monitor` improves.
+      mode: One of "auto", "min" or "max": whether `monitor` improves when it
+        goes down or up. For "auto", it goes up for accuracies and down
+        otherwise.
+      save_freq: "epoch" to save at the end of each epoch, or an integer to
+        save after that many training steps.
+      io_device: Optionally, the device (like "/job:localhost") that runs the
+        I/O ops of saving, see `tf.train.CheckpointOptions`.
+    """
+    super().__init__()
+    if save_freq != "epoch" and not isinstance(save_freq, int):
+      raise ValueError(
+          f"Expected `save_freq` to be 'epoch' or an integer (got {save_freq})")
+    if mode not in ("auto", "min", "max"):
+      raise ValueError(f"Expected `mode` in auto, min, max (got {mode})")
+    if mode == "auto":
+      mode = "max" if "acc" in monitor else "min"
+    self._filepath = filepath
+    self._monitor = monitor
+    self._save_best_only = save_best_only
+    self._better = np.greater if mode == "max" else np.less
+    self._best = -np.inf if mode == "max" else np.inf
+    self._save_freq = save_freq
+    self._options = tf.train.CheckpointOptions(
+        experimental_io_device=io_device, enable_async=True)
+    self._checkpoint = None
+    self._batches_seen_since_last_saving = 0
+    self._last_batch_seen = -1
+
+  def set_model(self, model: tf.keras.Model):
+    super().set_model(model)
+    # Like `Model.save_weights()`, with the model as the root object.
+    self._checkpoint = tf.train.Checkpoint(root=model)
+
+  def on_train_batch_end(self, batch: int,
+                         logs: Optional[Mapping[str, Any]] = None):
+    if self._save_freq == "epoch":
+      return
+    # With `steps_per_execution`, `batch` can advance by more than one.
+    if batch <= self._last_batch_seen:
+      self._batches_seen_since_last_saving += batch + 1
+    else:
+      self._batches_seen_since_last_saving += batch - self._last_batch_seen
+    self._last_batch_seen = batch
+    if self._batches_seen_since_last_saving >= self._save_freq:
+      self._batches_seen_since_last_saving = 0
+      self._save(logs)
+
+  def on_epoch_begin(self, epoch: int,
+                     logs: Optional[Mapping[str, Any]] = None):
+    self._last_batch_seen = -1
+
+  def on_epoch_end(self, epoch: int, logs: Optional[Mapping[str, Any]] = None):
+    if self._save_freq == "epoch":
+      self._save(logs)
+
+  def on_train_end(self, logs: Optional[Mapping[str, Any]] = None):
+    self.sync()
+
+  def sync(self):
+    """Waits until all pending checkpoint writes are done."""
+    if self._checkpoint is not None:
+      self._checkpoint.sync()
+
+  def _save(self, logs: Optional[Mapping[str, Any]]):
+    if self._save_best_only:
+      current = (logs or {}).get(self._monitor)
+      if current is None:
+        tf.get_logger().warning(
+            "Can save best model only with %s available, skipping.",
+            self._monitor)
+        return
+      if not self._better(current, self._best):
+        return
+      self._best = current
+    self._checkpoint.write(self._filepath, options=self._options)
@@ -0,0 +1,96 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for async_checkpoint."""
+import os
+
+from absl.testing import parameterized
+import tensorflow as tf
+from tensorflow_gnn.runner.trainers import async_checkpoint
+
+
+def _model() -> tf.keras.Model:
+  model = tf.keras.Sequential([tf.keras.layers.Dense(1, input_shape=(4,))])
+  model.compile(optimizer="sgd", loss="mse")
+  return model
+
+
+def _dataset() -> tf.data.Dataset:
+  x = tf.random.stateless_normal((32, 4), seed=(1, 2))
+  y = tf.reduce_sum(x, axis=-1, keepdims=True)
+  return tf.data.Dataset.from_tensor_slices((x, y)).batch(4)
+
+
+class CountingCheckpoint(async_checkpoint.AsyncModelCheckpoint):
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.num_saves = 0
+
+  def _save(self, logs):
+    super()._save(logs)
+    self.num_saves += 1
+
+
+class AsyncModelCheckpointTest(tf.test.TestCase, parameterized.TestCase):
+
+  def test_load_weights(self):
+    filepath = os.path.join(self.get_temp_dir(), "latest")
+    model = _model()
+    model.fit(_dataset(), epochs=2, verbose=0, callbacks=[
+        async_checkpoint.AsyncModelCheckpoint(filepath)])
+
+    restored = _model()
+    restored.load_weights(filepath)
+    for expected, actual in zip(model.weights, restored.weights):
+      self.assertAllEqual(expected, actual)
+
+  @parameterized.named_parameters(
+      ("Epoch", "epoch", 1, 3),
+      ("Steps", 3, 1, 2),
+      ("StepsPerExecution", 4, 2, 2),
+  )
+  def test_save_freq(self, save_freq, steps_per_execution, expected_saves):
+    model = _model()
+    model.compile(optimizer="sgd", loss="mse",
+                  steps_per_execution=steps_per_execution)
+    callback = CountingCheckpoint(
+        os.path.join(self.get_temp_dir(), "latest"), save_freq=save_freq)
+    model.fit(_dataset().take(4), epochs=3 if save_freq == "epoch" else 2,
+              verbose=0, callbacks=[callback])
+    self.assertEqual(callback.num_saves, expected_saves)
+
+  def test_save_best_only(self):
+    filepath = os.path.join(self.get_temp_dir(), "best")
+    callback = async_checkpoint.AsyncModelCheckpoint(
+        filepath, monitor="loss", save_best_only=True)
+    model = _model()
+    callback.set_model(model)
+    weights = []
+    for epoch, loss in enumerate([3., 1., 2.]):
+      model.layers[0].kernel.assign(tf.fill([4, 1], float(epoch)))
+      weights.append(model.layers[0].kernel.numpy())
+      callback.on_epoch_end(epoch, {"loss": loss})
+    callback.on_train_end()
+
+    model.load_weights(filepath)
+    self.assertAllEqual(model.layers[0].kernel, weights[1])
+
+  def test_bad_save_freq(self):
+    with self.assertRaisesRegex(ValueError, "save_freq"):
+      async_checkpoint.AsyncModelCheckpoint("path", save_freq="batch")
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -0,0 +1,162 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""A Keras callback to back up and restore the position of the input."""
+import os
+from typing import Any, Mapping, Optional, Union
+
+from absl import logging
+import tensorflow as tf
+
+
+class IteratorCheckpoint(tf.keras.callbacks.Callback):
+  """Backs up the training input iterator alongside `BackupAndRestore`.
+
+  `tf.keras.callbacks.BackupAndRestore` restores the model (and the epoch and
+  step) after an interruption, but `Model.fit` restarts the input from its
+  beginning: the examples consumed before the interruption are trained on
+  again. This callback saves the state of the iterator that `Model.fit` reads
+  from at the same points as a `BackupAndRestore` with the same `save_freq`
+  and restores it when training resumes from that backup, so that training
+  continues with the next unseen example.
+
+  The iterator state is the state of the `tf.data` pipeline: for file readers
+  like `tf.data.TFRecordDataset`, the index of the current file and the byte
+  offset in it, which are restored by seeking; for random ops like
+  `tf.data.Dataset.sample_from_datasets` or `shuffle`, the state of the random
+  number generator. Restoring takes time proportional to the size of the
+  checkpoint, not to the input consumed. (Note that it includes buffered
+  elements, like those of `shuffle`, `prefetch` and parallel `interleave`.)
+
+  This callback must come right after the `BackupAndRestore` callback in the
+  callbacks of `Model.fit`. It uses the step counter of the optimizer to check
+  that a backup of the input matches the restored model, and it supports the
+  default strategy and `tf.distribute.MirroredStrategy`.
+  """
+
+  def __init__(self,
+               backup_dir: str,
+               *,
+               save_freq: Union[int, str] = "epoch",
+               persistent_iterator: bool = True,
+               delete_checkpoint: bool = True):
+    """Initializes the callback.
+
+    Args:
+      backup_dir: The directory of the backup, like for `BackupAndRestore`.
+        The input state is saved in its subdirectory "input".
+      save_freq: The `save_freq` of the `BackupAndRestore` callback: "epoch"
+        or a number of training batches.
+      persistent_iterator: Whether `Model.fit` reads all epochs from the same
+        iterator, as it does for repeated datasets with `steps_per_epoch`. If
+        not, backups from the end of an epoch are not restored, since the
+        next epoch starts a new iterator.
+      delete_checkpoint: Whether to delete the backup when training finishes,
+        like for `BackupAndRestore`.
+    """
+    super().__init__()
+    if save_freq != "epoch" and not isinstance(save_freq, int):
+      raise ValueError(
+          f"Expected `save_freq` to be 'epoch' or an integer (got {save_freq})")
+    self._backup_dir = os.path.join(backup_dir, "input")
+    self._save_freq = save_freq
+    self._persistent_iterator = persistent_iterator
+    self._delete_checkpoint = delete_checkpoint
+    self._step = tf.Variable(-1, dtype=tf.int64, trainable=False)
+    self._end_of_epoch = tf.Variable(False, trainable=False)
+    self._batches_count = 0
+    self._iterator = None
+    self._manager = None
+    self._train_function = None
+
+  def on_train_begin(self, logs: Optional[Mapping[str, Any]] = None):
+    strategy = self.model.distribute_strategy
+    if isinstance(strategy, tf.distribute.experimental.ParameterServerStrategy):
+      raise ValueError("`IteratorCheckpoint` does not support "
+                       "`ParameterServerStrategy`")
+    resolver = getattr(strategy, "cluster_resolver", None)
+    task_id = getattr(resolver, "task_id", None) or 0
+    # Each worker reads (and saves) its own input pipeline.
+    self._directory = os.path.join(self._backup_dir, f"worker_{task_id}")
+    self._batches_count = 0
+    self._iterator = None
+    self._manager = None
+
+    # `Model.fit` passes its iterator to `train_function` on every call.
+    train_function = self._train_function = self.model.train_function
+
+    def wrapped_train_function(iterator):
+      if iterator is not self._iterator:
+        self._set_iterator(iterator)
+      return train_function(iterator)
+
+    self.model.train_function = wrapped_train_function
+
+  def on_train_batch_end(self, batch: int,
+                         logs: Optional[Mapping[str, Any]] = None):
+    # Counts like `BackupAndRestore`, to save at the same batches.
+    if self._save_freq != "epoch":
+      self._batches_count += 1
+      if self._batches_count >= self._save_freq:
+        self._batches_count = 0
+        self._save(end_of_epoch=False)
+
+  def on_epoch_end(self, epoch: int, logs: Optional[Mapping[str, Any]] = None):
+    if self._save_freq == "epoch":
+      self._save(end_of_epoch=True)
+
+  def on_train_end(self, logs: Optional[Mapping[str, Any]] = None):
+    if self._delete_checkpoint and tf.io.gfile.exists(self._directory):
+      tf.io.gfile.rmtree(self._directory)
+    # Later calls of `Model.fit` without this callback must not be tracked.
+    self.model.train_function = self._train_function
+    self._train_function = None
+    self._iterator = None
+    self._manager = None
+
+  def _set_iterator(self, iterator):
+    """Tracks a new iterator of `Model.fit`, restoring it if it's the first."""
+    first = self._iterator is None
+    self._iterator = iterator
+    checkpoint = tf.train.Checkpoint(
+        iterator=iterator, step=self._step, end_of_epoch=self._end_of_epoch)
+    self._manager = tf.train.CheckpointManager(
+        checkpoint, self._directory, max_to_keep=1)
+    if first and self._manager.latest_checkpoint:
+      self._maybe_restore(checkpoint, self._manager.latest_checkpoint)
+
+  def _maybe_restore(self, checkpoint: tf.train.Checkpoint, path: str):
+    """Restores the iterator from `path` if it matches the restored model."""
+    # Read the metadata first, to not touch the iterator on a mismatch.
+    tf.train.Checkpoint(
+        step=self._step, end_of_epoch=self._end_of_epoch).read(
+            path).expect_partial()
+    step = int(self._step.numpy())
+    model_step = int(self.model.optimizer.iterations.numpy())
+    if step != model_step:
+      logging.warning(
+          "Not restoring the input from %s: it was saved at step %d, but the "
+          "model was restored at step %d.", path, step, model_step)
+      return
+    if bool(self._end_of_epoch.numpy()) and not self._persistent_iterator:
+      return
+    checkpoint.restore(path).assert_existing_objects_matched()
+    logging.info("Restored the input at step %d from %s.", step, path)
+
+  def _save(self, *, end_of_epoch: bool):
+    if self._manager is None:
+      return
+    self._step.assign(self.model.optimizer.iterations)
+    self._end_of_epoch.assign(end_of_epoch)
+    self._manager.save()
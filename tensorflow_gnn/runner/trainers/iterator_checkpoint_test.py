@@ -0,0 +1,136 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for iterator_checkpoint."""
+import os
+
+from absl.testing import parameterized
+import tensorflow as tf
+from tensorflow_gnn.runner.trainers import iterator_checkpoint
+
+_NUM_EXAMPLES = 24
+_BATCH_SIZE = 2
+_STEPS_PER_EPOCH = _NUM_EXAMPLES // _BATCH_SIZE
+
+
+class _CountingModel(tf.keras.Model):
+  """Counts how often it has trained on each example."""
+
+  def __init__(self):
+    super().__init__()
+    self.dense = tf.keras.layers.Dense(1)
+    self.counts = tf.Variable(tf.zeros([_NUM_EXAMPLES], tf.int64),
+                              trainable=False)
+
+  def call(self, inputs):
+    return self.dense(tf.cast(inputs[:, None], tf.float32))
+
+  def train_step(self, data):
+    self.counts.scatter_nd_add(data[:, None], tf.ones_like(data))
+    self.optimizer.iterations.assign_add(1)
+    return {}
+
+
+class _Interrupt(Exception):
+  pass
+
+
+class _InterruptAt(tf.keras.callbacks.Callback):
+
+  def __init__(self, step):
+    super().__init__()
+    self._step = step
+
+  def on_train_batch_end(self, batch, logs=None):
+    if int(self.model.optimizer.iterations.numpy()) >= self._step:
+      raise _Interrupt()
+
+
+def _dataset():
+  ds = tf.data.Dataset.range(_NUM_EXAMPLES)
+  ds = ds.shuffle(_NUM_EXAMPLES, reshuffle_each_iteration=True)
+  return ds.batch(_BATCH_SIZE).repeat().prefetch(2)
+
+
+class IteratorCheckpointTest(tf.test.TestCase, parameterized.TestCase):
+
+  def _fit(self, backup_dir, *, epochs, save_freq, input_backup,
+           interrupt_at=None):
+    model = _CountingModel()
+    model.compile(optimizer="sgd")
+    callbacks = [tf.keras.callbacks.BackupAndRestore(
+        backup_dir, save_freq=save_freq)]
+    if input_backup:
+      callbacks.append(iterator_checkpoint.IteratorCheckpoint(
+          backup_dir, save_freq=save_freq))
+    if interrupt_at is not None:
+      callbacks.append(_InterruptAt(interrupt_at))
+    model.fit(_dataset(), epochs=epochs, steps_per_epoch=_STEPS_PER_EPOCH,
+              callbacks=callbacks, verbose=0)
+    return model
+
+  @parameterized.named_parameters(
+      ("MidEpoch", 1, 3, 7),
+      ("EpochEnd", 2, "epoch", _STEPS_PER_EPOCH + 1),
+  )
+  def test_resume(self, epochs, save_freq, interrupt_at):
+    backup_dir = os.path.join(self.get_temp_dir(), "backup")
+    with self.assertRaises(_Interrupt):
+      self._fit(backup_dir, epochs=epochs, save_freq=save_freq,
+                input_backup=True, interrupt_at=interrupt_at)
+    model = self._fit(backup_dir, epochs=epochs, save_freq=save_freq,
+                      input_backup=True)
+    # Every example is trained on exactly once per epoch.
+    self.assertAllEqual(model.counts, [epochs] * _NUM_EXAMPLES)
+    self.assertFalse(tf.io.gfile.exists(os.path.join(backup_dir, "input",
+                                                     "worker_0")))
+
+  def test_resume_without_input_backup(self):
+    backup_dir = os.path.join(self.get_temp_dir(), "backup")
+    with self.assertRaises(_Interrupt):
+      self._fit(backup_dir, epochs=1, save_freq=3, input_backup=False,
+                interrupt_at=7)
+    model = self._fit(backup_dir, epochs=1, save_freq=3, input_backup=False)
+    # The input restarts: some examples are seen twice, others never.
+    self.assertEqual(int(tf.reduce_sum(model.counts)), _NUM_EXAMPLES)
+    self.assertNotAllEqual(model.counts, [1] * _NUM_EXAMPLES)
+
+  def test_mismatched_step(self):
+    backup_dir = os.path.join(self.get_temp_dir(), "backup")
+    with self.assertRaises(_Interrupt):
+      self._fit(backup_dir, epochs=1, save_freq=3, input_backup=True,
+                interrupt_at=7)
+    # Pretend the model backup is from a different step than the input's.
+    tf.io.gfile.rmtree(os.path.join(backup_dir, "chief"))
+    model = self._fit(backup_dir, epochs=1, save_freq=3, input_backup=True)
+    self.assertAllEqual(model.counts, [1] * _NUM_EXAMPLES)
+
+  def test_later_fit_is_not_tracked(self):
+    backup_dir = os.path.join(self.get_temp_dir(), "backup")
+    model = _CountingModel()
+    model.compile(optimizer="sgd")
+    callback = iterator_checkpoint.IteratorCheckpoint(backup_dir, save_freq=3)
+    model.fit(_dataset(), steps_per_epoch=_STEPS_PER_EPOCH,
+              callbacks=[callback], verbose=0)
+    model.fit(_dataset(), steps_per_epoch=_STEPS_PER_EPOCH, verbose=0)
+    self.assertIsNone(callback._iterator)
+    self.assertAllEqual(model.counts, [2] * _NUM_EXAMPLES)
+
+  def test_bad_save_freq(self):
+    with self.assertRaisesRegex(ValueError, "save_freq"):
+      iterator_checkpoint.IteratorCheckpoint("/tmp", save_freq="step")
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -20,6 +20,8 @@ from typing import Callable, Optional, Sequence, Union
 
 import tensorflow as tf
 from tensorflow_gnn.runner import interfaces
+from tensorflow_gnn.runner.trainers import async_checkpoint
+from tensorflow_gnn.runner.trainers import iterator_checkpoint
 
 BackupAndRestore = tf.keras.callbacks.experimental.BackupAndRestore
 DatasetProvider = interfaces.DatasetProvider
@@ -42,10 +44,14 @@ class KerasTrainerCheckpointOptions:
     checkpoint_dir: Directory path to save checkpoint files.
     best_checkpoint: Filename for the best checkpoint.
     latest_checkpoint: Filename for the latest checkpoint.
+    async_checkpoint: Whether to write checkpoints in a background thread
+      after copying the variables to host memory, so that training only
+      blocks for the copy. (See `AsyncModelCheckpoint`.)
   """
   checkpoint_dir: Optional[str] = None
   best_checkpoint: str = "best"
   latest_checkpoint: str = "latest"
+  async_checkpoint: bool = False
 
   def best_checkpoint_filepath(self) -> str:
     return os.path.join(self.checkpoint_dir, self.best_checkpoint)
@@ -72,6 +78,8 @@ class KerasTrainer(interfaces.Trainer):
       summarize_every_n_steps: Union[int, str] = 500,
       checkpoint_every_n_steps: Union[int, str] = "epoch",
       backup_and_restore: bool = True,
+      backup_every_n_steps: Union[int, str] = "epoch",
+      backup_input: bool = False,
       callbacks: Optional[Sequence[tf.keras.callbacks.Callback]] = None,
       restore_best_weights: Optional[bool] = None,
       options: Optional[KerasTrainerOptions] = None):
@@ -111,6 +119,13 @@ class KerasTrainer(interfaces.Trainer):
       backup_and_restore: Whether to backup and restore (According to
         `tf.keras.callbacks.BackupAndRestore`). The backup
         directory is determined by `backup_dir`.
+      backup_every_n_steps: The frequency for backups, as an integer number of
+        steps, or "epoch" for once per epoch. Backups within an epoch let
+        training resume mid-epoch.
+      backup_input: Whether to also back up the position of the training
+        input (see `IteratorCheckpoint`), so that training resumes with the
+        next unseen example instead of restarting the input. Requires
+        `backup_and_restore`.
       callbacks: Optional additional `tf.keras.callbacks.Callback` for
         `tf.keras.Model.fit.`
       restore_best_weights: Requires a `checkpoint_every_n_steps` other than
@@ -124,6 +139,9 @@ class KerasTrainer(interfaces.Trainer):
       raise ValueError("`restore_best_weights` requires a "
                        "`checkpoint_every_n_steps` other than \"never\"")
 
+    if backup_input and not backup_and_restore:
+      raise ValueError("`backup_input` requires `backup_and_restore`")
+
     if checkpoint_options is None:
       checkpoint_options = KerasTrainerCheckpointOptions()
 
@@ -150,6 +168,8 @@ class KerasTrainer(interfaces.Trainer):
     self._summarize_every_n_steps = summarize_every_n_steps
     self._checkpoint_every_n_steps = checkpoint_every_n_steps
     self._backup_and_restore = backup_and_restore
+    self._backup_every_n_steps = backup_every_n_steps
+    self._backup_input = backup_input
     self._callbacks = callbacks
     self._restore_best_weights = restore_best_weights
     self._options = options
@@ -162,6 +182,10 @@ class KerasTrainer(interfaces.Trainer):
   def strategy(self) -> tf.distribute.Strategy:
     return self._strategy
 
+  @property
+  def restore_best_weights(self) -> Optional[bool]:
+    return self._restore_best_weights
+
   def train(
       self,
       model_fn: Callable[[], tf.keras.Model],
@@ -270,22 +294,45 @@ class KerasTrainer(interfaces.Trainer):
 
     if self._backup_and_restore:
       callbacks += [
-          BackupAndRestore(backup_dir=self._backup_dir)
+          BackupAndRestore(
+              backup_dir=self._backup_dir,
+              save_freq=self._backup_every_n_steps)
       ]
+      if self._backup_input:
+        # Must come right after `BackupAndRestore`, to save at the same steps.
+        callbacks += [
+            iterator_checkpoint.IteratorCheckpoint(
+                self._backup_dir,
+                save_freq=self._backup_every_n_steps,
+                # Repeated datasets are read with one iterator for all epochs.
+                persistent_iterator=steps_per_epoch is not None)
+        ]
 
     if checkpoint_every_n_steps != "never":
-      callbacks += [
-          tf.keras.callbacks.ModelCheckpoint(
-              filepath=self._checkpoint_options.latest_checkpoint_filepath(),
-              save_best_only=False,
-              save_weights_only=True,
-              save_freq=checkpoint_every_n_steps),
-          tf.keras.callbacks.ModelCheckpoint(
-              filepath=self._checkpoint_options.best_checkpoint_filepath(),
-              save_best_only=True,
-              save_weights_only=True,
-              save_freq="epoch")
-      ]
+      if self._checkpoint_options.async_checkpoint:
+        callbacks += [
+            async_checkpoint.AsyncModelCheckpoint(
+                self._checkpoint_options.latest_checkpoint_filepath(),
+                save_best_only=False,
+                save_freq=checkpoint_every_n_steps),
+            async_checkpoint.AsyncModelCheckpoint(
+                self._checkpoint_options.best_checkpoint_filepath(),
+                save_best_only=True,
+                save_freq="epoch")
+        ]
+      else:
+        callbacks += [
+            tf.keras.callbacks.ModelCheckpoint(
+                filepath=self._checkpoint_options.latest_checkpoint_filepath(),
+                save_best_only=False,
+                save_weights_only=True,
+                save_freq=checkpoint_every_n_steps),
+            tf.keras.callbacks.ModelCheckpoint(
+                filepath=self._checkpoint_options.best_checkpoint_filepath(),
+                save_best_only=True,
+                save_weights_only=True,
+                save_freq="epoch")
+        ]
 
     if summarize_every_n_steps != "never":
       callbacks += [
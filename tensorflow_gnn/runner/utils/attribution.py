@@ -234,13 +234,23 @@ def integrated_gradients(
     output_name: Optional[str] = None,
     random_counterfactual: bool,
     steps: int,
-    seed: Optional[int] = None) -> tf.types.experimental.ConcreteFunction:
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> tf.types.experimental.ConcreteFunction:
   """Integrated gradients.
 
   This `tf.function` computes integrated gradients over a `tfgnn.GraphTensor.`
   The `tf.function` will be persisted in the ultimate saved model for
   subsequent attribution.
 
+  The interpolations of the Riemann sum are evaluated in chunks of
+  `chunk_size`: the interpolations of a chunk are merged into the components
+  of a single `tfgnn.GraphTensor` for one forward and backward pass of `model.`
+  For `chunk_size > 1` (including the default), this requires `model` to return
+  outputs (and the `preprocess_model` to return labels) with one row per graph
+  component, as usual for graph level tasks and for tasks on the root nodes of
+  sampled subgraphs. Other models need `chunk_size=1`.
+
   Args:
     preprocess_model: A `tf.keras.Model` for preprocessing. This model is
       expected to return a tuple (`GraphTensor`, `Tensor`) where the
@@ -252,10 +262,19 @@ def integrated_gradients(
     random_counterfactual: Whether to use a random uniform counterfactual.
     steps: The number of interpolations of the Riemann sum approximation.
     seed: An option random seed.
+    chunk_size: The number of interpolations per forward and backward pass.
+      If unset, all `steps` interpolations are evaluated in one pass. Lower
+      values bound the memory used by attribution, at the cost of more passes;
+      `chunk_size=1` evaluates one interpolation per pass.
 
   Returns:
     A `tf.function` with the integrated gradients as output.
   """
+  if chunk_size is None:
+    chunk_size = steps
+  elif chunk_size < 1:
+    raise ValueError(f"Expected `chunk_size` >= 1 (got {chunk_size})")
+
   @tf.function(input_signature=_input_signature(preprocess_model))
   def fn(inputs):
     try:
@@ -271,27 +290,48 @@ def integrated_gradients(
     interpolations = interpolate_graph_features(graph, baseline, steps=steps)
     gradients = []
 
-    for interpolation in interpolations:
+    for start in range(0, len(interpolations), chunk_size):
+      chunk = interpolations[start:start + chunk_size]
+      merged = tfgnn.experimental.concat_graph_components(chunk)
       with tf.GradientTape(persistent=True) as tape:
-        tape.watch(interpolation)
-        logits = model(interpolation)
-        loss = model.compiled_loss(
-            labels,
-            logits,
-            regularization_losses=model.losses)
-
-      def gradient_fn(inputs):
-        return tape.gradient(  # pylint: disable=cell-var-from-loop
+        tape.watch(merged)
+        logits = model(merged)
+        # The loss of each interpolation is computed separately, so that their
+        # gradients do not depend on the loss reduction across the batch.
+        splits = [tf.split(t, len(chunk), axis=0)
+                  for t in tf.nest.flatten(logits)]
+        loss = tf.math.add_n([
+            model.compiled_loss(
+                labels,
+                tf.nest.pack_sequence_as(logits, [t[i] for t in splits]),
+                regularization_losses=model.losses)
+            for i in range(len(chunk))])
+
+      def gradient_fn(value, num_items):
+        gradient = tape.gradient(  # pylint: disable=cell-var-from-loop
             loss,  # pylint: disable=cell-var-from-loop
-            *inputs,
+            value,
             unconnected_gradients=tf.UnconnectedGradients.ZERO)
+        # Sum the gradients of all interpolations in the chunk per item.
+        segment_ids = tf.tile(tf.range(num_items), [len(chunk)])  # pylint: disable=cell-var-from-loop
+        return tf.math.unsorted_segment_sum(gradient, segment_ids, num_items)
 
       gradients += [
-          reduce_graph_sequence(
-              (interpolation,),
-              context_fn=gradient_fn,
-              edge_set_fn=gradient_fn,
-              node_set_fn=gradient_fn)
+          graph.replace_features(
+              context={
+                  k: gradient_fn(v, graph.num_components)
+                  for k, v in merged.context.features.items()
+              },
+              edge_sets={
+                  k: {kk: gradient_fn(vv, graph.edge_sets[k].total_size)
+                      for kk, vv in v.features.items()}
+                  for k, v in merged.edge_sets.items()
+              },
+              node_sets={
+                  k: {kk: gradient_fn(vv, graph.node_sets[k].total_size)
+                      for kk, vv in v.features.items()}
+                  for k, v in merged.node_sets.items()
+              })
       ]
 
     gradients = sum_graph_features(gradients)
@@ -310,7 +350,8 @@ class IntegratedGradientsExporter(interfaces.ModelExporter):
                random_counterfactual: bool = True,
                steps: int = 32,
                seed: Optional[int] = None,
-               options: Optional[tf.saved_model.SaveOptions] = None):
+               options: Optional[tf.saved_model.SaveOptions] = None,
+               chunk_size: Optional[int] = None):
     """Captures the args shared across `save(...)` calls.
 
     Random counterfactuals (see `random_counterfactual` below) sample from, per
@@ -334,6 +375,11 @@ class IntegratedGradientsExporter(interfaces.ModelExporter):
       steps: The number of interpolations of the Riemann sum approximation.
       seed: An optional random seed.
       options: Options for saving to SavedModel.
+      chunk_size: The number of interpolations evaluated together in one
+        forward and backward pass. If unset, all `steps` interpolations are
+        evaluated together. Lower values bound the memory used by attribution;
+        set `chunk_size=1` for models whose outputs do not have one row per
+        graph component (see `integrated_gradients(...)`).
     """
     self._integrated_gradients_output_name = integrated_gradients_output_name
     self._subdirectory = subdirectory
@@ -341,6 +387,7 @@ class IntegratedGradientsExporter(interfaces.ModelExporter):
     self._steps = steps
     self._seed = seed
     self._options = options
+    self._chunk_size = chunk_size
 
   def save(self, run_result: interfaces.RunResult, export_dir: str):
     """Exports a Keras model with an additional integrated gradients signature.
@@ -382,7 +429,8 @@ class IntegratedGradientsExporter(interfaces.ModelExporter):
         output_name=self._integrated_gradients_output_name,
         random_counterfactual=self._random_counterfactual,
         steps=self._steps,
-        seed=self._seed)
+        seed=self._seed,
+        chunk_size=self._chunk_size)
     serving_default = tf.function(
         model_for_export,
         input_signature=_input_signature(model_for_export))
@@ -13,6 +13,7 @@
 # limitations under the License.
 # ==============================================================================
 """Tests for attribution."""
+from absl.testing import parameterized
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 
@@ -25,7 +26,7 @@ IntegratedGradientsExporter = attribution.IntegratedGradientsExporter
 tfgnn.enable_graph_tensor_validation_at_runtime()
 
 
-class AttributionTest(tf.test.TestCase):
+class AttributionTest(tf.test.TestCase, parameterized.TestCase):
 
   def setUp(self):
     super().setUp()
@@ -211,7 +212,12 @@ class AttributionTest(tf.test.TestCase):
         summation.node_sets["node"].features["h"],
         tf.convert_to_tensor((.8191 * 4, .9474 * 4, .1634 * 4)))
 
-  def test_integrated_gradients_exporter(self):
+  @parameterized.named_parameters(
+      ("Default", None),
+      ("Serial", 1),
+      ("Chunked", 2),
+      ("AllSteps", 3))
+  def test_integrated_gradients_exporter(self, chunk_size):
     # Preprocess model
     examples = tf.keras.Input(shape=(), dtype=tf.string, name="examples")
     parsed = tfgnn.keras.layers.ParseExample(self.gt.spec)(examples)
@@ -266,7 +272,8 @@ class AttributionTest(tf.test.TestCase):
 
     # Export
     export_dir = self.create_tempdir()
-    exporter = attribution.IntegratedGradientsExporter("output", steps=3)
+    exporter = attribution.IntegratedGradientsExporter(
+        "output", steps=3, chunk_size=chunk_size)
 
     run_result = interfaces.RunResult(preprocess_model, None, model)
     exporter.save(run_result, export_dir)
@@ -0,0 +1,185 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Helpers to find bottlenecks in the input pipeline of the runner."""
+import dataclasses
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import tensorflow as tf
+
+
+@dataclasses.dataclass
+class InputDiagnosticsConfig:
+  """Configures the input pipeline diagnostics of `runner.run(...)`.
+
+  Attributes:
+    num_batches: The number of batches to time per stage of the input
+      pipeline (and for the training steps of the trained model).
+    subdirectory: The subdirectory of the trainer's `model_dir` to write the
+      report to, as TensorBoard summaries.
+  """
+  num_batches: int = 50
+  subdirectory: str = "input_diagnostics"
+
+
+@dataclasses.dataclass
+class StageThroughput:
+  """The throughput of the input pipeline up to (and including) a stage."""
+  stage: str
+  records_per_second: float
+  seconds_per_batch: float
+
+
+@dataclasses.dataclass
+class InputDiagnosticsReport:
+  """The throughput of each stage of the input pipeline vs. the train step.
+
+  Attributes:
+    stages: The throughput of the input pipeline up to each stage, in order.
+    step: The throughput of the training steps on already prepared inputs, if
+      measured.
+  """
+  stages: List[StageThroughput]
+  step: Optional[StageThroughput] = None
+
+  def bottleneck(self) -> Optional[str]:
+    """Returns the stage after which the throughput drops most, if any.
+
+    If no stage reduces the throughput of the stages before it, the first
+    stage (reading the input) is the bottleneck.
+    """
+    if not self.stages:
+      return None
+    slowdowns = [prev.records_per_second / max(cur.records_per_second, 1e-9)
+                 for prev, cur in zip(self.stages, self.stages[1:])]
+    if not slowdowns or max(slowdowns) <= 1.:
+      return self.stages[0].stage
+    return self.stages[slowdowns.index(max(slowdowns)) + 1].stage
+
+
+def measure_throughput(stage: str,
+                       ds: tf.data.Dataset,
+                       *,
+                       num_batches: int,
+                       records_per_batch: int) -> StageThroughput:
+  """Returns the throughput of iterating over `num_batches` elements of `ds`.
+
+  The first element is read before the timing starts, so that the one-time
+  costs of building the pipeline (like tracing and opening files) do not
+  count.
+
+  Args:
+    stage: The name of the stage.
+    ds: The dataset of the input pipeline up to the stage.
+    num_batches: The number of elements (after the first) to time.
+    records_per_batch: The number of records per element of `ds`.
+
+  Returns:
+    A `StageThroughput`.
+  """
+  iterator = iter(ds.take(num_batches + 1))
+  next(iterator, None)
+  count = 0
+  start = time.perf_counter()
+  for _ in iterator:
+    count += 1
+  elapsed = time.perf_counter() - start
+  if not count:
+    raise ValueError(f"Stage {stage} has no more than one element")
+  return StageThroughput(
+      stage=stage,
+      records_per_second=count * records_per_batch / max(elapsed, 1e-9),
+      seconds_per_batch=elapsed / count)
+
+
+def diagnose_input_pipeline(
+    stages: Sequence[Tuple[str, tf.data.Dataset, int]],
+    *,
+    num_batches: int,
+    step_fn: Optional[Callable[[], Tuple[float, int]]] = None
+) -> InputDiagnosticsReport:
+  """Times the prefixes of an input pipeline one by one.
+
+  Each prefix is run on its own, so its throughput includes all stages before
+  it. The stage after which the throughput drops the most is the bottleneck;
+  if the input pipeline as a whole is slower than the training step, training
+  is input bound.
+
+  Args:
+    stages: A sequence of `(stage, dataset, records_per_batch)` for each
+      prefix of the input pipeline, in order. For unbatched stages, the
+      dataset should hold `num_batches * batch_size` elements or more and
+      `records_per_batch` be 1.
+    num_batches: The number of elements to time per stage, times
+      `records_per_batch` of the last stage for the unbatched stages.
+    step_fn: Optionally, a function that runs some training steps of the model
+      on prepared inputs and returns the seconds and the number of records.
+
+  Returns:
+    An `InputDiagnosticsReport`.
+  """
+  if num_batches < 1:
+    raise ValueError(f"Expected `num_batches` >= 1 (got {num_batches})")
+  batch_size = max(r for _, _, r in stages) if stages else 1
+  results = []
+  for stage, ds, records_per_batch in stages:
+    # Time the same number of records for all stages.
+    n = num_batches * batch_size // records_per_batch
+    results.append(measure_throughput(
+        stage, ds, num_batches=n, records_per_batch=records_per_batch))
+  step = None
+  if step_fn is not None:
+    seconds, num_records = step_fn()
+    step = StageThroughput(
+        stage="train_step",
+        records_per_second=num_records / max(seconds, 1e-9),
+        seconds_per_batch=seconds * batch_size / max(num_records, 1))
+  return InputDiagnosticsReport(stages=results, step=step)
+
+
+def format_report(report: InputDiagnosticsReport) -> str:
+  """Returns a printable table of `report`."""
+  rows = list(report.stages) + ([report.step] if report.step else [])
+  width = max([len("stage")] + [len(r.stage) for r in rows])
+  lines = [f"{'stage':<{width}}  {'records/s':>12}  {'ms/batch':>10}"]
+  for r in rows:
+    lines.append(f"{r.stage:<{width}}  {r.records_per_second:>12.1f}  "
+                 f"{1000 * r.seconds_per_batch:>10.3f}")
+  bottleneck = report.bottleneck()
+  if bottleneck is not None:
+    lines.append(f"Slowest input stage: {bottleneck}")
+  if report.step is not None and report.stages:
+    input_bound = (report.stages[-1].records_per_second
+                   < report.step.records_per_second)
+    lines.append("Training is " + ("likely" if input_bound else "not") +
+                 " input bound.")
+  return "\n".join(lines)
+
+
+def write_report(report: InputDiagnosticsReport, logdir: str):
+  """Writes `report` as TensorBoard summaries to `logdir`."""
+  writer = tf.summary.create_file_writer(logdir)
+  with writer.as_default():
+    for i, r in enumerate(report.stages):
+      tf.summary.scalar(f"records_per_second/{i:02d}_{r.stage}",
+                        r.records_per_second, step=0)
+    if report.step is not None:
+      tf.summary.scalar(f"records_per_second/{report.step.stage}",
+                        report.step.records_per_second, step=0)
+    # Render as preformatted text in TensorBoard.
+    text = "\n".join("    " + line
+                     for line in format_report(report).split("\n"))
+    tf.summary.text("report", text, step=0)
+  writer.close()
@@ -0,0 +1,81 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for input_diagnostics."""
+from absl.testing import parameterized
+import tensorflow as tf
+from tensorflow_gnn.runner.utils import input_diagnostics
+
+StageThroughput = input_diagnostics.StageThroughput
+
+
+def _report(*records_per_second):
+  return input_diagnostics.InputDiagnosticsReport(stages=[
+      StageThroughput(f"stage{i}", r, 1.)
+      for i, r in enumerate(records_per_second)
+  ])
+
+
+class InputDiagnosticsTest(tf.test.TestCase, parameterized.TestCase):
+
+  @parameterized.named_parameters(
+      ("Single", (10.,), "stage0"),
+      ("NoSlowdown", (10., 12., 14.), "stage0"),
+      ("Middle", (100., 10., 9.), "stage1"),
+      ("Last", (100., 90., 9.), "stage2"),
+  )
+  def test_bottleneck(self, records_per_second, expected):
+    self.assertEqual(_report(*records_per_second).bottleneck(), expected)
+
+  def test_diagnose_input_pipeline(self):
+    ds = tf.data.Dataset.range(100)
+    slow_ds = ds.batch(4).map(
+        lambda x: tf.py_function(lambda y: y, [x], tf.int64))
+    stages = [("read", ds, 1), ("batch", ds.batch(4), 4), ("slow", slow_ds, 4)]
+    report = input_diagnostics.diagnose_input_pipeline(
+        stages, num_batches=5, step_fn=lambda: (0.5, 20))
+
+    self.assertEqual([s.stage for s in report.stages],
+                     ["read", "batch", "slow"])
+    for stage in report.stages:
+      self.assertGreater(stage.records_per_second, 0.)
+    self.assertEqual(report.step.stage, "train_step")
+    self.assertAllClose(report.step.records_per_second, 40.)
+    self.assertAllClose(report.step.seconds_per_batch, 0.1)
+    self.assertIn("Training is not input bound.",
+                  input_diagnostics.format_report(report))
+
+  def test_too_few_elements(self):
+    stages = [("read", tf.data.Dataset.range(1), 1)]
+    with self.assertRaisesRegex(ValueError, "no more than one element"):
+      input_diagnostics.diagnose_input_pipeline(stages, num_batches=5)
+
+  def test_write_report(self):
+    logdir = self.get_temp_dir()
+    report = _report(100., 10.)
+    report.step = StageThroughput("train_step", 20., 1.)
+    input_diagnostics.write_report(report, logdir)
+
+    tags = set()
+    for filename in tf.io.gfile.glob(f"{logdir}/events*"):
+      for event in tf.compat.v1.train.summary_iterator(filename):
+        tags.update(v.tag for v in event.summary.value)
+    self.assertEqual(tags, {"records_per_second/00_stage0",
+                            "records_per_second/01_stage1",
+                            "records_per_second/train_step",
+                            "report"})
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -13,13 +13,21 @@
 # limitations under the License.
 # ==============================================================================
 """Model export helpers."""
+import functools
 import os
 from typing import Any, Optional, Sequence, Union
 
 import tensorflow as tf
+import tensorflow_gnn as tfgnn
 from tensorflow_gnn.runner import interfaces
 
 Field = Union[tf.Tensor, tf.RaggedTensor]
+SizeConstraints = tfgnn.SizeConstraints
+
+# The file read by TensorFlow Serving to warm up a model, see
+# https://www.tensorflow.org/tfx/serving/saved_model_warmup.
+_WARMUP_REQUESTS_FILENAME = os.path.join("assets.extra",
+                                         "tf_serving_warmup_requests")
 
 
 class KerasModelExporter(interfaces.ModelExporter):
@@ -167,6 +175,196 @@ class SubmoduleExporter(interfaces.ModelExporter):
                   self._options)
 
 
+class BucketedPaddingExporter(interfaces.ModelExporter):
+  """Exports a Keras model with serving signatures for padded size buckets.
+
+  Accelerators (notably TPUs) run best on inputs of a few fixed shapes. This
+  exporter stacks the `run_result.preprocess_model` and
+  `run_result.trained_model` like `KerasModelExporter` does, but pads the
+  `GraphTensor` inputs of the trained model (that is, after parsing and
+  preprocessing) to one of several fixed total sizes:
+
+    * The signature `serving_bucket_{i}` pads to `size_buckets[i]` and fails
+      for inputs that do not fit.
+    * The default serving signature pads to the first bucket in
+      `size_buckets` that fits the input, or runs unpadded if none fits.
+      Hence the buckets are best given in increasing order.
+
+  All signatures return the outputs of the trained model for the input
+  components only, so its outputs must be indexed by graph component, like
+  the predictions of the root node and graph `Task`s of the runner.
+
+  If `warmup_examples` are set, the export also contains TensorFlow Serving
+  warmup requests (`assets.extra/tf_serving_warmup_requests`) for the default
+  serving signature and for each bucket that fits the warmup examples, so that
+  their first requests do not pay for initialization. This requires the
+  `tensorflow-serving-api` package.
+  """
+
+  def __init__(self,
+               size_buckets: Sequence[SizeConstraints],
+               *,
+               output_names: Optional[Any] = None,
+               subdirectory: Optional[str] = None,
+               warmup_examples: Optional[Sequence[bytes]] = None,
+               model_name: str = "model",
+               options: Optional[tf.saved_model.SaveOptions] = None):
+    """Captures the args shared across `save(...)` calls.
+
+    Args:
+      size_buckets: The `SizeConstraints` to pad the inputs of the trained
+        model to, e.g., from `tfgnn.find_tight_size_constraints()` for
+        various batch sizes.
+      output_names: The names for output Tensor(s), see: `KerasModelExporter`.
+      subdirectory: An optional subdirectory, if set: models are exported to
+        `os.path.join(export_dir, subdirectory)`.
+      warmup_examples: Optionally, a batch of serialized `GraphTensor`s for
+        TensorFlow Serving warmup requests.
+      model_name: The model name in the warmup requests.
+      options: Options for saving to a TensorFlow `SavedModel`.
+    """
+    if not size_buckets:
+      raise ValueError("Expected at least one size bucket")
+    self._size_buckets = tuple(size_buckets)
+    self._output_names = output_names
+    self._subdirectory = subdirectory
+    self._warmup_examples = warmup_examples
+    self._model_name = model_name
+    self._options = options
+
+  def save(self, run_result: interfaces.RunResult, export_dir: str):
+    """Exports the stacked model with its bucketed serving signatures.
+
+    Args:
+      run_result: A `RunResult` from training.
+      export_dir: A destination directory.
+    """
+    preprocess_model = run_result.preprocess_model
+    model = run_result.trained_model
+
+    if preprocess_model is None:
+      raise ValueError("Bucketed padding requires a `preprocess_model`")
+    elif not preprocess_model.built:
+      raise ValueError("`preprocess_model` is expected to have been built")
+    elif not model.built:
+      raise ValueError("`model` is expected to have been built")
+
+    xs, *_ = preprocess_model.output
+    input_model = tf.keras.Model(preprocess_model.input, xs)
+    model_for_export = tf.keras.Model(preprocess_model.input, model(xs))
+    output_names = _flat_output_names(model_for_export, self._output_names)
+    [input_spec] = tf.nest.flatten(model_for_export.save_spec())
+
+    def outputs_dict(graphs, size_constraints=None):
+      num_components = tf.nest.flatten(graphs)[0].num_components
+      if size_constraints is not None:
+        graphs = tf.nest.map_structure(
+            lambda g: tfgnn.pad_to_total_sizes(g, size_constraints)[0],
+            graphs)
+      outputs = tf.nest.flatten(model(graphs))
+      # Drop the outputs for padding components (which come last).
+      return {name: output[:num_components]
+              for name, output in zip(output_names, outputs)}
+
+    signatures = {}
+    for i, size_constraints in enumerate(self._size_buckets):
+      signatures[f"serving_bucket_{i}"] = tf.function(
+          lambda x, c=size_constraints: outputs_dict(input_model(x), c),
+          input_signature=[input_spec])
+
+    @tf.function(input_signature=[input_spec])
+    def serving_default(examples):
+      graphs = input_model(examples)
+      # The index of the first fitting bucket, or len(buckets) if none fits.
+      fits = tf.stack([
+          tf.reduce_all([tfgnn.satisfies_size_constraints(g, c)
+                         for g in tf.nest.flatten(graphs)])
+          for c in self._size_buckets] + [tf.constant(True)])
+      index = tf.argmax(tf.cast(fits, tf.int32), output_type=tf.int32)
+      branches = [functools.partial(outputs_dict, graphs, c)
+                  for c in self._size_buckets]
+      branches.append(functools.partial(outputs_dict, graphs))
+      return tf.switch_case(index, branches)
+
+    signatures[tf.saved_model.DEFAULT_SERVING_SIGNATURE_DEF_KEY] = (
+        serving_default)
+
+    if self._subdirectory:
+      export_dir = os.path.join(export_dir, self._subdirectory)
+
+    tf.keras.models.save_model(
+        model_for_export,
+        export_dir,
+        include_optimizer=False,
+        save_traces=False,
+        signatures=signatures,
+        options=self._options)
+
+    if self._warmup_examples is not None:
+      examples = tf.constant(self._warmup_examples, tf.string)
+      graphs = tf.nest.flatten(input_model(examples))
+      signature_names = [tf.saved_model.DEFAULT_SERVING_SIGNATURE_DEF_KEY]
+      for i, size_constraints in enumerate(self._size_buckets):
+        if all(tfgnn.satisfies_size_constraints(g, size_constraints)
+               for g in graphs):
+          signature_names.append(f"serving_bucket_{i}")
+      _write_warmup_requests(
+          os.path.join(export_dir, _WARMUP_REQUESTS_FILENAME),
+          model_name=self._model_name,
+          signature_names=signature_names,
+          input_name=input_spec.name,
+          examples=examples)
+
+
+def _write_warmup_requests(filename: str,
+                           *,
+                           model_name: str,
+                           signature_names: Sequence[str],
+                           input_name: str,
+                           examples: tf.Tensor):
+  """Writes a TensorFlow Serving warmup request for each signature."""
+  try:
+    # pylint: disable=g-import-not-at-top
+    from tensorflow_serving.apis import model_pb2  # pytype: disable=import-error
+    from tensorflow_serving.apis import predict_pb2  # pytype: disable=import-error
+    from tensorflow_serving.apis import prediction_log_pb2  # pytype: disable=import-error
+    # pylint: enable=g-import-not-at-top
+  except ImportError as e:
+    raise ImportError("Warmup requests require the `tensorflow-serving-api` "
+                      "package") from e
+
+  tf.io.gfile.makedirs(os.path.dirname(filename))
+  with tf.io.TFRecordWriter(filename) as writer:
+    for signature_name in signature_names:
+      request = predict_pb2.PredictRequest(
+          model_spec=model_pb2.ModelSpec(
+              name=model_name, signature_name=signature_name))
+      request.inputs[input_name].CopyFrom(tf.make_tensor_proto(examples))
+      log = prediction_log_pb2.PredictionLog(
+          predict_log=prediction_log_pb2.PredictLog(request=request))
+      writer.write(log.SerializeToString())
+
+
+def _flat_output_names(model: tf.keras.Model,
+                       output_names: Optional[Any]) -> Sequence[str]:
+  """Returns the flat output names of `model` for use in a signature."""
+  if output_names is None:
+    flat_output_names = model.output_names
+    if not (isinstance(flat_output_names, Sequence)
+            and not isinstance(flat_output_names, (str, bytes))
+            and all(isinstance(name, str) for name in flat_output_names)):
+      raise ValueError("Expected Model.output_names to be a Sequence[str], "
+                       f"got: {flat_output_names}")
+  else:
+    tf.nest.assert_same_structure(model.output, output_names)
+    flat_output_names = tf.nest.flatten(output_names)
+    assert len(flat_output_names) == len(model.output_names)
+    for i in range(len(flat_output_names)):
+      if flat_output_names[i] is None:
+        flat_output_names[i] = model.output_names[i]
+  return flat_output_names
+
+
 def export_model(model: tf.keras.Model,
                  export_dir: str,
                  *,
@@ -211,21 +409,7 @@ def export_model(model: tf.keras.Model,
   #        ready to abandon the traditonal model.save() behavior.
   nested_arg_specs, nested_kwarg_specs = model.save_spec()
   flat_arg_specs = tf.nest.flatten((nested_arg_specs, nested_kwarg_specs))
-
-  if output_names is None:
-    flat_output_names = model.output_names
-    if not (isinstance(flat_output_names, Sequence)
-            and not isinstance(flat_output_names, (str, bytes))
-            and all(isinstance(name, str) for name in flat_output_names)):
-      raise ValueError("Expected Model.output_names to be a Sequence[str], "
-                       f"got: {flat_output_names}")
-  else:
-    tf.nest.assert_same_structure(model.output, output_names)
-    flat_output_names = tf.nest.flatten(output_names)
-    assert len(flat_output_names) == len(model.output_names)
-    for i in range(len(flat_output_names)):
-      if flat_output_names[i] is None:
-        flat_output_names[i] = model.output_names[i]
+  flat_output_names = _flat_output_names(model, output_names)
 
   @tf.function(input_signature=flat_arg_specs)
   def serving_default(*flat_args):
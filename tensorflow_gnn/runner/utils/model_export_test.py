@@ -99,6 +99,61 @@ def _named_inputs_outputs() -> tf.keras.Model:
   return tf.keras.Model([left, right], [summation, subtraction])
 
 
+_BUCKETED_SCHEMA = """
+  node_sets {
+    key: "nodes"
+    value {
+      features {
+        key: "features"
+        value {
+          dtype: DT_FLOAT
+          shape { dim { size: 4 } }
+        }
+      }
+    }
+  }
+  edge_sets {
+    key: "edges"
+    value {
+      source: "nodes"
+      target: "nodes"
+    }
+  }
+"""
+
+
+def _bucketed_graph_spec() -> tfgnn.GraphTensorSpec:
+  return tfgnn.create_graph_spec_from_schema_pb(
+      tfgnn.parse_schema(_BUCKETED_SCHEMA))
+
+
+def _bucketed_run_result() -> interfaces.RunResult:
+  """Returns a `RunResult` with per-component predictions."""
+  examples = tf.keras.Input(shape=(), dtype=tf.string, name="examples")
+  graph = tfgnn.keras.layers.ParseExample(_bucketed_graph_spec())(examples)
+  graph = graph.merge_batch_to_components()
+  labels = tfgnn.keras.layers.ReadoutFirstNode(
+      node_set_name="nodes", feature_name="features")(graph)
+  preprocess_model = tf.keras.Model(examples, (graph, labels))
+
+  inputs = tf.keras.Input(type_spec=graph.spec)
+  features = tfgnn.keras.layers.Pool(
+      tfgnn.CONTEXT, "sum", node_set_name="nodes",
+      feature_name="features")(inputs)
+  logits = tf.keras.layers.Dense(3, name="logits")(features)
+  trained_model = tf.keras.Model(inputs, logits)
+  return interfaces.RunResult(preprocess_model, None, trained_model)
+
+
+def _bucketed_examples(num_graphs: int) -> tf.Tensor:
+  spec = _bucketed_graph_spec()
+  return tf.constant([
+      tfgnn.write_example(
+          tfgnn.random_graph_tensor(spec, row_lengths_range=(2, 4)))
+      .SerializeToString()
+      for _ in range(num_graphs)])
+
+
 class ModelExportTests(tf.test.TestCase, parameterized.TestCase):
 
   @parameterized.named_parameters([
@@ -369,5 +424,83 @@ class ModelExportTests(tf.test.TestCase, parameterized.TestCase):
     self.assertAllClose(actual, inputs * 2)
 
 
+  def test_bucketed_padding_exporter(self):
+    export_dir = self.create_tempdir()
+    run_result = _bucketed_run_result()
+    size_buckets = [
+        tfgnn.SizeConstraints(
+            total_num_components=3,
+            total_num_nodes={"nodes": 9},
+            total_num_edges={"edges": 9}),
+        tfgnn.SizeConstraints(
+            total_num_components=9,
+            total_num_nodes={"nodes": 33},
+            total_num_edges={"edges": 33}),
+    ]
+    exporter = model_export.BucketedPaddingExporter(
+        size_buckets, output_names="logits")
+    exporter.save(run_result, export_dir)
+    saved_model = tf.saved_model.load(export_dir)
+
+    self.assertCountEqual(
+        saved_model.signatures.keys(),
+        ["serving_default", "serving_bucket_0", "serving_bucket_1"])
+
+    def expected_logits(examples):
+      graph, _ = run_result.preprocess_model(examples)
+      return run_result.trained_model(graph)
+
+    # Fits the first bucket, the second bucket and no bucket, respectively.
+    for num_graphs in (1, 4, 12):
+      examples = _bucketed_examples(num_graphs)
+      results = saved_model.signatures["serving_default"](examples=examples)
+      self.assertAllClose(results["logits"], expected_logits(examples))
+
+    examples = _bucketed_examples(2)
+    for signature_name in ("serving_bucket_0", "serving_bucket_1"):
+      results = saved_model.signatures[signature_name](examples=examples)
+      self.assertAllClose(results["logits"], expected_logits(examples))
+
+  def test_bucketed_padding_exporter_warmup(self):
+    try:
+      # pylint: disable=g-import-not-at-top
+      from tensorflow_serving.apis import prediction_log_pb2  # pytype: disable=import-error
+    except ImportError:
+      self.skipTest("Requires tensorflow-serving-api")
+    export_dir = self.create_tempdir()
+    size_buckets = [
+        tfgnn.SizeConstraints(
+            total_num_components=2,
+            total_num_nodes={"nodes": 5},
+            total_num_edges={"edges": 5}),
+        tfgnn.SizeConstraints(
+            total_num_components=9,
+            total_num_nodes={"nodes": 33},
+            total_num_edges={"edges": 33}),
+    ]
+    exporter = model_export.BucketedPaddingExporter(
+        size_buckets,
+        warmup_examples=_bucketed_examples(4).numpy().tolist())
+    exporter.save(_bucketed_run_result(), export_dir)
+
+    filename = os.path.join(export_dir, "assets.extra",
+                            "tf_serving_warmup_requests")
+    signature_names = []
+    for record in tf.data.TFRecordDataset(filename):
+      log = prediction_log_pb2.PredictionLog.FromString(record.numpy())
+      signature_names.append(log.predict_log.request.model_spec.signature_name)
+    # The warmup examples do not fit the first bucket.
+    self.assertEqual(signature_names, ["serving_default", "serving_bucket_1"])
+
+  def test_bucketed_padding_exporter_fails(self):
+    with self.assertRaisesRegex(ValueError, "at least one size bucket"):
+      model_export.BucketedPaddingExporter([])
+    run_result = _bucketed_run_result()
+    run_result = interfaces.RunResult(None, None, run_result.trained_model)
+    exporter = model_export.BucketedPaddingExporter(
+        [tfgnn.SizeConstraints(2, {"nodes": 5}, {"edges": 5})])
+    with self.assertRaisesRegex(ValueError, "requires a `preprocess_model`"):
+      exporter.save(run_result, self.create_tempdir())
+
 if __name__ == "__main__":
   tf.test.main()
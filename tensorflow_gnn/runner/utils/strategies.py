@@ -22,14 +22,28 @@ MinSizePartitioner = tf.distribute.experimental.partitioners.MinSizePartitioner
 class ParameterServerStrategy(tf.distribute.ParameterServerStrategy):
   """A `ParameterServerStrategy` convenience wrapper."""
 
-  def __init__(self, min_shard_bytes: Optional[int] = None):
+  def __init__(self,
+               min_shard_bytes: Optional[int] = None,
+               max_shards: Optional[int] = None):
+    """Initializes the strategy from the `TF_CONFIG` environment variable.
+
+    Args:
+      min_shard_bytes: The minimum size of a variable shard, in bytes. If
+        unset, the default of `MinSizePartitioner` is used.
+      max_shards: The maximum number of shards of a variable. If unset, the
+        number of parameter servers. Set it higher to spread a large table,
+        like the one of a `tfgnn.keras.layers.IdEmbedding`, over more shards
+        than parameter servers (they are placed round-robin).
+    """
     cluster_resolver = tf.distribute.cluster_resolver.TFConfigClusterResolver()
     num_ps = cluster_resolver.cluster_spec().num_tasks("ps")
+    if max_shards is None:
+      max_shards = num_ps
     # If min_shard_bytes is not supplied, use the recommended default.
     if min_shard_bytes is None:
-      variable_partitioner = MinSizePartitioner(max_shards=num_ps)
+      variable_partitioner = MinSizePartitioner(max_shards=max_shards)
     else:
-      variable_partitioner = MinSizePartitioner(min_shard_bytes, num_ps)
+      variable_partitioner = MinSizePartitioner(min_shard_bytes, max_shards)
     super().__init__(cluster_resolver, variable_partitioner)
 
 
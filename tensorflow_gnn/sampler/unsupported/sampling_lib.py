@@ -17,10 +17,11 @@
 import collections
 import math
 import random
-from typing import Any, Callable, DefaultDict, Dict, List, Iterable, Iterator, Set, Tuple
+from typing import Any, Callable, DefaultDict, Dict, List, Iterable, Iterator, Optional, Set, Tuple
 
 from absl import logging
 import apache_beam as beam
+import numpy as np
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 from tensorflow_gnn.sampler import sampling_spec_pb2
@@ -113,6 +114,18 @@ Frontier = PCollection[Tuple[Tuple[SampleId, NodeId], int]]
 _FROTIER_OUTPUT_TAG = "frontier"
 
 
+def _copy_without_edges(node: Node) -> Node:
+  """Returns a copy of `node` with all fields except its outgoing edges."""
+  result = Node()
+  if node.HasField("id"):
+    result.id = node.id
+  if node.HasField("features"):
+    result.features.CopyFrom(node.features)
+  if node.HasField("node_set_name"):
+    result.node_set_name = node.node_set_name
+  return result
+
+
 class ResevoirEdgeSamplingFn(beam.DoFn):
   """Implements reservoir sampling without replacement.
 
@@ -175,9 +188,7 @@ class ResevoirEdgeSamplingFn(beam.DoFn):
         for _, edge_index in weights[:self._sample_size]:
           edge_index_to_count[edge_index] += count_step
 
-      sampled_edges = Node()
-      sampled_edges.CopyFrom(node)
-      sampled_edges.ClearField("outgoing_edges")
+      sampled_edges = _copy_without_edges(node)
       sampled_edges.outgoing_edges.extend(
           [node.outgoing_edges[index] for index in edge_index_to_count.keys()])
 
@@ -189,6 +200,97 @@ class ResevoirEdgeSamplingFn(beam.DoFn):
     yield sample_id, sampled_edges
 
 
+def sample_uniform_edge_indices(rng: np.random.Generator, degree: int,
+                                sample_size: int,
+                                num_resamples: int) -> Tuple[np.ndarray,
+                                                             np.ndarray]:
+  """Computes a uniform sampling plan for a node from its out-degree only.
+
+  Each of `num_resamples` independent samples draws `min(sample_size, degree)`
+  distinct edge indices from `[0, degree)` uniformly at random. The plan does
+  not depend on the edges themselves, so the edges could be picked later by
+  their indices in the adjacency list.
+
+  Args:
+    rng: The random numbers generator.
+    degree: The number of outgoing edges of the node.
+    sample_size: The number of edges to sample without replacement for each
+      resample.
+    num_resamples: The number of independent samples.
+
+  Returns:
+    A tuple of sorted unique sampled edge indices and the total number of times
+    each of those edges was sampled across all resamples.
+  """
+  if degree <= sample_size:
+    return (np.arange(degree, dtype=np.int64),
+            np.full([degree], num_resamples, dtype=np.int64))
+  picks = [
+      rng.choice(degree, size=sample_size, replace=False, shuffle=False)
+      for _ in range(num_resamples)
+  ]
+  return np.unique(np.concatenate(picks), return_counts=True)
+
+
+class UniformEdgeSamplingFn(beam.DoFn):
+  """Implements uniform edge sampling without replacement by edge indices.
+
+  Unlike `ResevoirEdgeSamplingFn`, the sampled edges are selected by their
+  indices from a sampling plan computed using only the node out-degree (see
+  `sample_uniform_edge_indices()`). The work per input node is proportional to
+  the number of sampled edges and not to the total number of outgoing edges,
+  which matters for nodes with very large out-degrees.
+  """
+
+  def __init__(self, sample_size: int, seed: Optional[int] = None):
+    """Constructor.
+
+    Args:
+      sample_size: The upper bound on the number of sampled edges for each
+        (node, path) pair.
+      seed: The optional seed for the random numbers generator.
+    """
+    self._sample_size = sample_size
+    self._seed = seed
+    self._rng = None
+
+  def setup(self):
+    self._rng = np.random.default_rng(self._seed)
+
+  def process(self, element: Tuple[SampleId, Tuple[int, Node]]):
+    """Samples edges for each input and computes new sampling frontier.
+
+    Args:
+      element: A tuple containing a sample id mapping to a tuple containing an
+        integer count of the total number of sampling paths that lead to a given
+        node.
+
+    Yields:
+      Tuple of sample id and sampled edged as the main output and new sampling
+        frontier as `_FROTIER_OUTPUT_TAG` output.
+    """
+    sample_id, (num_samples, node) = element
+
+    edges = node.outgoing_edges
+    if len(edges) <= self._sample_size:
+      sampled_edges = node
+      for edge in edges:
+        yield beam.pvalue.TaggedOutput(
+            _FROTIER_OUTPUT_TAG, ((sample_id, edge.neighbor_id), num_samples))
+    else:
+      indices, counts = sample_uniform_edge_indices(self._rng, len(edges),
+                                                    self._sample_size,
+                                                    num_samples)
+      sampled_edges = _copy_without_edges(node)
+      for edge_index, count in zip(indices.tolist(), counts.tolist()):
+        edge = edges[edge_index]
+        sampled_edges.outgoing_edges.append(edge)
+        yield beam.pvalue.TaggedOutput(_FROTIER_OUTPUT_TAG,
+                                       ((sample_id, edge.neighbor_id), count))
+
+    yield sample_id, sampled_edges
+
+
 def sample_edges(
     sampling_spec: sampling_spec_pb2.SamplingSpec,
     seeds: Dict[tfgnn.NodeSetName, PCollection[Tuple[SampleId, NodeId]]],
@@ -285,10 +387,15 @@ def sample_edges(
         | stage_name("DropSourceIds") >> beam.Values()
         | stage_name("ExtractMatchedNodes") >> beam.MapTuple(extract_nodes))
 
-    sampling_fn = ResevoirEdgeSamplingFn(
-        create_sampling_weight_fn(sampling_op, get_weight_feature),
-        sampling_op.sample_size,
-        resample_for_each_path=not is_deterministic(sampling_op))
+    if sampling_op.strategy == sampling_spec_pb2.RANDOM_UNIFORM:
+      # Uniform sampling does not depend on edge weights, so edges are picked
+      # by their indices without visiting all outgoing edges of a node.
+      sampling_fn = UniformEdgeSamplingFn(sampling_op.sample_size)
+    else:
+      sampling_fn = ResevoirEdgeSamplingFn(
+          create_sampling_weight_fn(sampling_op, get_weight_feature),
+          sampling_op.sample_size,
+          resample_for_each_path=not is_deterministic(sampling_op))
     sampled_edges, new_frontier = (
         nodes
         | stage_name("SampleEdges") >> beam.ParDo(sampling_fn).with_outputs(
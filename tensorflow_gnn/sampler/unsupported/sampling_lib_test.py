@@ -20,6 +20,7 @@ from typing import Iterable, List, Mapping, Tuple
 from absl.testing import parameterized
 import apache_beam as beam
 from apache_beam.testing import util
+import numpy as np
 import tensorflow as tf
 import tensorflow_gnn as tfgnn
 
@@ -279,6 +280,74 @@ class TestReservoirEdgeSamplingFn(EdgeSamplingTestBase):
           label="frontier")
 
 
+class TestUniformEdgeSamplingFn(EdgeSamplingTestBase):
+
+  def test_sample_uniform_edge_indices(self):
+    rng = np.random.default_rng(42)
+    indices, counts = lib.sample_uniform_edge_indices(
+        rng, degree=1_000_000, sample_size=5, num_resamples=3)
+    self.assertEqual(counts.sum(), 15)
+    self.assertLen(np.unique(indices), indices.size)
+    self.assertTrue(np.all((indices >= 0) & (indices < 1_000_000)))
+    self.assertTrue(np.all(counts <= 3))
+
+    indices, counts = lib.sample_uniform_edge_indices(
+        rng, degree=3, sample_size=5, num_resamples=7)
+    self.assertAllEqual(indices, [0, 1, 2])
+    self.assertAllEqual(counts, [7, 7, 7])
+
+  def test_all(self):
+    sampling_fn = lib.UniformEdgeSamplingFn(3, seed=1)
+    with beam.Pipeline() as root:
+      nodes = _create_test_nodes([(b"sample.1", 1, [3, 2, 1]),
+                                  (b"sample.2", 3, [2])])
+      sampled_edges, new_frontier = (
+          root | beam.Create([(sample_id, (count, node))
+                              for (sample_id, node), count in zip(
+                                  nodes, [10, 30])])
+          | beam.ParDo(sampling_fn).with_outputs(
+              lib._FROTIER_OUTPUT_TAG, main="sampled_edges"))
+      util.assert_that(
+          sampled_edges, self.sampled_edges_matcher(nodes), label="samples")
+      util.assert_that(
+          new_frontier,
+          util.equal_to([
+              ((b"sample.1", b"1"), 10),
+              ((b"sample.1", b"2"), 10),
+              ((b"sample.1", b"3"), 10),
+              ((b"sample.2", b"2"), 30),
+          ]),
+          label="frontier")
+
+  def test_sample_size(self):
+    sampling_fn = lib.UniformEdgeSamplingFn(2, seed=1)
+    with beam.Pipeline() as root:
+      nodes = _create_test_nodes([(b"sample.1", 1, [1, 2, 3, 4, 5])])
+      sampled_edges, new_frontier = (
+          root | beam.Create([(b"sample.1", (10, nodes[0][1]))])
+          | beam.ParDo(sampling_fn).with_outputs(
+              lib._FROTIER_OUTPUT_TAG, main="sampled_edges"))
+
+      def check_samples(actual):
+        self.assertLen(actual, 1)
+        sample_id, node = actual[0]
+        self.assertEqual(sample_id, b"sample.1")
+        self.assertEqual(node.id, b"1")
+        neighbors = [edge.neighbor_id for edge in node.outgoing_edges]
+        self.assertLen(set(neighbors), len(neighbors))
+        self.assertBetween(len(neighbors), 2, 5)
+
+      def check_frontier(actual):
+        self.assertEqual(sum(count for _, count in actual), 20)
+        for (sample_id, neighbor_id), count in actual:
+          self.assertEqual(sample_id, b"sample.1")
+          self.assertIn(neighbor_id, [b"1", b"2", b"3", b"4", b"5"])
+          self.assertBetween(count, 1, 10)
+
+      util.assert_that(sampled_edges, check_samples, label="samples")
+      util.assert_that(new_frontier, check_frontier, label="frontier")
+
+
 class TestEdgeSampling(EdgeSamplingTestBase):
 
   @parameterized.named_parameters(
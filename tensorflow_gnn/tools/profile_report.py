@@ -0,0 +1,286 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Report the op time and memory of a TF-GNN model by edge set and layer.
+
+Capture a trace of a few training steps of a model that was built and traced
+with op profiling enabled, like
+
+```
+from tensorflow_gnn.graph import op_profiling
+
+op_profiling.enable_op_profiling()
+model = ...  # Build, compile and fit the model for some warm-up steps.
+tf.profiler.experimental.start("/tmp/trace")
+...  # Fit the model for a few more steps.
+tf.profiler.experimental.stop()
+```
+
+and run this tool on the trace directory:
+
+```
+tfgnn_profile_report --trace_dir=/tmp/trace
+```
+
+It sums up the run time of the ops in the trace by the TF-GNN operation
+(broadcast, pool, softmax, convolution), by edge set, by node set and by Keras
+layer, using the name scopes set by op profiling (see `op_profiling.py`).
+Memory is summed up from the allocator events in the trace, if any (usually,
+these are only recorded for GPUs). Edge set and node set names appear with
+the characters replaced that cannot be used in name scopes.
+"""
+
+import collections
+import dataclasses
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from absl import app
+from absl import flags
+import tensorflow as tf
+from tensorflow_gnn.graph import op_profiling
+
+from tensorflow.tsl.profiler.protobuf import xplane_pb2  # pylint: disable=g-direct-tensorflow-import
+
+
+FLAGS = flags.FLAGS
+
+# The key for ops outside of any annotated TF-GNN operation.
+OTHER = '(other)'
+
+
+def define_flags():
+  """Define the program flags."""
+
+  flags.DEFINE_string('trace_dir', None,
+                      'The directory with the captured trace, as passed to '
+                      'tf.profiler.experimental.start(). All *.xplane.pb files '
+                      'in it and its subdirectories are read.')
+
+  flags.DEFINE_integer('top', 20,
+                       'The number of rows to print per table (0 for all).')
+
+
+@dataclasses.dataclass
+class Cost:
+  """The aggregated cost of a group of ops."""
+  time_ps: int = 0
+  num_events: int = 0
+  allocated_bytes: int = 0
+
+
+@dataclasses.dataclass
+class ProfileReport:
+  """The costs of the ops in a trace, grouped in various ways."""
+  by_operation: Dict[str, Cost]
+  by_edge_set: Dict[str, Cost]
+  by_node_set: Dict[str, Cost]
+  by_layer: Dict[str, Cost]
+
+
+@dataclasses.dataclass(frozen=True)
+class OpAttribution:
+  """What an op of the model belongs to, as recovered from its name."""
+  layer: str
+  operation: Optional[str]
+  edge_set_name: Optional[str]
+  node_set_name: Optional[str]
+
+
+def attribute_op(op_name: str) -> OpAttribution:
+  """Returns the attribution of an op from its name scopes.
+
+  The layer is the sequence of name scopes before the first scope opened by
+  op profiling (or before the op itself). The operation is the outermost
+  TF-GNN operation, so that the ops of a pool inside a softmax count for the
+  softmax. The edge set and node set are the innermost ones.
+
+  Args:
+    op_name: The full name of an op, like
+      `"model/gat_v2_conv/tfgnn.convolution/edge_set.cites/MatMul"`.
+
+  Returns:
+    An `OpAttribution`.
+  """
+  scopes = op_name.split('/')[:-1]
+  layer_scopes = []
+  operation = edge_set_name = node_set_name = None
+  for scope in scopes:
+    if scope.startswith(op_profiling.OP_SCOPE_PREFIX):
+      if operation is None:
+        operation = scope[len(op_profiling.OP_SCOPE_PREFIX):]
+    elif scope.startswith(op_profiling.EDGE_SET_SCOPE_PREFIX):
+      edge_set_name = scope[len(op_profiling.EDGE_SET_SCOPE_PREFIX):]
+    elif scope.startswith(op_profiling.NODE_SET_SCOPE_PREFIX):
+      node_set_name = scope[len(op_profiling.NODE_SET_SCOPE_PREFIX):]
+    elif operation is None and edge_set_name is None and node_set_name is None:
+      layer_scopes.append(scope)
+  return OpAttribution(layer='/'.join(layer_scopes), operation=operation,
+                       edge_set_name=edge_set_name, node_set_name=node_set_name)
+
+
+def read_xspaces(trace_dir: str) -> List[xplane_pb2.XSpace]:
+  """Returns the XSpace protos of all *.xplane.pb files in `trace_dir`."""
+  result = []
+  for dirpath, _, filenames in tf.io.gfile.walk(trace_dir):
+    for filename in sorted(filenames):
+      if filename.endswith('.xplane.pb'):
+        xspace = xplane_pb2.XSpace()
+        with tf.io.gfile.GFile(os.path.join(dirpath, filename), 'rb') as f:
+          xspace.ParseFromString(f.read())
+        result.append(xspace)
+  return result
+
+
+def _iter_plane_events(
+    plane: xplane_pb2.XPlane
+) -> Iterable[Tuple[xplane_pb2.XEventMetadata, xplane_pb2.XEvent,
+                    Dict[str, object]]]:
+  """Yields (event metadata, event, stats) for all events in `plane`."""
+  stat_names = {k: v.name for k, v in plane.stat_metadata.items()}
+
+  def stat_value(stat):
+    kind = stat.WhichOneof('value')
+    if kind == 'ref_value':
+      return plane.stat_metadata[stat.ref_value].name
+    return getattr(stat, kind) if kind else None
+
+  for line in plane.lines:
+    for event in line.events:
+      stats = {stat_names.get(s.metadata_id): stat_value(s)
+               for s in event.stats}
+      metadata = plane.event_metadata[event.metadata_id]
+      for s in metadata.stats:
+        stats.setdefault(stat_names.get(s.metadata_id), stat_value(s))
+      yield metadata, event, stats
+
+
+def _op_name(metadata: xplane_pb2.XEventMetadata,
+             stats: Dict[str, object]) -> Optional[str]:
+  """Returns the op name of a TF op event, or None for other events."""
+  tf_op = stats.get('tf_op')
+  if isinstance(tf_op, str) and ':' in tf_op:
+    return tf_op.rsplit(':', 1)[0]
+  # The host events of TF ops are named like "model/dense/MatMul:MatMul",
+  # with the op type as display name.
+  suffix = ':' + metadata.display_name
+  if metadata.display_name and metadata.name.endswith(suffix):
+    return metadata.name[:-len(suffix)]
+  return None
+
+
+def summarize(xspaces: Iterable[xplane_pb2.XSpace]) -> ProfileReport:
+  """Returns the ProfileReport for the op events in `xspaces`.
+
+  If there are device planes (like GPUs) with TF op events, only these are
+  used for time, because the host events for the same ops merely launch them.
+
+  Args:
+    xspaces: The XSpace protos of a trace, as returned by `read_xspaces()`.
+
+  Returns:
+    A `ProfileReport`.
+  """
+  op_times = collections.defaultdict(lambda: [0, 0])
+  device_op_times = collections.defaultdict(lambda: [0, 0])
+  op_bytes = collections.defaultdict(int)
+  for xspace in xspaces:
+    for plane in xspace.planes:
+      is_device = plane.name.startswith('/device:')
+      for metadata, event, stats in _iter_plane_events(plane):
+        if metadata.name == 'MemoryAllocation':
+          tf_op = stats.get('tf_op')
+          num_bytes = stats.get('requested_bytes')
+          if isinstance(tf_op, str) and num_bytes:
+            op_bytes[tf_op.rsplit(':', 1)[0]] += int(num_bytes)
+          continue
+        op_name = _op_name(metadata, stats)
+        if op_name is None:
+          continue
+        times = device_op_times if is_device else op_times
+        times[op_name][0] += event.duration_ps
+        times[op_name][1] += 1
+  if device_op_times:
+    op_times = device_op_times
+
+  report = ProfileReport(
+      by_operation=collections.defaultdict(Cost),
+      by_edge_set=collections.defaultdict(Cost),
+      by_node_set=collections.defaultdict(Cost),
+      by_layer=collections.defaultdict(Cost))
+
+  def add(op_name, time_ps, num_events, allocated_bytes):
+    attribution = attribute_op(op_name)
+    keys = [(report.by_operation, attribution.operation or OTHER),
+            (report.by_layer, attribution.layer or OTHER)]
+    if attribution.edge_set_name is not None:
+      keys.append((report.by_edge_set, attribution.edge_set_name))
+    if attribution.node_set_name is not None:
+      keys.append((report.by_node_set, attribution.node_set_name))
+    for costs, key in keys:
+      costs[key].time_ps += time_ps
+      costs[key].num_events += num_events
+      costs[key].allocated_bytes += allocated_bytes
+
+  for op_name, (time_ps, num_events) in op_times.items():
+    add(op_name, time_ps, num_events, op_bytes.pop(op_name, 0))
+  for op_name, allocated_bytes in op_bytes.items():
+    add(op_name, 0, 0, allocated_bytes)
+
+  return ProfileReport(by_operation=dict(report.by_operation),
+                       by_edge_set=dict(report.by_edge_set),
+                       by_node_set=dict(report.by_node_set),
+                       by_layer=dict(report.by_layer))
+
+
+def format_report(report: ProfileReport, top: int = 0) -> str:
+  """Returns a printable table of `report` with `top` rows per group."""
+  total_ps = sum(c.time_ps for c in report.by_layer.values()) or 1
+  lines = []
+  for title, costs in [('TF-GNN operation', report.by_operation),
+                       ('Edge set', report.by_edge_set),
+                       ('Node set', report.by_node_set),
+                       ('Layer', report.by_layer)]:
+    if not costs:
+      continue
+    rows = sorted(costs.items(), key=lambda kv: -kv[1].time_ps)
+    if top:
+      rows = rows[:top]
+    width = max(len(title), *(len(k) for k, _ in rows))
+    lines.append(f'{title:<{width}}  {"time (ms)":>12}  {"%":>6}  '
+                 f'{"events":>8}  {"alloc (MiB)":>12}')
+    for key, cost in rows:
+      lines.append(f'{key:<{width}}  {cost.time_ps / 1e9:>12.3f}  '
+                   f'{100.0 * cost.time_ps / total_ps:>6.1f}  '
+                   f'{cost.num_events:>8}  '
+                   f'{cost.allocated_bytes / 2**20:>12.3f}')
+    lines.append('')
+  return '\n'.join(lines)
+
+
+def app_main(_):
+  xspaces = read_xspaces(FLAGS.trace_dir)
+  if not xspaces:
+    raise app.UsageError(f'No *.xplane.pb files in {FLAGS.trace_dir}')
+  print(format_report(summarize(xspaces), top=FLAGS.top))
+
+
+def main():
+  define_flags()
+  flags.mark_flag_as_required('trace_dir')
+  app.run(app_main)
+
+
+if __name__ == '__main__':
+  main()
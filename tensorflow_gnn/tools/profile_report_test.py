@@ -0,0 +1,149 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for profile_report."""
+
+import tempfile
+
+import tensorflow as tf
+import tensorflow_gnn as tfgnn
+from tensorflow_gnn.graph import op_profiling
+from tensorflow_gnn.models import vanilla_mpnn
+from tensorflow_gnn.tools import profile_report
+
+from tensorflow.tsl.profiler.protobuf import xplane_pb2  # pylint: disable=g-direct-tensorflow-import
+
+
+def _make_graph():
+  return tfgnn.GraphTensor.from_pieces(
+      node_sets={
+          "a": tfgnn.NodeSet.from_fields(
+              sizes=[3], features={tfgnn.HIDDEN_STATE: tf.ones([3, 4])}),
+          "b": tfgnn.NodeSet.from_fields(
+              sizes=[2], features={tfgnn.HIDDEN_STATE: tf.ones([2, 4])}),
+      },
+      edge_sets={
+          "a->b": tfgnn.EdgeSet.from_fields(
+              sizes=[3],
+              adjacency=tfgnn.Adjacency.from_indices(("a", [0, 1, 2]),
+                                                     ("b", [0, 1, 1]))),
+          "b->a": tfgnn.EdgeSet.from_fields(
+              sizes=[2],
+              adjacency=tfgnn.Adjacency.from_indices(("b", [0, 1]),
+                                                     ("a", [2, 0]))),
+      })
+
+
+def _add_event(plane, line, name, duration_ps, **stats):
+  """Adds an event with string or int stats to an XPlane proto."""
+  metadata_id = len(plane.event_metadata) + 1
+  plane.event_metadata[metadata_id].id = metadata_id
+  plane.event_metadata[metadata_id].name = name
+  if ":" in name and "::" not in name:  # Like TF op events.
+    plane.event_metadata[metadata_id].display_name = name.rsplit(":", 1)[1]
+  event = line.events.add(metadata_id=metadata_id, duration_ps=duration_ps)
+  for stat_name, value in stats.items():
+    stat_id = next((k for k, v in plane.stat_metadata.items()
+                    if v.name == stat_name), len(plane.stat_metadata) + 1)
+    plane.stat_metadata[stat_id].id = stat_id
+    plane.stat_metadata[stat_id].name = stat_name
+    if isinstance(value, str):
+      event.stats.add(metadata_id=stat_id, str_value=value)
+    else:
+      event.stats.add(metadata_id=stat_id, int64_value=value)
+
+
+class ProfileReportTest(tf.test.TestCase):
+
+  def tearDown(self):
+    op_profiling.disable_op_profiling()
+    super().tearDown()
+
+  def testAttributeOp(self):
+    self.assertEqual(
+        profile_report.OpAttribution(
+            layer="model/graph_update/conv", operation="convolution",
+            edge_set_name="a->b", node_set_name=None),
+        profile_report.attribute_op(
+            "model/graph_update/conv/tfgnn.convolution/edge_set.a->b/"
+            "tfgnn.pool/edge_set.a->b/UnsortedSegmentSum"))
+    self.assertEqual(
+        profile_report.OpAttribution(
+            layer="model/dense", operation=None, edge_set_name=None,
+            node_set_name=None),
+        profile_report.attribute_op("model/dense/MatMul"))
+    self.assertEqual(
+        "node_set.x",
+        profile_report.attribute_op(
+            "tfgnn.pool/node_set.node_set.x/Sum").node_set_name)
+
+  def testSummarize(self):
+    xspace = xplane_pb2.XSpace()
+    host = xspace.planes.add(name="/host:CPU")
+    line = host.lines.add(name="tf_Compute")
+    _add_event(host, line, "m/tfgnn.pool/edge_set.a/Sum:UnsortedSegmentSum",
+               3000)
+    _add_event(host, line, "m/tfgnn.pool/edge_set.b/Sum:UnsortedSegmentSum",
+               1000)
+    _add_event(host, line, "m/dense/MatMul:MatMul", 6000)
+    _add_event(host, line, "ExecutorState::Process", 100000)
+    _add_event(host, line, "EagerExecute", 100000)
+    _add_event(host, line, "MemoryAllocation", 10,
+               tf_op="m/tfgnn.pool/edge_set.a/Sum:UnsortedSegmentSum",
+               requested_bytes=2048)
+
+    report = profile_report.summarize([xspace])
+    self.assertEqual({"a", "b"}, set(report.by_edge_set))
+    self.assertEqual(3000, report.by_edge_set["a"].time_ps)
+    self.assertEqual(2048, report.by_edge_set["a"].allocated_bytes)
+    self.assertEqual(4000, report.by_operation["pool"].time_ps)
+    self.assertEqual(6000, report.by_operation[profile_report.OTHER].time_ps)
+    self.assertEqual(6000, report.by_layer["m/dense"].time_ps)
+    self.assertEqual(4000, report.by_layer["m"].time_ps)
+    self.assertRegex(profile_report.format_report(report), r"Edge set")
+
+  def testSummarizePrefersDeviceEvents(self):
+    xspace = xplane_pb2.XSpace()
+    host = xspace.planes.add(name="/host:CPU")
+    _add_event(host, host.lines.add(), "m/tfgnn.pool/edge_set.a/Sum:Sum", 10)
+    device = xspace.planes.add(name="/device:GPU:0")
+    _add_event(device, device.lines.add(), "sum_kernel", 500,
+               tf_op="m/tfgnn.pool/edge_set.a/Sum:Sum")
+    report = profile_report.summarize([xspace])
+    self.assertEqual(500, report.by_edge_set["a"].time_ps)
+
+  def testCapturedTrace(self):
+    op_profiling.enable_op_profiling()
+    graph = _make_graph()
+    inputs = tf.keras.layers.Input(type_spec=graph.spec)
+    outputs = vanilla_mpnn.VanillaMPNNGraphUpdate(
+        units=4, message_dim=4, receiver_tag=tfgnn.TARGET)(inputs)
+    model = tf.keras.Model(inputs, outputs)
+    step = tf.function(model)
+    step(graph)
+
+    trace_dir = tempfile.mkdtemp(dir=self.get_temp_dir())
+    tf.profiler.experimental.start(trace_dir)
+    for _ in range(3):
+      step(graph)
+    tf.profiler.experimental.stop()
+
+    report = profile_report.summarize(profile_report.read_xspaces(trace_dir))
+    self.assertContainsSubset(["a->b", "b->a"], report.by_edge_set.keys())
+    self.assertGreater(report.by_edge_set["a->b"].time_ps, 0)
+    self.assertContainsSubset(["convolution"], report.by_operation.keys())
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -0,0 +1,33 @@
+# Copyright 2024 The TensorFlow GNN Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Utilities for non-trainable state under a `tf.distribute.Strategy`."""
+
+from typing import Tuple
+
+import tensorflow as tf
+
+# For variables to which all replicas write the same (all-gathered) values,
+# so the update of the first replica is applied to all copies.
+MIRRORED_VARIABLE_KWARGS = dict(
+    synchronization=tf.VariableSynchronization.ON_WRITE,
+    aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA)
+
+
+def all_gather_from_replicas(*values: tf.Tensor) -> Tuple[tf.Tensor, ...]:
+  """Concatenates `values` from all replicas, if in a multi-replica context."""
+  replica_context = tf.distribute.get_replica_context()
+  if replica_context is None or replica_context.num_replicas_in_sync == 1:
+    return values
+  return tuple(replica_context.all_gather(value, axis=0) for value in values)